@@ -1,3 +1,10 @@
 from django.contrib import admin
 
-# Register your models here.
+from client.models import Client
+
+
+@admin.register(Client)
+class ClientAdmin(admin.ModelAdmin):
+    list_display = ("name", "internal")
+    list_filter = ("internal",)
+    search_fields = ("name",)
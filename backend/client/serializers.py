@@ -0,0 +1,10 @@
+from common.serializers import ModelValidationMixin
+from rest_framework import serializers
+
+from client.models import Client
+
+
+class ClientSerializer(ModelValidationMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Client
+        fields = ["id", "name", "internal"]
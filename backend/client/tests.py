@@ -1,3 +1,58 @@
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from client.models import Client
+
+
+class ClientViewSetCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create(username="admin")
+        Client.objects.bulk_create(Client(name=f"Client {i}") for i in range(30))
+        return super().setUpTestData()
+
+    def test_list_query_count_independent_of_page_size(self):
+        """Should list a page with one query at any page size."""
+        api = APIClient()
+        api.force_authenticate(self.user)
+        for page_size in (5, 30):
+            with self.assertNumQueries(1):
+                response = api.get("/api/clients/", {"page_size": page_size})
+            self.assertEqual(len(response.data["results"]), page_size)
+
+
+class StatusReportCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create(username="admin")
+        cls.client_ = Client.objects.create(name="Acme")
+        cls.client_.projects.create(name="Website").tasks.create(hours_estimate=3)
+        return super().setUpTestData()
+
+    def setUp(self):
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def test_json(self):
+        """Should return the client's report with its projects."""
+        response = self.api.get(f"/api/clients/{self.client_.pk}/status-report/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["projects"][0]["estimate_hours"], 3)
+
+    def test_bulk_csv(self):
+        """Should export the reports of several clients as one CSV file."""
+        response = self.api.get(
+            "/api/clients/status-reports/",
+            {"ids": str(self.client_.pk), "export": "csv"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn("Website", response.content.decode())
+
+    def test_unknown_format(self):
+        """Should reject an unknown export format."""
+        response = self.api.get(
+            f"/api/clients/{self.client_.pk}/status-report/", {"export": "xls"}
+        )
+        self.assertEqual(response.status_code, 400)
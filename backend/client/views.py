@@ -1,3 +1,67 @@
-from django.shortcuts import render
+from django.http import HttpResponse
+from rest_framework import serializers, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
 
-# Create your views here.
+from client.models import Client
+from client.serializers import ClientSerializer
+from task.status_reports import (
+    EXPORT_FORMATS,
+    client_report,
+    client_reports,
+    export_reports,
+)
+
+
+class ClientViewSet(viewsets.ModelViewSet):
+    queryset = Client.objects.all()
+    serializer_class = ClientSerializer
+
+    @action(detail=True, url_path="status-report")
+    def status_report(self, request, pk=None):
+        """
+        The client's status report across all of its projects, as JSON or, with
+        ``?export=csv`` or ``?export=pdf``, as a file.
+        """
+        client = self.get_object()
+        return self._report_response(
+            request, [client.pk], f"status-report-{pk}", lambda: client_report(client)
+        )
+
+    @action(detail=False, url_path="status-reports")
+    def status_reports(self, request):
+        """Reports for ``?ids=1,2,...`` (default: every client) in bulk."""
+        params = StatusReportParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        ids = params.validated_data.get("ids")
+        clients = ids if ids else Client.objects.values("pk")
+        return self._report_response(
+            request, clients, "status-reports", lambda: client_reports(clients)
+        )
+
+    @staticmethod
+    def _report_response(request, clients, filename, report):
+        params = StatusReportParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        export_format = params.validated_data.get("export")
+        if not export_format:
+            return Response(report())
+        content, content_type, extension = export_reports(clients, export_format)
+        response = HttpResponse(content, content_type=content_type)
+        response["Content-Disposition"] = (
+            f'attachment; filename="{filename}.{extension}"'
+        )
+        return response
+
+
+class StatusReportParamsSerializer(serializers.Serializer):
+    export = serializers.ChoiceField(choices=EXPORT_FORMATS, required=False)
+    ids = serializers.CharField(required=False)
+
+    def validate_ids(self, value):
+        try:
+            return [int(part) for part in value.split(",") if part]
+        except ValueError as error:
+            raise serializers.ValidationError(
+                "Expected comma-separated ids."
+            ) from error
@@ -1,3 +1,27 @@
 from django.contrib import admin
 
-# Register your models here.
+from common.pagination import EstimatedCountPaginator
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Admin for tables too large to count or to list in a select box: pages are
+    counted by estimate, the unfiltered total is not shown, and foreign keys
+    are picked with autocomplete widgets (see ``autocomplete_fields``).
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+
+
+class ReadOnlyAdmin(LargeTableAdmin):
+    """Admin for rows maintained by the application: browsable, not editable."""
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
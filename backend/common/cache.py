@@ -0,0 +1,258 @@
+"""
+Two-tier cache for hot read models.
+
+Values live in the Django cache named by ``settings.READ_CACHE_ALIAS`` (Redis
+in production, local memory in tests and development) and in a bounded
+in-process LRU in front of it, so a hot key costs neither a network round trip
+nor unpickling.
+
+Keys are versioned per scope: ``("project", 7)`` has a counter in the shared
+cache that is part of every key cached under it. ``bump("project", 7)``
+increments the counter, which orphans everything cached for the project at
+once in every process; orphans age out of both tiers through their TTL and the
+LRU bound. Each process holds versions for ``READ_CACHE_VERSION_TTL`` seconds,
+so other processes see a bump within that window; the bumping process sees it
+at once. Values computed under a scope the current transaction has bumped are
+not cached, since they may include writes that are later rolled back.
+
+Hit and miss counters per tier are kept in ``get_cache().stats`` and served
+with the instrumentation metrics.
+"""
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+# Returned by the tiers for a miss, so that None can be cached.
+MISSING = object()
+
+
+class LRU:
+    """Thread-safe LRU of at most ``max_entries`` values, each with a TTL."""
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None, now=None):
+        if self.max_entries <= 0:
+            return
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._entries[key] = (now + (self.ttl if ttl is None else ttl), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class TieredCache:
+    """An ``LRU`` in front of a shared Django cache, with versioned scopes."""
+
+    def __init__(
+        self,
+        shared,
+        max_entries=2048,
+        ttl=300,
+        version_ttl=1.0,
+        prefix="scmods",
+    ):
+        self.shared = shared
+        self.ttl = ttl
+        self.version_ttl = version_ttl
+        self.prefix = prefix
+        self.local = LRU(max_entries, ttl)
+        self.versions = LRU(max_entries, version_ttl)
+        self.stats = Counter()
+        self._stats_lock = threading.Lock()
+        # Scopes bumped by this thread's open transaction.
+        self._uncommitted = threading.local()
+
+    def _count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def _version_key(self, namespace, scope_id):
+        return f"{self.prefix}:version:{namespace}:{scope_id}"
+
+    def versions_of(self, scopes):
+        """``{(namespace, id): version}`` for ``scopes``, 0 for new scopes."""
+        versions, missing = {}, {}
+        for scope in scopes:
+            version = self.versions.get(scope)
+            if version is MISSING:
+                missing[self._version_key(*scope)] = scope
+            else:
+                versions[scope] = version
+        if missing:
+            found = self.shared.get_many(list(missing))
+            for key, scope in missing.items():
+                versions[scope] = found.get(key, 0)
+                self.versions.set(scope, versions[scope], self.version_ttl)
+        return versions
+
+    def key(self, name, scopes=(), parts=()):
+        """
+        The cache key of ``name`` under ``scopes`` (``(namespace, id)`` pairs)
+        at their current versions, with ``parts`` appended.
+        """
+        versions = self.versions_of(scopes)
+        scope_part = ",".join(
+            f"{namespace}{scope_id}v{versions[(namespace, scope_id)]}"
+            for namespace, scope_id in scopes
+        )
+        return ":".join(
+            [self.prefix, name, scope_part, *(str(part) for part in parts)]
+        )
+
+    def get(self, key):
+        value = self.local.get(key)
+        if value is not MISSING:
+            self._count("local_hits")
+            return value
+        value = self.shared.get(key, MISSING)
+        if value is not MISSING:
+            self._count("shared_hits")
+            self.local.set(key, value)
+            return value
+        self._count("misses")
+        return MISSING
+
+    def set(self, key, value, ttl=None):
+        self._count("sets")
+        self.shared.set(key, value, ttl or self.ttl)
+        self.local.set(key, value, ttl)
+
+    def get_or_set(self, name, compute, scopes=(), parts=(), ttl=None):
+        """
+        Return the value cached for ``name`` under ``scopes``, or compute and
+        cache it. Values are shared between callers: do not mutate them.
+        """
+        key = self.key(name, scopes, parts)
+        value = self.get(key)
+        if value is MISSING:
+            value = compute()
+            if not self._bumped_in_transaction(scopes):
+                self.set(key, value, ttl)
+        return value
+
+    def _bumped_in_transaction(self, scopes):
+        bumped = getattr(self._uncommitted, "scopes", None)
+        if not bumped:
+            return False
+        if not transaction.get_connection().in_atomic_block:
+            bumped.clear()
+            return False
+        return any(scope in bumped for scope in scopes)
+
+    def bump(self, namespace, *scope_ids):
+        """
+        Invalidate everything cached under ``(namespace, id)`` for each id, now
+        and again when the current transaction commits, so that no other
+        process can cache a value read before the commit under the new version.
+        """
+        scope_ids = {scope_id for scope_id in scope_ids if scope_id is not None}
+        if not scope_ids:
+            return
+        self._bump(namespace, scope_ids)
+        if transaction.get_connection().in_atomic_block:
+            bumped = getattr(self._uncommitted, "scopes", None)
+            if bumped is None:
+                bumped = self._uncommitted.scopes = set()
+            bumped.update((namespace, scope_id) for scope_id in scope_ids)
+            transaction.on_commit(lambda: self._committed(namespace, scope_ids))
+
+    def _committed(self, namespace, scope_ids):
+        self._bump(namespace, scope_ids)
+        getattr(self._uncommitted, "scopes", set()).difference_update(
+            (namespace, scope_id) for scope_id in scope_ids
+        )
+
+    def _bump(self, namespace, scope_ids):
+        for scope_id in scope_ids:
+            key = self._version_key(namespace, scope_id)
+            # add() is a no-op for existing keys; incr() is atomic in Redis.
+            self.shared.add(key, 0, None)
+            version = self.shared.incr(key)
+            self.versions.set((namespace, scope_id), version, self.version_ttl)
+            self._count("bumps")
+
+    def clear(self):
+        self.local.clear()
+        self.versions.clear()
+        self.shared.clear()
+        self._uncommitted.scopes = set()
+        with self._stats_lock:
+            self.stats.clear()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """The process-wide ``TieredCache`` configured by the ``READ_CACHE_*`` settings."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TieredCache(
+                caches[settings.READ_CACHE_ALIAS],
+                max_entries=settings.READ_CACHE_MAX_ENTRIES,
+                ttl=settings.READ_CACHE_TTL,
+                version_ttl=settings.READ_CACHE_VERSION_TTL,
+            )
+        return _cache
+
+
+def bump(namespace, *scope_ids):
+    """Shortcut for ``get_cache().bump``."""
+    get_cache().bump(namespace, *scope_ids)
+
+
+def cached_instance(model, pk):
+    """``model`` row ``pk`` (or ``None``), cached under the model's own scope."""
+    namespace = model._meta.label_lower
+    return get_cache().get_or_set(
+        "instance",
+        lambda: model._default_manager.filter(pk=pk).first(),
+        scopes=[(namespace, pk)],
+    )
+
+
+def invalidate_instances_on_change(model):
+    """Bump a row's scope whenever it is saved or deleted."""
+
+    def invalidate(sender, instance, **kwargs):
+        bump(sender._meta.label_lower, instance.pk)
+
+    post_save.connect(invalidate, sender=model, weak=False)
+    post_delete.connect(invalidate, sender=model, weak=False)
@@ -0,0 +1,245 @@
+"""
+Query-count and latency instrumentation.
+
+``instrument(name)`` records, for the block it wraps, the number of SQL queries,
+the time spent in the database, queries repeated with the same shape
+(fingerprint) and the wall time, and adds them to per-name histograms in
+``REGISTRY``. ``InstrumentationMiddleware`` wraps every request, named after
+its URL route and method, and the ``instrument`` management command wraps
+another command. The registry is dumped as JSON or in the Prometheus text
+format by ``metrics_view`` at ``/metrics/``.
+
+Everything is opt-in through ``settings.INSTRUMENTATION_ENABLED``: when it is
+off the middleware removes itself at startup and nothing wraps the database
+cursor.
+"""
+import bisect
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+# Histogram upper bounds, Prometheus style (the +Inf bucket is implicit).
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+# Duplicate fingerprints kept per name; the rest are counted but not listed.
+TOP_DUPLICATES = 20
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_LISTS = re.compile(r"\((?:\s*(?:%s|\?)\s*,)*\s*(?:%s|\?)\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql):
+    """
+    Reduce ``sql`` to its shape: literals become ``?`` and ``IN`` lists of any
+    length collapse to ``(...)``, so an N+1 loop maps to one fingerprint.
+    """
+    sql = _LITERALS.sub("?", sql)
+    sql = _LISTS.sub("(...)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+class QueryRecorder:
+    """``connection.execute_wrapper`` that counts and times queries."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+
+    @property
+    def duplicates(self):
+        """``{fingerprint: count}`` for queries issued more than once."""
+        return {sql: count for sql, count in self.fingerprints.items() if count > 1}
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """Yield ``(upper_bound, observations <= upper_bound)``."""
+        total = 0
+        for bound, count in zip((*self.buckets, float("inf")), self.counts):
+            total += count
+            yield bound, total
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": {
+                _format_bound(bound): count for bound, count in self.cumulative()
+            },
+        }
+
+
+class Stats:
+    """Everything recorded under one name."""
+
+    def __init__(self):
+        self.wall_seconds = Histogram(SECONDS_BUCKETS)
+        self.db_seconds = Histogram(SECONDS_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.duplicate_queries = 0
+        self.duplicates = Counter()
+
+    def observe(self, wall_seconds, recorder):
+        self.wall_seconds.observe(wall_seconds)
+        self.db_seconds.observe(recorder.seconds)
+        self.queries.observe(recorder.count)
+        for sql, count in recorder.duplicates.items():
+            self.duplicate_queries += count - 1
+            self.duplicates[sql] += count - 1
+
+    def as_dict(self):
+        return {
+            "wall_seconds": self.wall_seconds.as_dict(),
+            "db_seconds": self.db_seconds.as_dict(),
+            "queries": self.queries.as_dict(),
+            "duplicate_queries": self.duplicate_queries,
+            "top_duplicates": [
+                {"fingerprint": sql, "count": count}
+                for sql, count in self.duplicates.most_common(TOP_DUPLICATES)
+            ],
+        }
+
+
+class Registry:
+    """Thread-safe ``{name: Stats}`` shared by every instrumented block."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def observe(self, name, wall_seconds, recorder):
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = Stats()
+            stats.observe(wall_seconds, recorder)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                name: stats.as_dict() for name, stats in sorted(self._stats.items())
+            }
+
+    def prometheus_text(self):
+        """Render the histograms in the Prometheus text exposition format."""
+        metrics = (
+            ("scmods_wall_seconds", "wall_seconds", "Wall time per request"),
+            ("scmods_db_seconds", "db_seconds", "Database time per request"),
+            ("scmods_queries", "queries", "SQL queries per request"),
+        )
+        lines = []
+        with self._lock:
+            stats = sorted(self._stats.items())
+            for metric, attribute, help_text in metrics:
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.append(f"# TYPE {metric} histogram")
+                for name, entry in stats:
+                    histogram = getattr(entry, attribute)
+                    label = f'endpoint="{_label(name)}"'
+                    for bound, count in histogram.cumulative():
+                        le = _format_bound(bound)
+                        lines.append(f'{metric}_bucket{{{label},le="{le}"}} {count}')
+                    lines.append(f"{metric}_sum{{{label}}} {histogram.sum}")
+                    lines.append(f"{metric}_count{{{label}}} {histogram.count}")
+            lines.append(
+                "# HELP scmods_duplicate_queries_total "
+                "Queries repeating an earlier query's fingerprint"
+            )
+            lines.append("# TYPE scmods_duplicate_queries_total counter")
+            for name, entry in stats:
+                lines.append(
+                    f'scmods_duplicate_queries_total{{endpoint="{_label(name)}"}} '
+                    f"{entry.duplicate_queries}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def _format_bound(bound):
+    return "+Inf" if bound == float("inf") else f"{bound:g}"
+
+
+def _label(name):
+    return name.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+@contextmanager
+def instrument(name, registry=REGISTRY):
+    """
+    Record the queries and wall time of the block under ``name``, or under
+    ``name()`` if it is callable and the name is only known once the block has
+    run. Yields the ``QueryRecorder`` so callers can inspect the block's own
+    numbers.
+    """
+    recorder = QueryRecorder()
+    started = time.perf_counter()
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            yield recorder
+    finally:
+        elapsed = time.perf_counter() - started
+        registry.observe(name() if callable(name) else name, elapsed, recorder)
+
+
+def endpoint_name(request):
+    """``"<METHOD> <route>"``, e.g. ``"GET api/tasks/<pk>/"``."""
+    match = request.resolver_match
+    if match is None:
+        return f"{request.method} <unresolved>"
+    # Regex routes (e.g. from DRF routers) keep their anchors; drop them.
+    return f"{request.method} {match.route.replace('^', '').replace('$', '')}"
+
+
+class InstrumentationMiddleware:
+    """
+    Instrument every request under its ``endpoint_name``. Removes itself unless
+    ``settings.INSTRUMENTATION_ENABLED`` is set.
+    """
+
+    def __init__(self, get_response):
+        if not settings.INSTRUMENTATION_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with instrument(lambda: endpoint_name(request)):
+            return self.get_response(request)
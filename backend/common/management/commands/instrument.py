@@ -0,0 +1,45 @@
+import argparse
+import json
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from common.instrumentation import REGISTRY, instrument
+
+
+class Command(BaseCommand):
+    help = (
+        "Run another management command and report its query count, database "
+        "time, duplicate queries and wall time"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output", help="Also write the instrumentation registry as JSON here"
+        )
+        parser.add_argument("command_name", help="Command to run")
+        parser.add_argument(
+            "command_args",
+            nargs=argparse.REMAINDER,
+            help="Arguments passed through to the command",
+        )
+
+    def handle(self, *args, **options):
+        name = options["command_name"]
+        started = time.perf_counter()
+        with instrument(f"command {name}") as recorder:
+            call_command(name, *options["command_args"], stdout=self.stdout)
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"{recorder.count} queries, {recorder.seconds:.3f}s in the database, "
+            f"{elapsed:.3f}s wall time"
+        )
+        duplicates = sorted(recorder.duplicates.items(), key=lambda item: -item[1])
+        for sql, count in duplicates[:5]:
+            self.stdout.write(f"  repeated {count}x: {sql[:160]}")
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(REGISTRY.as_dict(), output, indent=2)
+                output.write("\n")
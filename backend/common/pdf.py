@@ -0,0 +1,84 @@
+"""
+Plain-text PDF documents.
+
+Enough of the PDF format to lay out lines of monospaced text on A4 pages, for
+exports that would otherwise need a typesetting dependency. Each page is one
+content stream in the built-in Courier font, so no fonts are embedded and the
+output is a few hundred bytes per page.
+"""
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 in points.
+MARGIN = 40
+FONT_SIZE = 8
+LEADING = 10
+# Courier glyphs are 0.6 em wide.
+COLUMNS = int((PAGE_WIDTH - 2 * MARGIN) / (FONT_SIZE * 0.6))
+LINES_PER_PAGE = int((PAGE_HEIGHT - 2 * MARGIN) / LEADING)
+
+
+def _escape(text):
+    text = text.encode("latin-1", "replace").decode("latin-1")
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def paginate(lines):
+    """Split ``lines`` into pages, breaking at form feeds (``"\\f"``) too."""
+    pages, page = [], []
+    for line in lines:
+        if line == "\f":
+            if page:
+                pages.append(page)
+            page = []
+            continue
+        if len(page) == LINES_PER_PAGE:
+            pages.append(page)
+            page = []
+        page.append(line[:COLUMNS])
+    if page or not pages:
+        pages.append(page)
+    return pages
+
+
+def text_pdf(lines, title=""):
+    """Return the bytes of a PDF showing ``lines``, one per row."""
+    pages = paginate(lines)
+    # Objects: 1 catalog, 2 page tree, 3 font, 4 info, then a page and its
+    # content stream per page.
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [{}] /Count {} >>".format(
+            " ".join(f"{5 + 2 * i} 0 R" for i in range(len(pages))), len(pages)
+        ),
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Courier "
+        "/Encoding /WinAnsiEncoding >>",
+        f"<< /Title ({_escape(title)}) /Producer (scmods) >>",
+    ]
+    for i, page in enumerate(pages):
+        text = [f"BT /F1 {FONT_SIZE} Tf {LEADING} TL"]
+        text.append(f"{MARGIN} {PAGE_HEIGHT - MARGIN} Td")
+        text.extend(f"({_escape(line)}) '" for line in page)
+        text.append("ET")
+        stream = "\n".join(text)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} "
+            f"{PAGE_HEIGHT}] /Resources << /Font << /F1 3 0 R >> >> "
+            f"/Contents {6 + 2 * i} 0 R >>"
+        )
+        objects.append(
+            f"<< /Length {len(stream.encode('latin-1'))} >>\n"
+            f"stream\n{stream}\nendstream"
+        )
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    output += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    output += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R /Info 4 0 R >>\n"
+        f"startxref\n{xref}\n%%EOF\n"
+    ).encode()
+    return bytes(output)
@@ -0,0 +1,32 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from rest_framework import serializers
+
+
+class ModelValidationMixin:
+    """
+    Report the ``ValidationError`` raised by a model's ``save()`` (``full_clean``
+    and the hierarchy and prerequisite checks) as a 400 response instead of a
+    server error. The write is atomic, so a rejected many-to-many change also
+    rolls back the fields saved before it.
+    """
+
+    def create(self, validated_data):
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except DjangoValidationError as error:
+            raise serializers.ValidationError(_error_detail(error)) from error
+
+    def update(self, instance, validated_data):
+        try:
+            with transaction.atomic():
+                return super().update(instance, validated_data)
+        except DjangoValidationError as error:
+            raise serializers.ValidationError(_error_detail(error)) from error
+
+
+def _error_detail(error):
+    if hasattr(error, "error_dict"):
+        return error.message_dict
+    return {"non_field_errors": error.messages}
@@ -1,3 +1,207 @@
-from django.test import TestCase
+import json
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import call_command
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from client.models import Client
+from common.cache import LRU, MISSING, TieredCache, cached_instance, get_cache
+from common.instrumentation import (
+    REGISTRY,
+    Histogram,
+    Registry,
+    fingerprint,
+    instrument,
+)
+from project.models import ProjectType
+
+
+class FingerprintCases(SimpleTestCase):
+    def test_collapses_literals_and_lists(self):
+        """Should map queries differing only in values to one fingerprint."""
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'x'"),
+            fingerprint("SELECT * FROM t WHERE id IN (%s)  AND name = 'y'"),
+        )
+
+
+class HistogramCases(SimpleTestCase):
+    def test_cumulative_buckets(self):
+        """Should count each observation in its bucket and every larger one."""
+        histogram = Histogram((1, 5))
+        for value in (0.5, 1, 3, 9):
+            histogram.observe(value)
+        self.assertEqual(
+            list(histogram.cumulative()), [(1, 2), (5, 3), (float("inf"), 4)]
+        )
+        self.assertEqual(histogram.sum, 13.5)
+
+
+class InstrumentCases(TestCase):
+    def test_records_queries_and_duplicates(self):
+        """Should count the block's queries and the fingerprints it repeated."""
+        registry = Registry()
+        client = Client.objects.create(name="Client")
+        with instrument("loop", registry) as recorder:
+            for _ in range(3):
+                Client.objects.get(pk=client.pk)
+            Client.objects.count()
+        self.assertEqual(recorder.count, 4)
+        stats = registry.as_dict()["loop"]
+        self.assertEqual(stats["queries"]["sum"], 4)
+        self.assertEqual(stats["duplicate_queries"], 2)
+        self.assertEqual(stats["top_duplicates"][0]["count"], 2)
+
+    def test_prometheus_text(self):
+        """Should expose bucket, sum and count series per endpoint."""
+        registry = Registry()
+        with instrument('GET api/"x"/', registry):
+            Client.objects.count()
+        text = registry.prometheus_text()
+        label = 'endpoint="GET api/\\"x\\"/"'
+        self.assertIn(f'scmods_queries_bucket{{{label},le="1"}} 1', text)
+        self.assertIn(f"scmods_queries_count{{{label}}} 1", text)
+
+
+class InstrumentationMiddlewareCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = get_user_model().objects.create(username="staff", is_staff=True)
+        return super().setUpTestData()
+
+    def setUp(self):
+        REGISTRY.reset()
+
+    @override_settings(INSTRUMENTATION_ENABLED=True)
+    def test_records_requests_by_route(self):
+        """Should aggregate requests under their method and URL route."""
+        self.client.force_login(self.staff)
+        for _ in range(2):
+            self.client.get("/api/clients/")
+        response = self.client.get("/metrics/", {"format": "json"})
+        stats = json.loads(response.content)["GET api/clients/"]
+        self.assertEqual(stats["wall_seconds"]["count"], 2)
+        self.assertGreater(stats["queries"]["sum"], 0)
+
+    @override_settings(
+        INSTRUMENTATION_ENABLED=True, INSTRUMENTATION_METRICS_TOKEN="secret"
+    )
+    def test_metrics_require_token_or_staff(self):
+        """Should serve metrics to the token bearer and refuse anonymous users."""
+        self.assertEqual(self.client.get("/metrics/").status_code, 403)
+        response = self.client.get(
+            "/metrics/", headers={"Authorization": "Bearer secret"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("# TYPE scmods_queries histogram", response.content.decode())
+
+    def test_disabled_by_default(self):
+        """Should record nothing and hide the endpoint unless enabled."""
+        self.client.force_login(self.staff)
+        self.client.get("/api/clients/")
+        self.assertEqual(REGISTRY.as_dict(), {})
+        self.assertEqual(self.client.get("/metrics/").status_code, 404)
+
+
+class InstrumentCommandCases(TestCase):
+    def test_reports_command_queries(self):
+        """Should run the wrapped command and report its queries."""
+        out = StringIO()
+        call_command("instrument", "repair_task_hierarchy", stdout=out)
+        self.assertIn("Repaired child_count", out.getvalue())
+        self.assertRegex(out.getvalue(), r"\d+ queries, ")
+
+
+class LRUCases(SimpleTestCase):
+    def test_evicts_least_recently_used(self):
+        """Should drop the least recently read entry past the size bound."""
+        lru = LRU(max_entries=2, ttl=60)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        lru.get("a")
+        lru.set("c", 3)
+        self.assertEqual((lru.get("a"), lru.get("b"), lru.get("c")), (1, MISSING, 3))
+
+    def test_expires(self):
+        """Should forget entries past their TTL."""
+        lru = LRU(max_entries=2, ttl=10)
+        lru.set("a", 1, now=0)
+        self.assertEqual(lru.get("a", now=9), 1)
+        self.assertIs(lru.get("a", now=10), MISSING)
+
+
+class TieredCacheCases(SimpleTestCase):
+    def setUp(self):
+        self.shared = LocMemCache(f"tiered-{self._testMethodName}", {})
+        self.cache = TieredCache(self.shared, max_entries=10, ttl=60)
+
+    def test_tiers_and_counters(self):
+        """Should serve repeats from the LRU, then from the shared cache."""
+        compute = iter(range(10)).__next__
+        scope = [("project", 1)]
+        self.assertEqual(self.cache.get_or_set("tree", compute, scope), 0)
+        self.assertEqual(self.cache.get_or_set("tree", compute, scope), 0)
+        self.cache.local.clear()
+        self.assertEqual(self.cache.get_or_set("tree", compute, scope), 0)
+        self.assertEqual(
+            dict(self.cache.stats),
+            {"misses": 1, "sets": 1, "local_hits": 1, "shared_hits": 1},
+        )
+
+    def test_bump_orphans_scope_in_every_process(self):
+        """Should recompute a bumped scope here and in another process."""
+        other = TieredCache(self.shared, max_entries=10, ttl=60, version_ttl=0)
+        compute = iter(range(10)).__next__
+        self.cache.get_or_set("tree", compute, [("project", 1)])
+        self.cache.get_or_set("tree", compute, [("project", 2)])
+        self.cache.bump("project", 1)
+        self.assertEqual(self.cache.get_or_set("tree", compute, [("project", 1)]), 2)
+        self.assertEqual(self.cache.get_or_set("tree", compute, [("project", 2)]), 1)
+        self.assertEqual(other.get_or_set("tree", compute, [("project", 1)]), 2)
+
+
+
+class TieredCacheTransactionCases(TestCase):
+    def test_skips_values_read_after_uncommitted_bump(self):
+        """Should not cache a scope bumped by the open transaction."""
+        self.cache = TieredCache(LocMemCache("tiered-transaction", {}))
+        compute = iter(range(10)).__next__
+        with transaction.atomic():
+            self.cache.bump("project", 1)
+            self.cache.get_or_set("tree", compute, [("project", 1)])
+            self.assertEqual(self.cache.stats["sets"], 0)
+
+
+class CachedInstanceCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.template = Client.objects.create().projects.create(name="Template")
+        cls.project_type = ProjectType.objects.create(
+            name="Before", template=cls.template
+        )
+        return super().setUpTestData()
+
+    def setUp(self):
+        get_cache().clear()
+
+    def test_invalidated_on_save(self):
+        """Should serve a cached row until it is saved again."""
+        project_type = self.project_type
+        cached_instance(ProjectType, project_type.pk)
+        with self.assertNumQueries(0):
+            cached = cached_instance(ProjectType, project_type.pk)
+        self.assertEqual(cached.name, "Before")
+        project_type.name = "After"
+        project_type.save()
+        self.assertEqual(cached_instance(ProjectType, project_type.pk).name, "After")
+
+    def test_invalidated_when_template_deleted(self):
+        """Should drop a cached type whose template the SET_NULL cascade cleared."""
+        cached_instance(ProjectType, self.project_type.pk)
+        self.template.delete()
+        self.assertIsNone(
+            cached_instance(ProjectType, self.project_type.pk).template_id
+        )
@@ -1,3 +1,44 @@
-from django.shortcuts import render
+import json
 
-# Create your views here.
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+
+from common.cache import get_cache
+from common.instrumentation import REGISTRY
+
+
+def metrics_view(request):
+    """
+    Per-endpoint query and latency histograms in the Prometheus text format, or
+    as JSON with ``?format=json``. Requires ``INSTRUMENTATION_ENABLED`` and
+    either the ``INSTRUMENTATION_METRICS_TOKEN`` bearer token or a staff user.
+    """
+    if not settings.INSTRUMENTATION_ENABLED:
+        raise Http404
+    token = settings.INSTRUMENTATION_METRICS_TOKEN
+    authorization = request.headers.get("Authorization", "")
+    if not (
+        (token and constant_time_compare(authorization, f"Bearer {token}"))
+        or request.user.is_staff
+    ):
+        raise PermissionDenied
+    cache_stats = dict(get_cache().stats)
+    if request.GET.get("format") == "json":
+        return HttpResponse(
+            json.dumps({**REGISTRY.as_dict(), "read_cache": cache_stats}, indent=2),
+            content_type="application/json",
+        )
+    lines = [
+        "# HELP scmods_read_cache_total Read cache lookups and writes by outcome",
+        "# TYPE scmods_read_cache_total counter",
+        *(
+            f'scmods_read_cache_total{{outcome="{outcome}"}} {count}'
+            for outcome, count in sorted(cache_stats.items())
+        ),
+    ]
+    return HttpResponse(
+        REGISTRY.prometheus_text() + "\n".join(lines) + "\n",
+        content_type="text/plain; version=0.0.4",
+    )
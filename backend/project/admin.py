@@ -1,3 +1,28 @@
 from django.contrib import admin
 
-# Register your models here.
+from project.models import Project, ProjectType
+
+
+@admin.register(ProjectType)
+class ProjectTypeAdmin(admin.ModelAdmin):
+    list_display = ("name", "template")
+    # Project.__str__ reads client.name.
+    list_select_related = ("template__client",)
+    search_fields = ("name",)
+    autocomplete_fields = ("template",)
+
+
+@admin.register(Project)
+class ProjectAdmin(admin.ModelAdmin):
+    list_display = ("name", "client", "type", "status", "priority")
+    # Project.__str__ reads client.name.
+    list_select_related = ("client", "type")
+    list_filter = ("status", "type")
+    search_fields = ("name", "client__name")
+    autocomplete_fields = ("client", "type")
+
+    def get_queryset(self, request):
+        # Also serves the autocomplete results of other admins' project
+        # fields. The changelist skips list_select_related once the queryset
+        # selects anything, hence both here.
+        return super().get_queryset(request).select_related(*self.list_select_related)
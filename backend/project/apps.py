@@ -3,3 +3,10 @@ from django.apps import AppConfig
 
 class ProjectConfig(AppConfig):
     name = 'project'
+
+    def ready(self):
+        from common.cache import invalidate_instances_on_change
+
+        from project import signals  # noqa: F401
+
+        invalidate_instances_on_change(self.get_model("ProjectType"))
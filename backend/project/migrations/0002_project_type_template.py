@@ -0,0 +1,19 @@
+# Generated by Django 6.0 on 2026-10-18 15:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projecttype',
+            name='template',
+            field=models.ForeignKey(blank=True, default=None, help_text='Project whose task tree new projects of this type start from. See task.cloning.instantiate_template.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='template_for', to='project.project'),
+        ),
+    ]
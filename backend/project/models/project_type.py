@@ -3,6 +3,18 @@ from django.db import models
 
 class ProjectType(models.Model):
     name = models.CharField(max_length=255, unique=True)
+    template = models.ForeignKey(
+        to="project.Project",
+        related_name="template_for",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        default=None,
+        help_text=(
+            "Project whose task tree new projects of this type start from. See "
+            "task.cloning.instantiate_template."
+        ),
+    )
 
     class Meta:
         ordering = ["name"]
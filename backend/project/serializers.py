@@ -0,0 +1,25 @@
+from common.serializers import ModelValidationMixin
+from rest_framework import serializers
+
+from project.models import Project
+
+
+class ProjectSerializer(ModelValidationMixin, serializers.ModelSerializer):
+    client_name = serializers.CharField(source="client.name", read_only=True)
+    type_name = serializers.CharField(
+        source="type.name", read_only=True, default=None
+    )
+
+    class Meta:
+        model = Project
+        fields = [
+            "id",
+            "client",
+            "client_name",
+            "type",
+            "type_name",
+            "name",
+            "description",
+            "priority",
+            "status",
+        ]
@@ -0,0 +1,17 @@
+from common import cache
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+from project.models import Project, ProjectType
+
+
+@receiver(pre_delete, sender=Project)
+def invalidate_project_types_on_template_delete(sender, instance, **kwargs):
+    """
+    Bump the cached types whose template is being deleted: the SET_NULL
+    cascade clears their ``template`` with an UPDATE that skips ``post_save``.
+    """
+    cache.bump(
+        ProjectType._meta.label_lower,
+        *instance.template_for.values_list("pk", flat=True),
+    )
@@ -1,3 +1,133 @@
+import json
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from client.models import Client
+from project.models import ProjectType
+
+
+class ProjectViewSetCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create(username="admin")
+        project_type = ProjectType.objects.create(name="Audit")
+        for i in range(30):
+            Client.objects.create(name=f"Client {i}").projects.create(
+                name="Project", type=project_type
+            )
+        return super().setUpTestData()
+
+    def test_list_query_count_independent_of_page_size(self):
+        """Should list a page with one query at any page size."""
+        api = APIClient()
+        api.force_authenticate(self.user)
+        for page_size in (5, 30):
+            with self.assertNumQueries(1):
+                response = api.get("/api/projects/", {"page_size": page_size})
+            self.assertEqual(len(response.data["results"]), page_size)
+        self.assertEqual(response.data["results"][0]["type_name"], "Audit")
+
+    def test_invalid_client_filter(self):
+        """Should answer 400 for a client filter that is not an id."""
+        api = APIClient()
+        api.force_authenticate(self.user)
+        response = api.get("/api/projects/", {"client": "abc"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("client", response.data)
+
+
+class ProjectTreeCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create(username="admin")
+        cls.project = Client.objects.create().projects.create()
+        cls.root = cls.project.tasks.create(name="Root")
+        cls.child = cls.project.tasks.create(name="Child", parent=cls.root)
+        cls.grandchild = cls.project.tasks.create(
+            name="Grandchild", parent=cls.child, hours_estimate=2
+        )
+        cls.other = cls.project.tasks.create(name="Other")
+        return super().setUpTestData()
+
+    def setUp(self):
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def get_tree(self, **params):
+        response = self.api.get(f"/api/projects/{self.project.id}/tree/", params)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(b"".join(response.streaming_content))
+
+    def test_nested_tree(self):
+        """Should nest every task below its parent."""
+        tree = self.get_tree()
+        self.assertEqual([task["name"] for task in tree["tasks"]], ["Root", "Other"])
+        grandchild = tree["tasks"][0]["children"][0]["children"][0]
+        self.assertEqual(grandchild["id"], self.grandchild.id)
+        self.assertEqual(grandchild["hours_estimate"], 2)
+        self.assertEqual(grandchild["children"], [])
+
+    def test_depth(self):
+        """Should leave out tasks below the requested depth."""
+        tree = self.get_tree(depth=1)
+        child = tree["tasks"][0]["children"][0]
+        self.assertEqual(child["children"], [])
+        self.assertEqual(child["child_count"], 1)
+
+    def test_root(self):
+        """Should return only the requested subtree."""
+        tree = self.get_tree(root=self.child.id)
+        self.assertEqual([task["id"] for task in tree["tasks"]], [self.child.id])
+
+    def test_unknown_root(self):
+        """Should answer 404 for a root outside the project."""
+        response = self.api.get(
+            f"/api/projects/{self.project.id}/tree/", {"root": 0}
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_query_count_independent_of_size(self):
+        """Should read the whole tree with one query after the project lookup."""
+        for _ in range(20):
+            self.project.tasks.create(parent=self.child)
+        with self.assertNumQueries(2):
+            self.get_tree()
+
+    def test_instantiate_template(self):
+        """Should copy the type's template tree into the project once asked."""
+        project_type = ProjectType.objects.create(name="Audit", template=self.project)
+        project = Client.objects.create().projects.create(type=project_type)
+        url = f"/api/projects/{project.id}/instantiate-template/"
+        self.assertEqual(self.api.post(url).status_code, 201)
+        self.assertEqual(project.tasks.count(), 4)
+        project_type.template = None
+        project_type.save()
+        self.assertEqual(self.api.post(url).status_code, 400)
+
+
+class ProjectAdminCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = get_user_model().objects.create_superuser(username="admin")
+        return super().setUpTestData()
 
-# Create your tests here.
+    def test_changelists_query_count_independent_of_rows(self):
+        """Should list projects and clients with a fixed number of queries."""
+        self.client.force_login(self.admin)
+        project_type = ProjectType.objects.create(name="Audit")
+        # Session, user, filtered and full counts, page, plus the project type
+        # filter's choices.
+        for url, expected in [
+            ("/admin/project/project/", 6),
+            ("/admin/client/client/", 5),
+        ]:
+            for count in (1, 10):
+                for i in range(count):
+                    Client.objects.create(name=f"Client {i}").projects.create(
+                        name="Project", type=project_type
+                    )
+                with self.subTest(url=url, count=count):
+                    with self.assertNumQueries(expected):
+                        self.assertEqual(self.client.get(url).status_code, 200)
@@ -1,3 +1,77 @@
-from django.shortcuts import render
+from django.core.exceptions import ValidationError
+from django.http import StreamingHttpResponse
+from rest_framework import serializers, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
+from rest_framework.exceptions import ValidationError as DRFValidationError
+from rest_framework.response import Response
 
-# Create your views here.
+from project.models import Project
+from project.serializers import ProjectSerializer
+from task.cached_reads import project_rollup, project_tree
+from task.cloning import instantiate_template
+from task.models import Task
+from task.tree import iter_tree_json, load_tree
+
+
+class ProjectViewSet(viewsets.ModelViewSet):
+    queryset = Project.objects.select_related("client", "type")
+    serializer_class = ProjectSerializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = ProjectFilterParamsSerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        client = params.validated_data.get("client")
+        if client:
+            queryset = queryset.filter(client_id=client)
+        return queryset
+
+    @action(detail=True)
+    def tree(self, request, pk=None):
+        """
+        Stream the project's nested task tree as JSON. ``?root=<task id>`` limits
+        it to one subtree and ``?depth=<n>`` to ``n`` levels below the top.
+        """
+        params = TreeParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        project = self.get_object()
+        root = params.validated_data.get("root")
+        try:
+            if root is None:
+                roots, children = project_tree(project.pk)
+            else:
+                roots, children = load_tree(project.pk, root)
+        except Task.DoesNotExist as error:
+            raise NotFound(str(error)) from error
+        return StreamingHttpResponse(
+            iter_tree_json(
+                project.pk, roots, children, params.validated_data.get("depth")
+            ),
+            content_type="application/json",
+        )
+
+    @action(detail=True)
+    def rollup(self, request, pk=None):
+        """The project's estimated, logged and remaining hours."""
+        project = self.get_object()
+        return Response(project_rollup(project.pk))
+
+    @action(detail=True, methods=["post"], url_path="instantiate-template")
+    def instantiate_template(self, request, pk=None):
+        """Copy the task tree of the project type's template into the project."""
+        project = self.get_object()
+        try:
+            result = instantiate_template(project)
+        except ValidationError as error:
+            raise DRFValidationError({"non_field_errors": error.messages}) from error
+        return Response(result._asdict(), status=status.HTTP_201_CREATED)
+
+
+class ProjectFilterParamsSerializer(serializers.Serializer):
+    client = serializers.IntegerField(required=False)
+
+
+class TreeParamsSerializer(serializers.Serializer):
+    root = serializers.IntegerField(required=False)
+    depth = serializers.IntegerField(required=False, min_value=0)
@@ -0,0 +1,18 @@
+from rest_framework.routers import DefaultRouter
+
+from client.views import ClientViewSet
+from project.views import ProjectViewSet
+from task.views import (
+    ReportViewSet,
+    ScenarioViewSet,
+    TaskViewSet,
+    TimeEntryViewSet,
+)
+
+router = DefaultRouter()
+router.register("clients", ClientViewSet)
+router.register("projects", ProjectViewSet)
+router.register("tasks", TaskViewSet)
+router.register("time-entries", TimeEntryViewSet)
+router.register("reports", ReportViewSet, basename="report")
+router.register("scenarios", ScenarioViewSet, basename="scenario")
@@ -48,6 +48,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'rest_framework',
     'users',
     'common',
     'client',
@@ -56,6 +57,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'common.instrumentation.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -63,6 +65,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'task.middleware.CoalesceReschedulingMiddleware',
 ]
 
 ROOT_URLCONF = 'scmods.urls'
@@ -137,4 +140,45 @@ USE_TZ = True
 STATIC_URL = 'static/'
 
 # Misc
-AUTH_USER_MODEL = 'users.User'
\ No newline at end of file
+AUTH_USER_MODEL = 'users.User'
+
+# REST API
+REST_FRAMEWORK = {
+    'DEFAULT_PERMISSION_CLASSES': [
+        'rest_framework.permissions.IsAuthenticated',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'common.pagination.IdCursorPagination',
+    'PAGE_SIZE': 100,
+}
+
+# Scheduling
+SCHEDULING_HOURS_PER_DAY = 8
+SCHEDULING_WORKDAY_START_HOUR = 9
+# 'database', 'redis' or 'local' hand rescheduling to
+# `manage.py run_scheduler_worker`; 'inline' reschedules inside the request.
+SCHEDULING_QUEUE_BACKEND = os.environ.get('SCHEDULING_QUEUE_BACKEND', 'database')
+SCHEDULING_REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+
+# Read cache: an in-process LRU in front of CACHES[READ_CACHE_ALIAS], which is
+# Redis when CACHE_BACKEND is 'redis' and local memory otherwise.
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'local')
+CACHES = {
+    'default': (
+        {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL', 'redis://localhost:6379/1'),
+        }
+        if CACHE_BACKEND == 'redis'
+        else {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+    ),
+}
+READ_CACHE_ALIAS = 'default'
+READ_CACHE_MAX_ENTRIES = int(os.environ.get('READ_CACHE_MAX_ENTRIES', 2048))
+READ_CACHE_TTL = int(os.environ.get('READ_CACHE_TTL', 300))
+# Seconds other processes may keep serving a key after it was invalidated.
+READ_CACHE_VERSION_TTL = float(os.environ.get('READ_CACHE_VERSION_TTL', 1.0))
+
+# Instrumentation: per-endpoint query counts and latency histograms, served at
+# /metrics/ to staff users or to requests bearing the metrics token.
+INSTRUMENTATION_ENABLED = os.environ.get('INSTRUMENTATION_ENABLED', 'False') == 'True'
+INSTRUMENTATION_METRICS_TOKEN = os.environ.get('INSTRUMENTATION_METRICS_TOKEN', '')
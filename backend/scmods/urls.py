@@ -14,9 +14,14 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from common.views import metrics_view
 from django.contrib import admin
-from django.urls import path
+from django.urls import include, path
+
+from scmods.api import router
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/', include(router.urls)),
+    path('metrics/', metrics_view, name='metrics'),
 ]
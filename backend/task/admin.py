@@ -1,3 +1,126 @@
+from common.admin import LargeTableAdmin, ReadOnlyAdmin
 from django.contrib import admin
+from django.urls import reverse
+from django.utils.html import format_html
 
-# Register your models here.
+from project.models import Project
+from task.models import (
+    DailyTime,
+    ProjectSnapshot,
+    RescheduleJob,
+    Task,
+    TaskForecast,
+    TimeEntry,
+)
+
+
+class TreeLevelFilter(admin.SimpleListFilter):
+    """
+    One level of the task tree: ``?parent=roots`` lists top-level tasks and
+    ``?parent=<id>`` the direct children of a task, so the tree is browsed a
+    level at a time instead of loading a subtree.
+    """
+    title = "tree level"
+    parameter_name = "parent"
+
+    def lookups(self, request, model_admin):
+        return [("roots", "Top level")]
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if value == "roots":
+            return queryset.filter(parent__isnull=True)
+        if value and value.isdigit():
+            return queryset.filter(parent_id=int(value))
+        return queryset
+
+
+@admin.register(Task)
+class TaskAdmin(LargeTableAdmin):
+    ordering = ("-id",)
+    list_display = (
+        "id",
+        "name",
+        "subtasks",
+        "project",
+        "status",
+        "assigned_to",
+        "hours_estimate",
+        "remaining_hours",
+        "schedule_datetime",
+        "due_date",
+    )
+    list_display_links = ("id", "name")
+    # Project.__str__ reads client.name.
+    list_select_related = ("project__client", "assigned_to")
+    list_filter = (TreeLevelFilter, "status", "auto_schedule", "auto_assign")
+    search_fields = ("name",)
+    autocomplete_fields = ("project", "parent", "prerequisites", "assigned_to")
+    readonly_fields = (
+        "dependent_hours",
+        "actual_hours",
+        "remaining_hours",
+        "child_count",
+        "path",
+    )
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name == "project":
+            # The selected project is rendered with its client's name.
+            kwargs["queryset"] = Project.objects.select_related("client")
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    @admin.display(description="subtasks", ordering="child_count")
+    def subtasks(self, task):
+        if not task.child_count:
+            return "-"
+        url = reverse("admin:task_task_changelist")
+        return format_html(
+            '<a href="{}?parent={}">{} &#9656;</a>', url, task.pk, task.child_count
+        )
+
+    def changelist_view(self, request, extra_context=None):
+        parent = request.GET.get(TreeLevelFilter.parameter_name, "")
+        if parent.isdigit():
+            chain, _ = Task.objects.parent_chain(int(parent), select_tasks=True)
+            extra_context = {**(extra_context or {}), "ancestors": chain[::-1]}
+        return super().changelist_view(request, extra_context)
+
+
+@admin.register(TimeEntry)
+class TimeEntryAdmin(LargeTableAdmin):
+    ordering = ("-id",)
+    list_display = ("id", "task", "user", "start_time", "end_time")
+    list_select_related = ("task", "user")
+    search_fields = ("task__name", "user__username")
+    autocomplete_fields = ("task", "user")
+
+
+@admin.register(DailyTime)
+class DailyTimeAdmin(ReadOnlyAdmin):
+    list_display = ("day", "user", "task", "seconds")
+    list_select_related = ("user", "task")
+
+
+@admin.register(ProjectSnapshot)
+class ProjectSnapshotAdmin(ReadOnlyAdmin):
+    list_display = ("project", "computed_at")
+    list_select_related = ("project__client",)
+
+
+@admin.register(RescheduleJob)
+class RescheduleJobAdmin(ReadOnlyAdmin):
+    list_display = ("project", "enqueued_at", "claimed_at")
+    list_select_related = ("project__client",)
+
+
+@admin.register(TaskForecast)
+class TaskForecastAdmin(ReadOnlyAdmin):
+    list_display = (
+        "task",
+        "finish_p50",
+        "finish_p90",
+        "overrun_probability",
+        "simulated_at",
+    )
+    list_select_related = ("task",)
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class TaskConfig(AppConfig):
     name = 'task'
+
+    def ready(self):
+        from task import signals  # noqa: F401
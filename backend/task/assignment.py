@@ -0,0 +1,230 @@
+"""
+Capacity-aware auto-assignment of scheduled leaf tasks to users.
+
+Every user gets a row in a ``users x working days`` array of remaining hours.
+Tasks are popped from a priority queue (project priority, then due date, then
+scheduled start) and given to the user who can finish them soonest from their
+scheduled start day, which is found for all users at once with a cumulative sum
+over the capacity window. Nobody is ever booked past ``daily_capacity_hours``.
+"""
+import heapq
+from collections import namedtuple
+from datetime import date
+
+import numpy as np
+from common import cache
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from task.models import Task
+from task.scheduling import SCHEDULED_PROJECT_STATUSES, WorkCalendar
+
+AssignmentTask = namedtuple(
+    "AssignmentTask",
+    ["id", "hours", "start_day", "priority", "due_day", "assigned_to_id"],
+)
+
+AssignmentResult = namedtuple(
+    "AssignmentResult", ["assignments", "finish_days", "unassigned"]
+)
+
+# Tolerance for float comparisons on hours.
+EPSILON = 1e-6
+
+
+def compute_assignments(
+    tasks, capacities, booked=None, horizon_days=260, lookahead_days=60
+):
+    """
+    Assign ``tasks`` (``AssignmentTask`` records) to users without touching the
+    database.
+
+    ``capacities`` maps user ids to hours per working day and ``booked`` is an
+    optional ``(users x days)`` array of hours already committed to manually
+    assigned work. Returns an ``AssignmentResult`` with ``{task_id: user_id}``,
+    ``{task_id: finish_day}`` and the ids of tasks nobody can fit within the
+    horizon.
+    """
+    user_ids = list(capacities)
+    row_of = {user_id: row for row, user_id in enumerate(user_ids)}
+    remaining = np.repeat(
+        np.array([capacities[user_id] for user_id in user_ids], dtype=np.float64)[
+            :, np.newaxis
+        ],
+        horizon_days,
+        axis=1,
+    )
+    if booked is not None:
+        remaining = np.maximum(remaining - booked, 0.0)
+
+    queue = [
+        (-task.priority, task.due_day, task.start_day, task.id, task)
+        for task in tasks
+    ]
+    heapq.heapify(queue)
+
+    assignments, finish_days, unassigned = {}, {}, []
+    while queue:
+        task = heapq.heappop(queue)[-1]
+        if not user_ids:
+            unassigned.append(task.id)
+            continue
+        start = min(max(task.start_day, 0), horizon_days - 1)
+        row, finish = _best_user(
+            remaining, start, task, row_of, lookahead_days, horizon_days
+        )
+        if row is None:
+            unassigned.append(task.id)
+            continue
+        window = remaining[row, start:finish + 1]
+        before = np.cumsum(window) - window
+        window -= np.clip(task.hours - before, 0.0, window)
+        assignments[task.id] = user_ids[row]
+        finish_days[task.id] = finish
+    return AssignmentResult(assignments, finish_days, unassigned)
+
+
+def _best_user(remaining, start, task, row_of, lookahead_days, horizon_days):
+    """
+    Return ``(row, finish_day)`` for the user who finishes ``task`` soonest, or
+    ``(None, None)`` if nobody can within the horizon. Ties go to the current
+    assignee, then to the user with the most free hours in the window.
+    """
+    width = lookahead_days
+    while True:
+        end = min(start + width, horizon_days)
+        window = remaining[:, start:end]
+        cumulative = np.cumsum(window, axis=1)
+        done = cumulative >= task.hours - EPSILON
+        can_finish = done.any(axis=1)
+        if can_finish.any():
+            finish = np.where(can_finish, done.argmax(axis=1), np.iinfo(np.int64).max)
+            best = finish.min()
+            candidates = np.flatnonzero(finish == best)
+            current = row_of.get(task.assigned_to_id)
+            if current in candidates:
+                return current, start + int(best)
+            free = cumulative[candidates, -1]
+            return int(candidates[free.argmax()]), start + int(best)
+        if end == horizon_days:
+            return None, None
+        width *= 2
+
+
+# Open leaf rows read by ``assignment_inputs``.
+LEAF_FIELDS = (
+    "id",
+    "hours_estimate",
+    "schedule_datetime",
+    "project__priority",
+    "due_date",
+    "assigned_to_id",
+    "auto_assign",
+)
+
+
+def load_assignment_inputs(calendar, now, horizon_days):
+    """
+    Load auto-assignable leaf tasks, user capacities and the hours already
+    booked by manual assignments, with two queries.
+    """
+    leaves = (
+        Task.objects.filter(
+            child_count=0, project__status__in=SCHEDULED_PROJECT_STATUSES
+        )
+        .exclude(status=Task.TaskStatus.COMPLETED)
+        .order_by()
+        .values_list(*LEAF_FIELDS)
+    )
+    capacities = dict(
+        get_user_model()
+        .objects.filter(is_active=True, daily_capacity_hours__gt=0)
+        .order_by("pk")
+        .values_list("pk", "daily_capacity_hours")
+    )
+    return assignment_inputs(leaves, capacities, calendar, now, horizon_days)
+
+
+def assignment_inputs(leaves, capacities, calendar, now, horizon_days):
+    """
+    Build the ``compute_assignments`` inputs from open leaf rows (``LEAF_FIELDS``
+    tuples) and ``{user_id: daily hours}``, without touching the database:
+    ``AssignmentTask`` records for auto-assigned leaves and the ``booked``
+    hours of the manually assigned ones. Returns ``(tasks, capacities,
+    booked)``.
+    """
+    now_day = int(calendar.to_offset(now) // calendar.hours_per_day)
+
+    def day_of(value):
+        if value is None:
+            return now_day
+        return max(int(calendar.to_offset(value) // calendar.hours_per_day), now_day)
+
+    tasks, manual = [], []
+    for (
+        task_id, hours, start, priority, due_date, assigned_to_id, auto_assign
+    ) in leaves:
+        if not auto_assign:
+            if assigned_to_id in capacities:
+                manual.append((assigned_to_id, hours, start))
+            continue
+        tasks.append(
+            AssignmentTask(
+                id=task_id,
+                hours=hours,
+                start_day=day_of(start) - now_day,
+                priority=priority,
+                due_day=(due_date or date.max).toordinal(),
+                assigned_to_id=assigned_to_id,
+            )
+        )
+
+    booked = np.zeros((len(capacities), horizon_days))
+    rows = {user_id: row for row, user_id in enumerate(capacities)}
+    for user_id, hours, start in manual:
+        day = day_of(start) - now_day
+        row = rows[user_id]
+        while hours > EPSILON and day < horizon_days:
+            taken = min(hours, capacities[user_id] - booked[row, day])
+            if taken > 0:
+                booked[row, day] += taken
+                hours -= taken
+            day += 1
+    return tasks, capacities, booked
+
+
+def assign_tasks(calendar=None, now=None, horizon_days=260):
+    """
+    Assign every auto-assignable open leaf task in booked or started projects
+    and store ``assigned_to`` for the tasks whose assignee changed with one
+    ``bulk_update``. Returns the ``AssignmentResult``.
+    """
+    calendar = calendar or WorkCalendar.starting_today()
+    now = now or timezone.now()
+    tasks, capacities, booked = load_assignment_inputs(calendar, now, horizon_days)
+    result = compute_assignments(
+        tasks, capacities, booked=booked, horizon_days=horizon_days
+    )
+    current = {task.id: task.assigned_to_id for task in tasks}
+    changed = {
+        task_id: user_id
+        for task_id, user_id in result.assignments.items()
+        if current[task_id] != user_id
+    }
+    Task.objects.bulk_update(
+        [
+            Task(id=task_id, assigned_to_id=user_id)
+            for task_id, user_id in changed.items()
+        ],
+        ["assigned_to"],
+        batch_size=1000,
+    )
+    if changed:
+        Task.objects.projects_changed(
+            Task.objects.filter(pk__in=list(changed))
+            .order_by()
+            .values_list("project_id", flat=True)
+            .distinct()
+        )
+        cache.bump("user", *changed.values())
+    return result
@@ -0,0 +1,494 @@
+"""
+Transactional batches of task edits.
+
+A batch is a list of operations, applied in one transaction with a fixed
+number of queries however long it is:
+
+``{"op": "create", "ref": "a", "project": 1, "parent": 5, ...fields}``
+    Create a task. ``ref`` names it for later operations in the batch.
+``{"op": "update", "task": 7, ...fields}``
+    Change plain fields of a task.
+``{"op": "move", "task": 7, "parent": "a"}``
+    Re-parent a task (``null`` makes it a root).
+``{"op": "link", "task": 7, "prerequisite": "a"}`` / ``{"op": "unlink", ...}``
+    Add or remove a prerequisite.
+
+Tasks are referred to by id (an integer) or by the ``ref`` of a task created
+earlier in the batch (a string). Operations are replayed in order over
+in-memory copies of the tasks, so each sees the effect of the ones before it.
+The final rows, hierarchy and prerequisite graph are then validated once, with
+errors reported by operation index, rows are written with ``bulk_create`` and
+``bulk_update``, and the affected tasks are queued for rescheduling once.
+"""
+from collections import Counter, defaultdict, namedtuple
+
+from common import cache
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+
+from task import scheduling
+from task.graph import find_cycle, strongly_connected_components
+from task.models import Task
+from task.models.managers import check_constraint_errors
+
+# Fields a batch may set on created or updated tasks.
+BATCH_FIELDS = (
+    "name",
+    "description",
+    "instructions",
+    "status",
+    "hours_estimate",
+    "hours_optimistic",
+    "hours_pessimistic",
+    "buffer_before",
+    "buffer_after",
+    "auto_schedule",
+    "due_date",
+    "assigned_to",
+    "auto_assign",
+)
+
+OPERATIONS = ("create", "update", "move", "link", "unlink")
+
+REQUIRED_KEYS = {
+    "create": ("project",),
+    "update": ("task",),
+    "move": ("task", "parent"),
+    "link": ("task", "prerequisite"),
+    "unlink": ("task", "prerequisite"),
+}
+
+ESTIMATE_ON_PARENT = (
+    "Parent tasks cannot have hour estimates. Estimates should be on leaf tasks only."
+)
+
+BatchResult = namedtuple("BatchResult", ["created", "updated", "linked", "unlinked"])
+
+
+class BatchError(ValidationError):
+    """Raised with ``{operation_index: [messages]}`` when a batch is rejected."""
+
+    def __init__(self, errors):
+        self.operation_errors = errors
+        super().__init__(
+            [f"Operation {i}: {message}" for i, messages in errors.items()
+             for message in messages]
+        )
+
+
+def apply_batch(operations):
+    """
+    Validate and apply ``operations``. Returns a ``BatchResult`` with
+    ``{ref: id}`` for created tasks, the ids of updated or moved tasks and the
+    number of prerequisite links added and removed. Nothing is written if any
+    operation is invalid; ``BatchError`` lists the problems by operation index.
+    """
+    return _Batch(list(operations)).apply()
+
+
+def _is_id(value):
+    """Whether ``value`` can be a primary key; ``bool`` is an ``int`` subclass."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+class _Batch:
+    def __init__(self, operations):
+        self.operations = operations
+        self.errors = {}
+
+    def reject(self, i, message):
+        self.errors.setdefault(i, []).append(message)
+
+    def raise_errors(self):
+        if self.errors:
+            raise BatchError(self.errors)
+
+    def apply(self):
+        self._check_shapes()
+        self.raise_errors()
+        with transaction.atomic():
+            self._load_existing()
+            self.raise_errors()
+            self._replay()
+            self._validate_rows()
+            self.raise_errors()
+            self._validate_hierarchy()
+            self._validate_estimates_on_leaves()
+            self._validate_prerequisites()
+            self.raise_errors()
+            updated = self._write()
+            self._refresh_derived_columns()
+            Task.objects.projects_changed(
+                task.project_id for task in self.tasks.values()
+            )
+            # Assigning or reopening a task can add a project to the assignee's
+            # open tasks; created tasks are bumped by bulk_create_validated.
+            cache.bump(
+                "user",
+                *(
+                    self.tasks[node].assigned_to_id
+                    for node in updated
+                    if self.fields_set[node] & {"assigned_to", "status"}
+                ),
+            )
+            scheduling.mark_dirty(self.dirty)
+        return BatchResult(
+            created={
+                ref: self.tasks[ref].pk
+                for ref in self.create_op
+                if isinstance(ref, str)
+            },
+            updated=updated,
+            linked=self.linked,
+            unlinked=self.unlinked,
+        )
+
+    # ===========================================================================
+    # PARSING
+    # ===========================================================================
+    def _check_shapes(self):
+        self.refs = {}
+        for i, operation in enumerate(self.operations):
+            if not isinstance(operation, dict) or operation.get("op") not in OPERATIONS:
+                self.reject(i, f"Operation must be one of {', '.join(OPERATIONS)}.")
+                continue
+            kind = operation["op"]
+            allowed = {"op"} | self._keys(kind)
+            for key in operation.keys() - allowed:
+                self.reject(i, f"Unknown key '{key}' for {kind}.")
+            required = REQUIRED_KEYS[kind]
+            for key in required:
+                if key not in operation:
+                    self.reject(i, f"'{key}' is required for {kind}.")
+            for key in ("task", "parent", "prerequisite"):
+                node = operation.get(key)
+                if isinstance(node, str):
+                    if node not in self.refs:
+                        self.reject(
+                            i, f"Unknown ref '{node}'; refs must be created earlier."
+                        )
+                elif node is not None and not _is_id(node):
+                    self.reject(i, f"'{key}' must be a task id or a batch ref.")
+            if "project" in operation and not _is_id(operation["project"]):
+                self.reject(i, "'project' must be a project id.")
+            user = operation.get("assigned_to")
+            if user is not None and not _is_id(user):
+                self.reject(i, "'assigned_to' must be a user id.")
+            if kind == "create" and "ref" in operation:
+                ref = operation["ref"]
+                if not isinstance(ref, str):
+                    self.reject(i, "'ref' must be a string.")
+                elif ref in self.refs:
+                    self.reject(i, f"Duplicate ref '{ref}'.")
+                else:
+                    self.refs[ref] = i
+
+    @staticmethod
+    def _keys(kind):
+        if kind == "create":
+            return {"ref", "project", "parent", *BATCH_FIELDS}
+        if kind == "update":
+            return {"task", *BATCH_FIELDS}
+        if kind == "move":
+            return {"task", "parent"}
+        return {"task", "prerequisite"}
+
+    def _ops(self, *kinds):
+        return [
+            (i, operation)
+            for i, operation in enumerate(self.operations)
+            if operation["op"] in kinds
+        ]
+
+    # ===========================================================================
+    # LOADING
+    # ===========================================================================
+    def _load_existing(self):
+        """Load every existing task the batch mentions with one query."""
+        ids = {
+            operation[key]
+            for _, operation in self._ops(*OPERATIONS)
+            for key in ("task", "parent", "prerequisite")
+            if _is_id(operation.get(key))
+        }
+        self.existing = Task.objects.in_bulk(ids)
+        for i, operation in self._ops(*OPERATIONS):
+            for key in ("task", "parent", "prerequisite"):
+                node = operation.get(key)
+                if _is_id(node) and node not in self.existing:
+                    self.reject(i, f"Task {node} does not exist.")
+
+        # Created tasks are checked by bulk_create_validated.
+        user_ids = {
+            operation["assigned_to"]
+            for _, operation in self._ops("update")
+            if operation.get("assigned_to") is not None
+        }
+        users = set(
+            get_user_model()
+            .objects.filter(pk__in=user_ids)
+            .values_list("pk", flat=True)
+        )
+        for i, operation in self._ops("update"):
+            user = operation.get("assigned_to")
+            if user is not None and user not in users:
+                self.reject(i, f"User {user} does not exist.")
+
+    @staticmethod
+    def _field_values(operation):
+        values = {key: operation[key] for key in BATCH_FIELDS if key in operation}
+        if "assigned_to" in values:
+            values["assigned_to_id"] = values.pop("assigned_to")
+        return values
+
+    def _replay(self):
+        """
+        Apply the operations in order to in-memory tasks, keyed by id or ref,
+        leaving the final fields, parents and prerequisite links of the batch.
+        A link cancels an earlier unlink of the same pair and vice versa.
+        """
+        self.tasks = dict(self.existing)
+        self.stored_parent = {pk: task.parent_id for pk, task in self.existing.items()}
+        # {node: final parent node} and the operation that set it.
+        self.parent_of, self.hierarchy_op = {}, {}
+        # {node: index} of the create and of the last operation setting fields.
+        self.create_op, self.last_edit, self.last_estimate = {}, {}, {}
+        self.fields_set = defaultdict(set)
+        # {(task node, prerequisite node): index}
+        self.added, self.removed = {}, {}
+        for i, operation in enumerate(self.operations):
+            kind = operation["op"]
+            if kind in ("link", "unlink"):
+                pair = (operation["task"], operation["prerequisite"])
+                adding, removing = (
+                    (self.added, self.removed)
+                    if kind == "link"
+                    else (self.removed, self.added)
+                )
+                removing.pop(pair, None)
+                adding[pair] = i
+                continue
+            if kind == "move":
+                self.parent_of[operation["task"]] = operation["parent"]
+                self.hierarchy_op[operation["task"]] = i
+                continue
+            if kind == "create":
+                node = operation.get("ref", ("create", i))
+                self.tasks[node] = Task(project_id=operation["project"])
+                self.create_op[node] = i
+                self.parent_of[node] = operation.get("parent")
+                self.hierarchy_op[node] = i
+            else:
+                node = operation["task"]
+            for name, value in self._field_values(operation).items():
+                setattr(self.tasks[node], name, value)
+            self.fields_set[node].update(
+                key for key in BATCH_FIELDS if key in operation
+            )
+            self.last_edit[node] = i
+            if "hours_estimate" in operation:
+                self.last_estimate[node] = i
+
+    # ===========================================================================
+    # VALIDATION
+    # ===========================================================================
+    def _validate_rows(self):
+        """
+        Run field validation and the model's check constraints on every row the
+        batch creates or edits, blaming the last operation that set its fields.
+        """
+        for node, i in self.last_edit.items():
+            task = self.tasks[node]
+            if node in self.create_op:
+                exclude = ["project", "parent", "assigned_to"]
+            else:
+                exclude = [
+                    field.name
+                    for field in Task._meta.fields
+                    if field.name not in self.fields_set[node]
+                    or field.name == "assigned_to"
+                ]
+            try:
+                task.clean_fields(exclude=exclude)
+            except ValidationError as error:
+                for message in error.messages:
+                    self.reject(i, message)
+                continue
+            for message in check_constraint_errors(task):
+                self.reject(i, message)
+
+    def _validate_hierarchy(self):
+        """Reject parents in another project and moves that close a cycle."""
+        for node, parent in self.parent_of.items():
+            if (
+                parent is not None
+                and self.tasks[parent].project_id != self.tasks[node].project_id
+            ):
+                self.reject(
+                    self.hierarchy_op[node], "Parent task belongs to another project."
+                )
+        moves = {
+            node: i
+            for node, i in self.hierarchy_op.items()
+            if self.operations[i]["op"] == "move"
+        }
+        if not moves:
+            return
+        parents = dict(
+            Task.objects.filter(
+                project_id__in={self.tasks[node].project_id for node in moves}
+            ).values_list("id", "parent_id")
+        )
+        parents.update(self.parent_of)
+        edges = [(child, parent) for child, parent in parents.items() if parent]
+        for node, i in moves.items():
+            cycle = find_cycle(edges, [node])
+            if cycle:
+                self.reject(i, f"Parent/child cycle found at task node {cycle[-1]}")
+
+    def _validate_estimates_on_leaves(self):
+        """
+        Reject estimates on tasks that are parents once the batch is applied.
+        The operations that give such a task children are blamed, or the one
+        that set its estimate when it already had them.
+        """
+        gained, lost = defaultdict(list), Counter()
+        for node, parent in self.parent_of.items():
+            stored = self.stored_parent.get(node)
+            if parent == stored:
+                continue
+            if stored is not None:
+                lost[stored] += 1
+            if parent is not None:
+                gained[parent].append(self.hierarchy_op[node])
+        for node in gained.keys() | self.last_estimate.keys():
+            task = self.tasks[node]
+            if task.hours_estimate <= 0:
+                continue
+            children = len(gained[node])
+            if node not in self.create_op:
+                children += task.child_count - lost[node]
+            if children > 0:
+                for i in gained[node] or [self.last_estimate[node]]:
+                    self.reject(i, ESTIMATE_ON_PARENT)
+
+    def _validate_prerequisites(self):
+        """
+        Reject links that close a cycle in the final prerequisite graph: the
+        stored edges reachable from the linked tasks, less the unlinked pairs,
+        plus the linked ones. Links that are already stored are dropped.
+        """
+        if not self.added:
+            return
+        stored = set(
+            Task.objects.prerequisite_edges(
+                {node for pair in self.added for node in pair if isinstance(node, int)}
+            )
+        )
+        self.added = {
+            pair: i for pair, i in self.added.items() if pair not in stored
+        }
+        component_of = {}
+        edges = (stored - self.removed.keys()) | self.added.keys()
+        for number, component in enumerate(strongly_connected_components(edges)):
+            for node in component:
+                component_of[node] = number
+        for (task, prerequisite), i in self.added.items():
+            if task == prerequisite or component_of[task] == component_of[prerequisite]:
+                self.reject(i, "Circular dependency found in prerequisite pairs.")
+
+    # ===========================================================================
+    # WRITING
+    # ===========================================================================
+    def _write(self):
+        """
+        Write the final state: field updates first and unlinks next, so that the
+        inserts see the batch's estimates and prerequisite graph, then the
+        created tasks and links, then the moves, which may point at created
+        tasks. Returns the sorted ids of updated or moved tasks.
+        """
+        updates = [node for node in self.last_edit if node not in self.create_op]
+        self.updated_fields = {
+            name for node in updates for name in self.fields_set[node]
+        }
+        if updates:
+            Task.objects.bulk_update(
+                [self.tasks[node] for node in updates],
+                sorted(self.updated_fields),
+                batch_size=1000,
+            )
+        self.dirty = set(updates)
+
+        self._unlink()
+        self._create_and_link()
+        self.raise_errors()
+
+        moves = [node for node in self.parent_of if node not in self.create_op]
+        for node in moves:
+            task, parent = self.tasks[node], self.parent_of[node]
+            task.parent_id = None if parent is None else self.tasks[parent].pk
+            self.dirty.update((node, self.stored_parent[node], task.parent_id))
+        if moves:
+            Task.objects.bulk_update(
+                [self.tasks[node] for node in moves], ["parent"], batch_size=1000
+            )
+        self.moved = bool(moves)
+        return sorted({*updates, *moves})
+
+    def _unlink(self):
+        pairs = [pair for pair in self.removed if all(isinstance(n, int) for n in pair)]
+        self.unlinked = 0
+        if not pairs:
+            return
+        condition = Q()
+        for task_id, prerequisite_id in pairs:
+            condition |= Q(from_task_id=task_id, to_task_id=prerequisite_id)
+        self.dirty.update(task_id for task_id, _ in pairs)
+        self.unlinked, _ = Task.prerequisites.through.objects.filter(condition).delete()
+
+    def _create_and_link(self):
+        """
+        Insert created tasks, under their final parents, and new prerequisite
+        links through ``TaskManager.bulk_create_validated``.
+        """
+        new_tasks = []
+        for node in self.create_op:
+            task, parent = self.tasks[node], self.parent_of[node]
+            if isinstance(parent, str):
+                task.parent = self.tasks[parent]
+            else:
+                task.parent_id = parent
+            new_tasks.append(task)
+        links = [
+            (self.tasks[task], self.tasks[prerequisite])
+            for task, prerequisite in self.added
+        ]
+        self.linked = len(links)
+        try:
+            result = Task.objects.bulk_create_validated(new_tasks, links)
+        except ValidationError as error:
+            for i in self.added.values():
+                self.reject(i, " ".join(error.messages))
+            return
+        indexes = list(self.create_op.values())
+        for row, error in result.errors.items():
+            for message in error.messages:
+                self.reject(indexes[row], message)
+        self.dirty.update(task.pk for task in result.created)
+        self.dirty.update(task.pk for task, _ in links)
+
+    def _refresh_derived_columns(self):
+        """
+        Rebuild child counts, paths and rollups of the projects touched by moves
+        or estimate changes: a fixed number of set-based queries per batch.
+        """
+        if not self.moved and not self.updated_fields & {"hours_estimate", "status"}:
+            return
+        projects = Task.objects.filter(pk__in=self.dirty).values("project_id")
+        tasks = Task.objects.filter(project_id__in=projects)
+        if self.moved:
+            tasks.rebuild_child_counts()
+            tasks.rebuild_paths()
+        tasks.rebuild_rollups()
@@ -0,0 +1,437 @@
+"""
+Synthetic workloads and timings for the task graph.
+
+``seed_workload`` fills the database with clients, projects, task trees,
+prerequisite DAGs, users and time entries through the validated bulk insert
+paths, so the maintained columns (path, child_count, rollups) are correct and
+a million rows load in minutes. ``run_benchmarks`` times the operations that
+dominate request and scheduler latency against whatever is in the database,
+along with the peak memory each allocates, and returns plain data the
+management commands write out as JSON.
+"""
+import platform
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+import django
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import Prefetch
+from django.test.utils import CaptureQueriesContext
+
+from client.models import Client
+from project.models import Project
+from task.graph import find_cycle
+from task.models import Task, TimeEntry
+from task.scheduling import load_task_graph, schedule_projects
+from task.simulation import simulate_projects
+from task.tree import iter_tree_json, load_tree
+
+# Seeded clients are named "<BENCHMARK_PREFIX> <n>" so runs can find them.
+BENCHMARK_PREFIX = "Benchmark client"
+
+TREE_SHAPES = ("wide", "deep")
+
+# Time entries are spread over the working days after this instant.
+WORKLOAD_START = datetime(2025, 1, 6, 9, tzinfo=timezone.utc)
+
+
+# ===============================================================================
+# WORKLOAD GENERATION
+# ===============================================================================
+def tree_parents(count, shape="wide", branching=8, max_depth=50):
+    """
+    Return ``parents[i]``, the index of task ``i``'s parent (``None`` for the
+    root at index 0), for a tree of ``count`` tasks.
+
+    ``wide`` is a complete tree where every task has ``branching`` children.
+    ``deep`` hangs spines of up to ``max_depth`` levels off the root; every
+    spine task gets ``branching`` children, the last of which carries the spine
+    on. Materialized paths are capped at 2048 characters, so keep ``max_depth``
+    well under 200 for large ids.
+    """
+    if shape not in TREE_SHAPES:
+        raise ValueError(f"Unknown tree shape {shape!r}")
+    parents, depth = [None], [0]
+    spine = 0
+    for i in range(1, count):
+        if shape == "wide":
+            parent = (i - 1) // branching
+        else:
+            parent = spine
+            if i % branching == 0:
+                spine = i if depth[parent] + 1 < max_depth else 0
+        parents.append(parent)
+        depth.append(depth[parent] + 1)
+    return parents
+
+
+def prerequisite_pairs(leaves, rng, per_task=1.0, window=50):
+    """
+    Return ``(task_index, prerequisite_index)`` pairs forming a random DAG over
+    ``leaves``. Each leaf depends on about ``per_task`` of the ``window`` leaves
+    before it, so edges only point backwards and can never close a cycle.
+    """
+    pairs = set()
+    for position in range(1, len(leaves)):
+        count = int(per_task) + (rng.random() < per_task % 1)
+        low = max(0, position - window)
+        for _ in range(count):
+            pairs.add((leaves[position], leaves[rng.randrange(low, position)]))
+    return sorted(pairs)
+
+
+def seed_workload(
+    clients=10,
+    projects_per_client=10,
+    tasks_per_project=1000,
+    shape="wide",
+    branching=8,
+    max_depth=50,
+    prerequisites_per_task=1.0,
+    users=50,
+    entries_per_leaf=1,
+    seed=0,
+    batch_size=5000,
+    stdout=None,
+):
+    """
+    Create a synthetic workload and return the number of rows created per
+    model. Tasks, their prerequisites and time entries are inserted one project
+    at a time through the validated bulk paths.
+    """
+    rng = random.Random(seed)
+    user_ids = _seed_users(users, batch_size)
+    client_offset = Client.objects.filter(name__startswith=BENCHMARK_PREFIX).count()
+    new_clients = Client.objects.bulk_create(
+        [
+            Client(name=f"{BENCHMARK_PREFIX} {client_offset + i}")
+            for i in range(clients)
+        ],
+        batch_size=batch_size,
+    )
+    projects = Project.objects.bulk_create(
+        [
+            Project(
+                client=client,
+                name=f"Project {i}",
+                priority=rng.randrange(10),
+                status=rng.choice(
+                    [Project.ProjectStatus.BOOKED, Project.ProjectStatus.STARTED]
+                ),
+            )
+            for client in new_clients
+            for i in range(projects_per_client)
+        ],
+        batch_size=batch_size,
+    )
+
+    parents = tree_parents(tasks_per_project, shape, branching, max_depth)
+    has_children = set(parents)
+    leaves = [i for i in range(tasks_per_project) if i not in has_children]
+    counts = {"users": len(user_ids), "clients": len(new_clients)}
+    counts.update(projects=len(projects), tasks=0, prerequisites=0, time_entries=0)
+
+    for number, project in enumerate(projects, 1):
+        with transaction.atomic():
+            tasks = _project_tasks(project, parents, has_children, user_ids, rng)
+            pairs = prerequisite_pairs(leaves, rng, prerequisites_per_task)
+            result = Task.objects.bulk_create_validated(
+                tasks, [(tasks[a], tasks[b]) for a, b in pairs], batch_size
+            )
+            if result.errors:
+                raise ValueError(f"Generated invalid tasks: {result.errors}")
+            entries = _leaf_entries(tasks, leaves, user_ids, entries_per_leaf, rng)
+            TimeEntry.objects.bulk_create_validated(entries, batch_size)
+        counts["tasks"] += len(tasks)
+        counts["prerequisites"] += len(pairs)
+        counts["time_entries"] += len(entries)
+        if stdout is not None and number % 10 == 0:
+            stdout.write(f"Seeded {number}/{len(projects)} projects")
+    return counts
+
+
+def _seed_users(count, batch_size):
+    User = get_user_model()
+    names = [f"benchmark-user-{i}" for i in range(count)]
+    existing = dict(
+        User.objects.filter(username__in=names).values_list("username", "pk")
+    )
+    created = User.objects.bulk_create(
+        [User(username=name) for name in names if name not in existing],
+        batch_size=batch_size,
+    )
+    return sorted([*existing.values(), *(user.pk for user in created)])
+
+
+def _project_tasks(project, parents, has_children, user_ids, rng):
+    statuses = [
+        Task.TaskStatus.COMPLETED,
+        Task.TaskStatus.IN_PROCESS,
+        Task.TaskStatus.NOT_STARTED,
+        Task.TaskStatus.NOT_STARTED,
+    ]
+    tasks = []
+    for i, parent in enumerate(parents):
+        leaf = i not in has_children
+        tasks.append(
+            Task(
+                project=project,
+                parent=tasks[parent] if parent is not None else None,
+                name=f"Task {i}",
+                status=rng.choice(statuses) if leaf else Task.TaskStatus.NOT_STARTED,
+                hours_estimate=rng.choice((1, 2, 4, 8, 16)) if leaf else 0,
+                assigned_to_id=rng.choice(user_ids) if leaf and user_ids else None,
+                auto_assign=leaf and rng.random() < 0.5,
+                due_date=(
+                    (WORKLOAD_START + timedelta(days=rng.randrange(365))).date()
+                    if rng.random() < 0.1
+                    else None
+                ),
+            )
+        )
+    return tasks
+
+
+def _leaf_entries(tasks, leaves, user_ids, per_leaf, rng):
+    entries = []
+    for i in leaves:
+        for _ in range(per_leaf):
+            start = WORKLOAD_START + timedelta(
+                days=rng.randrange(365), hours=rng.randrange(8)
+            )
+            entries.append(
+                TimeEntry(
+                    task=tasks[i],
+                    user_id=rng.choice(user_ids) if user_ids else None,
+                    start_time=start,
+                    end_time=start + timedelta(minutes=rng.randrange(15, 240, 15)),
+                )
+            )
+    return entries
+
+
+# ===============================================================================
+# BENCHMARKS
+# ===============================================================================
+# name -> setup(project_ids), returning the zero-argument callable to time.
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Register a benchmark under ``name``."""
+
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+def benchmark_projects():
+    """Ids of the projects created by ``seed_workload``."""
+    return list(
+        Project.objects.filter(client__name__startswith=BENCHMARK_PREFIX)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+
+
+def _sample_leaves(project_ids, count=100):
+    return list(
+        Task.objects.filter(project_id__in=project_ids, child_count=0)
+        .order_by("pk")[:count]
+    )
+
+
+@benchmark("task_full_clean")
+def _task_full_clean(project_ids):
+    """full_clean() of existing leaf tasks: field, parent and cycle checks."""
+    tasks = _sample_leaves(project_ids)
+
+    def run():
+        for task in tasks:
+            task.full_clean()
+
+    return run
+
+
+@benchmark("bulk_create_validated")
+def _bulk_create_validated(project_ids):
+    """Validated insert of 500 tasks in a chain of prerequisites, rolled back."""
+    project_id = project_ids[0]
+
+    def run():
+        with transaction.atomic():
+            root = Task(project_id=project_id, name="Benchmark root")
+            tasks = [root] + [
+                Task(project_id=project_id, parent=root, name=f"Leaf {i}")
+                for i in range(499)
+            ]
+            pairs = list(zip(tasks[2:], tasks[1:-1]))
+            Task.objects.bulk_create_validated(tasks, pairs)
+            transaction.set_rollback(True)
+
+    return run
+
+
+@benchmark("prerequisite_cycle_check")
+def _prerequisite_cycle_check(project_ids):
+    """Cycle check for one new prerequisite edge on each of 100 leaves."""
+    tasks = _sample_leaves(project_ids)
+    edges = list(zip(tasks[1:], tasks[:-1]))
+
+    def run():
+        for task, prerequisite in edges:
+            downstream = Task.objects.prerequisite_edges([prerequisite.pk])
+            find_cycle(downstream + [(task.pk, prerequisite.pk)], [task.pk])
+
+    return run
+
+
+@benchmark("tree_json")
+def _tree_json(project_ids):
+    """Load and serialize the full task tree of every project."""
+
+    def run():
+        for project_id in project_ids:
+            roots, children = load_tree(project_id)
+            for _ in iter_tree_json(project_id, roots, children):
+                pass
+
+    return run
+
+
+@benchmark("rebuild_rollups")
+def _rebuild_rollups(project_ids):
+    """Recompute every rolled-up hours column from the hierarchy."""
+    tasks = Task.objects.filter(project_id__in=project_ids)
+
+    def run():
+        with transaction.atomic():
+            tasks.rebuild_rollups()
+            transaction.set_rollback(True)
+
+    return run
+
+
+@benchmark("task_graph_load")
+def _task_graph_load(project_ids):
+    """Load every task and prerequisite edge into a ``TaskGraph``."""
+
+    def run():
+        load_task_graph(project_ids)
+
+    return run
+
+
+@benchmark("task_instances_load")
+def _task_instances_load(project_ids):
+    """The same tasks and edges as ``Task`` instances, for comparison."""
+
+    def run():
+        list(
+            Task.objects.filter(project_id__in=project_ids).prefetch_related(
+                Prefetch("prerequisites", queryset=Task.objects.only("id"))
+            )
+        )
+
+    return run
+
+
+@benchmark("schedule_projects")
+def _schedule_projects(project_ids):
+    """Full critical-path schedule of every project, rolled back."""
+
+    def run():
+        with transaction.atomic():
+            schedule_projects(project_ids, now=WORKLOAD_START)
+            transaction.set_rollback(True)
+
+    return run
+
+
+@benchmark("simulate_schedule")
+def _simulate_schedule(project_ids):
+    """Monte Carlo schedule of every project over 1000 trials, rolled back."""
+
+    def run():
+        with transaction.atomic():
+            simulate_projects(project_ids, trials=1000, now=WORKLOAD_START, seed=0)
+            transaction.set_rollback(True)
+
+    return run
+
+
+def run_benchmarks(project_ids, names=None, repeat=5):
+    """
+    Time the benchmarks in ``names`` (default: all) against ``project_ids``.
+    Each one runs once untimed to warm caches, count its queries and trace its
+    peak Python and NumPy allocations, then ``repeat`` timed times. Returns a
+    JSON-serializable dict.
+    """
+    names = list(names or BENCHMARKS)
+    unknown = set(names) - BENCHMARKS.keys()
+    if unknown:
+        raise ValueError(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+    if not project_ids:
+        raise ValueError("No projects to benchmark; run seed_benchmark_data first.")
+
+    results = {}
+    for name in names:
+        run = BENCHMARKS[name](project_ids)
+        tracemalloc.start()
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                run()
+            _, peak_bytes = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - started)
+        results[name] = {
+            "queries": len(queries),
+            "peak_bytes": peak_bytes,
+            "runs": repeat,
+            "min": min(timings),
+            "median": statistics.median(timings),
+            "mean": statistics.fmean(timings),
+            "max": max(timings),
+        }
+    return {
+        "environment": {
+            "database": connection.vendor,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+        },
+        "workload": {
+            "projects": len(project_ids),
+            "tasks": Task.objects.filter(project_id__in=project_ids).count(),
+            "prerequisites": Task.prerequisites.through.objects.filter(
+                from_task__project_id__in=project_ids
+            ).count(),
+            "time_entries": TimeEntry.objects.filter(
+                task__project_id__in=project_ids
+            ).count(),
+        },
+        "results": results,
+    }
+
+
+def compare_results(current, baseline):
+    """
+    Return ``{name: median / baseline median}`` for benchmarks present in both
+    result documents; above 1.0 is slower than the baseline.
+    """
+    return {
+        name: result["median"] / baseline["results"][name]["median"]
+        for name, result in current["results"].items()
+        if name in baseline.get("results", {})
+        and baseline["results"][name]["median"] > 0
+    }
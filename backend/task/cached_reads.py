@@ -0,0 +1,76 @@
+"""
+Hot task reads served through the read cache (``common.cache``).
+
+Everything here is cached under the ``("project", id)`` scope of the projects
+it reads, which every write to a project's tasks or time entries bumps (see
+``ProjectSnapshot.objects.invalidate``). A user's task list spans projects, so
+it is also scoped to ``("user", id)``, bumped when a task is assigned to the
+user or changes status.
+"""
+from common.cache import get_cache
+from django.db.models import Sum
+
+from task.models import Task
+from task.tree import load_tree
+
+USER_TASK_FIELDS = (
+    "id",
+    "project_id",
+    "name",
+    "status",
+    "remaining_hours",
+    "schedule_datetime",
+    "due_date",
+    "risk_hours",
+)
+
+
+def project_tree(project_id):
+    """``load_tree(project_id)`` for the whole project, cached."""
+    return get_cache().get_or_set(
+        "tree", lambda: load_tree(project_id), scopes=[("project", project_id)]
+    )
+
+
+def project_rollup(project_id):
+    """The project's estimated, actual and remaining hours, cached."""
+
+    def compute():
+        totals = Task.objects.filter(
+            project_id=project_id, parent__isnull=True
+        ).aggregate(
+            estimate_hours=Sum("dependent_hours", default=0.0),
+            actual_hours=Sum("actual_hours", default=0.0),
+            remaining_hours=Sum("remaining_hours", default=0.0),
+        )
+        return {"project": project_id, **totals}
+
+    return get_cache().get_or_set(
+        "rollup", compute, scopes=[("project", project_id)]
+    )
+
+
+def user_tasks(user_id):
+    """
+    The open tasks assigned to ``user_id`` in schedule order, as dicts of
+    ``USER_TASK_FIELDS``. Cached under the user's scope and the scopes of the
+    projects the user has open tasks in, so a change to any of them is seen.
+    """
+    cache = get_cache()
+    open_tasks = Task.objects.filter(assigned_to_id=user_id).exclude(
+        status=Task.TaskStatus.COMPLETED
+    )
+    project_ids = cache.get_or_set(
+        "user_projects",
+        lambda: sorted(
+            set(open_tasks.order_by().values_list("project_id", flat=True))
+        ),
+        scopes=[("user", user_id)],
+    )
+    return cache.get_or_set(
+        "user_tasks",
+        lambda: list(
+            open_tasks.order_by("schedule_datetime", "id").values(*USER_TASK_FIELDS)
+        ),
+        scopes=[("user", user_id), *(("project", pk) for pk in project_ids)],
+    )
@@ -0,0 +1,191 @@
+"""
+Copying task trees between projects.
+
+``clone_subtree`` copies a task and its descendants, with their prerequisite
+edges, into a project; ``instantiate_template`` copies the whole task tree of
+a project type's template project into a new project. Either way the copy is
+written with a fixed number of queries however large the tree is: the source
+rows and edges are read once, new ids are mapped to old ones in memory, and
+rows are written with one ``bulk_create`` for the tasks, one ``bulk_update``
+for their parent links and paths and one ``bulk_create`` for the edges (per
+``batch_size`` rows). Every derived column is computed in memory, and edges
+among new tasks cannot close a cycle, so no per-row validation or
+``m2m_changed`` cycle check runs.
+"""
+from collections import namedtuple
+
+from common.cache import cached_instance
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from project.models import ProjectType
+from task import scheduling
+from task.models import Task
+from task.models.managers import ROLLUP_FIELDS, path_ids
+from task.rollups import ZERO, Rollup, add, own_rollup
+
+# Fields copied from each source task. Status, schedule, due date, assignee
+# and logged hours belong to the source project and start over in the copy.
+CLONED_FIELDS = (
+    "name",
+    "description",
+    "instructions",
+    "hours_estimate",
+    "hours_optimistic",
+    "hours_pessimistic",
+    "buffer_before",
+    "buffer_after",
+    "auto_schedule",
+    "auto_assign",
+)
+
+CloneResult = namedtuple("CloneResult", ["created", "roots", "edges"])
+
+
+def clone_subtree(task, project, parent=None, batch_size=1000):
+    """
+    Copy ``task`` (a ``Task`` or its id) and its subtree into ``project``,
+    under ``parent`` or as a new top-level task. Returns a ``CloneResult``
+    with ``{source id: new id}``, the new root ids and the number of
+    prerequisite edges copied. Edges to tasks outside the subtree are not
+    copied.
+    """
+    if not isinstance(task, Task):
+        task = Task.objects.only("path").get(pk=task)
+    return clone_tasks(
+        Task.objects.subtree(task), project, parent=parent, batch_size=batch_size
+    )
+
+
+def instantiate_template(project, parent=None, batch_size=1000):
+    """
+    Copy the task tree of the template of ``project``'s type into ``project``.
+    Raises ``ValidationError`` when the type has no template.
+    """
+    project_type = (
+        cached_instance(ProjectType, project.type_id) if project.type_id else None
+    )
+    if project_type is None or project_type.template_id is None:
+        raise ValidationError("The project's type has no template project.")
+    if project_type.template_id == project.pk:
+        raise ValidationError("A template project cannot be instantiated into itself.")
+    return clone_tasks(
+        Task.objects.filter(project_id=project_type.template_id),
+        project,
+        parent=parent,
+        batch_size=batch_size,
+    )
+
+
+def clone_tasks(source, project, parent=None, batch_size=1000):
+    """
+    Copy the tasks of ``source``, a queryset closed under descendants (a
+    subtree or a whole project), into ``project``. Tasks whose parent is not in
+    ``source`` become children of ``parent`` (a ``Task``, an id or ``None``).
+    """
+    project_id = getattr(project, "pk", project)
+    rows = list(source.order_by("path").values("id", "parent_id", *CLONED_FIELDS))
+    if not rows:
+        return CloneResult(created={}, roots=[], edges=0)
+    source_ids = {row["id"] for row in rows}
+    through = Task.prerequisites.through
+    edges = list(
+        through.objects.filter(from_task__in=source, to_task__in=source)
+        .order_by()
+        .values_list("from_task_id", "to_task_id")
+    )
+
+    with transaction.atomic():
+        parent_id, parent_path = _lock_parent(parent, project_id)
+
+        # Rollups of a fresh copy: the estimates, nothing logged, all remaining.
+        source_parent = {
+            row["id"]: row["parent_id"] if row["parent_id"] in source_ids else None
+            for row in rows
+        }
+        rollups, child_count = {}, dict.fromkeys(source_ids, 0)
+        for row in rows:
+            own = own_rollup(row["hours_estimate"], 0.0, False)
+            node = row["id"]
+            while node is not None:
+                rollups[node] = add(rollups.get(node, ZERO), own)
+                node = source_parent[node]
+            if source_parent[row["id"]] is not None:
+                child_count[source_parent[row["id"]]] += 1
+
+        copies = {
+            row["id"]: Task(
+                project_id=project_id,
+                child_count=child_count[row["id"]],
+                **{field: row[field] for field in CLONED_FIELDS},
+                **dict(zip(ROLLUP_FIELDS, rollups[row["id"]])),
+            )
+            for row in rows
+        }
+        Task.objects.bulk_create(copies.values(), batch_size=batch_size)
+
+        roots = []
+        for row in rows:  # Ordered by path: parents come first.
+            copy = copies[row["id"]]
+            source_parent_id = source_parent[row["id"]]
+            if source_parent_id is None:
+                copy.parent_id = parent_id
+                copy.path = f"{parent_path or ''}{copy.pk}/"
+                roots.append(row["id"])
+            else:
+                copy.parent_id = copies[source_parent_id].pk
+                copy.path = f"{copies[source_parent_id].path}{copy.pk}/"
+        Task.objects.bulk_update(
+            copies.values(), ["parent", "path"], batch_size=batch_size
+        )
+        through.objects.bulk_create(
+            [
+                through(
+                    from_task_id=copies[task_id].pk,
+                    to_task_id=copies[prerequisite_id].pk,
+                )
+                for task_id, prerequisite_id in edges
+            ],
+            batch_size=batch_size,
+        )
+
+        if parent_id is not None:
+            total = Rollup(
+                *(sum(rollups[root][i] for root in roots) for i in range(len(ZERO)))
+            )
+            Task.objects.adjust_child_counts({parent_id: len(roots)})
+            Task.objects.adjust_rollups({pk: total for pk in path_ids(parent_path)})
+        Task.objects.projects_changed([project_id])
+        scheduling.mark_dirty(copies[root].pk for root in roots)
+
+    return CloneResult(
+        created={source_id: copy.pk for source_id, copy in copies.items()},
+        roots=[copies[root].pk for root in roots],
+        edges=len(edges),
+    )
+
+
+def _lock_parent(parent, project_id):
+    """
+    Return ``(id, path)`` of the task copies will hang under, locking its row,
+    or ``(None, None)`` for a copy at the top level.
+    """
+    if parent is None:
+        return None, None
+    row = (
+        Task.objects.select_for_update()
+        .filter(pk=getattr(parent, "pk", parent))
+        .values_list("id", "project_id", "hours_estimate", "path")
+        .first()
+    )
+    if row is None:
+        raise ValidationError("Parent task does not exist.")
+    parent_id, parent_project_id, hours_estimate, path = row
+    if parent_project_id != project_id:
+        raise ValidationError("Parent task belongs to another project.")
+    if hours_estimate > 0:
+        raise ValidationError(
+            "Parent tasks cannot have hour estimates. "
+            "Estimates should be on leaf tasks only."
+        )
+    return parent_id, path
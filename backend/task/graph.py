@@ -0,0 +1,312 @@
+"""
+In-memory graph algorithms for the task hierarchy and prerequisite network.
+
+Functions here operate on plain ``(source, target)`` edge pairs so they can be fed
+from a single bulk query instead of walking related managers one node at a time.
+
+``TaskGraph`` holds a whole portfolio the same way for passes that visit every
+task: one typed NumPy array per column instead of a model instance or tuple per
+task, with children, prerequisites and dependents in compressed sparse row
+(CSR) form. Its passes run a topological level at a time, with one vectorized
+step per level instead of a Python step per task.
+"""
+from collections import defaultdict
+from datetime import timezone as dt_timezone
+
+import numpy as np
+
+# Positions within a TaskGraph; halves the index arrays of int64.
+INDEX = np.int32
+
+
+def build_adjacency(edges):
+    """Return a ``{source: [target, ...]}`` mapping for an iterable of edges."""
+    adjacency = defaultdict(list)
+    for source, target in edges:
+        adjacency[source].append(target)
+    return adjacency
+
+
+def find_cycle(edges, start_ids):
+    """
+    Return the first cycle reachable from ``start_ids`` as a list of node ids, or
+    ``None`` if every path from the start nodes terminates.
+
+    Uses an iterative three-colour depth first search so arbitrarily deep graphs
+    cannot exhaust the interpreter's recursion limit.
+    """
+    adjacency = build_adjacency(edges)
+    visiting, done = set(), set()
+
+    for start in start_ids:
+        if start in done:
+            continue
+        path = [start]
+        visiting.add(start)
+        stack = [iter(adjacency.get(start, ()))]
+        while stack:
+            node = next(stack[-1], None)
+            if node is None:
+                stack.pop()
+                finished = path.pop()
+                visiting.discard(finished)
+                done.add(finished)
+                continue
+            if node in visiting:
+                return path[path.index(node):] + [node]
+            if node in done:
+                continue
+            path.append(node)
+            visiting.add(node)
+            stack.append(iter(adjacency.get(node, ())))
+    return None
+
+
+def strongly_connected_components(edges):
+    """
+    Return the strongly connected components of the graph as a list of sets,
+    using an iterative version of Tarjan's algorithm. Every node that appears in
+    ``edges`` belongs to exactly one component.
+    """
+    adjacency = build_adjacency(edges)
+    nodes = set(adjacency)
+    for targets in adjacency.values():
+        nodes.update(targets)
+
+    index, lowlink, on_stack = {}, {}, set()
+    stack, components, counter = [], [], 0
+    for root in nodes:
+        if root in index:
+            continue
+        work = [(root, iter(adjacency.get(root, ())))]
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, targets = work[-1]
+            target = next(targets, None)
+            if target is not None:
+                if target not in index:
+                    index[target] = lowlink[target] = counter
+                    counter += 1
+                    stack.append(target)
+                    on_stack.add(target)
+                    work.append((target, iter(adjacency.get(target, ()))))
+                elif target in on_stack:
+                    lowlink[node] = min(lowlink[node], index[target])
+                continue
+            work.pop()
+            if work:
+                caller = work[-1][0]
+                lowlink[caller] = min(lowlink[caller], lowlink[node])
+            if lowlink[node] == index[node]:
+                component = set()
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.add(member)
+                    if member == node:
+                        break
+                components.append(component)
+    return components
+
+
+# ===============================================================================
+# ARRAY-BACKED GRAPH
+# ===============================================================================
+def csr(sources, targets, size):
+    """
+    Compressed sparse rows of the edges ``sources[k] -> targets[k]`` between
+    ``size`` nodes. Returns ``(offsets, targets, order)``: the targets of node
+    ``i`` are ``targets[offsets[i]:offsets[i + 1]]``, and ``order`` sorts any
+    per-edge array given in input order the same way.
+    """
+    sources = np.asarray(sources, dtype=INDEX)
+    order = np.argsort(sources, kind="stable")
+    offsets = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=size), out=offsets[1:])
+    return offsets, np.asarray(targets, dtype=INDEX)[order], order
+
+
+def csr_gather(offsets, nodes):
+    """
+    Return ``(sources, positions)`` for every edge leaving ``nodes``: the
+    source node of each edge and its position in the CSR target array.
+    """
+    starts = offsets[nodes]
+    lengths = offsets[nodes + 1] - starts
+    first = np.cumsum(lengths) - lengths
+    positions = np.repeat(starts - first, lengths) + np.arange(lengths.sum())
+    return np.repeat(nodes, lengths), positions
+
+
+def topological_levels(offsets, targets, size):
+    """
+    Split the ``size`` nodes of a CSR graph into levels, each holding the
+    nodes whose predecessors are all in earlier levels (Kahn's algorithm, one
+    level at a time). Nodes on or downstream of a cycle are left out, so the
+    levels cover fewer than ``size`` nodes exactly when there is a cycle.
+    """
+    in_degree = np.bincount(targets, minlength=size)
+    frontier = np.flatnonzero(in_degree == 0).astype(INDEX)
+    levels = []
+    while len(frontier):
+        levels.append(frontier)
+        _, positions = csr_gather(offsets, frontier)
+        reached = targets[positions]
+        np.subtract.at(in_degree, reached, 1)
+        reached = np.unique(reached)
+        frontier = reached[in_degree[reached] == 0]
+    return levels
+
+
+def datetime_column(values):
+    """Aware datetimes (or ``None``) as UTC ``datetime64[us]``, ``None`` as NaT."""
+    return np.array(
+        [
+            None if value is None
+            else value.astimezone(dt_timezone.utc).replace(tzinfo=None)
+            for value in values
+        ],
+        dtype="datetime64[us]",
+    )
+
+
+def datetimes(column):
+    """Aware UTC datetimes (``None`` for NaT) of a ``datetime_column``."""
+    return [
+        None if value is None else value.replace(tzinfo=dt_timezone.utc)
+        for value in column.astype(object)
+    ]
+
+
+class TaskGraph:
+    """
+    Tasks as parallel arrays in id order: position ``i`` of every array is the
+    task ``ids[i]``, and ``parent[i]`` is the position of its parent, or -1 if
+    its parent is not in the graph. Keyword ``columns`` become attributes,
+    reordered to match; ``columns`` lists their names.
+
+    ``edges`` are ``(task_id, prerequisite_id)`` pairs; pairs with an end
+    outside the graph are dropped. Children, prerequisites and dependents are
+    kept as CSR arrays (``*_offsets`` and ``*_targets``, read with
+    ``children_of`` and friends).
+    """
+
+    def __init__(self, ids, parent_ids, edges=(), **columns):
+        ids = np.asarray(ids, dtype=np.int64)
+        order = np.argsort(ids, kind="stable")
+        self.ids = ids[order]
+        self.size = len(self.ids)
+        positions = np.arange(self.size, dtype=INDEX)
+
+        parent_ids = np.fromiter(
+            (-1 if parent_id is None else parent_id for parent_id in parent_ids),
+            dtype=np.int64,
+            count=len(ids),
+        )
+        self.parent = self.index_of(parent_ids[order])
+        has_parent = self.parent >= 0
+        self.children_offsets, self.children_targets, _ = csr(
+            self.parent[has_parent], positions[has_parent], self.size
+        )
+
+        pairs = np.array(edges, dtype=np.int64).reshape(-1, 2)
+        task, prerequisite = self.index_of(pairs[:, 0]), self.index_of(pairs[:, 1])
+        inside = (task >= 0) & (prerequisite >= 0)
+        task, prerequisite = task[inside], prerequisite[inside]
+        self.prerequisite_offsets, self.prerequisite_targets, _ = csr(
+            task, prerequisite, self.size
+        )
+        self.dependent_offsets, self.dependent_targets, _ = csr(
+            prerequisite, task, self.size
+        )
+
+        self.columns = tuple(columns)
+        for name, values in columns.items():
+            setattr(self, name, np.asarray(values)[order])
+        self._levels = None
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def nbytes(self):
+        """Bytes held by the graph's arrays."""
+        values = vars(self).values()
+        return sum(value.nbytes for value in values if isinstance(value, np.ndarray))
+
+    @property
+    def has_children(self):
+        return np.diff(self.children_offsets) > 0
+
+    def index_of(self, task_ids):
+        """Positions of ``task_ids``, -1 for ids not in the graph."""
+        task_ids = np.asarray(task_ids, dtype=np.int64)
+        positions = np.searchsorted(self.ids, task_ids).clip(0, max(self.size - 1, 0))
+        found = (
+            self.ids[positions] == task_ids
+            if self.size
+            else np.zeros(task_ids.shape, dtype=bool)
+        )
+        return np.where(found, positions, -1).astype(INDEX)
+
+    def children_of(self, i):
+        return self.children_targets[
+            self.children_offsets[i]:self.children_offsets[i + 1]
+        ]
+
+    def prerequisites_of(self, i):
+        return self.prerequisite_targets[
+            self.prerequisite_offsets[i]:self.prerequisite_offsets[i + 1]
+        ]
+
+    def dependents_of(self, i):
+        return self.dependent_targets[
+            self.dependent_offsets[i]:self.dependent_offsets[i + 1]
+        ]
+
+    def levels(self):
+        """
+        Positions by depth in the hierarchy, roots first. Tasks on or below a
+        parent cycle are in no level.
+        """
+        if self._levels is None:
+            self._levels = topological_levels(
+                self.children_offsets, self.children_targets, self.size
+            )
+        return self._levels
+
+    def subtree_sums(self, values):
+        """
+        Sum ``values`` (one row per position, any trailing shape) over every
+        subtree. Tasks on or below a parent cycle keep their own value.
+        """
+        totals = np.array(values, dtype=np.float64)
+        for level in reversed(self.levels()[1:]):
+            np.add.at(totals, self.parent[level], totals[level])
+        return totals
+
+    def find_cycle(self):
+        """
+        Return one prerequisite cycle as a list of task ids (first id
+        repeated at the end), or ``None`` if the prerequisites form a DAG.
+        """
+        levels = topological_levels(
+            self.dependent_offsets, self.dependent_targets, self.size
+        )
+        if sum(len(level) for level in levels) == self.size:
+            return None
+        # Peeling left the cycles and everything downstream of them.
+        remaining = np.ones(self.size, dtype=bool)
+        for level in levels:
+            remaining[level] = False
+        stuck = np.flatnonzero(remaining).astype(INDEX)
+        sources, positions = csr_gather(self.prerequisite_offsets, stuck)
+        targets = self.prerequisite_targets[positions]
+        keep = remaining[targets]
+        edges = zip(
+            self.ids[sources[keep]].tolist(), self.ids[targets[keep]].tolist()
+        )
+        return find_cycle(edges, self.ids[stuck].tolist())
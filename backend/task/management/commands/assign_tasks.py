@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from task.assignment import assign_tasks
+
+
+class Command(BaseCommand):
+    help = (
+        "Assign auto_assign leaf tasks in booked and started projects to users "
+        "without exceeding anyone's daily capacity"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--horizon-days",
+            type=int,
+            default=260,
+            help="Number of working days to plan ahead (default: 260)",
+        )
+
+    def handle(self, *args, **options):
+        result = assign_tasks(horizon_days=options["horizon_days"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Assigned {len(result.assignments)} task(s); "
+                f"{len(result.unassigned)} could not fit within the horizon"
+            )
+        )
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from client.models import Client
+from task.status_reports import EXPORT_FORMATS, export_reports
+
+
+class Command(BaseCommand):
+    help = (
+        "Write client status reports, built from the cached project snapshots, "
+        "to a CSV or PDF file"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--client",
+            type=int,
+            action="append",
+            dest="clients",
+            help="Only report on this client id (may be repeated)",
+        )
+        parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+        parser.add_argument("--output", required=True, help="File to write")
+
+    def handle(self, *args, **options):
+        clients = options["clients"] or Client.objects.values("pk")
+        content, _, _ = export_reports(clients, options["format"])
+        if isinstance(content, bytes):
+            with open(options["output"], "wb") as output:
+                output.write(content)
+        else:
+            with open(options["output"], "w", newline="") as output:
+                output.write(content)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {options['format'].upper()} status reports to "
+                f"{options['output']}"
+            )
+        )
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from task.models import DailyTime, Task
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-user, per-task daily time totals from the time entries"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--project",
+            type=int,
+            action="append",
+            dest="projects",
+            help="Only rebuild totals for tasks in this project id (may be repeated)",
+        )
+
+    def handle(self, *args, **options):
+        tasks = None
+        if options["projects"]:
+            tasks = Task.objects.filter(project_id__in=options["projects"])
+
+        rows, entries = DailyTime.objects.rebuild(tasks)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt {rows} daily total(s) from {entries} time entry(ies)"
+            )
+        )
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from task.models import Task
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the denormalized child_count, materialized path and rolled-up "
+        "hours columns on Task and repair any rows that drifted"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--project",
+            type=int,
+            action="append",
+            dest="projects",
+            help="Only repair tasks in this project id (may be repeated)",
+        )
+
+    def handle(self, *args, **options):
+        tasks = Task.objects.all()
+        if options["projects"]:
+            tasks = tasks.filter(project_id__in=options["projects"])
+
+        child_counts = tasks.rebuild_child_counts()
+        paths = tasks.rebuild_paths()
+        rollups = tasks.rebuild_rollups()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Repaired child_count on {child_counts} task(s), path on "
+                f"{paths} task(s) and rolled-up hours on {rollups} task(s)"
+            )
+        )
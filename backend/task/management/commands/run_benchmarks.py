@@ -0,0 +1,62 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from task.benchmarks import (
+    BENCHMARKS,
+    benchmark_projects,
+    compare_results,
+    run_benchmarks,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Time validation, cycle checks, tree fetches, rollups and scheduling "
+        "against seeded benchmark data and print the results as JSON"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--benchmark",
+            action="append",
+            dest="benchmarks",
+            choices=sorted(BENCHMARKS),
+            help="Only run this benchmark (may be repeated)",
+        )
+        parser.add_argument(
+            "--project",
+            type=int,
+            action="append",
+            dest="projects",
+            help="Benchmark this project id (may be repeated; default: every "
+            "project created by seed_benchmark_data)",
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument(
+            "--label", default="", help="Stored with the results, e.g. a commit"
+        )
+        parser.add_argument("--output", help="Also write the results to this file")
+        parser.add_argument(
+            "--compare",
+            help="Results file from an earlier run; adds median ratios against it",
+        )
+
+    def handle(self, *args, **options):
+        projects = options["projects"] or benchmark_projects()
+        try:
+            results = run_benchmarks(
+                projects, options["benchmarks"], options["repeat"]
+            )
+        except ValueError as error:
+            raise CommandError(error) from error
+        results["label"] = options["label"]
+        if options["compare"]:
+            with open(options["compare"]) as baseline:
+                results["compared_to"] = compare_results(results, json.load(baseline))
+
+        document = json.dumps(results, indent=2, sort_keys=True)
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                output.write(document + "\n")
+        self.stdout.write(document)
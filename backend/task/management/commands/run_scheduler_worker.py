@@ -0,0 +1,68 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from task.queue import get_queue
+from task.worker import SchedulerWorker
+
+
+class Command(BaseCommand):
+    help = (
+        "Consume project reschedule jobs from the scheduling queue and recompute "
+        "their schedules across a process pool"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--backend",
+            choices=["database", "redis", "local"],
+            help="Queue backend (default: settings.SCHEDULING_QUEUE_BACKEND)",
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=1,
+            help="Number of scheduling processes (default: 1)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Jobs claimed per batch (default: 100)",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait when the queue is empty (default: 1)",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the queue and exit instead of polling forever",
+        )
+        parser.add_argument(
+            "--stats",
+            action="store_true",
+            help="Print queue depth and the age of the oldest job as JSON and exit",
+        )
+
+    def handle(self, *args, **options):
+        queue = get_queue(options["backend"])
+        if queue is None:
+            self.stderr.write(
+                "SCHEDULING_QUEUE_BACKEND is 'inline'; pass --backend to choose a queue"
+            )
+            return
+        if options["stats"]:
+            self.stdout.write(json.dumps(queue.stats()._asdict()))
+            return
+
+        worker = SchedulerWorker(
+            queue=queue,
+            processes=options["processes"],
+            batch_size=options["batch_size"],
+            poll_interval=options["poll_interval"],
+        )
+        stats = worker.run(once=options["once"])
+        self.stdout.write(self.style.SUCCESS(json.dumps(stats.as_dict())))
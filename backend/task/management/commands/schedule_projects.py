@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from task.scheduling import schedule_portfolio, schedule_projects
+
+
+class Command(BaseCommand):
+    help = (
+        "Compute the critical-path schedule for booked and started projects (or the "
+        "given projects) and store schedule_datetime and risk_hours"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--project",
+            type=int,
+            action="append",
+            dest="projects",
+            help="Only schedule this project id (may be repeated)",
+        )
+
+    def handle(self, *args, **options):
+        if options["projects"]:
+            schedule = schedule_projects(options["projects"])
+        else:
+            schedule = schedule_portfolio()
+        at_risk = sum(1 for hours in schedule.risk_hours.values() if hours > 0)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Scheduled {len(schedule.early_start)} task(s); "
+                f"{at_risk} finish after their due date"
+            )
+        )
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand
+
+from task.benchmarks import TREE_SHAPES, seed_workload
+
+
+class Command(BaseCommand):
+    help = (
+        "Create synthetic clients, projects, task trees, prerequisite DAGs, users "
+        "and time entries for benchmarking"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clients", type=int, default=10)
+        parser.add_argument("--projects-per-client", type=int, default=10)
+        parser.add_argument("--tasks-per-project", type=int, default=1000)
+        parser.add_argument(
+            "--shape",
+            choices=TREE_SHAPES,
+            default="wide",
+            help="wide: every task has --branching children; deep: long spines "
+            "of up to --max-depth levels (default: wide)",
+        )
+        parser.add_argument("--branching", type=int, default=8)
+        parser.add_argument("--max-depth", type=int, default=50)
+        parser.add_argument(
+            "--prerequisites-per-task",
+            type=float,
+            default=1.0,
+            help="Average number of prerequisites per leaf task (default: 1.0)",
+        )
+        parser.add_argument("--users", type=int, default=50)
+        parser.add_argument("--entries-per-leaf", type=int, default=1)
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Random seed (default: 0)"
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        counts = seed_workload(
+            clients=options["clients"],
+            projects_per_client=options["projects_per_client"],
+            tasks_per_project=options["tasks_per_project"],
+            shape=options["shape"],
+            branching=options["branching"],
+            max_depth=options["max_depth"],
+            prerequisites_per_task=options["prerequisites_per_task"],
+            users=options["users"],
+            entries_per_leaf=options["entries_per_leaf"],
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            stdout=self.stdout,
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Created "
+                + ", ".join(f"{count} {name}" for name, count in counts.items())
+            )
+        )
@@ -0,0 +1,61 @@
+from argparse import ArgumentTypeError
+
+from django.core.management.base import BaseCommand
+
+from project.models import Project
+from task.scheduling import SCHEDULED_PROJECT_STATUSES
+from task.simulation import DEFAULT_TRIALS, simulate_projects
+
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise ArgumentTypeError(f"{value} is not a positive integer")
+    return number
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate the schedule of booked and started projects (or the given "
+        "projects) with sampled task durations and store P50/P90 finish dates "
+        "and due date overrun probabilities per task"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--project",
+            type=int,
+            action="append",
+            dest="projects",
+            help="Only simulate this project id (may be repeated)",
+        )
+        parser.add_argument("--trials", type=positive_int, default=DEFAULT_TRIALS)
+        parser.add_argument(
+            "--processes",
+            type=positive_int,
+            default=1,
+            help="Run chunks of trials on this many processes",
+        )
+        parser.add_argument("--seed", type=int, default=None)
+
+    def handle(self, *args, **options):
+        project_ids = options["projects"] or list(
+            Project.objects.filter(status__in=SCHEDULED_PROJECT_STATUSES)
+            .order_by()
+            .values_list("id", flat=True)
+        )
+        result = simulate_projects(
+            project_ids,
+            trials=options["trials"],
+            seed=options["seed"],
+            processes=options["processes"],
+        )
+        likely_late = sum(
+            1 for probability in result.overrun_probability if probability >= 0.5
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Simulated {len(result.task_ids)} task(s) over {result.trials} "
+                f"trial(s); {likely_late} more likely than not to finish late"
+            )
+        )
@@ -0,0 +1,12 @@
+from task.scheduling import coalesce_rescheduling
+
+
+class CoalesceReschedulingMiddleware:
+    """Reschedule every task edited during a request once, when the request ends."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with coalesce_rescheduling():
+            return self.get_response(request)
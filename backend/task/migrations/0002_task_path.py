@@ -0,0 +1,84 @@
+# Generated by Django 6.0 on 2026-10-18 14:46
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_paths(apps, schema_editor):
+    Task = apps.get_model('task', 'Task')
+    parents = dict(Task.objects.values_list('id', 'parent_id'))
+    paths = {}
+
+    def compute(task_id):
+        chain, seen = [], set()
+        while task_id is not None and task_id not in paths:
+            if task_id in seen:
+                return
+            chain.append(task_id)
+            seen.add(task_id)
+            task_id = parents.get(task_id)
+        path = paths.get(task_id, '')
+        for node_id in reversed(chain):
+            path = f'{path}{node_id}/'
+            paths[node_id] = path
+
+    for task_id in parents:
+        compute(task_id)
+    Task.objects.bulk_update(
+        [Task(id=task_id, path=path) for task_id, path in paths.items()],
+        ['path'],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0001_initial'),
+        ('task', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='path',
+            field=models.CharField(blank=True, editable=False, help_text="Materialized path of ancestor ids ending with this task's id, e.g. '1/5/9/'. Maintained on save.", max_length=2048),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='description',
+            field=models.TextField(blank=True, help_text='Detailed description of task.'),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='due_date',
+            field=models.DateField(blank=True, default=None, null=True),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='instructions',
+            field=models.TextField(blank=True, help_text='Specific instructions for completion of task. If using this field, consider creating child subtasks.'),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='name',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='schedule_datetime',
+            field=models.DateTimeField(blank=True, default=None, null=True),
+        ),
+        migrations.AlterField(
+            model_name='timeentry',
+            name='user',
+            field=models.ForeignKey(blank=True, help_text='User who performed the work', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='time_entries', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['path'], name='task_path_idx', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.RunPython(populate_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-18 14:47
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_child_counts(apps, schema_editor):
+    Task = apps.get_model('task', 'Task')
+    counts = (
+        Task.objects.filter(parent__isnull=False)
+        .values('parent_id')
+        .annotate(total=Count('pk'))
+        .values_list('parent_id', 'total')
+    )
+    Task.objects.bulk_update(
+        [Task(id=task_id, child_count=total) for task_id, total in counts],
+        ['child_count'],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task', '0002_task_path'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='child_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of direct children. Maintained on save and delete.'),
+        ),
+        migrations.RunPython(populate_child_counts, migrations.RunPython.noop),
+    ]
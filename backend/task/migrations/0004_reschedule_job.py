@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-18 14:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0001_initial'),
+        ('task', '0003_task_child_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RescheduleJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('enqueued_at', models.DateTimeField(auto_now_add=True)),
+                ('claimed_at', models.DateTimeField(blank=True, default=None, null=True)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reschedule_jobs', to='project.project')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['claimed_at', 'enqueued_at'], name='task_resche_claimed_682f7d_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('claimed_at__isnull', True)), fields=('project',), name='reschedule_job_one_pending_per_project')],
+            },
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 6.0 on 2026-10-18 15:01
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+from task.rollups import compute_rollups, hours_between, own_rollup
+
+
+def populate_rollups(apps, schema_editor):
+    Task = apps.get_model('task', 'Task')
+    TimeEntry = apps.get_model('task', 'TimeEntry')
+    logged = defaultdict(float)
+    for task_id, start, end in TimeEntry.objects.values_list(
+        'task_id', 'start_time', 'end_time'
+    ):
+        logged[task_id] += hours_between(start, end)
+    nodes = {
+        task_id: (parent_id, own_rollup(estimate, logged[task_id], status == 'COMPLETED'))
+        for task_id, parent_id, estimate, status in Task.objects.values_list(
+            'id', 'parent_id', 'hours_estimate', 'status'
+        )
+    }
+    Task.objects.bulk_update(
+        [
+            Task(
+                id=task_id,
+                dependent_hours=total.estimated,
+                actual_hours=total.actual,
+                remaining_hours=total.remaining,
+            )
+            for task_id, total in compute_rollups(nodes).items()
+        ],
+        ['dependent_hours', 'actual_hours', 'remaining_hours'],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task', '0004_reschedule_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='actual_hours',
+            field=models.FloatField(default=0, editable=False, help_text='Hours logged against this task and its subtree. Maintained on save.'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='remaining_hours',
+            field=models.FloatField(default=0, editable=False, help_text='Estimated hours left on this task and its subtree; completed tasks count as zero. Maintained on save.'),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='dependent_hours',
+            field=models.FloatField(default=0, editable=False, help_text='Estimated hours of this task and its subtree. Maintained on save.'),
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 6.0 on 2026-10-18 15:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0001_initial'),
+        ('task', '0005_task_rollups'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('status', 'COMPLETED'), _negated=True), fields=['project', 'status'], name='task_open_project_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('auto_assign', True), ('child_count', 0), models.Q(('status', 'COMPLETED'), _negated=True)), fields=['project'], name='task_open_auto_leaf_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['assigned_to', 'schedule_datetime'], name='task_assignee_schedule_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('due_date__isnull', False), models.Q(('status', 'COMPLETED'), _negated=True)), fields=['due_date'], name='task_open_due_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timeentry',
+            index=models.Index(fields=['task', 'start_time'], name='time_entry_task_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timeentry',
+            index=models.Index(fields=['user', 'start_time'], name='time_entry_user_start_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='task',
+            constraint=models.CheckConstraint(condition=models.Q(('hours_estimate__gte', 0)), name='task_hours_estimate_non_negative'),
+        ),
+        migrations.AddConstraint(
+            model_name='timeentry',
+            constraint=models.CheckConstraint(condition=models.Q(('start_time__isnull', True), ('end_time__isnull', True), ('end_time__gte', models.F('start_time')), _connector='OR'), name='time_entry_ends_after_start'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 6.0 on 2026-10-18 15:18
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+SPAN_INDEX = "time_entry_span_gist"
+
+
+def close_extra_running_timers(apps, schema_editor):
+    """
+    Keep only each user's latest running entry open. Older ones are closed at
+    their start so they stay at zero hours and no rollup changes.
+    """
+    TimeEntry = apps.get_model("task", "TimeEntry")
+    running = TimeEntry.objects.filter(
+        user__isnull=False, start_time__isnull=False, end_time__isnull=True
+    )
+    latest = {}
+    for entry_id, user_id in running.order_by("start_time", "id").values_list(
+        "id", "user_id"
+    ):
+        latest[user_id] = entry_id
+    running.exclude(pk__in=latest.values()).update(end_time=F("start_time"))
+
+
+def create_span_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    TimeEntry = apps.get_model("task", "TimeEntry")
+    schema_editor.execute(
+        f"CREATE INDEX {SPAN_INDEX} ON {TimeEntry._meta.db_table} USING gist "
+        "(tstzrange(start_time, COALESCE(end_time, 'infinity'::timestamptz), '[)'))"
+    )
+
+
+def drop_span_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(f"DROP INDEX IF EXISTS {SPAN_INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task', '0006_indexes_and_constraints'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(close_extra_running_timers, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='timeentry',
+            constraint=models.UniqueConstraint(condition=models.Q(('end_time__isnull', True), ('start_time__isnull', False), ('user__isnull', False)), fields=('user',), name='time_entry_one_running_timer'),
+        ),
+        migrations.RunPython(create_span_index, drop_span_index),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 6.0 on 2026-10-18 15:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+from task.rollups import seconds_by_day
+
+
+def fill_daily_time(apps, schema_editor):
+    """Sum the existing time entries into daily totals."""
+    TimeEntry = apps.get_model("task", "TimeEntry")
+    DailyTime = apps.get_model("task", "DailyTime")
+    daily = {}
+    entries = TimeEntry.objects.filter(
+        start_time__isnull=False, end_time__isnull=False
+    ).values_list("task_id", "user_id", "start_time", "end_time")
+    for task_id, user_id, start, end in entries.iterator(5000):
+        for day, seconds in seconds_by_day(start, end).items():
+            key = (user_id, task_id, day)
+            daily[key] = daily.get(key, 0) + seconds
+    DailyTime.objects.bulk_create(
+        (
+            DailyTime(user_id=user_id, task_id=task_id, day=day, seconds=seconds)
+            for (user_id, task_id, day), seconds in daily.items()
+        ),
+        batch_size=5000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task', '0007_running_timers'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyTime',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('seconds', models.BigIntegerField(default=0)),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_times', to='task.task')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='daily_times', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day', 'user'], name='daily_time_day_user_idx'), models.Index(fields=['task', 'day'], name='daily_time_task_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'task', 'day'), name='daily_time_user_task_day'), models.UniqueConstraint(condition=models.Q(('user__isnull', True)), fields=('task', 'day'), name='daily_time_no_user_task_day')],
+            },
+        ),
+        migrations.RunPython(fill_daily_time, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 6.0 on 2026-10-18 15:26
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0001_initial'),
+        ('task', '0008_daily_time'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectSnapshot',
+            fields=[
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='snapshot', serialize=False, to='project.project')),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
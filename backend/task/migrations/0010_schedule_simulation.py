@@ -0,0 +1,46 @@
+# Generated by Django 6.0 on 2026-10-18 15:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0002_project_type_template'),
+        ('task', '0009_project_snapshot'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskForecast',
+            fields=[
+                ('task', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='forecast', serialize=False, to='task.task')),
+                ('finish_p50', models.DateTimeField()),
+                ('finish_p90', models.DateTimeField()),
+                ('overrun_probability', models.FloatField(blank=True, help_text='Share of trials finishing after the due date; null without one.', null=True)),
+                ('trials', models.PositiveIntegerField()),
+                ('simulated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='hours_optimistic',
+            field=models.FloatField(blank=True, default=None, help_text='Fewest hours the task could take, for schedule risk simulation. Defaults to a fixed share of the estimate.', null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='hours_pessimistic',
+            field=models.FloatField(blank=True, default=None, help_text='Most hours the task could take, for schedule risk simulation. Defaults to a fixed multiple of the estimate.', null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='task',
+            constraint=models.CheckConstraint(condition=models.Q(('hours_optimistic__isnull', True), models.Q(('hours_optimistic__gte', 0), ('hours_optimistic__lte', models.F('hours_estimate'))), _connector='OR'), name='task_hours_optimistic_within_estimate', violation_error_message='Optimistic hours must be between 0 and the estimate.'),
+        ),
+        migrations.AddConstraint(
+            model_name='task',
+            constraint=models.CheckConstraint(condition=models.Q(('hours_pessimistic__isnull', True), ('hours_pessimistic__gte', models.F('hours_estimate')), _connector='OR'), name='task_hours_pessimistic_within_estimate', violation_error_message='Pessimistic hours must be at least the estimate.'),
+        ),
+    ]
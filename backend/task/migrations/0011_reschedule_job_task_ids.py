@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 18:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task', '0010_schedule_simulation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reschedulejob',
+            name='task_ids',
+            field=models.TextField(blank=True, default='*'),
+        ),
+    ]
@@ -1,4 +1,15 @@
+from .daily_time import DailyTime
+from .project_snapshot import ProjectSnapshot
+from .reschedule_job import RescheduleJob
 from .task import Task
+from .task_forecast import TaskForecast
 from .time_entry import TimeEntry
 
-__all__ = ['Task', 'TimeEntry']
\ No newline at end of file
+__all__ = [
+    'DailyTime',
+    'ProjectSnapshot',
+    'RescheduleJob',
+    'Task',
+    'TaskForecast',
+    'TimeEntry',
+]
@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.db import models
+from django.db.models import Q
+
+from .managers import DailyTimeManager
+
+
+class DailyTime(models.Model):
+    """
+    Seconds logged per user, task and local day: ``TimeEntry`` rows summed
+    ahead of time so reports read a table that grows with days worked, not
+    with entries. Kept in step by every write path of ``TimeEntry``;
+    ``manage.py rebuild_daily_time`` recomputes it from the entries.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        related_name="daily_times",
+        null=True,
+        blank=True,
+    )
+    task = models.ForeignKey(
+        to="task.Task", related_name="daily_times", on_delete=models.CASCADE
+    )
+    day = models.DateField()
+    seconds = models.BigIntegerField(default=0)
+
+    objects = DailyTimeManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "task", "day"], name="daily_time_user_task_day"
+            ),
+            # NULLs never conflict above: entries without a user share this row.
+            models.UniqueConstraint(
+                fields=["task", "day"],
+                condition=Q(user__isnull=True),
+                name="daily_time_no_user_task_day",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["day", "user"], name="daily_time_day_user_idx"),
+            models.Index(fields=["task", "day"], name="daily_time_task_day_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.user_id}/{self.task_id}: {self.seconds}s"
@@ -0,0 +1,1101 @@
+import operator
+from collections import Counter, defaultdict
+from typing import NamedTuple
+
+import numpy as np
+from common import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connections, models, transaction
+from django.db.models import Case, Count, F, Func, Q, Sum, Value, When
+from django.db.models.functions import Greatest
+
+from task.graph import TaskGraph, strongly_connected_components
+from task.rollups import (
+    ZERO,
+    Rollup,
+    add,
+    duration_hours,
+    hours_between,
+    own_rollup,
+    seconds_by_day,
+    subtract,
+)
+
+# Columns holding a task's rolled-up estimated, actual and remaining hours.
+ROLLUP_FIELDS = ("dependent_hours", "actual_hours", "remaining_hours")
+
+# Backends known to support ``WITH RECURSIVE`` common table expressions. Anything
+# else falls back to one query per level of the graph.
+RECURSIVE_CTE_VENDORS = {"postgresql", "sqlite"}
+
+
+class BulkCreateResult(NamedTuple):
+    """Outcome of a validated bulk insert."""
+
+    created: list
+    errors: dict
+
+
+def _existing_ids(model, ids, using):
+    ids = {pk for pk in ids if pk is not None}
+    if not ids:
+        return set()
+    return set(
+        model._base_manager.using(using)
+        .filter(pk__in=ids)
+        .order_by()
+        .values_list("pk", flat=True)
+    )
+
+
+def path_ids(path):
+    """Return the task ids in a materialized path, root first."""
+    return [int(pk) for pk in path.split("/") if pk]
+
+
+def _spread(deltas, task_ids, rollup):
+    """Add ``rollup`` to the ``{task_id: Rollup}`` deltas of every id given."""
+    for task_id in task_ids:
+        deltas[task_id] = add(deltas.get(task_id, ZERO), rollup)
+
+
+def spread_by_day(deltas, span, sign=1):
+    """
+    Add the daily seconds of a time entry's ``(task_id, user_id, start, end)``
+    span to ``{(user_id, task_id, day): seconds}``, negated when ``sign`` is -1.
+    """
+    task_id, user_id, start, end = span
+    for day, seconds in seconds_by_day(start, end).items():
+        key = (user_id, task_id, day)
+        deltas[key] = deltas.get(key, 0) + sign * seconds
+
+
+def _logged_duration():
+    """Total duration of a task's own finished time entries."""
+    return Sum(
+        F("time_entries__end_time") - F("time_entries__start_time"),
+        output_field=models.DurationField(),
+    )
+
+
+def _shift(values, default, output_field=None):
+    """
+    ``CASE`` expression mapping ids to ``{pk: value}``. Ids sharing a value are
+    grouped into one ``WHEN pk IN (...)`` so that large batches, where most
+    values repeat, compile to a handful of branches instead of one per row.
+    """
+    groups = defaultdict(list)
+    for pk, value in values.items():
+        groups[value].append(pk)
+    return Case(
+        *(When(pk__in=pks, then=Value(value)) for value, pks in groups.items()),
+        default=Value(default),
+        output_field=output_field,
+    )
+
+
+def _clean_fields(objs, exclude, errors):
+    """
+    Run field validation and the model's check constraints (no queries) and
+    collect messages.
+    """
+    for i, obj in enumerate(objs):
+        if obj.pk is not None:
+            errors.setdefault(i, []).append("Object is already saved.")
+            continue
+        try:
+            obj.clean_fields(exclude=exclude)
+        except ValidationError as error:
+            errors.setdefault(i, []).extend(error.messages)
+            continue
+        messages = check_constraint_errors(obj)
+        if messages:
+            errors.setdefault(i, []).extend(messages)
+
+
+_COMPARISONS = {
+    "exact": operator.eq,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+}
+
+
+class _UnsupportedCondition(Exception):
+    pass
+
+
+def check_constraint_errors(obj):
+    """
+    Return the violation messages of ``obj``'s ``CheckConstraint``s.
+
+    ``Model.validate_constraints()`` runs a query per constraint, which is too
+    slow for rows validated in bulk. The comparisons, ``isnull`` lookups and
+    ``F()`` references the models use are evaluated in Python instead, with
+    SQL's rule that a condition coming out NULL passes; any other condition
+    falls back to the constraint's own query.
+    """
+    messages = []
+    for constraint in obj._meta.constraints:
+        if not isinstance(constraint, models.CheckConstraint):
+            continue
+        try:
+            passed = _evaluate(constraint.condition, obj) is not False
+        except _UnsupportedCondition:
+            try:
+                constraint.validate(type(obj), obj)
+            except ValidationError as error:
+                messages.extend(error.messages)
+            continue
+        if not passed:
+            messages.append(constraint.get_violation_error_message())
+    return messages
+
+
+def _evaluate(condition, obj):
+    """Evaluate ``condition`` for ``obj`` as ``True``, ``False`` or ``None``."""
+    if isinstance(condition, Q):
+        results = [_evaluate(child, obj) for child in condition.children]
+        if condition.connector == Q.AND:
+            value = False if False in results else None if None in results else True
+        elif condition.connector == Q.OR:
+            value = True if True in results else None if None in results else False
+        else:
+            raise _UnsupportedCondition
+        return value if value is None or not condition.negated else not value
+    if not isinstance(condition, tuple):
+        raise _UnsupportedCondition
+    name, other = condition
+    name, _, lookup = name.partition("__")
+    lookup = lookup or "exact"
+    current = _attribute(obj, name)
+    if lookup == "isnull":
+        return (current is None) == bool(other)
+    if lookup == "exact" and other is None:
+        return current is None
+    if isinstance(other, F):
+        other = _attribute(obj, other.name)
+    elif hasattr(other, "resolve_expression") or lookup not in _COMPARISONS:
+        raise _UnsupportedCondition
+    if current is None or other is None:
+        return None
+    return _COMPARISONS[lookup](current, other)
+
+
+def _attribute(obj, name):
+    try:
+        return getattr(obj, obj._meta.get_field(name).attname)
+    except (FieldDoesNotExist, AttributeError):
+        raise _UnsupportedCondition from None
+
+
+class TaskQuerySet(models.QuerySet):
+    def _supports_recursive_cte(self):
+        return connections[self.db].vendor in RECURSIVE_CTE_VENDORS
+
+    def ancestors(self, task_id):
+        """
+        Return the ancestors of ``task_id`` as a list of tasks ordered from the
+        immediate parent up to the root, loaded with a single recursive query.
+        """
+        chain, _ = self.parent_chain(task_id, select_tasks=True)
+        return chain[1:]
+
+    def parent_chain(self, task_id, select_tasks=False):
+        """
+        Walk parent links upward from ``task_id`` (inclusive) and return a
+        ``(chain, has_cycle)`` tuple. ``chain`` holds ``(id, parent_id)`` pairs, or
+        task instances when ``select_tasks`` is set, and stops before the first
+        repeated node if the stored hierarchy already contains a cycle.
+        """
+        if self._supports_recursive_cte():
+            rows = self._parent_chain_rows(task_id, select_tasks)
+        else:
+            rows = self._parent_chain_rows_by_level(task_id, select_tasks)
+        by_id = {(row.id if select_tasks else row[0]): row for row in rows}
+
+        chain, seen, node_id = [], set(), task_id
+        while node_id is not None and node_id in by_id:
+            if node_id in seen:
+                return chain, True
+            seen.add(node_id)
+            row = by_id[node_id]
+            chain.append(row)
+            node_id = row.parent_id if select_tasks else row[1]
+        return chain, False
+
+    def _parent_chain_rows(self, task_id, select_tasks):
+        connection = connections[self.db]
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        parent_column = self.model._meta.get_field("parent").column
+        # As with prerequisite_edges, UNION keeps a corrupted cyclic hierarchy
+        # from recursing forever.
+        cte = f"""
+            WITH RECURSIVE chain(id, parent_id) AS (
+                SELECT id, {parent_column} FROM {table} WHERE id = %s
+                UNION
+                SELECT task.id, task.{parent_column}
+                FROM {table} task
+                JOIN chain ON task.id = chain.parent_id
+            )
+        """
+        if select_tasks:
+            sql = cte + f"SELECT task.* FROM {table} task JOIN chain USING (id)"
+            return list(self.raw(sql, [task_id]))
+        with connection.cursor() as cursor:
+            cursor.execute(cte + "SELECT id, parent_id FROM chain", [task_id])
+            return [tuple(row) for row in cursor.fetchall()]
+
+    def _parent_chain_rows_by_level(self, task_id, select_tasks):
+        rows, seen, node_id = [], set(), task_id
+        while node_id is not None and node_id not in seen:
+            seen.add(node_id)
+            row = self.filter(pk=node_id).values_list("id", "parent_id").first()
+            if row is None:
+                break
+            rows.append(row)
+            node_id = row[1]
+        if select_tasks:
+            return list(self.in_bulk([row[0] for row in rows]).values())
+        return rows
+
+    def subtree(self, task):
+        """Return ``task`` and all of its descendants using the materialized path."""
+        return self.filter(path__startswith=task.path)
+
+    def descendants(self, task):
+        """Return all descendants of ``task`` using the materialized path."""
+        return self.subtree(task).exclude(pk=task.pk)
+
+    def rebuild_paths(self):
+        """
+        Recompute the materialized path of every task in the queryset from its
+        parent links and write back the ones that drifted. Parents outside the
+        queryset are loaded as needed. Returns the number of tasks updated.
+        """
+        rows = {
+            task_id: (parent_id, path)
+            for task_id, parent_id, path in self.values_list("id", "parent_id", "path")
+        }
+        missing = {parent_id for parent_id, _ in rows.values()} - rows.keys()
+        missing.discard(None)
+        known_paths = dict(
+            self.model._base_manager.using(self.db)
+            .filter(pk__in=missing)
+            .values_list("id", "path")
+        )
+
+        def compute(task_id):
+            chain, seen = [], set()
+            while task_id in rows and task_id not in known_paths:
+                if task_id in seen:
+                    return  # Stored cycle; leave these paths untouched.
+                chain.append(task_id)
+                seen.add(task_id)
+                task_id = rows[task_id][0]
+            path = known_paths.get(task_id, "") if task_id is not None else ""
+            for node_id in reversed(chain):
+                path = f"{path}{node_id}/"
+                known_paths[node_id] = path
+
+        for task_id in rows:
+            compute(task_id)
+        stale = [
+            self.model(id=task_id, path=known_paths[task_id])
+            for task_id, (_, path) in rows.items()
+            if task_id in known_paths and known_paths[task_id] != path
+        ]
+        self.model._base_manager.using(self.db).bulk_update(
+            stale, ["path"], batch_size=1000
+        )
+        return len(stale)
+
+    def projects_changed(self, project_ids):
+        """Shortcut for ``ProjectSnapshot.objects.invalidate`` on this database."""
+        _project_snapshot_model(self.model).objects.db_manager(self.db).invalidate(
+            project_ids
+        )
+
+    def adjust_child_counts(self, deltas):
+        """
+        Apply ``{parent_id: delta}`` changes to ``child_count`` in one UPDATE,
+        clamping at zero so a drifted counter cannot violate the column check.
+        """
+        deltas = {pk: delta for pk, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        self.model._base_manager.using(self.db).filter(pk__in=deltas).update(
+            child_count=Greatest(F("child_count") + _shift(deltas, 0), Value(0))
+        )
+
+    def delete(self):
+        """
+        Delete the tasks (and their subtrees) and decrement the child_count of
+        surviving parents.
+        """
+        rows, projects = {}, set()
+        for task_id, project_id, parent_id, path, *rollup in self.values_list(
+            "id", "project_id", "parent_id", "path", *ROLLUP_FIELDS
+        ):
+            rows[task_id] = (parent_id, path, Rollup(*rollup))
+            projects.add(project_id)
+        deltas, rollups = {}, {}
+        for parent_id, path, total in rows.values():
+            if parent_id is None or parent_id in rows:
+                continue
+            deltas[parent_id] = deltas.get(parent_id, 0) - 1
+            ancestors = path_ids(path)[:-1] or [parent_id]
+            # Subtrees of another deleted task are already in its total.
+            if not any(pk in rows for pk in ancestors):
+                _spread(rollups, ancestors, subtract(ZERO, total))
+        with transaction.atomic(using=self.db):
+            self.projects_changed(projects)
+            result = super().delete()
+            manager = self.model.objects.using(self.db)
+            manager.adjust_child_counts(deltas)
+            manager.adjust_rollups(rollups)
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+    def rebuild_child_counts(self):
+        """
+        Recount the direct children of every task in the queryset and write back
+        the counters that drifted. Returns the number of tasks updated.
+        """
+        actual = dict(
+            self.model._base_manager.using(self.db)
+            .filter(parent__in=self.values("pk"))
+            .values("parent_id")
+            .annotate(total=Count("pk"))
+            .values_list("parent_id", "total")
+        )
+        stale = [
+            self.model(id=task_id, child_count=actual.get(task_id, 0))
+            for task_id, stored in self.values_list("id", "child_count")
+            if stored != actual.get(task_id, 0)
+        ]
+        self.model._base_manager.using(self.db).bulk_update(
+            stale, ["child_count"], batch_size=1000
+        )
+        return len(stale)
+
+    def with_logged_duration(self):
+        """Annotate ``logged``: the total duration of each task's own time entries."""
+        return self.order_by().annotate(logged=_logged_duration())
+
+    def adjust_rollups(self, deltas):
+        """
+        Add ``{task_id: Rollup}`` differences to ``dependent_hours``,
+        ``actual_hours`` and ``remaining_hours`` in one UPDATE.
+        """
+        deltas = {pk: delta for pk, delta in deltas.items() if any(delta)}
+        if not deltas:
+            return
+
+        self.model._base_manager.using(self.db).filter(pk__in=deltas).update(
+            **{
+                field: F(field)
+                + _shift(
+                    {pk: delta[i] for pk, delta in deltas.items()},
+                    0.0,
+                    models.FloatField(),
+                )
+                for i, field in enumerate(ROLLUP_FIELDS)
+            }
+        )
+
+    def roll_up_logged_hours(self, hours, rows=None):
+        """
+        Propagate ``{task_id: hours}`` of time already logged (or removed, when
+        negative) against tasks to the tasks and their ancestors, recomputing
+        each task's own remaining hours, and invalidate the cached reads of
+        their projects. Three queries for any number of tasks, or two when the
+        caller already has ``rows`` of ``(task_id, project_id, path,
+        hours_estimate, status, logged hours)`` as they are after the change.
+        """
+        hours = {pk: delta for pk, delta in hours.items() if delta}
+        if not hours:
+            return
+        if rows is None:
+            rows = [
+                (*row, duration_hours(logged))
+                for *row, logged in (
+                    self.model._base_manager.using(self.db)
+                    .filter(pk__in=hours)
+                    .order_by()
+                    .annotate(logged=_logged_duration())
+                    .values_list(
+                        "id", "project_id", "path", "hours_estimate", "status", "logged"
+                    )
+                )
+            ]
+        completed = self.model.TaskStatus.COMPLETED
+        deltas, projects = {}, set()
+        for task_id, project_id, path, estimate, status, logged in rows:
+            projects.add(project_id)
+            done = status == completed
+            change = subtract(
+                own_rollup(estimate, logged, done),
+                own_rollup(estimate, logged - hours[task_id], done),
+            )
+            _spread(deltas, path_ids(path) or [task_id], change)
+        self.adjust_rollups(deltas)
+        self.projects_changed(projects)
+
+    def rebuild_rollups(self):
+        """
+        Recompute the rolled-up hours of every task in the queryset with one
+        aggregated query and a ``TaskGraph`` subtree sum, and write back the
+        rows that drifted. The queryset should hold whole trees, e.g. whole
+        projects. Returns the number of tasks updated.
+        """
+        completed = self.model.TaskStatus.COMPLETED
+        ids, parent_ids, projects, own, stored = [], [], [], [], []
+        rows = (
+            self.with_logged_duration()
+            .values_list(
+                "id",
+                "project_id",
+                "parent_id",
+                "hours_estimate",
+                "status",
+                "logged",
+                *ROLLUP_FIELDS,
+            )
+        )
+        for task_id, project_id, parent_id, estimate, status, logged, *rollup in rows:
+            ids.append(task_id)
+            parent_ids.append(parent_id)
+            projects.append(project_id)
+            own.append(
+                own_rollup(estimate, duration_hours(logged), status == completed)
+            )
+            stored.append(rollup)
+        graph = TaskGraph(
+            ids,
+            parent_ids,
+            project_id=np.array(projects, dtype=np.int64),
+            own=np.array(own, dtype=np.float64).reshape(-1, len(ROLLUP_FIELDS)),
+            stored=np.array(stored, dtype=np.float64).reshape(-1, len(ROLLUP_FIELDS)),
+        )
+        totals = graph.subtree_sums(graph.own)
+        drifted = np.flatnonzero((np.abs(totals - graph.stored) > 1e-6).any(axis=1))
+        stale = [
+            self.model(id=task_id, **dict(zip(ROLLUP_FIELDS, total)))
+            for task_id, total in zip(
+                graph.ids[drifted].tolist(), totals[drifted].tolist()
+            )
+        ]
+        self.model._base_manager.using(self.db).bulk_update(
+            stale, ROLLUP_FIELDS, batch_size=1000
+        )
+        self.projects_changed(set(graph.project_id[drifted].tolist()))
+        return len(stale)
+
+    def prerequisite_edges(self, task_ids):
+        """
+        Return every ``(task_id, prerequisite_id)`` edge reachable from ``task_ids``
+        by following prerequisites, including the edges leaving the start tasks.
+        """
+        task_ids = list(task_ids)
+        if not task_ids:
+            return []
+        through = self.model.prerequisites.through
+        from_column = through._meta.get_field("from_task").column
+        to_column = through._meta.get_field("to_task").column
+
+        if not self._supports_recursive_cte():
+            return self._prerequisite_edges_by_level(through, task_ids)
+
+        table = connections[self.db].ops.quote_name(through._meta.db_table)
+        placeholders = ", ".join(["%s"] * len(task_ids))
+        # UNION (not UNION ALL) discards edges that were already visited, so the
+        # recursion terminates even when the stored graph already has a cycle.
+        sql = f"""
+            WITH RECURSIVE reachable(from_id, to_id) AS (
+                SELECT {from_column}, {to_column} FROM {table}
+                WHERE {from_column} IN ({placeholders})
+                UNION
+                SELECT edge.{from_column}, edge.{to_column}
+                FROM {table} edge
+                JOIN reachable ON edge.{from_column} = reachable.to_id
+            )
+            SELECT from_id, to_id FROM reachable
+        """
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(sql, task_ids)
+            return [tuple(row) for row in cursor.fetchall()]
+
+    def _prerequisite_edges_by_level(self, through, task_ids):
+        edges, seen, frontier = [], set(), set(task_ids)
+        while frontier:
+            seen |= frontier
+            level = list(
+                through.objects.using(self.db)
+                .filter(from_task_id__in=frontier)
+                .values_list("from_task_id", "to_task_id")
+            )
+            edges.extend(level)
+            frontier = {to_id for _, to_id in level} - seen
+        return edges
+
+
+class TaskManager(models.Manager.from_queryset(TaskQuerySet)):
+    def bulk_create_validated(self, tasks, prerequisites=(), batch_size=1000):
+        """
+        Validate and insert a batch of new tasks with a handful of set-based
+        queries instead of a full_clean() per row.
+
+        Tasks may use other tasks in the batch (or existing tasks) as their
+        parent. ``prerequisites`` is an iterable of ``(task, prerequisite)`` pairs
+        where each side is either a task from the batch or an existing task.
+
+        Returns a ``BulkCreateResult`` with the inserted tasks and a
+        ``{row_index: ValidationError}`` dict for rejected rows. Rows that depend
+        on a rejected row, through their parent or a prerequisite pair, are
+        rejected as well.
+        """
+        tasks = list(tasks)
+        position = {id(task): i for i, task in enumerate(tasks)}
+        errors = {}
+
+        def reject(i, message):
+            errors.setdefault(i, []).append(message)
+
+        _clean_fields(tasks, ["project", "parent", "assigned_to"], errors)
+
+        # Resolve parents: either another row in the batch or an existing task.
+        parent_field = self.model._meta.get_field("parent")
+        batch_parent, db_parent = {}, {}
+        for i, task in enumerate(tasks):
+            if parent_field.is_cached(task) and task.parent is not None:
+                if task.parent.pk is None:
+                    if id(task.parent) not in position:
+                        reject(i, "Parent task is neither saved nor part of the batch.")
+                    else:
+                        batch_parent[i] = position[id(task.parent)]
+                    continue
+            if task.parent_id is not None:
+                db_parent[i] = task.parent_id
+
+        parents = {
+            row[0]: row
+            for row in self.model._base_manager.using(self.db)
+            .filter(pk__in=set(db_parent.values()))
+            .values_list("id", "hours_estimate", "path")
+        }
+        projects = _existing_ids(
+            self.model._meta.get_field("project").related_model,
+            [task.project_id for task in tasks],
+            self.db,
+        )
+        users = _existing_ids(
+            self.model._meta.get_field("assigned_to").related_model,
+            [task.assigned_to_id for task in tasks],
+            self.db,
+        )
+        for i, task in enumerate(tasks):
+            if task.project_id not in projects:
+                reject(i, "Project does not exist.")
+            if task.assigned_to_id is not None and task.assigned_to_id not in users:
+                reject(i, "Assigned user does not exist.")
+            if i in db_parent:
+                parent = parents.get(db_parent[i])
+                if parent is None:
+                    reject(i, "Parent task does not exist.")
+                elif parent[1] > 0:
+                    reject(
+                        i,
+                        "Parent tasks cannot have hour estimates. "
+                        "Estimates should be on leaf tasks only.",
+                    )
+        for i in set(batch_parent.values()):
+            if tasks[i].hours_estimate > 0:
+                reject(
+                    i,
+                    "Parent tasks cannot have hour estimates. "
+                    "Estimates should be on leaf tasks only.",
+                )
+        for component in strongly_connected_components(batch_parent.items()):
+            member = next(iter(component))
+            if len(component) > 1 or batch_parent.get(member) == member:
+                for i in component:
+                    reject(i, f"Parent/child cycle found at batch row {i}")
+
+        pairs = self._resolve_prerequisite_pairs(prerequisites, position, errors)
+
+        # Rejections cascade to rows that depend on a rejected row.
+        changed = True
+        while changed:
+            changed = False
+            for child, parent in batch_parent.items():
+                if parent in errors and child not in errors:
+                    reject(child, f"Parent row {parent} was rejected.")
+                    changed = True
+            for pair in pairs:
+                rows = [node[1] for node in pair if isinstance(node, tuple)]
+                for i in rows:
+                    if i not in errors and any(row in errors for row in rows):
+                        reject(i, "A prerequisite pair involves a rejected row.")
+                        changed = True
+
+        valid = [i for i in range(len(tasks)) if i not in errors]
+        with transaction.atomic(using=self.db):
+            self._insert_validated_tasks(
+                tasks, valid, batch_parent, db_parent, parents, batch_size
+            )
+            through = self.model.prerequisites.through
+            through.objects.using(self.db).bulk_create(
+                [
+                    through(
+                        from_task_id=self._pair_node_pk(tasks, pair[0]),
+                        to_task_id=self._pair_node_pk(tasks, pair[1]),
+                    )
+                    for pair in pairs
+                    if not any(
+                        isinstance(node, tuple) and node[1] in errors for node in pair
+                    )
+                ],
+                batch_size=batch_size,
+            )
+
+        return BulkCreateResult(
+            created=[tasks[i] for i in valid],
+            errors={i: ValidationError(messages) for i, messages in errors.items()},
+        )
+
+    def _resolve_prerequisite_pairs(self, prerequisites, position, errors):
+        """
+        Map ``(task, prerequisite)`` pairs onto graph nodes, where batch rows are
+        ``("row", index)`` and existing tasks are their id, and reject rows whose
+        pairs would close a prerequisite cycle with the stored graph.
+        """
+        pairs = []
+        for task, prerequisite in prerequisites:
+            pair = tuple(
+                ("row", position[id(obj)]) if obj.pk is None and id(obj) in position
+                else obj.pk
+                for obj in (task, prerequisite)
+            )
+            if None in pair:
+                raise ValueError(
+                    "Prerequisite pairs must use saved tasks or tasks in the batch."
+                )
+            pairs.append(pair)
+        if not pairs:
+            return pairs
+
+        existing = _existing_ids(
+            self.model,
+            [node for pair in pairs for node in pair if not isinstance(node, tuple)],
+            self.db,
+        )
+        components = strongly_connected_components(
+            self.prerequisite_edges(existing) + pairs
+        )
+        component_of = {}
+        for number, component in enumerate(components):
+            for node in component:
+                component_of[node] = number
+
+        for task_node, prerequisite_node in pairs:
+            rows = [
+                node[1] for node in (task_node, prerequisite_node)
+                if isinstance(node, tuple)
+            ]
+            if any(
+                not isinstance(node, tuple) and node not in existing
+                for node in (task_node, prerequisite_node)
+            ):
+                message = "Prerequisite task does not exist."
+            elif (
+                task_node == prerequisite_node
+                or component_of[task_node] == component_of[prerequisite_node]
+            ):
+                message = "Circular dependency found in prerequisite pairs."
+            else:
+                continue
+            if not rows:
+                raise ValidationError(message)
+            for i in rows:
+                errors.setdefault(i, []).append(message)
+        return pairs
+
+    @staticmethod
+    def _pair_node_pk(tasks, node):
+        return tasks[node[1]].pk if isinstance(node, tuple) else node
+
+    def _insert_validated_tasks(
+        self, tasks, valid, batch_parent, db_parent, parents, batch_size
+    ):
+        """Insert valid rows level by level and fill in path and child_count."""
+        depth = {}
+        for i in valid:
+            chain = []
+            node = i
+            while node not in depth and node in batch_parent:
+                chain.append(node)
+                node = batch_parent[node]
+            level = depth.setdefault(node, 0)
+            for node in reversed(chain):
+                level += 1
+                depth[node] = level
+
+        completed = self.model.TaskStatus.COMPLETED
+        for i in valid:
+            task = tasks[i]
+            task.child_count = 0
+            own = own_rollup(task.hours_estimate, 0.0, task.status == completed)
+            for field, value in zip(ROLLUP_FIELDS, own):
+                setattr(task, field, value)
+        for i in valid:
+            if i in batch_parent:
+                tasks[batch_parent[i]].child_count += 1
+
+        ordered = sorted(valid, key=depth.__getitem__)
+        for level in sorted(set(depth[i] for i in valid)):
+            self.bulk_create(
+                [tasks[i] for i in ordered if depth[i] == level], batch_size=batch_size
+            )
+
+        for i in ordered:
+            task = tasks[i]
+            if i in batch_parent:
+                parent_path = tasks[batch_parent[i]].path
+            elif i in db_parent:
+                parent_path = parents[db_parent[i]][2]
+            else:
+                parent_path = ""
+            task.path = f"{parent_path}{task.pk}/"
+            task._cached_parent_id = task.parent_id
+        self.bulk_update([tasks[i] for i in ordered], ["path"], batch_size=batch_size)
+        self.adjust_child_counts(Counter(db_parent[i] for i in valid if i in db_parent))
+
+        rollups = {}
+        for i in valid:
+            task = tasks[i]
+            _spread(
+                rollups,
+                path_ids(task.path)[:-1],
+                Rollup(*(getattr(task, field) for field in ROLLUP_FIELDS)),
+            )
+        self.adjust_rollups(rollups)
+        self.projects_changed({tasks[i].project_id for i in valid})
+        cache.bump("user", *{tasks[i].assigned_to_id for i in valid})
+
+
+class TimeRange(Func):
+    """``tstzrange(start, end, '[)')``; a NULL end is unbounded."""
+
+    function = "tstzrange"
+    template = "%(function)s(%(expressions)s, '[)')"
+    output_field = models.Field()
+
+
+class EntrySpan(TimeRange):
+    """
+    A time entry's span with running timers open-ended. Must stay identical to
+    the expression of the ``time_entry_span_gist`` index for it to be used.
+    """
+
+    template = "%(function)s(%(expressions)s, 'infinity'::timestamptz), '[)')"
+    arg_joiner = ", COALESCE("
+
+    def __init__(self):
+        super().__init__(F("start_time"), F("end_time"))
+
+
+class RangesOverlap(Func):
+    """``range && range``."""
+
+    arg_joiner = " && "
+    template = "(%(expressions)s)"
+    output_field = models.BooleanField()
+
+
+class TimeEntryQuerySet(models.QuerySet):
+    def overlapping(self, start, end=None):
+        """
+        Entries whose span overlaps ``[start, end)``; an open ``end`` (a running
+        timer) extends to infinity on either side. On PostgreSQL this is a range
+        ``&&`` served by the ``time_entry_span_gist`` index; elsewhere the
+        equivalent pair of comparisons.
+        """
+        if connections[self.db].vendor == "postgresql":
+            return self.filter(
+                RangesOverlap(EntrySpan(), TimeRange(Value(start), Value(end)))
+            )
+        condition = Q(end_time__isnull=True) | Q(end_time__gt=start)
+        if end is not None:
+            condition &= Q(start_time__lt=end)
+        return self.filter(condition, start_time__isnull=False)
+
+    def delete(self):
+        """
+        Delete the entries and roll their hours out of the tasks' totals and
+        the daily totals.
+        """
+        hours, daily = defaultdict(float), {}
+        for span in self.values_list("task_id", "user_id", "start_time", "end_time"):
+            hours[span[0]] -= hours_between(span[2], span[3])
+            spread_by_day(daily, span, -1)
+        task_model = self.model._meta.get_field("task").related_model
+        with transaction.atomic(using=self.db):
+            result = super().delete()
+            task_model.objects.using(self.db).roll_up_logged_hours(hours)
+            _daily_time_model(self.model).objects.db_manager(self.db).add_seconds(daily)
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
+class TimeEntryManager(models.Manager.from_queryset(TimeEntryQuerySet)):
+    def bulk_create_validated(self, entries, batch_size=1000):
+        """
+        Validate and insert a batch of new time entries, checking that every
+        entry is attached to an existing leaf task with one query for the whole
+        batch. Returns a ``BulkCreateResult`` like
+        ``TaskManager.bulk_create_validated``.
+        """
+        entries = list(entries)
+        errors = {}
+        _clean_fields(entries, ["task", "user"], errors)
+
+        task_model = self.model._meta.get_field("task").related_model
+        child_counts = dict(
+            task_model._base_manager.using(self.db)
+            .filter(pk__in={entry.task_id for entry in entries})
+            .values_list("id", "child_count")
+        )
+        users = _existing_ids(
+            self.model._meta.get_field("user").related_model,
+            [entry.user_id for entry in entries],
+            self.db,
+        )
+        for i, entry in enumerate(entries):
+            if entry.task_id not in child_counts:
+                errors.setdefault(i, []).append("Task does not exist.")
+            elif child_counts[entry.task_id] > 0:
+                errors.setdefault(i, []).append(
+                    "Time entries can only be applied to leaf tasks."
+                )
+            if entry.user_id is not None and entry.user_id not in users:
+                errors.setdefault(i, []).append("User does not exist.")
+
+        self._reject_overlaps(entries, errors)
+
+        valid = [entry for i, entry in enumerate(entries) if i not in errors]
+        hours, daily = defaultdict(float), {}
+        for entry in valid:
+            hours[entry.task_id] += hours_between(entry.start_time, entry.end_time)
+            spread_by_day(daily, entry._span())
+        with transaction.atomic(using=self.db):
+            self.bulk_create(valid, batch_size=batch_size)
+            task_model.objects.using(self.db).roll_up_logged_hours(hours)
+            _daily_time_model(self.model).objects.db_manager(self.db).add_seconds(
+                daily, batch_size
+            )
+        for entry in valid:
+            entry._cached_span = entry._span()
+
+        return BulkCreateResult(
+            created=valid,
+            errors={i: ValidationError(messages) for i, messages in errors.items()},
+        )
+
+
+    def _reject_overlaps(self, entries, errors):
+        """
+        Reject entries overlapping another entry of their user, stored or in the
+        batch, reading the stored ones with one query.
+        """
+        spans = [
+            (entry.start_time, entry.end_time, i)
+            for i, entry in enumerate(entries)
+            if i not in errors
+            and entry.user_id is not None
+            and entry.start_time is not None
+        ]
+        if not spans:
+            return
+        ends = [end for _, end, _ in spans]
+        stored = (
+            self.filter(user_id__in={entries[i].user_id for *_, i in spans})
+            .overlapping(
+                min(start for start, _, _ in spans),
+                None if None in ends else max(ends),
+            )
+            .values_list("user_id", "start_time", "end_time")
+        )
+        by_user = defaultdict(list)
+        for user_id, start, end in stored:
+            by_user[user_id].append((start, end, None))
+        for span in spans:
+            by_user[entries[span[2]].user_id].append(span)
+        for user_spans in by_user.values():
+            for i in _overlapping_keys(user_spans) - {None}:
+                errors.setdefault(i, []).append(
+                    "Time entry overlaps another entry of the same user."
+                )
+
+
+def _overlapping_keys(spans):
+    """
+    Return the keys of ``(start, end, key)`` spans that overlap another span,
+    an open ``end`` running forever. After sorting by start, a span overlaps an
+    earlier one when it starts before the furthest earlier end, and a later one
+    when the next span starts before it ends.
+    """
+    spans = sorted(
+        (span for span in spans if span[0] != span[1]), key=lambda span: span[0]
+    )
+    keys, reach, open_ended = set(), None, False
+    for k, (start, end, key) in enumerate(spans):
+        after = spans[k + 1][0] if k + 1 < len(spans) else None
+        if (
+            open_ended
+            or (reach is not None and start < reach)
+            or (after is not None and (end is None or after < end))
+        ):
+            keys.add(key)
+        if end is None:
+            open_ended = True
+        elif reach is None or end > reach:
+            reach = end
+    return keys
+
+
+def _daily_time_model(time_entry_model):
+    return time_entry_model._meta.apps.get_model("task", "DailyTime")
+
+
+def _project_snapshot_model(task_model):
+    return task_model._meta.apps.get_model("task", "ProjectSnapshot")
+
+
+class DailyTimeManager(models.Manager):
+    def detach_users(self, user_ids):
+        """
+        Fold the totals of ``user_ids`` into the rows without a user, as the
+        ``SET_NULL`` of a deleted user would, but without colliding with the
+        rows of entries that never had a user. Three queries.
+        """
+        rows = (
+            self.filter(user_id__in=user_ids)
+            .order_by()
+            .values_list("task_id", "day")
+            .annotate(total=Sum("seconds"))
+        )
+        deltas = {(None, task_id, day): total for task_id, day, total in rows}
+        if not deltas:
+            return
+        self.add_seconds(deltas)
+        self.filter(user_id__in=user_ids).delete()
+
+    def add_seconds(self, deltas, batch_size=1000):
+        """
+        Add ``{(user_id, task_id, day): seconds}`` to the daily totals with one
+        upsert per ``batch_size`` keys, creating missing rows. Totals without a
+        user conflict on their own partial unique index, so they are upserted
+        separately.
+        """
+        deltas = [(*key, seconds) for key, seconds in deltas.items() if seconds]
+        with_user = [delta for delta in deltas if delta[0] is not None]
+        without_user = [delta for delta in deltas if delta[0] is None]
+        self._upsert(with_user, "(user_id, task_id, day)", batch_size)
+        self._upsert(
+            without_user, "(task_id, day) WHERE user_id IS NULL", batch_size
+        )
+
+    def _upsert(self, deltas, conflict, batch_size):
+        connection = connections[self.db]
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        for i in range(0, len(deltas), batch_size):
+            batch = deltas[i : i + batch_size]
+            values = ", ".join(["(%s, %s, %s, %s)"] * len(batch))
+            params = [
+                value
+                for user_id, task_id, day, seconds in batch
+                for value in (
+                    user_id,
+                    task_id,
+                    connection.ops.adapt_datefield_value(day),
+                    seconds,
+                )
+            ]
+            sql = f"""
+                INSERT INTO {table} (user_id, task_id, day, seconds)
+                VALUES {values}
+                ON CONFLICT {conflict}
+                DO UPDATE SET seconds = {table}.seconds + EXCLUDED.seconds
+            """
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+
+    def rebuild(self, tasks=None, batch_size=5000):
+        """
+        Recompute the daily totals of ``tasks`` (a Task queryset; default: all)
+        from their time entries. Returns ``(rows written, entries read)``.
+        """
+        time_entry_model = self.model._meta.apps.get_model("task", "TimeEntry")
+        entries = time_entry_model.objects.using(self.db).order_by()
+        rows = self.using(self.db).all()
+        if tasks is not None:
+            entries = entries.filter(task__in=tasks.values("pk"))
+            rows = rows.filter(task__in=tasks.values("pk"))
+        daily, count = {}, 0
+        for span in entries.values_list(
+            "task_id", "user_id", "start_time", "end_time"
+        ).iterator(batch_size):
+            spread_by_day(daily, span)
+            count += 1
+        with transaction.atomic(using=self.db):
+            rows.delete()
+            self.using(self.db).bulk_create(
+                (
+                    self.model(user_id=user_id, task_id=task_id, day=day, seconds=s)
+                    for (user_id, task_id, day), s in daily.items()
+                    if s
+                ),
+                batch_size=batch_size,
+            )
+        return sum(1 for s in daily.values() if s), count
+
+
+class ProjectSnapshotManager(models.Manager):
+    def invalidate(self, project_ids):
+        """
+        Drop everything cached about ``project_ids`` after their tasks or time
+        entries changed: the snapshots, with one statement under the projects'
+        lock, and the ``project`` scopes of the read cache.
+        """
+        project_ids = {pk for pk in project_ids if pk is not None}
+        if not project_ids:
+            return
+        with transaction.atomic(using=self.db, savepoint=False):
+            self.lock_projects(project_ids)
+            self.filter(project__in=project_ids).delete()
+        cache.bump("project", *project_ids)
+
+    def lock_projects(self, project_ids):
+        """
+        Lock the ``Project`` rows of ``project_ids`` until the transaction ends,
+        in id order so that lockers cannot deadlock. Snapshots are computed and
+        invalidated under this lock, or a refresh that read the tasks before a
+        writer committed could store its snapshot after the writer dropped it.
+        Backends without row locks serialize writers anyway and skip the query.
+        """
+        if not connections[self.db].features.has_select_for_update:
+            return
+        project_model = self.model._meta.get_field("project").related_model
+        list(
+            project_model._base_manager.using(self.db)
+            .select_for_update()
+            .filter(pk__in=project_ids)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
@@ -0,0 +1,27 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+from .managers import ProjectSnapshotManager
+
+
+class ProjectSnapshot(models.Model):
+    """
+    A project's status report figures (rollups, schedule dates, risk and
+    completion) computed by ``task.status_reports``. Any write to the
+    project's tasks or time entries deletes the snapshot; it is recomputed the
+    next time a report needs it.
+    """
+
+    project = models.OneToOneField(
+        to="project.Project",
+        related_name="snapshot",
+        on_delete=models.CASCADE,
+        primary_key=True,
+    )
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    objects = ProjectSnapshotManager()
+
+    def __str__(self):
+        return f"Snapshot of project {self.project_id} at {self.computed_at}"
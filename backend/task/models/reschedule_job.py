@@ -0,0 +1,38 @@
+from django.db import models
+from django.db.models import Q
+
+
+class RescheduleJob(models.Model):
+    """
+    A pending or running request to reschedule one project, consumed by
+    ``manage.py run_scheduler_worker`` through ``task.queue.DatabaseQueue``.
+    """
+    project = models.ForeignKey(
+        to="project.Project",
+        related_name="reschedule_jobs",
+        on_delete=models.CASCADE,
+    )
+    enqueued_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(blank=True, null=True, default=None)
+    # Comma-separated ids of the edited tasks, so the worker can reschedule
+    # incrementally, or "*" to reschedule the whole project. Text rather than
+    # an array so pending jobs merge with a plain ``||`` on every backend.
+    task_ids = models.TextField(blank=True, default="*")
+
+    class Meta:
+        constraints = [
+            # At most one pending job per project, so repeated edits coalesce
+            # while a running job may coexist with the next pending one.
+            models.UniqueConstraint(
+                fields=["project"],
+                condition=Q(claimed_at__isnull=True),
+                name="reschedule_job_one_pending_per_project",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["claimed_at", "enqueued_at"]),
+        ]
+
+    def __str__(self):
+        state = "claimed" if self.claimed_at else "pending"
+        return f"Reschedule project {self.project_id} ({state})"
@@ -1,8 +1,24 @@
+from common import cache
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
+from django.db.models import DEFERRED, F, Q
+from django.db.models.functions import Concat, Substr
 from django.utils.translation import gettext_lazy as _
 
+from task.graph import find_cycle
+from task.rollups import (
+    ZERO,
+    Rollup,
+    add,
+    duration_hours,
+    own_rollup,
+    subtract,
+)
+
+from .managers import ROLLUP_FIELDS, TaskManager, path_ids
+from .project_snapshot import ProjectSnapshot
+
 
 class Task(models.Model):
     class TaskStatus(models.TextChoices):
@@ -39,7 +55,46 @@ class Task(models.Model):
     hours_estimate = models.FloatField(
         default=0, help_text="Estimated hours to complete"
     )
-    dependent_hours = models.FloatField(default=0)
+    hours_optimistic = models.FloatField(
+        null=True,
+        blank=True,
+        default=None,
+        help_text=(
+            "Fewest hours the task could take, for schedule risk simulation. "
+            "Defaults to a fixed share of the estimate."
+        ),
+    )
+    hours_pessimistic = models.FloatField(
+        null=True,
+        blank=True,
+        default=None,
+        help_text=(
+            "Most hours the task could take, for schedule risk simulation. "
+            "Defaults to a fixed multiple of the estimate."
+        ),
+    )
+    dependent_hours = models.FloatField(
+        default=0,
+        editable=False,
+        help_text=(
+            "Estimated hours of this task and its subtree. Maintained on save."
+        ),
+    )
+    actual_hours = models.FloatField(
+        default=0,
+        editable=False,
+        help_text=(
+            "Hours logged against this task and its subtree. Maintained on save."
+        ),
+    )
+    remaining_hours = models.FloatField(
+        default=0,
+        editable=False,
+        help_text=(
+            "Estimated hours left on this task and its subtree; completed tasks "
+            "count as zero. Maintained on save."
+        ),
+    )
     buffer_before = models.PositiveSmallIntegerField(
         default=0,
         help_text="Buffer days between scheduled prerequisites and start of task",
@@ -70,18 +125,281 @@ class Task(models.Model):
         default=True,
         help_text="Whether scheduler should automatically assign this task"
     )
+    child_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of direct children. Maintained on save and delete.",
+    )
+    path = models.CharField(
+        max_length=2048,
+        blank=True,
+        editable=False,
+        help_text=(
+            "Materialized path of ancestor ids ending with this task's id, e.g. "
+            "'1/5/9/'. Maintained on save."
+        ),
+    )
+
+    objects = TaskManager()
+
+    # Changing any of these on a saved task queues it for rescheduling.
+    SCHEDULE_INPUT_FIELDS = (
+        "hours_estimate",
+        "buffer_before",
+        "buffer_after",
+        "status",
+        "parent_id",
+        "due_date",
+        "auto_schedule",
+    )
+
+    # Kept in step by UPDATEs when related rows change; a plain save() of a
+    # stale instance must not write them back.
+    MAINTAINED_FIELDS = ("child_count", "path", *ROLLUP_FIELDS)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["path"], name="task_path_idx", opclasses=["varchar_pattern_ops"]
+            ),
+            # Open work per project: scheduler passes and project dashboards.
+            models.Index(
+                fields=["project", "status"],
+                name="task_open_project_idx",
+                condition=~Q(status="COMPLETED"),
+            ),
+            # Auto-assignable open leaves, read by every assignment run.
+            models.Index(
+                fields=["project"],
+                name="task_open_auto_leaf_idx",
+                condition=Q(auto_assign=True, child_count=0) & ~Q(status="COMPLETED"),
+            ),
+            # A user's tasks in schedule order.
+            models.Index(
+                fields=["assigned_to", "schedule_datetime"],
+                name="task_assignee_schedule_idx",
+            ),
+            # Overdue and upcoming open tasks by due date.
+            models.Index(
+                fields=["due_date"],
+                name="task_open_due_date_idx",
+                condition=Q(due_date__isnull=False) & ~Q(status="COMPLETED"),
+            ),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=Q(hours_estimate__gte=0),
+                name="task_hours_estimate_non_negative",
+            ),
+            models.CheckConstraint(
+                condition=Q(hours_optimistic__isnull=True)
+                | Q(hours_optimistic__gte=0, hours_optimistic__lte=F("hours_estimate")),
+                name="task_hours_optimistic_within_estimate",
+                violation_error_message=(
+                    "Optimistic hours must be between 0 and the estimate."
+                ),
+            ),
+            models.CheckConstraint(
+                condition=Q(hours_pessimistic__isnull=True)
+                | Q(hours_pessimistic__gte=F("hours_estimate")),
+                name="task_hours_pessimistic_within_estimate",
+                violation_error_message=(
+                    "Pessimistic hours must be at least the estimate."
+                ),
+            ),
+        ]
+
+    def __str__(self):
+        return self.name or f"Task {self.pk}"
 
     def __init__(self, *args, **kwargs):
         self._skip_validation = kwargs.pop('skip_validation', False)
         super().__init__(*args, **kwargs)
-        self._cached_parent_id = self.parent_id
+        # Read __dict__ so a deferred parent_id is not loaded for every instance;
+        # _original_parent_id() fetches it only if it is ever needed.
+        self._cached_parent_id = self.__dict__.get("parent_id", DEFERRED)
+        self._cached_project_id = self.__dict__.get("project_id", DEFERRED)
+        self._cached_assigned_to_id = self.__dict__.get("assigned_to_id", DEFERRED)
+        self._cached_schedule_inputs = self._schedule_inputs()
 
     def save(self, *args, **kwargs):
         """Save with validation unless explicitly skipped."""
         if not kwargs.pop('skip_validation', False) and not self._skip_validation:
             self.full_clean()
-        super().save(*args, **kwargs)
+        adding = self._state.adding
+        parent_updated = self._parent_updated()
+        path_stale = not self.path or parent_updated
+        rollup_stale = adding or parent_updated or self._rollup_inputs_updated()
+        # A task moved to another project leaves the old project's snapshot stale.
+        previous_project_id = None if adding else self._original_project_id()
+        if not adding and kwargs.get("update_fields") is None:
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.MAINTAINED_FIELDS
+                and field.attname not in deferred
+            ]
+        with transaction.atomic(using=kwargs.get("using")):
+            if adding:
+                stored = None
+                self._set_own_rollup()
+            elif rollup_stale:
+                stored = self._stored_rollup()
+            super().save(*args, **kwargs)
+            if adding or parent_updated:
+                self._update_parent_child_counts(
+                    None if adding else self._original_parent_id()
+                )
+            if path_stale:
+                self._update_path()
+            ProjectSnapshot.objects.invalidate(
+                {self.project_id, previous_project_id} - {DEFERRED}
+            )
+            if (
+                self.assigned_to_id != self._cached_assigned_to_id
+                or self._status_updated()
+            ):
+                # The assignee's open tasks may now span another project.
+                cache.bump("user", self.assigned_to_id)
+            if rollup_stale:
+                self._update_rollups(stored)
         self._cached_parent_id = self.parent_id
+        self._cached_project_id = self.project_id
+        self._cached_assigned_to_id = self.assigned_to_id
+        self._cached_schedule_inputs = self._schedule_inputs()
+
+    def delete(self, *args, **kwargs):
+        """Delete the task and its subtree, keeping the parent's child_count."""
+        parent_id = self.parent_id
+        with transaction.atomic(using=kwargs.get("using")):
+            path, *total = (
+                Task.objects.filter(pk=self.pk)
+                .values_list("path", *ROLLUP_FIELDS)
+                .first()
+            ) or (self.path, *ZERO)
+            result = super().delete(*args, **kwargs)
+            ProjectSnapshot.objects.invalidate([self.project_id])
+            if parent_id is not None:
+                Task.objects.adjust_child_counts({parent_id: -1})
+                Task.objects.adjust_rollups(
+                    {
+                        pk: subtract(ZERO, Rollup(*total))
+                        for pk in path_ids(path)[:-1] or [parent_id]
+                    }
+                )
+        return result
+
+    # ===============================================================================
+    # HIERARCHY
+    # ===============================================================================
+    def _update_parent_child_counts(self, old_parent_id):
+        """Move one unit of child_count from ``old_parent_id`` to the new parent."""
+        deltas = {}
+        if old_parent_id is not None:
+            deltas[old_parent_id] = -1
+        if self.parent_id is not None:
+            deltas[self.parent_id] = deltas.get(self.parent_id, 0) + 1
+        Task.objects.adjust_child_counts(deltas)
+        # Keep a cached parent instance in step so its leaf checks stay accurate.
+        if self.parent_id is not None and Task.parent.is_cached(self):
+            self.parent.child_count += 1
+
+    def _update_path(self):
+        """Recompute this task's path and rewrite the paths of its descendants."""
+        old_path = self.path
+        parent_path = ""
+        if self.parent_id is not None:
+            parent_path = (
+                Task.objects.filter(pk=self.parent_id)
+                .values_list("path", flat=True)
+                .first()
+            ) or ""
+        self.path = f"{parent_path}{self.pk}/"
+        Task.objects.filter(pk=self.pk).update(path=self.path)
+
+        # A new path inside the old subtree means the task was moved below one of
+        # its own descendants (only possible with skip_validation); leave the
+        # subtree alone rather than rewriting it recursively.
+        if old_path and old_path != self.path and not self.path.startswith(old_path):
+            Task.objects.filter(path__startswith=old_path).exclude(pk=self.pk).update(
+                path=Concat(
+                    models.Value(self.path),
+                    Substr("path", len(old_path) + 1),
+                    output_field=models.CharField(),
+                )
+            )
+
+    # ===============================================================================
+    # ROLLUPS
+    # ===============================================================================
+    def _rollup_inputs_updated(self):
+        return any(
+            name in self._cached_schedule_inputs
+            and self.__dict__.get(name) != self._cached_schedule_inputs[name]
+            for name in ("hours_estimate", "status")
+        )
+
+    def _own_rollup(self, logged_hours, inputs=None):
+        inputs = self.__dict__ if inputs is None else inputs
+        return own_rollup(
+            inputs.get("hours_estimate", self.hours_estimate),
+            logged_hours,
+            inputs.get("status", self.status) == Task.TaskStatus.COMPLETED,
+        )
+
+    def _set_own_rollup(self):
+        for field, value in zip(ROLLUP_FIELDS, self._own_rollup(0.0)):
+            setattr(self, field, value)
+
+    def _stored_rollup(self):
+        """
+        Return ``(path, subtree total, own logged hours)`` as currently stored,
+        in one query.
+        """
+        row = (
+            Task.objects.filter(pk=self.pk)
+            .with_logged_duration()
+            .values_list("path", *ROLLUP_FIELDS, "logged")
+            .first()
+        )
+        if row is None:
+            return self.path, ZERO, 0.0
+        path, *total, logged = row
+        return path, Rollup(*total), duration_hours(logged)
+
+    def _update_rollups(self, stored):
+        """
+        Add this task's change to the rolled-up hours of the task and its
+        ancestors, moving its subtree total from the old ancestors to the new
+        ones when it was reparented.
+        """
+        if stored is None:
+            own = Rollup(*(getattr(self, field) for field in ROLLUP_FIELDS))
+            Task.objects.adjust_rollups({pk: own for pk in path_ids(self.path)[:-1]})
+            return
+
+        old_path, old_total, logged = stored
+        change = subtract(
+            self._own_rollup(logged),
+            self._own_rollup(logged, self._cached_schedule_inputs),
+        )
+        new_total = add(old_total, change)
+        deltas = {self.pk: change}
+        new_ancestors = path_ids(self.path)[:-1]
+        old_ancestors = path_ids(old_path)[:-1] if old_path else []
+        if old_ancestors != new_ancestors:
+            for pk in old_ancestors:
+                deltas[pk] = subtract(deltas.get(pk, ZERO), old_total)
+            for pk in new_ancestors:
+                deltas[pk] = add(deltas.get(pk, ZERO), new_total)
+        else:
+            for pk in new_ancestors:
+                deltas[pk] = change
+        Task.objects.adjust_rollups(deltas)
+        for field, value in zip(ROLLUP_FIELDS, new_total):
+            setattr(self, field, value)
 
     # ===============================================================================
     # VALIDATION
@@ -94,7 +412,51 @@ class Task(models.Model):
             self._validate_no_parent_cycles()
 
     def _parent_updated(self):
-        return self._cached_parent_id != self.parent_id
+        if "parent_id" not in self.__dict__:
+            return False
+        return self._original_parent_id() != self.parent_id
+
+    def _original_parent_id(self):
+        """Return ``parent_id`` as last loaded or saved."""
+        if self._cached_parent_id is DEFERRED:
+            self._cached_parent_id = (
+                Task.objects.filter(pk=self.pk)
+                .values_list("parent_id", flat=True)
+                .first()
+            )
+        return self._cached_parent_id
+
+    def _original_project_id(self):
+        """
+        Return ``project_id`` as last loaded or saved, fetching it only when it
+        was deferred and has since been assigned.
+        """
+        if self._cached_project_id is DEFERRED and "project_id" in self.__dict__:
+            self._cached_project_id = (
+                Task.objects.filter(pk=self.pk)
+                .values_list("project_id", flat=True)
+                .first()
+            )
+        return self._cached_project_id
+
+    def _schedule_inputs(self):
+        # Read __dict__ directly so deferred fields are not loaded one by one.
+        return {
+            name: self.__dict__[name]
+            for name in self.SCHEDULE_INPUT_FIELDS
+            if name in self.__dict__
+        }
+
+    def _status_updated(self):
+        if "status" not in self.__dict__:
+            return False
+        return self._cached_schedule_inputs.get("status", DEFERRED) != self.status
+
+    def _schedule_inputs_updated(self):
+        return any(
+            self.__dict__.get(name) != value
+            for name, value in self._cached_schedule_inputs.items()
+        )
 
     def _validate_hours_estimate_only_on_leaf_tasks(self):
         if self.hours_estimate > 0 and self.is_parent:
@@ -103,31 +465,39 @@ class Task(models.Model):
                 "Estimates should be on leaf tasks only."
             )
 
-    def _validate_no_parent_cycles(self, nodes_in_path=None):
-        if nodes_in_path is None:
-            nodes_in_path = []
+    def _validate_no_parent_cycles(self):
         if self.parent_id is None:
             return
-        if self.parent_id in nodes_in_path:
+        if self.parent_id == self.id:
+            raise ValidationError(f"Parent/child cycle found at task node {self.id}")
+        chain, has_cycle = Task.objects.parent_chain(self.parent_id)
+        if has_cycle or self.id in {task_id for task_id, _ in chain}:
             raise ValidationError(f"Parent/child cycle found at task node {self.id}")
-        if self.id:
-            nodes_in_path.append(self.id)
-        self.parent._validate_no_parent_cycles(nodes_in_path=nodes_in_path)
 
-    def _validate_no_prerequisite_cycles(self, nodes_in_path=None):
+    def _validate_no_prerequisite_cycles(self):
         if self.id is None:
             return
-        if nodes_in_path is None:
-            nodes_in_path = []
-        if not self.prerequisites.exists():
-            return
-        for prerequisite in self.prerequisites.all():
-            if prerequisite.id in nodes_in_path: 
-                raise ValidationError(
-                    f"Circular dependency found at task node {self.id}"
-                )
-            nodes_in_path.append(self.id)
-            prerequisite._validate_no_prerequisite_cycles(nodes_in_path=nodes_in_path)
+        edges = Task.objects.prerequisite_edges([self.id])
+        cycle = find_cycle(edges, [self.id])
+        if cycle:
+            raise ValidationError(
+                f"Circular dependency found at task node {cycle[-1]}"
+            )
+
+    @classmethod
+    def _validate_new_prerequisite_edges(cls, new_edges):
+        """
+        Raise ValidationError if adding ``(task_id, prerequisite_id)`` edges would
+        close a prerequisite cycle. The existing graph downstream of the new
+        prerequisites is loaded in one query and checked in memory.
+        """
+        new_edges = list(new_edges)
+        edges = cls.objects.prerequisite_edges({to_id for _, to_id in new_edges})
+        cycle = find_cycle(edges + new_edges, [from_id for from_id, _ in new_edges])
+        if cycle:
+            raise ValidationError(
+                f"Circular dependency found at task node {cycle[-1]}"
+            )
 
     # ===============================================================================
     # PROPERTY METHODS
@@ -135,8 +505,8 @@ class Task(models.Model):
 
     @property
     def is_parent(self):
-        return self.children.exists()
+        return self.child_count > 0
 
     @property
     def is_leaf(self):
-        return not self.children.exists()
\ No newline at end of file
+        return self.child_count == 0
@@ -0,0 +1,28 @@
+from django.db import models
+
+
+class TaskForecast(models.Model):
+    """
+    A task's finish date distribution from the latest Monte Carlo run of
+    ``task.simulation``: the median and 90th percentile finish and, for tasks
+    with a due date, the share of trials finishing after it.
+    """
+
+    task = models.OneToOneField(
+        to="task.Task",
+        related_name="forecast",
+        on_delete=models.CASCADE,
+        primary_key=True,
+    )
+    finish_p50 = models.DateTimeField()
+    finish_p90 = models.DateTimeField()
+    overrun_probability = models.FloatField(
+        null=True,
+        blank=True,
+        help_text="Share of trials finishing after the due date; null without one.",
+    )
+    trials = models.PositiveIntegerField()
+    simulated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Forecast of task {self.task_id} at {self.simulated_at}"
@@ -1,6 +1,18 @@
+from collections import defaultdict
+
 from django.conf import settings
-from django.db import models
 from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import DEFERRED, F, Q
+
+from task.rollups import hours_between
+
+from .daily_time import DailyTime
+from .managers import TimeEntryManager, spread_by_day
+from .task import Task
+
+# Fields whose last saved values drive the rollup and daily total updates.
+SPAN_FIELDS = ("task_id", "user_id", "start_time", "end_time")
 
 
 class TimeEntry(models.Model):
@@ -18,17 +30,94 @@ class TimeEntry(models.Model):
     start_time = models.DateTimeField(blank=True, null=True, default=None)
     end_time = models.DateTimeField(blank=True, null=True, default=None)
 
+    objects = TimeEntryManager()
+
+    class Meta:
+        indexes = [
+            # A task's entries and a user's timesheet, both read by date range.
+            models.Index(
+                fields=["task", "start_time"], name="time_entry_task_start_idx"
+            ),
+            models.Index(
+                fields=["user", "start_time"], name="time_entry_user_start_idx"
+            ),
+        ]
+        constraints = [
+            # A running timer is an entry that has started but not ended.
+            models.UniqueConstraint(
+                fields=["user"],
+                condition=Q(
+                    user__isnull=False,
+                    start_time__isnull=False,
+                    end_time__isnull=True,
+                ),
+                name="time_entry_one_running_timer",
+            ),
+            models.CheckConstraint(
+                condition=Q(start_time__isnull=True)
+                | Q(end_time__isnull=True)
+                | Q(end_time__gte=F("start_time")),
+                name="time_entry_ends_after_start",
+            ),
+        ]
+
     def __init__(self, *args, **kwargs):
         self._skip_validation = kwargs.pop('skip_validation', False)
         super().__init__(*args, **kwargs)
-        self._cached_task_id = self.task_id
+        if self.pk is None:
+            self._cached_span = (None, None, None, None)
+        elif all(name in self.__dict__ for name in SPAN_FIELDS):
+            self._cached_span = self._span()
+        else:
+            # Deferred fields are read back by _original_values() when needed.
+            self._cached_span = DEFERRED
 
     def save(self, *args, **kwargs):
         """Save with validation unless explicitly skipped."""
         if not kwargs.pop('skip_validation', False) and not self._skip_validation:
             self.full_clean()
-        super().save(*args, **kwargs)
-        self._cached_task_id = self.task_id
+        old_span, span = self._original_values(), self._span()
+        hours = defaultdict(float)
+        hours[old_span[0]] -= hours_between(*old_span[2:])
+        hours[self.task_id] += self.hours
+        hours.pop(None, None)
+        daily = {}
+        spread_by_day(daily, old_span, -1)
+        spread_by_day(daily, span)
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+            Task.objects.roll_up_logged_hours(hours)
+            DailyTime.objects.add_seconds(daily)
+        self._cached_span = span
+
+    def delete(self, *args, **kwargs):
+        """
+        Delete the entry and roll its hours out of the task's totals and the
+        daily totals.
+        """
+        span = self._original_values()
+        daily = {}
+        spread_by_day(daily, span, -1)
+        with transaction.atomic(using=kwargs.get("using")):
+            result = super().delete(*args, **kwargs)
+            Task.objects.roll_up_logged_hours({span[0]: -hours_between(*span[2:])})
+            DailyTime.objects.add_seconds(daily)
+        return result
+
+    def _span(self):
+        return tuple(getattr(self, name) for name in SPAN_FIELDS)
+
+    def _original_values(self):
+        """Return ``(task_id, user_id, start_time, end_time)`` as last saved."""
+        if self._cached_span is DEFERRED:
+            self._cached_span = (
+                TimeEntry.objects.filter(pk=self.pk).values_list(*SPAN_FIELDS).get()
+            )
+        return self._cached_span
+
+    @property
+    def hours(self):
+        return hours_between(self.start_time, self.end_time)
 
     # ===============================================================================
     # VALIDATION
@@ -38,12 +127,27 @@ class TimeEntry(models.Model):
         super().clean()
         if self.id is None or self._task_updated():
             self._validate_attached_to_leaf_task()
+        if self.id is None or self._original_values() != self._span():
+            self._validate_no_overlap()
 
     def _task_updated(self):
-        return self._cached_task_id != self.task_id
+        return self._original_values()[0] != self.task_id
 
     def _validate_attached_to_leaf_task(self):
         if self.task.is_parent:
             raise ValidationError(
                 "Time entries can only be applied to leaf tasks."
             )
+
+    def _validate_no_overlap(self):
+        if self.user_id is None or self.start_time is None:
+            return
+        conflict = (
+            TimeEntry.objects.filter(user_id=self.user_id)
+            .exclude(pk=self.pk)
+            .overlapping(self.start_time, self.end_time)
+            .values_list("pk", flat=True)
+            .first()
+        )
+        if conflict is not None:
+            raise ValidationError(f"The entry would overlap time entry {conflict}.")
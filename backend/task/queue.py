@@ -0,0 +1,340 @@
+"""
+Job queues that carry project reschedule requests from web processes to
+``manage.py run_scheduler_worker``.
+
+Every backend coalesces jobs per project: enqueueing a project that already
+has a pending job keeps the original job (and its enqueue time), so a burst
+of edits costs one reschedule. Jobs carry the ids of the edited tasks, merged
+when jobs coalesce, so the worker only reschedules downstream of them; a job
+enqueued without task ids reschedules the whole project. A project is never
+handed to two workers at once. The backend is chosen with
+``settings.SCHEDULING_QUEUE_BACKEND``:
+
+``database``
+    ``RescheduleJob`` rows claimed with ``SELECT ... FOR UPDATE SKIP LOCKED``.
+``redis``
+    A sorted set of pending project ids scored by enqueue time, with a set of
+    edited task ids per project. Requires the ``redis`` package and
+    ``settings.SCHEDULING_REDIS_URL``.
+``local``
+    An in-process stand-in for tests and single-process development.
+``inline``
+    No queue; ``flush_dirty`` reschedules on commit inside the request.
+"""
+import threading
+import time
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from task.models import RescheduleJob
+
+# ``key`` identifies the claim for ``complete``/``release``; ``enqueued_at`` is
+# a Unix timestamp used to report latency. ``task_ids`` is a frozenset of the
+# edited tasks, or None to reschedule the whole project.
+Job = namedtuple("Job", ["key", "project_id", "enqueued_at", "task_ids"])
+
+QueueStats = namedtuple("QueueStats", ["depth", "running", "oldest_age_seconds"])
+
+
+def _task_ids(task_ids, project_id):
+    """The edited tasks ``enqueue`` was given for a project, or None."""
+    ids = (task_ids or {}).get(project_id)
+    return None if ids is None else frozenset(ids)
+
+
+def _merge(task_ids, more):
+    """Edited tasks of two coalesced jobs; None (the whole project) absorbs."""
+    if task_ids is None or more is None:
+        return None
+    return task_ids | more
+
+
+def _requeue(queue, jobs):
+    """Enqueue ``jobs`` again with the task ids they were claimed with."""
+    queue.enqueue(
+        [job.project_id for job in jobs],
+        {job.project_id: job.task_ids for job in jobs if job.task_ids is not None},
+    )
+
+
+def _encode(task_ids):
+    """``RescheduleJob.task_ids`` text; "*" is the whole project."""
+    return "*" if task_ids is None else ",".join(map(str, sorted(task_ids)))
+
+
+def _decode(value):
+    if value == "*":
+        return None
+    return frozenset(int(task_id) for task_id in value.split(",") if task_id)
+
+
+class DatabaseQueue:
+    """Queue backed by the ``RescheduleJob`` table."""
+
+    def enqueue(self, project_ids, task_ids=None):
+        """
+        Queue ``project_ids`` for rescheduling, merging ``task_ids``
+        (``{project_id: edited task ids}``) into their pending jobs with one
+        upsert. Projects without task ids are rescheduled whole.
+        """
+        rows = [
+            (project_id, _encode(_task_ids(task_ids, project_id)))
+            for project_id in set(project_ids)
+        ]
+        if not rows:
+            return
+        table = connection.ops.quote_name(RescheduleJob._meta.db_table)
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        values = ", ".join(["(%s, %s, %s)"] * len(rows))
+        params = [value for row in rows for value in (row[0], now, row[1])]
+        sql = f"""
+            INSERT INTO {table} (project_id, enqueued_at, task_ids)
+            VALUES {values}
+            ON CONFLICT (project_id) WHERE claimed_at IS NULL
+            DO UPDATE SET task_ids = CASE
+                WHEN {table}.task_ids = '*' OR EXCLUDED.task_ids = '*' THEN '*'
+                ELSE {table}.task_ids || ',' || EXCLUDED.task_ids
+            END
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+
+    def claim(self, limit):
+        """
+        Claim up to ``limit`` pending jobs, oldest first, skipping rows locked
+        by other workers and projects another worker is still running.
+        """
+        running = RescheduleJob.objects.filter(
+            project_id=OuterRef("project_id"), claimed_at__isnull=False
+        )
+        with transaction.atomic():
+            jobs = list(
+                RescheduleJob.objects.select_for_update(skip_locked=True)
+                .filter(claimed_at__isnull=True)
+                .exclude(Exists(running))
+                .order_by("enqueued_at")
+                .values_list("pk", "project_id", "enqueued_at", "task_ids")[:limit]
+            )
+            if jobs:
+                RescheduleJob.objects.filter(pk__in=[job[0] for job in jobs]).update(
+                    claimed_at=timezone.now()
+                )
+        return [
+            Job(pk, project_id, enqueued_at.timestamp(), _decode(task_ids))
+            for pk, project_id, enqueued_at, task_ids in jobs
+        ]
+
+    def complete(self, jobs):
+        RescheduleJob.objects.filter(pk__in=[job.key for job in jobs]).delete()
+
+    def release(self, jobs):
+        """Put failed jobs back so another pass picks them up."""
+        self.complete(jobs)
+        _requeue(self, jobs)
+
+    def requeue_stale(self, older_than):
+        """Release jobs claimed more than ``older_than`` seconds ago."""
+        cutoff = timezone.now() - timedelta(seconds=older_than)
+        stale = RescheduleJob.objects.filter(claimed_at__lt=cutoff)
+        self.release(
+            [
+                Job(pk, project_id, None, _decode(task_ids))
+                for pk, project_id, task_ids in stale.values_list(
+                    "pk", "project_id", "task_ids"
+                )
+            ]
+        )
+
+    def stats(self):
+        pending = RescheduleJob.objects.filter(claimed_at__isnull=True).order_by()
+        oldest = pending.order_by("enqueued_at").values_list(
+            "enqueued_at", flat=True
+        ).first()
+        return QueueStats(
+            depth=pending.count(),
+            running=RescheduleJob.objects.filter(claimed_at__isnull=False).count(),
+            oldest_age_seconds=(
+                (timezone.now() - oldest).total_seconds() if oldest else 0.0
+            ),
+        )
+
+
+class RedisQueue:
+    """Queue backed by a Redis sorted set (pending) and hash (running)."""
+
+    def __init__(self, url=None, prefix="scmods:reschedule"):
+        import redis
+
+        self.client = redis.Redis.from_url(url or settings.SCHEDULING_REDIS_URL)
+        self.pending_key = f"{prefix}:pending"
+        self.running_key = f"{prefix}:running"
+        # Projects to reschedule whole, and a set of edited task ids per project.
+        self.whole_key = f"{prefix}:whole"
+        self.tasks_prefix = f"{prefix}:tasks"
+
+    def enqueue(self, project_ids, task_ids=None):
+        project_ids = set(project_ids)
+        if not project_ids:
+            return
+        now = time.time()
+        pipeline = self.client.pipeline()
+        # Record the task ids before the project becomes claimable.
+        for project_id in project_ids:
+            ids = _task_ids(task_ids, project_id)
+            if ids is None:
+                pipeline.sadd(self.whole_key, project_id)
+            elif ids:
+                pipeline.sadd(f"{self.tasks_prefix}:{project_id}", *ids)
+        pipeline.zadd(
+            self.pending_key, {project_id: now for project_id in project_ids}, nx=True
+        )
+        pipeline.execute()
+
+    def claim(self, limit):
+        popped = self.client.zpopmin(self.pending_key, limit)
+        claimed, busy = [], {}
+        now = time.time()
+        for member, score in popped:
+            project_id = int(member)
+            # HSETNX marks the project running unless another worker has it.
+            if self.client.hsetnx(self.running_key, project_id, now):
+                claimed.append((project_id, score))
+            else:
+                busy[project_id] = score
+        if busy:
+            self.client.zadd(self.pending_key, busy, nx=True)
+        if not claimed:
+            return []
+        pipeline = self.client.pipeline()
+        for project_id, _ in claimed:
+            key = f"{self.tasks_prefix}:{project_id}"
+            pipeline.srem(self.whole_key, project_id)
+            pipeline.smembers(key)
+            pipeline.delete(key)
+        results = pipeline.execute()
+        jobs = []
+        for i, (project_id, score) in enumerate(claimed):
+            whole, task_ids = results[3 * i], results[3 * i + 1]
+            task_ids = None if whole else frozenset(map(int, task_ids))
+            jobs.append(Job(project_id, project_id, score, task_ids))
+        return jobs
+
+    def complete(self, jobs):
+        if jobs:
+            self.client.hdel(self.running_key, *[job.key for job in jobs])
+
+    def release(self, jobs):
+        self.complete(jobs)
+        _requeue(self, jobs)
+
+    def requeue_stale(self, older_than):
+        """Release stale claims; their task ids are gone, so reschedule whole."""
+        cutoff = time.time() - older_than
+        stale = [
+            Job(int(project_id), int(project_id), None, None)
+            for project_id, claimed in self.client.hgetall(self.running_key).items()
+            if float(claimed) < cutoff
+        ]
+        self.release(stale)
+
+    def stats(self):
+        oldest = self.client.zrange(self.pending_key, 0, 0, withscores=True)
+        return QueueStats(
+            depth=self.client.zcard(self.pending_key),
+            running=self.client.hlen(self.running_key),
+            oldest_age_seconds=time.time() - oldest[0][1] if oldest else 0.0,
+        )
+
+
+class LocalQueue:
+    """In-process queue with the same semantics, for tests and development."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # {project_id: (enqueued_at or claimed_at, task_ids)}
+        self.pending = {}
+        self.running = {}
+
+    def enqueue(self, project_ids, task_ids=None):
+        now = time.time()
+        with self._lock:
+            for project_id in project_ids:
+                enqueued_at, ids = self.pending.get(project_id, (now, frozenset()))
+                self.pending[project_id] = (
+                    enqueued_at,
+                    _merge(ids, _task_ids(task_ids, project_id)),
+                )
+
+    def claim(self, limit):
+        with self._lock:
+            ready = sorted(
+                (enqueued_at, project_id, ids)
+                for project_id, (enqueued_at, ids) in self.pending.items()
+                if project_id not in self.running
+            )[:limit]
+            now = time.time()
+            for _, project_id, ids in ready:
+                del self.pending[project_id]
+                self.running[project_id] = (now, ids)
+        return [
+            Job(project_id, project_id, enqueued_at, ids)
+            for enqueued_at, project_id, ids in ready
+        ]
+
+    def complete(self, jobs):
+        with self._lock:
+            for job in jobs:
+                self.running.pop(job.key, None)
+
+    def release(self, jobs):
+        self.complete(jobs)
+        _requeue(self, jobs)
+
+    def requeue_stale(self, older_than):
+        cutoff = time.time() - older_than
+        self.release(
+            [
+                Job(project_id, project_id, None, ids)
+                for project_id, (claimed, ids) in list(self.running.items())
+                if claimed < cutoff
+            ]
+        )
+
+    def stats(self):
+        with self._lock:
+            oldest = min(
+                (enqueued_at for enqueued_at, _ in self.pending.values()), default=None
+            )
+            return QueueStats(
+                depth=len(self.pending),
+                running=len(self.running),
+                oldest_age_seconds=time.time() - oldest if oldest else 0.0,
+            )
+
+
+QUEUE_BACKENDS = {
+    "database": DatabaseQueue,
+    "redis": RedisQueue,
+    "local": LocalQueue,
+}
+
+_queues = {}
+
+
+def get_queue(backend=None):
+    """
+    Return the queue for ``backend`` (default ``SCHEDULING_QUEUE_BACKEND``), or
+    ``None`` when scheduling runs inline. Instances are shared per process so
+    the ``local`` queue is visible to the worker running alongside it.
+    """
+    backend = backend or settings.SCHEDULING_QUEUE_BACKEND
+    if backend == "inline":
+        return None
+    if backend not in _queues:
+        _queues[backend] = QUEUE_BACKENDS[backend]()
+    return _queues[backend]
@@ -0,0 +1,103 @@
+"""
+Rolled-up estimated, actual and remaining hours for the task hierarchy.
+
+Every task contributes its own ``hours_estimate``, the hours logged against it
+and what is left of its estimate. A task's rollup is the sum of those
+contributions over its subtree, so it is additive: changing one task only adds
+the difference to the task and its ancestors (``TaskQuerySet.adjust_rollups``),
+and a full rebuild is one aggregated query plus a subtree sum over a
+``TaskGraph`` (``compute_rollups`` is the plain-dict version).
+"""
+import math
+from collections import defaultdict, namedtuple
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+
+Rollup = namedtuple("Rollup", ["estimated", "actual", "remaining"])
+
+ZERO = Rollup(0.0, 0.0, 0.0)
+
+
+def duration_hours(duration):
+    """Convert a ``timedelta`` (or ``None``) to hours."""
+    return duration.total_seconds() / 3600 if duration else 0.0
+
+
+def hours_between(start, end):
+    """Hours between two datetimes; open-ended entries count as zero."""
+    if start is None or end is None:
+        return 0.0
+    return duration_hours(end - start)
+
+
+def seconds_by_day(start, end, tz=None):
+    """
+    Split ``[start, end)`` at local midnights into ``{date: seconds}``. Each
+    instant is floored to the whole second first, so splitting and summing
+    are exact and stored totals can be adjusted entry by entry. Open-ended
+    entries contribute nothing.
+    """
+    if start is None or end is None or end <= start:
+        return {}
+    tz = tz or timezone.get_current_timezone()
+    first, last = math.floor(start.timestamp()), math.floor(end.timestamp())
+    day = timezone.localtime(start, tz).date()
+    seconds = {}
+    while first < last:
+        midnight = math.floor(
+            timezone.make_aware(
+                datetime.combine(day + timedelta(days=1), time()), tz
+            ).timestamp()
+        )
+        upto = min(last, midnight)
+        if upto > first:
+            seconds[day] = upto - first
+        first, day = upto, day + timedelta(days=1)
+    return seconds
+
+
+def own_rollup(hours_estimate, logged_hours, completed):
+    """Contribution of a single task, ignoring its children."""
+    remaining = 0.0 if completed else max(hours_estimate - logged_hours, 0.0)
+    return Rollup(float(hours_estimate), float(logged_hours), remaining)
+
+
+def add(rollup, other):
+    return Rollup(*(a + b for a, b in zip(rollup, other)))
+
+
+def subtract(rollup, other):
+    return Rollup(*(a - b for a, b in zip(rollup, other)))
+
+
+def compute_rollups(nodes):
+    """
+    Return ``{task_id: Rollup}`` subtree totals for ``{task_id: (parent_id,
+    own_rollup)}``. Tasks whose parent is not in ``nodes`` are treated as roots;
+    tasks caught in a parent cycle keep only their own contribution.
+    """
+    children = defaultdict(list)
+    for task_id, (parent_id, _) in nodes.items():
+        if parent_id in nodes:
+            children[parent_id].append(task_id)
+
+    totals = {}
+    roots = [
+        task_id for task_id, (parent_id, _) in nodes.items() if parent_id not in nodes
+    ]
+    for root in roots:
+        stack = [(root, False)]
+        while stack:
+            task_id, expanded = stack.pop()
+            if expanded:
+                total = nodes[task_id][1]
+                for child in children.get(task_id, ()):
+                    total = add(total, totals[child])
+                totals[task_id] = total
+                continue
+            stack.append((task_id, True))
+            stack.extend((child, False) for child in children.get(task_id, ()))
+    for task_id, (_, own) in nodes.items():
+        totals.setdefault(task_id, own)
+    return totals
@@ -0,0 +1,369 @@
+"""
+What-if scheduling over an in-memory copy of the portfolio.
+
+``load_portfolio`` reads every booked or started project, and any candidate
+projects such as open RFPs, into a ``Portfolio``: task records, prerequisite
+edges, assignees, project priorities and user capacities, with four queries.
+A ``Scenario`` layers hypothetical edits over a portfolio without changing it
+(win a candidate project, drop a project, change estimates, due dates or
+priorities, remove a user or change their capacity) and ``run`` reschedules
+and reassigns everything in memory with ``compute_schedule`` and
+``compute_assignments``. Nothing is written to the database.
+
+The result is a diff against the portfolio with no edits applied: the tasks
+whose ``schedule_datetime``, ``risk_hours`` or assignee would change, and the
+finish and risk of every project before and after. The unedited run is
+computed once per portfolio, so further scenarios cost one schedule and one
+assignment pass each.
+"""
+import math
+from collections import namedtuple
+from datetime import date, datetime
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from project.models import Project
+from task.assignment import assignment_inputs, compute_assignments
+from task.models import Task
+from task.scheduling import (
+    SCHEDULED_PROJECT_STATUSES,
+    TaskRecord,
+    WorkCalendar,
+    children_by_parent,
+    compute_schedule,
+)
+
+OPERATIONS = (
+    "add_project",
+    "remove_project",
+    "set_priority",
+    "set_estimate",
+    "set_due_date",
+    "remove_user",
+    "set_capacity",
+)
+
+# A task's schedule outcome: what save_schedule and assign_tasks would store.
+Outcome = namedtuple(
+    "Outcome", ["project_id", "schedule_datetime", "risk_hours", "assigned_to_id"]
+)
+
+ScenarioResult = namedtuple("ScenarioResult", ["tasks", "projects", "unassigned"])
+
+
+class Portfolio:
+    """
+    Tasks, edges, assignees, priorities and capacities of the scheduled
+    projects (``project_ids``) and of ``candidate_ids`` projects that are only
+    scheduled in scenarios that add them.
+    """
+
+    def __init__(
+        self,
+        tasks,
+        edges,
+        assignees,
+        priorities,
+        capacities,
+        project_ids,
+        candidate_ids=(),
+        calendar=None,
+        now=None,
+        horizon_days=260,
+    ):
+        self.tasks = tasks
+        self.edges = edges
+        self.assignees = assignees
+        self.priorities = priorities
+        self.capacities = capacities
+        self.project_ids = frozenset(project_ids)
+        self.candidate_ids = frozenset(candidate_ids)
+        self.calendar = calendar or WorkCalendar.starting_today()
+        self.now = now or timezone.now()
+        self.horizon_days = horizon_days
+        self._baseline = None
+
+    @property
+    def baseline(self):
+        """``{task_id: Outcome}`` of the portfolio with no edits."""
+        if self._baseline is None:
+            self._baseline = Scenario(self).outcomes()[0]
+        return self._baseline
+
+
+def load_portfolio(candidate_ids=(), calendar=None, now=None, horizon_days=260):
+    """
+    Read the scheduled projects and ``candidate_ids`` into a ``Portfolio``:
+    one query each for projects, tasks, prerequisite edges and users.
+    """
+    projects = dict(
+        Project.objects.filter(
+            Q(status__in=SCHEDULED_PROJECT_STATUSES) | Q(pk__in=list(candidate_ids))
+        )
+        .order_by()
+        .values_list("id", "priority")
+    )
+    tasks, assignees = {}, {}
+    for row in (
+        Task.objects.filter(project_id__in=list(projects))
+        .order_by()
+        .values_list(*TaskRecord._fields, "assigned_to_id", "auto_assign")
+    ):
+        task = TaskRecord._make(row[:-2])
+        tasks[task.id] = task
+        assignees[task.id] = row[-2:]
+    edges = list(
+        Task.prerequisites.through.objects.filter(
+            from_task__project_id__in=list(projects)
+        ).values_list("from_task_id", "to_task_id")
+    )
+    capacities = dict(
+        get_user_model()
+        .objects.filter(is_active=True, daily_capacity_hours__gt=0)
+        .order_by("pk")
+        .values_list("pk", "daily_capacity_hours")
+    )
+    candidates = set(candidate_ids) & projects.keys()
+    return Portfolio(
+        tasks,
+        edges,
+        assignees,
+        projects,
+        capacities,
+        project_ids=projects.keys() - candidates,
+        candidate_ids=candidates,
+        calendar=calendar,
+        now=now,
+        horizon_days=horizon_days,
+    )
+
+
+class Scenario:
+    """Hypothetical edits to a ``Portfolio``; see ``OPERATIONS``."""
+
+    def __init__(self, portfolio):
+        self.portfolio = portfolio
+        self.project_ids = set(portfolio.project_ids)
+        self.priorities = {}
+        self.task_changes = {}
+        self.capacities = dict(portfolio.capacities)
+
+    def apply(self, edits):
+        """
+        Apply ``[{"op": name, ...arguments}]`` edits in order; ``op`` is one of
+        ``OPERATIONS`` and the other keys are the method's arguments. Returns
+        the scenario.
+        """
+        for i, edit in enumerate(edits):
+            edit = dict(edit)
+            name = edit.pop("op", None)
+            if name not in OPERATIONS:
+                raise ValidationError(f"Edit {i}: unknown operation {name!r}.")
+            try:
+                getattr(self, name)(**edit)
+            except ValidationError as error:
+                raise ValidationError(
+                    [f"Edit {i}: {message}" for message in error.messages]
+                ) from error
+            except TypeError as error:
+                raise ValidationError(f"Edit {i}: {error}") from error
+        return self
+
+    def add_project(self, project):
+        """Schedule candidate ``project`` as if it were booked."""
+        if project not in self.portfolio.candidate_ids | self.portfolio.project_ids:
+            raise ValidationError(f"Project {project} is not in the portfolio.")
+        self.project_ids.add(project)
+
+    def remove_project(self, project):
+        """Drop ``project``, freeing its assignees' time."""
+        self.project_ids.discard(project)
+
+    def set_priority(self, project, priority):
+        """Give ``project`` a non-negative integer ``priority``."""
+        if project not in self.portfolio.priorities:
+            raise ValidationError(f"Project {project} is not in the portfolio.")
+        if isinstance(priority, str) and priority.strip().isdigit():
+            priority = int(priority)
+        if isinstance(priority, bool) or not isinstance(priority, int) or priority < 0:
+            raise ValidationError("priority must be a non-negative integer.")
+        self.priorities[project] = priority
+
+    def set_estimate(self, task, hours):
+        self._change(task, hours_estimate=_hours(hours))
+
+    def set_due_date(self, task, due_date):
+        """Move ``task``'s due date to a date or ``YYYY-MM-DD``, or clear it."""
+        if isinstance(due_date, str):
+            due_date = parse_date(due_date)
+            if due_date is None:
+                raise ValidationError("due_date must be a YYYY-MM-DD date.")
+        elif isinstance(due_date, datetime) or not (
+            due_date is None or isinstance(due_date, date)
+        ):
+            raise ValidationError("due_date must be a YYYY-MM-DD date.")
+        self._change(task, due_date=due_date)
+
+    def remove_user(self, user):
+        """Take ``user`` off every task and out of assignment."""
+        self.capacities.pop(user, None)
+
+    def set_capacity(self, user, hours):
+        """Give ``user`` ``hours`` of capacity per working day."""
+        self.capacities[user] = _hours(hours)
+
+    def _change(self, task_id, **fields):
+        if task_id not in self.portfolio.tasks:
+            raise ValidationError(f"Task {task_id} is not in the portfolio.")
+        self.task_changes.setdefault(task_id, {}).update(fields)
+
+    def outcomes(self):
+        """
+        Reschedule and reassign in memory. Returns ``({task_id: Outcome},
+        unassigned task ids)`` for the tasks of the scenario's projects.
+        """
+        portfolio = self.portfolio
+        calendar = portfolio.calendar
+        tasks = {
+            task_id: task._replace(**self.task_changes.get(task_id, {}))
+            for task_id, task in portfolio.tasks.items()
+            if task.project_id in self.project_ids
+        }
+        schedule = compute_schedule(
+            tasks,
+            portfolio.edges,
+            calendar,
+            now_offset=max(calendar.to_offset(portfolio.now), 0.0),
+        )
+
+        starts = {}
+        for task_id, task in tasks.items():
+            starts[task_id] = task.schedule_datetime
+            if task.auto_schedule and task.status != Task.TaskStatus.COMPLETED:
+                starts[task_id] = schedule.start_datetime(task_id)
+        priorities = {**portfolio.priorities, **self.priorities}
+        children = children_by_parent(tasks)
+        assignees = {
+            task_id: (
+                assigned_to_id if assigned_to_id in self.capacities else None,
+                auto_assign,
+            )
+            for task_id, (assigned_to_id, auto_assign) in portfolio.assignees.items()
+            if task_id in tasks
+        }
+        leaves = [
+            (
+                task_id,
+                task.hours_estimate,
+                starts[task_id],
+                priorities[task.project_id],
+                task.due_date,
+                *assignees[task_id],
+            )
+            for task_id, task in tasks.items()
+            if task_id not in children and task.status != Task.TaskStatus.COMPLETED
+        ]
+        inputs = assignment_inputs(
+            leaves, self.capacities, calendar, portfolio.now, portfolio.horizon_days
+        )
+        assignment = compute_assignments(
+            *inputs[:2], booked=inputs[2], horizon_days=portfolio.horizon_days
+        )
+        for task_id, user_id in assignment.assignments.items():
+            assignees[task_id] = (user_id, True)
+
+        outcomes = {
+            task_id: Outcome(
+                task.project_id,
+                starts[task_id],
+                round(schedule.risk_hours[task_id], 2),
+                assignees[task_id][0],
+            )
+            for task_id, task in tasks.items()
+        }
+        return outcomes, assignment.unassigned
+
+    def run(self):
+        """
+        Return a ``ScenarioResult``: ``tasks`` maps each changed task to
+        ``{field: (before, after)}`` for the ``Outcome`` fields that differ
+        (``None`` before for tasks of added projects, after for removed
+        ones); ``projects`` maps every project in either run to its latest
+        task start and total risk hours as ``(before, after)`` pairs.
+        """
+        before = self.portfolio.baseline
+        after, unassigned = self.outcomes()
+        tasks = {}
+        for task_id in before.keys() | after.keys():
+            old, new = before.get(task_id), after.get(task_id)
+            fields = {
+                field: (
+                    getattr(old, field) if old else None,
+                    getattr(new, field) if new else None,
+                )
+                for field in ("schedule_datetime", "risk_hours", "assigned_to_id")
+            }
+            changed = {
+                field: pair for field, pair in fields.items() if pair[0] != pair[1]
+            }
+            if changed:
+                tasks[task_id] = changed
+        return ScenarioResult(
+            tasks=tasks,
+            projects={
+                project_id: {
+                    name: (summary_before[name], summary_after[name])
+                    for name in ("last_start", "risk_hours")
+                }
+                for project_id, summary_before, summary_after in _project_pairs(
+                    before, after
+                )
+            },
+            unassigned=sorted(unassigned),
+        )
+
+
+def _hours(value):
+    """``value`` as a finite, non-negative number of hours."""
+    if not isinstance(value, bool):
+        try:
+            hours = float(value)
+        except (TypeError, ValueError):
+            pass
+        else:
+            if math.isfinite(hours) and hours >= 0:
+                return hours
+    raise ValidationError("hours must be a finite, non-negative number.")
+
+
+def _summaries(outcomes):
+    summaries = {}
+    for outcome in outcomes.values():
+        summary = summaries.setdefault(
+            outcome.project_id, {"last_start": None, "risk_hours": 0.0}
+        )
+        if outcome.schedule_datetime is not None and (
+            summary["last_start"] is None
+            or outcome.schedule_datetime > summary["last_start"]
+        ):
+            summary["last_start"] = outcome.schedule_datetime
+        summary["risk_hours"] = round(summary["risk_hours"] + outcome.risk_hours, 2)
+    return summaries
+
+
+def _project_pairs(before, after):
+    """Yield ``(project_id, summary before, summary after)`` per project."""
+    empty = {"last_start": None, "risk_hours": None}
+    before, after = _summaries(before), _summaries(after)
+    for project_id in sorted(before.keys() | after.keys()):
+        yield project_id, before.get(project_id, empty), after.get(project_id, empty)
+
+
+def run_scenario(edits, candidate_ids=(), calendar=None, now=None):
+    """Load the portfolio, apply ``edits`` and return the ``ScenarioResult``."""
+    portfolio = load_portfolio(candidate_ids, calendar=calendar, now=now)
+    return Scenario(portfolio).apply(edits).run()
@@ -0,0 +1,713 @@
+"""
+Critical path scheduling over a project's task hierarchy and prerequisites.
+
+Each task is split into a start and a finish event. Events are linked by the
+task's own duration, by the hierarchy (a child cannot start before its parent and
+a parent finishes with its last child) and by prerequisites plus their buffer
+days. A single Kahn pass over that event graph gives the earliest start and finish
+of every task in O(V + E), and a reverse pass gives the latest times and slack.
+
+Times are measured in working hours from the start of the calendar's origin day,
+so estimates, buffers and due dates can be compared without datetime arithmetic.
+
+Full passes over whole projects (``schedule_projects``) load a ``TaskGraph``
+and run ``compute_graph_schedule``, the same passes over NumPy arrays a
+topological level at a time. ``compute_schedule`` takes ``TaskRecord`` dicts
+for callers that edit tasks in memory first.
+"""
+import threading
+from collections import defaultdict, deque, namedtuple
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+
+import numpy as np
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from project.models import Project
+from task.graph import (
+    TaskGraph,
+    csr,
+    csr_gather,
+    datetime_column,
+    datetimes,
+    topological_levels,
+)
+from task.models import Task
+from task.queue import get_queue
+
+# Projects that compete for the schedule. RFPs are only scheduled in scenarios.
+SCHEDULED_PROJECT_STATUSES = [
+    Project.ProjectStatus.BOOKED,
+    Project.ProjectStatus.STARTED,
+]
+
+TaskRecord = namedtuple(
+    "TaskRecord",
+    [
+        "id",
+        "project_id",
+        "parent_id",
+        "status",
+        "hours_estimate",
+        "buffer_before",
+        "buffer_after",
+        "schedule_datetime",
+        "auto_schedule",
+        "due_date",
+        "risk_hours",
+    ],
+)
+
+
+class WorkCalendar:
+    """
+    Convert between datetimes and working-hour offsets. Working days run Monday
+    to Friday for ``hours_per_day`` hours from ``day_start_hour``; offset 0 is the
+    start of the working day on (or after) ``origin``.
+    """
+
+    def __init__(self, origin, hours_per_day=None, day_start_hour=None, tz=None):
+        self.hours_per_day = hours_per_day or settings.SCHEDULING_HOURS_PER_DAY
+        self.day_start_hour = (
+            settings.SCHEDULING_WORKDAY_START_HOUR
+            if day_start_hour is None
+            else day_start_hour
+        )
+        self.tz = tz or timezone.get_current_timezone()
+        self.origin = self._next_workday(origin)
+
+    @classmethod
+    def starting_today(cls, **kwargs):
+        return cls(timezone.localdate(), **kwargs)
+
+    @staticmethod
+    def _next_workday(day):
+        while day.weekday() >= 5:
+            day += timedelta(days=1)
+        return day
+
+    @staticmethod
+    def _workdays_between(start, end):
+        """Number of working days in ``[start, end)``; negative if end < start."""
+        if end < start:
+            return -WorkCalendar._workdays_between(end, start)
+        weeks, remainder = divmod((end - start).days, 7)
+        weekday = start.weekday()
+        return weeks * 5 + sum(
+            1 for i in range(remainder) if (weekday + i) % 7 < 5
+        )
+
+    def _add_workdays(self, count):
+        weeks, remainder = divmod(count, 5)
+        day = self.origin + timedelta(weeks=weeks)
+        while remainder:
+            day += timedelta(days=1)
+            if day.weekday() < 5:
+                remainder -= 1
+        return day
+
+    def to_offset(self, value):
+        """Return the working-hour offset of a datetime (or the start of a date)."""
+        if isinstance(value, datetime):
+            local = timezone.localtime(value, self.tz)
+            day = local.date()
+            hours = local.hour + local.minute / 60 - self.day_start_hour
+            hours = min(max(hours, 0), self.hours_per_day)
+            if day.weekday() >= 5:
+                day, hours = self._next_workday(day), 0
+        else:
+            day, hours = self._next_workday(value), 0
+        return self._workdays_between(self.origin, day) * self.hours_per_day + hours
+
+    def end_of_day_offset(self, day):
+        """Return the offset at which working day ``day`` ends."""
+        days = self._workdays_between(self.origin, day + timedelta(days=1))
+        return days * self.hours_per_day
+
+    def to_datetime(self, offset):
+        """Return the aware datetime for an offset, rounded to the minute."""
+        days, hours = divmod(offset, self.hours_per_day)
+        day = self._add_workdays(int(days))
+        minutes = round(hours * 60)
+        naive = datetime.combine(day, time(self.day_start_hour)) + timedelta(
+            minutes=minutes
+        )
+        return timezone.make_aware(naive, self.tz)
+
+
+class Schedule:
+    """Computed early/late times (in working-hour offsets) for a set of tasks."""
+
+    def __init__(self, calendar, early_start, early_finish, slack, risk_hours):
+        self.calendar = calendar
+        self.early_start = early_start
+        self.early_finish = early_finish
+        self.slack = slack
+        self.risk_hours = risk_hours
+
+    def start_datetime(self, task_id):
+        return self.calendar.to_datetime(self.early_start[task_id])
+
+    def finish_datetime(self, task_id):
+        return self.calendar.to_datetime(self.early_finish[task_id])
+
+    @property
+    def critical_path(self):
+        """Ids of tasks with no slack, in order of their earliest start."""
+        critical = [task_id for task_id, slack in self.slack.items() if slack <= 1e-9]
+        return sorted(critical, key=self.early_start.__getitem__)
+
+
+def load_graph(project_ids):
+    """
+    Load the tasks and prerequisite edges of ``project_ids`` with two queries.
+    Returns ``({task_id: TaskRecord}, [(task_id, prerequisite_id), ...])``.
+    """
+    tasks = {
+        row[0]: TaskRecord._make(row)
+        for row in Task.objects.filter(project_id__in=project_ids).values_list(
+            *TaskRecord._fields
+        )
+    }
+    edges = list(
+        Task.prerequisites.through.objects.filter(
+            from_task__project_id__in=project_ids
+        ).values_list("from_task_id", "to_task_id")
+    )
+    return tasks, edges
+
+
+def load_task_graph(project_ids):
+    """
+    Load the tasks and prerequisite edges of ``project_ids`` into a
+    ``TaskGraph`` with two queries.
+    """
+    rows = (
+        Task.objects.filter(project_id__in=project_ids)
+        .order_by()
+        .values_list(*TaskRecord._fields)
+    )
+    edges = Task.prerequisites.through.objects.filter(
+        from_task__project_id__in=project_ids
+    ).values_list("from_task_id", "to_task_id")
+    return build_task_graph(rows, list(edges))
+
+
+def build_task_graph(rows, edges):
+    """
+    Build the ``TaskGraph`` of ``rows`` (``TaskRecord`` field tuples) and
+    ``(task_id, prerequisite_id)`` edges, with a typed array per field.
+    """
+    columns = TaskRecord._make(
+        zip(*rows) if rows else [()] * len(TaskRecord._fields)
+    )
+    return TaskGraph(
+        columns.id,
+        columns.parent_id,
+        edges,
+        project_id=np.array(columns.project_id, dtype=np.int64),
+        completed=np.array(
+            [status == Task.TaskStatus.COMPLETED for status in columns.status],
+            dtype=bool,
+        ),
+        hours_estimate=np.array(columns.hours_estimate, dtype=np.float64),
+        buffer_before=np.array(columns.buffer_before, dtype=np.int16),
+        buffer_after=np.array(columns.buffer_after, dtype=np.int16),
+        schedule_datetime=datetime_column(columns.schedule_datetime),
+        auto_schedule=np.array(columns.auto_schedule, dtype=bool),
+        due_date=np.array(columns.due_date, dtype="datetime64[D]"),
+        risk_hours=np.array(columns.risk_hours, dtype=np.float64),
+    )
+
+
+def children_by_parent(tasks):
+    children = defaultdict(list)
+    for task in tasks.values():
+        if task.parent_id in tasks:
+            children[task.parent_id].append(task.id)
+    return children
+
+
+def task_duration(task, has_children):
+    """Working hours the task itself occupies; parents span their children."""
+    if has_children or task.status == Task.TaskStatus.COMPLETED:
+        return 0.0
+    return float(task.hours_estimate)
+
+
+def compute_schedule(tasks, edges, calendar, now_offset=0.0, durations=None):
+    """
+    Compute earliest/latest times, slack and risk hours for
+    ``tasks`` (``{id: TaskRecord}``) without touching the database. Prerequisite
+    edges to tasks outside ``tasks`` are ignored. ``durations`` can override the
+    duration of individual tasks.
+
+    Raises ValidationError if the hierarchy and prerequisites contain a cycle.
+    """
+    hours_per_day = calendar.hours_per_day
+    ids = list(tasks)
+    index = {task_id: i for i, task_id in enumerate(ids)}
+    children = children_by_parent(tasks)
+    durations = durations or {}
+
+    # Event 2i is the start of task i, event 2i + 1 its finish.
+    size = 2 * len(ids)
+    successors = [[] for _ in range(size)]
+    in_degree = [0] * size
+    early = [0.0] * size
+
+    def link(source, target, weight):
+        successors[source].append((target, weight))
+        in_degree[target] += 1
+
+    for i, task_id in enumerate(ids):
+        task = tasks[task_id]
+        has_children = task_id in children
+        duration = durations.get(task_id, task_duration(task, has_children))
+        link(2 * i, 2 * i + 1, 0.0 if has_children else duration)
+        early[2 * i] = now_offset
+        if not task.auto_schedule and task.schedule_datetime is not None:
+            early[2 * i] = calendar.to_offset(task.schedule_datetime)
+        if task.parent_id in index:
+            parent = index[task.parent_id]
+            link(2 * parent, 2 * i, 0.0)
+            link(2 * i + 1, 2 * parent + 1, 0.0)
+    for task_id, prerequisite_id in edges:
+        if task_id in index and prerequisite_id in index:
+            buffer_days = (
+                tasks[prerequisite_id].buffer_after + tasks[task_id].buffer_before
+            )
+            link(
+                2 * index[prerequisite_id] + 1,
+                2 * index[task_id],
+                float(buffer_days * hours_per_day),
+            )
+
+    order = []
+    queue = deque(event for event in range(size) if in_degree[event] == 0)
+    while queue:
+        event = queue.popleft()
+        order.append(event)
+        for target, weight in successors[event]:
+            if early[event] + weight > early[target]:
+                early[target] = early[event] + weight
+            in_degree[target] -= 1
+            if in_degree[target] == 0:
+                queue.append(target)
+    if len(order) < size:
+        raise ValidationError(
+            "Cannot schedule tasks: the hierarchy or prerequisites contain a cycle."
+        )
+
+    project_end = max(early, default=0.0)
+    late = [project_end] * size
+    for event in reversed(order):
+        for target, weight in successors[event]:
+            if late[target] - weight < late[event]:
+                late[event] = late[target] - weight
+
+    early_start, early_finish, slack, risk_hours = {}, {}, {}, {}
+    for i, task_id in enumerate(ids):
+        task = tasks[task_id]
+        early_start[task_id] = early[2 * i]
+        early_finish[task_id] = early[2 * i + 1]
+        slack[task_id] = late[2 * i] - early[2 * i]
+        risk = 0.0
+        if task.due_date is not None:
+            overrun = early[2 * i + 1] - calendar.end_of_day_offset(task.due_date)
+            risk = max(0.0, overrun)
+        risk_hours[task_id] = risk
+
+    return Schedule(
+        calendar,
+        early_start,
+        early_finish,
+        slack,
+        risk_hours,
+    )
+
+
+def compute_graph_schedule(graph, calendar, now_offset=0.0):
+    """
+    ``compute_schedule`` for a ``TaskGraph`` from ``build_task_graph``: the
+    same event graph as CSR arrays, relaxed one topological level at a time.
+
+    Raises ValidationError if the hierarchy and prerequisites contain a cycle.
+    """
+    size = 2 * graph.size
+    positions = np.arange(graph.size, dtype=np.int64)
+    has_children = graph.has_children
+    duration = np.where(has_children | graph.completed, 0.0, graph.hours_estimate)
+
+    # Event 2i is the start of task i, event 2i + 1 its finish, as in
+    # compute_schedule: own duration, hierarchy, then prerequisites.
+    child = np.flatnonzero(graph.parent >= 0)
+    parent = graph.parent[child].astype(np.int64)
+    task, offsets = csr_gather(graph.prerequisite_offsets, positions)
+    prerequisite = graph.prerequisite_targets[offsets].astype(np.int64)
+    buffer_days = graph.buffer_after[prerequisite].astype(np.float64)
+    buffer_days += graph.buffer_before[task]
+    sources = np.concatenate(
+        (2 * positions, 2 * parent, 2 * child + 1, 2 * prerequisite + 1)
+    )
+    targets = np.concatenate((2 * positions + 1, 2 * child, 2 * parent + 1, 2 * task))
+    weights = np.concatenate(
+        (
+            duration,
+            np.zeros(2 * len(child)),
+            buffer_days * calendar.hours_per_day,
+        )
+    )
+    offsets, targets, order = csr(sources, targets, size)
+    weights = weights[order]
+
+    levels = topological_levels(offsets, targets, size)
+    if sum(len(level) for level in levels) < size:
+        raise ValidationError(
+            "Cannot schedule tasks: the hierarchy or prerequisites contain a cycle."
+        )
+
+    early = np.zeros(size)
+    early[0::2] = now_offset
+    manual = np.flatnonzero(~graph.auto_schedule & ~np.isnat(graph.schedule_datetime))
+    for i, start in zip(manual, datetimes(graph.schedule_datetime[manual])):
+        early[2 * i] = calendar.to_offset(start)
+    edge_levels = [csr_gather(offsets, level) for level in levels]
+    for level_sources, level_positions in edge_levels:
+        np.maximum.at(
+            early,
+            targets[level_positions],
+            early[level_sources] + weights[level_positions],
+        )
+
+    late = np.full(size, early.max() if size else 0.0)
+    for level_sources, level_positions in reversed(edge_levels):
+        np.minimum.at(
+            late,
+            level_sources,
+            late[targets[level_positions]] - weights[level_positions],
+        )
+
+    risk_hours = np.zeros(graph.size)
+    has_due = ~np.isnat(graph.due_date)
+    if has_due.any():
+        days, day_index = np.unique(graph.due_date[has_due], return_inverse=True)
+        due = np.array(
+            [calendar.end_of_day_offset(day) for day in days.astype(object)]
+        )
+        risk_hours[has_due] = np.maximum(early[1::2][has_due] - due[day_index], 0.0)
+
+    ids = graph.ids.tolist()
+    return Schedule(
+        calendar,
+        dict(zip(ids, early[0::2].tolist())),
+        dict(zip(ids, early[1::2].tolist())),
+        dict(zip(ids, (late[0::2] - early[0::2]).tolist())),
+        dict(zip(ids, risk_hours.tolist())),
+    )
+
+
+def compute_incremental_schedule(tasks, edges, calendar, dirty_ids, now_offset=0.0):
+    """
+    Recompute only the part of the schedule downstream of ``dirty_ids``: their
+    subtrees, their transitive dependents and the ancestors whose finish
+    depends on them. Times of tasks outside that cone are
+    taken from their stored ``schedule_datetime``.
+
+    Returns a Schedule covering just the affected tasks (without slack, which
+    needs a full backward pass).
+    """
+    hours_per_day = calendar.hours_per_day
+    children = children_by_parent(tasks)
+    prerequisites, dependents = defaultdict(list), defaultdict(list)
+    for task_id, prerequisite_id in edges:
+        if task_id in tasks and prerequisite_id in tasks:
+            prerequisites[task_id].append(prerequisite_id)
+            dependents[prerequisite_id].append(task_id)
+
+    def duration(task_id):
+        return 0.0 if task_id in children else task_duration(tasks[task_id], False)
+
+    def release(task_id):
+        task = tasks[task_id]
+        if not task.auto_schedule and task.schedule_datetime is not None:
+            return calendar.to_offset(task.schedule_datetime)
+        return now_offset
+
+    # Events are (task_id, is_finish) pairs, mirroring compute_schedule.
+    def successors(event):
+        task_id, is_finish = event
+        if is_finish:
+            parent_id = tasks[task_id].parent_id
+            if parent_id in tasks:
+                yield (parent_id, True), 0.0
+            for dependent_id in dependents.get(task_id, ()):
+                buffer_days = (
+                    tasks[task_id].buffer_after + tasks[dependent_id].buffer_before
+                )
+                yield (dependent_id, False), float(buffer_days * hours_per_day)
+        else:
+            yield (task_id, True), duration(task_id)
+            for child_id in children.get(task_id, ()):
+                yield (child_id, False), 0.0
+
+    def predecessors(event):
+        task_id, is_finish = event
+        if is_finish:
+            yield (task_id, False), duration(task_id)
+            for child_id in children.get(task_id, ()):
+                yield (child_id, True), 0.0
+        else:
+            parent_id = tasks[task_id].parent_id
+            if parent_id in tasks:
+                yield (parent_id, False), 0.0
+            for prerequisite_id in prerequisites.get(task_id, ()):
+                buffer_days = (
+                    tasks[prerequisite_id].buffer_after + tasks[task_id].buffer_before
+                )
+                yield (prerequisite_id, True), float(buffer_days * hours_per_day)
+
+    cone = set()
+    stack = [(task_id, False) for task_id in dirty_ids if task_id in tasks]
+    while stack:
+        event = stack.pop()
+        if event in cone:
+            continue
+        cone.add(event)
+        stack.extend(target for target, _ in successors(event))
+
+    stored = {}
+
+    def stored_time(event):
+        """Time of an event outside the cone, derived from stored starts."""
+        pending, on_path = [event], {event}
+        while pending:
+            current = pending[-1]
+            task_id, is_finish = current
+            if not is_finish:
+                start = tasks[task_id].schedule_datetime
+                stored[current] = (
+                    calendar.to_offset(start) if start is not None else now_offset
+                )
+            else:
+                missing = next(
+                    (p for p, _ in predecessors(current) if p not in stored), None
+                )
+                if missing is not None:
+                    if missing in on_path:
+                        raise ValidationError(
+                            "Cannot schedule tasks: the hierarchy contains a cycle."
+                        )
+                    pending.append(missing)
+                    on_path.add(missing)
+                    continue
+                stored[current] = max(
+                    stored[p] + weight for p, weight in predecessors(current)
+                )
+            on_path.discard(pending.pop())
+        return stored[event]
+
+    in_degree = dict.fromkeys(cone, 0)
+    for event in cone:
+        for target, _ in successors(event):
+            in_degree[target] += 1
+    early = {}
+    queue = deque(event for event, degree in in_degree.items() if degree == 0)
+    visited = 0
+    while queue:
+        event = queue.popleft()
+        visited += 1
+        value = release(event[0]) if not event[1] else 0.0
+        for source, weight in predecessors(event):
+            base = early[source] if source in cone else stored_time(source)
+            value = max(value, base + weight)
+        early[event] = value
+        for target, _ in successors(event):
+            in_degree[target] -= 1
+            if in_degree[target] == 0:
+                queue.append(target)
+    if visited < len(cone):
+        raise ValidationError(
+            "Cannot schedule tasks: the hierarchy or prerequisites contain a cycle."
+        )
+
+    affected = {task_id for task_id, _ in cone}
+    early_start, early_finish, risk_hours = {}, {}, {}
+    for task_id in affected:
+        start_event, finish_event = (task_id, False), (task_id, True)
+        early_start[task_id] = (
+            early[start_event] if start_event in early else stored_time(start_event)
+        )
+        early_finish[task_id] = (
+            early[finish_event] if finish_event in early else stored_time(finish_event)
+        )
+        due_date = tasks[task_id].due_date
+        risk_hours[task_id] = 0.0
+        if due_date is not None:
+            overrun = early_finish[task_id] - calendar.end_of_day_offset(due_date)
+            risk_hours[task_id] = max(0.0, overrun)
+    return Schedule(calendar, early_start, early_finish, {}, risk_hours)
+
+
+def save_schedule(schedule, tasks):
+    """
+    Write ``schedule_datetime`` (auto-scheduled, unfinished tasks only) and
+    ``risk_hours`` back with one ``bulk_update``, skipping rows whose stored
+    values already match. Returns the number of rows written.
+    """
+    return _write_schedule(
+        schedule,
+        (
+            (
+                task_id,
+                task.project_id,
+                task.auto_schedule and task.status != Task.TaskStatus.COMPLETED,
+                task.schedule_datetime,
+                task.risk_hours,
+            )
+            for task_id, task in tasks.items()
+            if task_id in schedule.early_start
+        ),
+    )
+
+
+def save_graph_schedule(schedule, graph):
+    """``save_schedule`` for the tasks of a ``TaskGraph``."""
+    return _write_schedule(
+        schedule,
+        zip(
+            graph.ids.tolist(),
+            graph.project_id.tolist(),
+            (graph.auto_schedule & ~graph.completed).tolist(),
+            datetimes(graph.schedule_datetime),
+            graph.risk_hours.tolist(),
+        ),
+    )
+
+
+def _write_schedule(schedule, rows):
+    """
+    Write the schedule of ``(task_id, project_id, reschedule, start, risk)``
+    rows holding stored values where it differs from them. ``dependent_hours``
+    is a maintained rollup and is left to ``adjust_rollups``.
+    """
+    updates, project_ids = [], set()
+    for task_id, project_id, reschedule, *stored in rows:
+        start = schedule.start_datetime(task_id) if reschedule else stored[0]
+        risk = round(schedule.risk_hours[task_id], 2)
+        if [start, risk] != stored:
+            updates.append(Task(id=task_id, schedule_datetime=start, risk_hours=risk))
+            project_ids.add(project_id)
+    Task.objects.bulk_update(
+        updates,
+        ["schedule_datetime", "risk_hours"], batch_size=1000
+    )
+    Task.objects.projects_changed(project_ids)
+    return len(updates)
+
+
+def schedule_projects(project_ids, calendar=None, now=None):
+    """Load, schedule and save the given projects. Returns the Schedule."""
+    calendar = calendar or WorkCalendar.starting_today()
+    now_offset = max(calendar.to_offset(now or timezone.now()), 0.0)
+    graph = load_task_graph(project_ids)
+    schedule = compute_graph_schedule(graph, calendar, now_offset=now_offset)
+    save_graph_schedule(schedule, graph)
+    return schedule
+
+
+def reschedule_tasks(task_ids, calendar=None, now=None):
+    """
+    Incrementally reschedule the downstream cone of ``task_ids`` and write the
+    affected rows back in one batch. Returns the Schedule of the affected
+    tasks, or None when there is nothing to reschedule.
+    """
+    task_ids = set(task_ids)
+    if not task_ids:
+        return None
+    calendar = calendar or WorkCalendar.starting_today()
+    now_offset = max(calendar.to_offset(now or timezone.now()), 0.0)
+    project_ids = set(
+        Task.objects.filter(pk__in=task_ids).values_list("project_id", flat=True)
+    )
+    tasks, edges = load_graph(project_ids)
+    schedule = compute_incremental_schedule(
+        tasks, edges, calendar, task_ids, now_offset=now_offset
+    )
+    save_schedule(schedule, tasks)
+    return schedule
+
+
+def schedule_portfolio(calendar=None, now=None):
+    """Schedule every booked or started project."""
+    project_ids = list(
+        Project.objects.filter(status__in=SCHEDULED_PROJECT_STATUSES)
+        .order_by()
+        .values_list("id", flat=True)
+    )
+    return schedule_projects(project_ids, calendar=calendar, now=now)
+
+
+# ===============================================================================
+# DIRTY-SET QUEUE
+# ===============================================================================
+_local = threading.local()
+
+
+def _dirty_state():
+    if not hasattr(_local, "dirty"):
+        _local.dirty = set()
+        _local.depth = 0
+    return _local
+
+
+def mark_dirty(task_ids):
+    """
+    Queue tasks for incremental rescheduling. Edits are coalesced until the
+    current transaction commits, or until the outermost
+    ``coalesce_rescheduling()`` block exits, and then rescheduled together.
+    """
+    state = _dirty_state()
+    state.dirty.update(task_id for task_id in task_ids if task_id is not None)
+    if state.depth == 0:
+        transaction.on_commit(flush_dirty)
+
+
+def flush_dirty():
+    """
+    Hand every queued task to the scheduler at once: enqueue their projects,
+    with the tasks to reschedule incrementally, for ``run_scheduler_worker``,
+    or reschedule them in place when
+    ``SCHEDULING_QUEUE_BACKEND`` is ``"inline"``. Safe to call when nothing is
+    queued.
+    """
+    state = _dirty_state()
+    if state.depth or not state.dirty:
+        return
+    task_ids, state.dirty = state.dirty, set()
+    queue = get_queue()
+    if queue is None:
+        reschedule_tasks(task_ids)
+        return
+    dirty = defaultdict(set)
+    for project_id, task_id in (
+        Task.objects.filter(pk__in=task_ids).order_by().values_list("project_id", "id")
+    ):
+        dirty[project_id].add(task_id)
+    queue.enqueue(list(dirty), dirty)
+
+
+@contextmanager
+def coalesce_rescheduling():
+    """Hold back rescheduling until the outermost block exits."""
+    state = _dirty_state()
+    state.depth += 1
+    try:
+        yield
+    finally:
+        state.depth -= 1
+        if state.depth == 0 and state.dirty:
+            transaction.on_commit(flush_dirty)
@@ -0,0 +1,79 @@
+from common.serializers import ModelValidationMixin
+from rest_framework import serializers
+
+from task.models import Task, TimeEntry
+
+
+class TaskSerializer(ModelValidationMixin, serializers.ModelSerializer):
+    project_name = serializers.CharField(source="project.name", read_only=True)
+    client_name = serializers.CharField(source="project.client.name", read_only=True)
+    parent_name = serializers.CharField(
+        source="parent.name", read_only=True, default=None
+    )
+    assigned_to_name = serializers.CharField(
+        source="assigned_to.get_full_name", read_only=True, default=None
+    )
+    children = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+
+    class Meta:
+        model = Task
+        fields = [
+            "id",
+            "project",
+            "project_name",
+            "client_name",
+            "parent",
+            "parent_name",
+            "children",
+            "prerequisites",
+            "name",
+            "description",
+            "instructions",
+            "status",
+            "hours_estimate",
+            "hours_optimistic",
+            "hours_pessimistic",
+            "dependent_hours",
+            "actual_hours",
+            "remaining_hours",
+            "buffer_before",
+            "buffer_after",
+            "schedule_datetime",
+            "auto_schedule",
+            "due_date",
+            "risk_hours",
+            "assigned_to",
+            "assigned_to_name",
+            "auto_assign",
+            "child_count",
+            "path",
+        ]
+        read_only_fields = ["schedule_datetime", "risk_hours"]
+
+
+class TimeEntrySerializer(ModelValidationMixin, serializers.ModelSerializer):
+    task_name = serializers.CharField(source="task.name", read_only=True)
+    user_name = serializers.CharField(
+        source="user.get_full_name", read_only=True, default=None
+    )
+
+    class Meta:
+        model = TimeEntry
+        fields = [
+            "id",
+            "task",
+            "task_name",
+            "user",
+            "user_name",
+            "start_time",
+            "end_time",
+            "hours",
+        ]
+
+
+class TimerSerializer(serializers.ModelSerializer):
+    """A timer's entry, without the names that would cost a query to read."""
+
+    class Meta:
+        model = TimeEntry
+        fields = ["id", "task", "user", "start_time", "end_time", "hours"]
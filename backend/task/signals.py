@@ -1,10 +1,61 @@
-from django.db.models.signals import m2m_changed
+from django.conf import settings
+from django.db.models.signals import m2m_changed, post_save, pre_delete
 from django.dispatch import receiver
-from task.models import Task
+
+from task import scheduling
+from task.models import DailyTime, Task
 
 
 @receiver(m2m_changed, sender=Task.prerequisites.through)
-def validate_prerequisites_on_change(sender, instance, action, **kwargs):
-    """Validate prerequisite cycles whenever prerequisites are added or removed."""
-    if action in ['post_add']:
-        instance._validate_no_prerequisite_cycles()
\ No newline at end of file
+def validate_prerequisites_on_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    """Reject prerequisite additions that would introduce a cycle."""
+    if action != "pre_add" or not pk_set:
+        return
+    if reverse:
+        new_edges = [(pk, instance.pk) for pk in pk_set]
+    else:
+        new_edges = [(instance.pk, pk) for pk in pk_set]
+    Task._validate_new_prerequisite_edges(new_edges)
+
+
+@receiver(m2m_changed, sender=Task.prerequisites.through)
+def reschedule_on_prerequisites_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    """Queue the tasks whose prerequisites changed for rescheduling."""
+    if action in ("post_add", "post_remove"):
+        scheduling.mark_dirty(pk_set if reverse else [instance.pk])
+    elif action == "pre_clear" and reverse:
+        scheduling.mark_dirty(instance.dependents.values_list("pk", flat=True))
+    elif action == "post_clear" and not reverse:
+        scheduling.mark_dirty([instance.pk])
+
+
+@receiver(post_save, sender=Task)
+def reschedule_on_task_change(sender, instance, created, raw, **kwargs):
+    """Queue a task (and its old and new parent) when a schedule input changes."""
+    if raw:
+        return
+    if created or instance._schedule_inputs_updated():
+        scheduling.mark_dirty(
+            [instance.pk, instance._original_parent_id(), instance.parent_id]
+        )
+
+
+@receiver(pre_delete, sender=Task)
+def reschedule_on_task_delete(sender, instance, **kwargs):
+    """
+    Queue the parent and the dependents of a deleted task. Its prerequisite
+    links go with it in a cascade that skips ``m2m_changed``.
+    """
+    scheduling.mark_dirty(
+        [instance.parent_id, *instance.dependents.values_list("pk", flat=True)]
+    )
+
+
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def detach_daily_times_on_user_delete(sender, instance, **kwargs):
+    """Merge a deleted user's daily totals into the rows without a user."""
+    DailyTime.objects.detach_users([instance.pk])
@@ -0,0 +1,337 @@
+"""
+Monte Carlo schedule risk.
+
+``compute_schedule`` gives one finish time per task from single-point
+estimates. Here the duration of every open leaf task is drawn from a
+triangular distribution between ``hours_optimistic`` and
+``hours_pessimistic`` (defaulting to ``OPTIMISTIC_FACTOR`` and
+``PESSIMISTIC_FACTOR`` times the estimate) with its mode at
+``hours_estimate``, and the draws are propagated through the same start and
+finish event graph as the critical path schedule.
+
+The event graph is sorted into topological levels once. Every trial then
+moves through it together: each level is one gather, add and
+``maximum.reduceat`` over a ``(events, trials)`` array, so the Python loop runs
+once per level rather than once per event and trial. Trials are split into
+chunks of ``CHUNK_TRIALS``, each seeded from one ``SeedSequence``, so results
+depend only on the seed, and chunks can run on a process pool. Chunking bounds
+the propagation arrays, which hold every event; each chunk is reduced to the
+finish of every task, kept as ``float32`` for exact percentiles, and its
+overrun counts.
+
+Per task, the median and 90th percentile finish and the share of trials that
+finish after the due date are stored as ``TaskForecast`` rows.
+"""
+from collections import defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from numbers import Integral
+
+import django
+import numpy as np
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+from task.models import Task, TaskForecast
+from task.scheduling import WorkCalendar, children_by_parent, load_graph
+
+# Default duration range of tasks without explicit optimistic and pessimistic
+# hours, as multiples of the estimate.
+OPTIMISTIC_FACTOR = 0.8
+PESSIMISTIC_FACTOR = 1.5
+
+DEFAULT_TRIALS = 5000
+# Trials propagated at once; bounds the propagation arrays at about 16 bytes
+# per event and trial. The finishes of all trials take 4 bytes per task and trial.
+CHUNK_TRIALS = 250
+
+# The event graph of ``build_graph`` as arrays. Event 2i is the start of task
+# i and 2i + 1 its finish. Edges are sorted by the level of their target and
+# then by target; ``levels`` holds ``(first_edge, end_edge, targets,
+# group_starts)`` per level. An edge adds ``weight`` plus, when ``sampled`` is
+# not -1, the drawn duration of that row of ``low``/``mode``/``high``.
+SimulationGraph = namedtuple(
+    "SimulationGraph",
+    [
+        "task_ids",
+        "release",
+        "source",
+        "weight",
+        "sampled",
+        "levels",
+        "low",
+        "mode",
+        "high",
+        "due",
+    ],
+)
+
+SimulationResult = namedtuple(
+    "SimulationResult", ["task_ids", "p50", "p90", "overrun_probability", "trials"]
+)
+
+
+def duration_ranges(tasks, optimistic, pessimistic):
+    """
+    ``{task_id: (low, mode, high)}`` hours for ``tasks``, from the optional
+    ``{task_id: hours}`` overrides in ``optimistic`` and ``pessimistic``.
+    """
+    ranges = {}
+    for task_id, task in tasks.items():
+        mode = float(task.hours_estimate)
+        low = optimistic.get(task_id)
+        high = pessimistic.get(task_id)
+        low = mode * OPTIMISTIC_FACTOR if low is None else min(low, mode)
+        high = mode * PESSIMISTIC_FACTOR if high is None else max(high, mode)
+        ranges[task_id] = (low, mode, high)
+    return ranges
+
+
+def build_graph(tasks, edges, ranges, calendar, now_offset=0.0):
+    """
+    Build the ``SimulationGraph`` of ``tasks`` (``{id: TaskRecord}``) and their
+    prerequisite ``edges``, with durations drawn from ``ranges``. Raises
+    ValidationError if the hierarchy and prerequisites contain a cycle.
+    """
+    hours_per_day = calendar.hours_per_day
+    ids = list(tasks)
+    index = {task_id: i for i, task_id in enumerate(ids)}
+    children = children_by_parent(tasks)
+    size = 2 * len(ids)
+
+    release = np.zeros(size)
+    due = np.full(len(ids), np.nan)
+    sources, targets, weights, sampled = [], [], [], []
+    low, mode, high = [], [], []
+
+    def link(source, target, weight=0.0, row=-1):
+        sources.append(source)
+        targets.append(target)
+        weights.append(weight)
+        sampled.append(row)
+
+    for i, task_id in enumerate(ids):
+        task = tasks[task_id]
+        release[2 * i] = now_offset
+        if not task.auto_schedule and task.schedule_datetime is not None:
+            release[2 * i] = calendar.to_offset(task.schedule_datetime)
+        if task.due_date is not None:
+            due[i] = calendar.end_of_day_offset(task.due_date)
+        if task_id in children or task.status == Task.TaskStatus.COMPLETED:
+            link(2 * i, 2 * i + 1)
+        else:
+            link(2 * i, 2 * i + 1, row=len(low))
+            for values, value in zip((low, mode, high), ranges[task_id]):
+                values.append(value)
+        if task.parent_id in index:
+            parent = index[task.parent_id]
+            link(2 * parent, 2 * i)
+            link(2 * i + 1, 2 * parent + 1)
+    for task_id, prerequisite_id in edges:
+        if task_id in index and prerequisite_id in index:
+            buffer_days = (
+                tasks[prerequisite_id].buffer_after + tasks[task_id].buffer_before
+            )
+            link(
+                2 * index[prerequisite_id] + 1,
+                2 * index[task_id],
+                float(buffer_days * hours_per_day),
+            )
+
+    level = _event_levels(size, sources, targets)
+    source = np.array(sources, dtype=np.int64)
+    target = np.array(targets, dtype=np.int64)
+    order = np.lexsort((target, level[target])) if len(target) else target
+    source, target = source[order], target[order]
+    weight = np.array(weights, dtype=np.float64)[order]
+    sampled = np.array(sampled, dtype=np.int64)[order]
+
+    levels = []
+    edge_levels = level[target]
+    bounds = np.flatnonzero(np.diff(edge_levels)) + 1
+    for first, end in zip(
+        np.concatenate(([0], bounds)), np.concatenate((bounds, [len(target)]))
+    ):
+        if first == end:
+            continue
+        level_targets = target[first:end]
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(level_targets)) + 1))
+        levels.append((int(first), int(end), level_targets[starts], starts))
+
+    return SimulationGraph(
+        ids,
+        release,
+        source,
+        weight,
+        sampled,
+        levels,
+        np.array(low, dtype=np.float64),
+        np.array(mode, dtype=np.float64),
+        np.array(high, dtype=np.float64),
+        due,
+    )
+
+
+def _event_levels(size, sources, targets):
+    """Longest path length (in edges) from a source event to each event."""
+    successors = defaultdict(list)
+    in_degree = np.zeros(size, dtype=np.int64)
+    for source, target in zip(sources, targets):
+        successors[source].append(target)
+        in_degree[target] += 1
+    level = np.zeros(size, dtype=np.int64)
+    frontier = list(np.flatnonzero(in_degree == 0))
+    visited = 0
+    while frontier:
+        event = frontier.pop()
+        visited += 1
+        for target in successors[event]:
+            level[target] = max(level[target], level[event] + 1)
+            in_degree[target] -= 1
+            if in_degree[target] == 0:
+                frontier.append(target)
+    if visited < size:
+        raise ValidationError(
+            "Cannot schedule tasks: the hierarchy or prerequisites contain a cycle."
+        )
+    return level
+
+
+def sample_triangular(rng, low, mode, high, trials):
+    """
+    Draw ``(len(low), trials)`` durations from triangular distributions by
+    inverting their CDF; zero-width ranges give their single value.
+    """
+    u = rng.random((len(low), trials))
+    width = high - low
+    split = np.divide(
+        mode - low, width, out=np.zeros_like(width), where=width > 0
+    )[:, np.newaxis]
+    rising = low[:, np.newaxis] + np.sqrt(u * (width * (mode - low))[:, np.newaxis])
+    falling = high[:, np.newaxis] - np.sqrt(
+        (1 - u) * (width * (high - mode))[:, np.newaxis]
+    )
+    return np.where(u < split, rising, falling)
+
+
+def simulate_chunk(graph, seed, trials):
+    """Finish offsets of every task in ``trials`` trials, ``(tasks, trials)``."""
+    rng = np.random.default_rng(seed)
+    durations = sample_triangular(rng, graph.low, graph.mode, graph.high, trials)
+    early = np.repeat(graph.release[:, np.newaxis], trials, axis=1)
+    for first, end, targets, starts in graph.levels:
+        values = early[graph.source[first:end]] + graph.weight[first:end, np.newaxis]
+        rows = graph.sampled[first:end]
+        drawn = rows >= 0
+        if drawn.any():
+            values[drawn] += durations[rows[drawn]]
+        early[targets] = np.maximum(
+            early[targets], np.maximum.reduceat(values, starts, axis=0)
+        )
+    return early[1::2].astype(np.float32)
+
+
+def simulate(graph, trials=DEFAULT_TRIALS, seed=None, processes=1):
+    """
+    Run ``trials`` trials of ``graph`` in chunks, on ``processes`` processes,
+    and return a ``SimulationResult`` of per-task finish offsets.
+    """
+    _validate_trials(trials)
+    chunks = [
+        min(CHUNK_TRIALS, trials - first) for first in range(0, trials, CHUNK_TRIALS)
+    ]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    finish = np.empty((len(graph.task_ids), trials), dtype=np.float32)
+    late = np.zeros(len(graph.task_ids), dtype=np.int64)
+    if processes > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(
+            max_workers=processes, initializer=django.setup
+        ) as pool:
+            results = pool.map(
+                simulate_chunk, [graph] * len(chunks), seeds, chunks
+            )
+            _fill(finish, late, graph.due, results, chunks)
+    else:
+        _fill(
+            finish,
+            late,
+            graph.due,
+            (simulate_chunk(graph, s, n) for s, n in zip(seeds, chunks)),
+            chunks,
+        )
+
+    p50, p90 = np.percentile(finish, [50, 90], axis=1)
+    overrun = np.where(np.isnan(graph.due), np.nan, late / trials)
+    return SimulationResult(graph.task_ids, p50, p90, overrun, trials)
+
+
+def _validate_trials(trials):
+    if isinstance(trials, bool) or not isinstance(trials, Integral) or trials < 1:
+        raise ValidationError("The number of trials must be a positive integer.")
+
+
+def _fill(finish, late, due, results, chunks):
+    """Copy each chunk's finishes into ``finish`` and count them past ``due``."""
+    first = 0
+    with np.errstate(invalid="ignore"):
+        for result, size in zip(results, chunks):
+            finish[:, first:first + size] = result
+            late += (result > due[:, np.newaxis]).sum(axis=1)
+            first += size
+
+
+def save_forecasts(result, calendar, batch_size=1000):
+    """Store ``result`` as ``TaskForecast`` rows, replacing earlier ones."""
+    forecasts = [
+        TaskForecast(
+            task_id=task_id,
+            finish_p50=calendar.to_datetime(float(p50)),
+            finish_p90=calendar.to_datetime(float(p90)),
+            overrun_probability=None if np.isnan(overrun) else round(float(overrun), 4),
+            trials=result.trials,
+        )
+        for task_id, p50, p90, overrun in zip(
+            result.task_ids, result.p50, result.p90, result.overrun_probability
+        )
+    ]
+    TaskForecast.objects.bulk_create(
+        forecasts,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=["task"],
+        update_fields=[
+            "finish_p50",
+            "finish_p90",
+            "overrun_probability",
+            "trials",
+            "simulated_at",
+        ],
+    )
+    return len(forecasts)
+
+
+def simulate_projects(
+    project_ids, trials=DEFAULT_TRIALS, calendar=None, now=None, seed=None, processes=1
+):
+    """Load, simulate and store forecasts for ``project_ids``. Returns the result."""
+    _validate_trials(trials)
+    calendar = calendar or WorkCalendar.starting_today()
+    now_offset = max(calendar.to_offset(now or timezone.now()), 0.0)
+    tasks, edges = load_graph(project_ids)
+    optimistic, pessimistic = {}, {}
+    for task_id, low, high in Task.objects.filter(
+        project_id__in=project_ids
+    ).values_list("id", "hours_optimistic", "hours_pessimistic"):
+        if low is not None:
+            optimistic[task_id] = low
+        if high is not None:
+            pessimistic[task_id] = high
+    graph = build_graph(
+        tasks,
+        edges,
+        duration_ranges(tasks, optimistic, pessimistic),
+        calendar,
+        now_offset=now_offset,
+    )
+    result = simulate(graph, trials=trials, seed=seed, processes=processes)
+    save_forecasts(result, calendar)
+    return result
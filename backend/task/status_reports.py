@@ -0,0 +1,308 @@
+"""
+Client-facing status reports.
+
+A report covers every project of a client: hours estimated, logged and left,
+percent complete, schedule dates and risk, overall and per top-level task
+(phase). The figures of each project are computed in bulk (two aggregated
+queries for any number of projects) and kept as a ``ProjectSnapshot``, which
+any write to the project's tasks or time entries deletes. A report therefore
+reads its projects and their snapshots with one query and only recomputes the
+projects that changed since they were last reported.
+"""
+import csv
+import io
+from collections import defaultdict
+
+from common.pdf import text_pdf
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q
+from django.utils import timezone
+
+from project.models import Project
+from task.models import ProjectSnapshot, Task
+
+EXPORT_FORMATS = ("csv", "pdf")
+
+CSV_COLUMNS = (
+    "client",
+    "project",
+    "status",
+    "phase",
+    "estimate_hours",
+    "actual_hours",
+    "remaining_hours",
+    "percent_complete",
+    "risk_hours",
+    "scheduled_start",
+    "next_due_date",
+)
+
+
+def percent_complete(estimate, remaining):
+    """Share of the estimate no longer remaining, as a percentage."""
+    if estimate <= 0:
+        return 100.0 if remaining <= 0 else 0.0
+    return round(max(0.0, min(1.0, 1 - remaining / estimate)) * 100, 1)
+
+
+def _iso(value):
+    return value.isoformat() if value is not None else None
+
+
+def compute_snapshots(project_ids):
+    """Return ``{project_id: snapshot data}`` for ``project_ids``."""
+    project_ids = list(project_ids)
+    open_task = ~Q(status=Task.TaskStatus.COMPLETED)
+    leaf = Q(child_count=0)
+    totals = {
+        row["project_id"]: row
+        for row in Task.objects.filter(project_id__in=project_ids)
+        .order_by()
+        .values("project_id")
+        .annotate(
+            tasks=Count("pk", filter=leaf),
+            completed_tasks=Count("pk", filter=leaf & ~open_task),
+            at_risk_tasks=Count("pk", filter=Q(risk_hours__gt=0)),
+            risk_hours=Max("risk_hours"),
+            scheduled_start=Min("schedule_datetime", filter=open_task),
+            last_scheduled_start=Max("schedule_datetime", filter=open_task),
+            next_due_date=Min("due_date", filter=open_task),
+        )
+    }
+    phases = defaultdict(list)
+    for row in (
+        Task.objects.filter(project_id__in=project_ids, parent__isnull=True)
+        .order_by("project_id", "schedule_datetime", "id")
+        .values(
+            "project_id",
+            "id",
+            "name",
+            "status",
+            "dependent_hours",
+            "actual_hours",
+            "remaining_hours",
+            "risk_hours",
+            "schedule_datetime",
+            "due_date",
+        )
+    ):
+        phases[row["project_id"]].append(
+            {
+                "id": row["id"],
+                "name": row["name"],
+                "status": row["status"],
+                "estimate_hours": row["dependent_hours"],
+                "actual_hours": row["actual_hours"],
+                "remaining_hours": row["remaining_hours"],
+                "percent_complete": percent_complete(
+                    row["dependent_hours"], row["remaining_hours"]
+                ),
+                "risk_hours": row["risk_hours"],
+                "scheduled_start": _iso(row["schedule_datetime"]),
+                "due_date": _iso(row["due_date"]),
+            }
+        )
+
+    snapshots = {}
+    for project_id in project_ids:
+        row = totals.get(project_id, {})
+        project_phases = phases.get(project_id, [])
+        estimate = sum(phase["estimate_hours"] for phase in project_phases)
+        remaining = sum(phase["remaining_hours"] for phase in project_phases)
+        snapshots[project_id] = {
+            "estimate_hours": estimate,
+            "actual_hours": sum(phase["actual_hours"] for phase in project_phases),
+            "remaining_hours": remaining,
+            "percent_complete": percent_complete(estimate, remaining),
+            "tasks": row.get("tasks", 0),
+            "completed_tasks": row.get("completed_tasks", 0),
+            "at_risk_tasks": row.get("at_risk_tasks", 0),
+            "risk_hours": row.get("risk_hours") or 0.0,
+            "scheduled_start": _iso(row.get("scheduled_start")),
+            "last_scheduled_start": _iso(row.get("last_scheduled_start")),
+            "next_due_date": _iso(row.get("next_due_date")),
+            "phases": project_phases,
+        }
+    return snapshots
+
+
+def refresh_snapshots(project_ids):
+    """
+    Recompute and store the snapshots of ``project_ids``; returns them. The
+    projects stay locked from before the read until the upsert commits, so a
+    concurrent ``ProjectSnapshotManager.invalidate`` waits and then drops the
+    result rather than being overwritten by it.
+    """
+    with transaction.atomic():
+        ProjectSnapshot.objects.lock_projects(project_ids)
+        snapshots = compute_snapshots(project_ids)
+        ProjectSnapshot.objects.bulk_create(
+            [
+                ProjectSnapshot(project_id=project_id, data=data)
+                for project_id, data in snapshots.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["project"],
+            update_fields=["data", "computed_at"],
+        )
+    return snapshots
+
+
+def client_reports(clients, statuses=None):
+    """
+    Return a report per client in ``clients`` (ids or a queryset): ``{"client":
+    {...}, "generated_at": ..., "projects": [...]}`` with every project's
+    snapshot data alongside its id, name and status. Projects whose snapshot is
+    missing are recomputed in bulk first; otherwise this is one query.
+    """
+    projects = (
+        Project.objects.filter(client__in=clients)
+        .select_related("client", "snapshot")
+        .order_by("client__name", "client_id", "name", "id")
+    )
+    if statuses is not None:
+        projects = projects.filter(status__in=statuses)
+    projects = list(projects)
+    stale = [
+        project.pk for project in projects if not hasattr(project, "snapshot")
+    ]
+    fresh = refresh_snapshots(stale) if stale else {}
+
+    reports = {}
+    generated_at = timezone.now()
+    for project in projects:
+        client = project.client
+        report = reports.setdefault(
+            client.pk,
+            {
+                "client": {
+                    "id": client.pk,
+                    "name": client.name,
+                    "internal": client.internal,
+                },
+                "generated_at": generated_at,
+                "projects": [],
+            },
+        )
+        data = fresh.get(project.pk) or project.snapshot.data
+        report["projects"].append(
+            {
+                "id": project.pk,
+                "name": project.name,
+                "status": project.status,
+                **data,
+            }
+        )
+    return list(reports.values())
+
+
+def client_report(client):
+    """The report of a single client (a ``Client`` or its id)."""
+    reports = client_reports([client])
+    if reports:
+        return reports[0]
+    client_id = getattr(client, "pk", client)
+    return {
+        "client": {"id": client_id},
+        "generated_at": timezone.now(),
+        "projects": [],
+    }
+
+
+# ===============================================================================
+# EXPORT
+# ===============================================================================
+def report_rows(reports):
+    """
+    Yield one ``CSV_COLUMNS`` tuple per project (with an empty phase) and
+    per phase of each project in ``reports``.
+    """
+    for report in reports:
+        client = report["client"].get("name", "")
+        for project in report["projects"]:
+            yield (
+                client,
+                project["name"],
+                project["status"],
+                "",
+                project["estimate_hours"],
+                project["actual_hours"],
+                project["remaining_hours"],
+                project["percent_complete"],
+                project["risk_hours"],
+                project["scheduled_start"] or "",
+                project["next_due_date"] or "",
+            )
+            for phase in project["phases"]:
+                yield (
+                    client,
+                    project["name"],
+                    phase["status"],
+                    phase["name"] or f"Task {phase['id']}",
+                    phase["estimate_hours"],
+                    phase["actual_hours"],
+                    phase["remaining_hours"],
+                    phase["percent_complete"],
+                    phase["risk_hours"],
+                    phase["scheduled_start"] or "",
+                    phase["due_date"] or "",
+                )
+
+
+def render_csv(reports):
+    """Every report in ``reports`` as one CSV document."""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(CSV_COLUMNS)
+    writer.writerows(report_rows(reports))
+    return output.getvalue()
+
+
+def render_pdf(reports):
+    """Every report in ``reports`` as one PDF, a client per page (or more)."""
+    lines = []
+    for report in reports:
+        if lines:
+            lines.append("\f")
+        lines.extend(_report_lines(report))
+    return text_pdf(lines, title="Project status report")
+
+
+def _report_lines(report):
+    generated = timezone.localtime(report["generated_at"]).strftime("%Y-%m-%d %H:%M")
+    lines = [
+        f"Status report: {report['client'].get('name', '')}",
+        f"Generated {generated}",
+        "",
+    ]
+    header = f"{'':<38}{'Est.':>8}{'Actual':>8}{'Left':>8}{'Done':>7}{'Risk':>7}"
+    for project in report["projects"]:
+        lines.append(f"{project['name']} ({project['status']})")
+        lines.append(
+            f"  Tasks {project['completed_tasks']}/{project['tasks']} complete, "
+            f"{project['at_risk_tasks']} at risk. Starts "
+            f"{(project['scheduled_start'] or '-')[:10]}, next due "
+            f"{project['next_due_date'] or '-'}"
+        )
+        lines.append(header)
+        for name, row in [("Total", project)] + [
+            (phase["name"] or f"Task {phase['id']}", phase)
+            for phase in project["phases"]
+        ]:
+            lines.append(
+                f"  {name[:36]:<36}{row['estimate_hours']:>8.1f}"
+                f"{row['actual_hours']:>8.1f}{row['remaining_hours']:>8.1f}"
+                f"{row['percent_complete']:>6.1f}%{row['risk_hours']:>7.1f}"
+            )
+        lines.append("")
+    return lines
+
+
+def export_reports(clients, export_format):
+    """Return ``(content, content_type, extension)`` for ``clients``."""
+    reports = client_reports(clients)
+    if export_format == "csv":
+        return render_csv(reports), "text/csv", "csv"
+    if export_format == "pdf":
+        return render_pdf(reports), "application/pdf", "pdf"
+    raise ValueError(f"Unknown export format {export_format!r}")
@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta
+
+from common.pagination import EstimatedCountPaginator
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+from django.utils import timezone
+
+from client.models import Client
+from task.models import Task, TimeEntry
+
+START = timezone.make_aware(datetime(2026, 1, 5, 9))
+
+
+class AdminPageCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = get_user_model().objects.create_superuser(username="admin")
+        return super().setUpTestData()
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def add_rows(self, count):
+        """Add ``count`` projects, each with a two-level tree and a time entry."""
+        logged = TimeEntry.objects.count()
+        for i in range(logged, logged + count):
+            project = Client.objects.create(name=f"Client {i}").projects.create(
+                name="Project"
+            )
+            root = project.tasks.create(name="Phase", assigned_to=self.admin)
+            leaf = project.tasks.create(
+                name="Leaf", parent=root, assigned_to=self.admin, hours_estimate=1
+            )
+            leaf.prerequisites.add(project.tasks.create(name="Kickoff", parent=root))
+            TimeEntry.objects.create(
+                task=leaf,
+                user=self.admin,
+                start_time=START + timedelta(hours=i),
+                end_time=START + timedelta(hours=i, minutes=30),
+            )
+        return root, leaf
+
+    def assertFixedQueries(self, url, expected):
+        """Should render ``url`` in ``expected`` queries at any table size."""
+        for count in (1, 5):
+            self.add_rows(count)
+            ContentType.objects.clear_cache()
+            with self.assertNumQueries(expected):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_changelists(self):
+        """Should list every task model with a fixed number of queries."""
+        # Session, user, count, page.
+        for url in [
+            "/admin/task/task/",
+            "/admin/task/timeentry/",
+            "/admin/task/dailytime/",
+            "/admin/task/projectsnapshot/",
+            "/admin/task/reschedulejob/",
+        ]:
+            with self.subTest(url=url):
+                self.assertFixedQueries(url, 4)
+
+    def test_maintained_rows_cannot_be_deleted(self):
+        """Should refuse to delete rows the application maintains."""
+        self.add_rows(1)
+        response = self.client.get("/admin/task/dailytime/")
+        self.assertNotContains(response, "delete_selected")
+        pk = response.context["cl"].result_list[0].pk
+        response = self.client.post(f"/admin/task/dailytime/{pk}/delete/")
+        self.assertEqual(response.status_code, 403)
+
+    def test_tree_levels(self):
+        """Should list one level of the tree, with the path to it."""
+        root, leaf = self.add_rows(1)
+        response = self.assertFixedQueries("/admin/task/task/?parent=roots", 4)
+        self.assertContains(response, f'?parent={root.pk}">2 &#9656;</a>')
+        self.assertNotContains(response, f"/admin/task/task/{leaf.pk}/change/")
+        # One more query for the ancestors.
+        response = self.assertFixedQueries(f"/admin/task/task/?parent={root.pk}", 5)
+        self.assertContains(response, f"/admin/task/task/{leaf.pk}/change/")
+        self.assertContains(response, f'<a href="?parent={root.pk}">Phase</a>')
+
+    def test_change_form(self):
+        """Should render related fields as autocomplete widgets, not full lists."""
+        _, leaf = self.add_rows(1)
+        # Session, user, task, its prerequisites, content type, then one per
+        # selected project, parent, prerequisites and assignee.
+        response = self.assertFixedQueries(f"/admin/task/task/{leaf.pk}/change/", 9)
+        for field in ("project", "parent", "prerequisites", "assigned_to"):
+            self.assertContains(response, f'data-field-name="{field}"')
+        # Session, user, content type.
+        self.assertFixedQueries("/admin/task/task/add/", 3)
+
+    def test_autocomplete(self):
+        """Should search tasks for the parent field a page at a time."""
+        root, _ = self.add_rows(1)
+        response = self.assertFixedQueries(
+            "/admin/autocomplete/?app_label=task&model_name=task"
+            "&field_name=parent&term=Phase",
+            4,
+        )
+        self.assertIn(str(root.pk), [row["id"] for row in response.json()["results"]])
+
+    def test_paginator_counts_small_results_exactly(self):
+        """Should fall back to COUNT(*) below the estimate threshold."""
+        self.add_rows(2)
+        paginator = EstimatedCountPaginator(Task.objects.order_by("id"), 5)
+        self.assertEqual(paginator.count, 6)
+
+    def test_project_autocomplete(self):
+        """Should search projects without a query per result for its client."""
+        self.assertFixedQueries(
+            "/admin/autocomplete/?app_label=task&model_name=task"
+            "&field_name=project&term=Project",
+            4,
+        )
@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from client.models import Client
+from task.models import TimeEntry
+
+START = timezone.make_aware(datetime(2026, 1, 5, 9))
+
+
+class ReportViewSetCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create(username="consultant")
+        cls.project = Client.objects.create().projects.create()
+        task = cls.project.tasks.create(hours_estimate=4)
+        TimeEntry.objects.create(
+            task=task,
+            user=cls.user,
+            start_time=START,
+            end_time=START + timedelta(hours=2),
+        )
+        return super().setUpTestData()
+
+    def setUp(self):
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def test_timesheet(self):
+        """Should group hours by the requested fields."""
+        response = self.api.get(
+            "/api/reports/timesheet/",
+            {"start": "2026-01-01", "end": "2026-02-01", "group_by": "project,day"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            [{"project": self.project.pk, "day": "2026-01-05", "hours": 2.0}],
+        )
+
+    def test_invalid_params(self):
+        """Should reject unknown groupings and empty ranges."""
+        response = self.api.get(
+            "/api/reports/timesheet/",
+            {"start": "2026-02-01", "end": "2026-01-01", "group_by": "colour"},
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_estimate_vs_actual(self):
+        """Should report a project's estimate, actual and remaining hours."""
+        response = self.api.get(
+            "/api/reports/estimate-vs-actual/", {"projects": str(self.project.pk)}
+        )
+        self.assertEqual(response.status_code, 200)
+        row = response.json()[0]
+        self.assertEqual(
+            (row["estimate_hours"], row["actual_hours"], row["remaining_hours"]),
+            (4, 2, 2),
+        )
@@ -0,0 +1,140 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from client.models import Client
+from task.models import Task
+
+
+class TaskViewSetCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create(username="planner")
+        client = Client.objects.create(name="Client")
+        cls.project = client.projects.create(name="Project")
+        parent = cls.project.tasks.create(name="Parent", assigned_to=cls.user)
+        previous = None
+        for i in range(60):
+            task = cls.project.tasks.create(
+                name=f"Task {i}", parent=parent, assigned_to=cls.user, hours_estimate=1
+            )
+            if previous is not None:
+                task.prerequisites.add(previous)
+            previous = task
+        return super().setUpTestData()
+
+    def setUp(self):
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def test_list_query_count_independent_of_page_size(self):
+        """Should list a page with the same three queries at any page size."""
+        for page_size in (5, 50):
+            with self.assertNumQueries(3):
+                response = self.api.get(
+                    "/api/tasks/", {"project": self.project.id, "page_size": page_size}
+                )
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.data["results"]), page_size)
+
+    def test_cursor_pages_cover_every_task(self):
+        """Should walk every task exactly once by following the next cursor."""
+        seen, url = [], "/api/tasks/?page_size=25"
+        while url:
+            response = self.api.get(url)
+            seen.extend(task["id"] for task in response.data["results"])
+            url = response.data["next"]
+        self.assertEqual(len(seen), 61)
+        self.assertEqual(seen, sorted(set(seen)))
+
+    def test_serializes_related_names(self):
+        """Should include names read through the joined relations."""
+        response = self.api.get("/api/tasks/", {"page_size": 2})
+        parent, child = response.data["results"]
+        self.assertEqual(parent["client_name"], "Client")
+        self.assertEqual(child["parent_name"], "Parent")
+        self.assertEqual(len(parent["children"]), 60)
+
+    def test_create_rejects_prerequisite_cycle(self):
+        """Should answer 400 when a new prerequisite would close a cycle."""
+        first = self.project.tasks.create(name="First")
+        second = self.project.tasks.create(name="Second")
+        second.prerequisites.add(first)
+
+        response = self.api.patch(
+            f"/api/tasks/{first.id}/", {"prerequisites": [second.id]}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_rejected_update_saves_nothing(self):
+        """Should roll back the fields saved before a rejected prerequisite."""
+        first = self.project.tasks.create(name="First")
+        second = self.project.tasks.create(name="Second")
+        second.prerequisites.add(first)
+
+        response = self.api.patch(
+            f"/api/tasks/{first.id}/",
+            {"name": "Renamed", "prerequisites": [second.id]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        first.refresh_from_db()
+        self.assertEqual(first.name, "First")
+
+    def test_invalid_filters(self):
+        """Should answer 400 for filters that are not ids."""
+        for name in ("project", "parent", "assigned_to"):
+            with self.subTest(name=name):
+                response = self.api.get(f"/api/tasks/?{name}=abc")
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(name, response.data)
+
+    def test_requires_authentication(self):
+        """Should refuse anonymous requests."""
+        self.assertEqual(APIClient().get("/api/tasks/").status_code, 403)
+
+    def test_batch_applies_operations(self):
+        """Should apply a batch and return the ids of the created tasks."""
+        response = self.api.post(
+            "/api/tasks/batch/",
+            {"operations": [
+                {"op": "create", "ref": "a", "project": self.project.id, "name": "A"},
+                {"op": "create", "ref": "b", "project": self.project.id,
+                 "parent": "a", "name": "B"},
+            ]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        b = Task.objects.get(pk=response.data["created"]["b"])
+        self.assertEqual(b.parent_id, response.data["created"]["a"])
+
+    def test_batch_reports_errors_by_operation(self):
+        """Should respond 400 with the errors keyed by operation index."""
+        response = self.api.post(
+            "/api/tasks/batch/",
+            {"operations": [
+                {"op": "create", "project": self.project.id, "name": "Kept?"},
+                {"op": "move", "task": 0, "parent": None},
+            ]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.data["operations"]), [1])
+        self.assertFalse(Task.objects.filter(name="Kept?").exists())
+
+    def test_clone_copies_subtree(self):
+        """Should copy a task's subtree into another project."""
+        target = Client.objects.create().projects.create()
+        parent = self.project.tasks.get(name="Parent")
+        response = self.api.post(
+            f"/api/tasks/{parent.pk}/clone/", {"project": target.pk}, format="json"
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["edges"], 59)
+        self.assertEqual(target.tasks.count(), 61)
+        response = self.api.post(
+            f"/api/tasks/{parent.pk}/clone/",
+            {"project": target.pk, "parent": parent.pk},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from client.models import Client
+
+START = timezone.make_aware(datetime(2026, 1, 5, 9))
+
+
+class TimeEntryViewSetCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create(username="consultant")
+        project = Client.objects.create().projects.create()
+        cls.task = project.tasks.create(hours_estimate=40)
+        for day in range(30):
+            cls.task.time_entries.create(
+                user=cls.user,
+                start_time=START + timedelta(days=day),
+                end_time=START + timedelta(days=day, hours=2),
+            )
+        return super().setUpTestData()
+
+    def setUp(self):
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def test_list_query_count_independent_of_page_size(self):
+        """Should list a page with one query at any page size."""
+        for page_size in (5, 30):
+            with self.assertNumQueries(1):
+                response = self.api.get("/api/time-entries/", {"page_size": page_size})
+            self.assertEqual(len(response.data["results"]), page_size)
+        self.assertEqual(response.data["results"][0]["hours"], 2)
+
+    def test_filters_by_task_and_user(self):
+        """Should narrow the list to ``?task=`` and ``?user=``."""
+        response = self.api.get(
+            "/api/time-entries/",
+            {"task": self.task.id, "user": self.user.id, "page_size": 50},
+        )
+        self.assertEqual(len(response.data["results"]), 30)
+        response = self.api.get("/api/time-entries/", {"user": self.user.id + 1})
+        self.assertEqual(response.data["results"], [])
+
+    def test_invalid_filters_rejected(self):
+        """Should answer 400 for filters that are not ids."""
+        for name in ("task", "user"):
+            with self.subTest(name=name):
+                response = self.api.get(f"/api/time-entries/?{name}=abc")
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(name, response.data)
+
+    def test_create_on_parent_task_rejected(self):
+        """Should answer 400 when logging time against a parent task."""
+        self.task.project.tasks.create(parent=self.task)
+        response = self.api.post(
+            "/api/time-entries/",
+            {"task": self.task.id, "start_time": START, "end_time": START},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_create_overlapping_rejected(self):
+        """Should answer 400 when the entry overlaps another of the user's."""
+        response = self.api.post(
+            "/api/time-entries/",
+            {
+                "task": self.task.id,
+                "user": self.user.id,
+                "start_time": START + timedelta(hours=1),
+                "end_time": START + timedelta(hours=3),
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_timer_start_switch_stop(self):
+        """Should drive the requesting user's timer through the timer actions."""
+        other = self.task.project.tasks.create()
+        response = self.api.post(
+            "/api/time-entries/timer/start/", {"task": self.task.id}, format="json"
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            self.api.get("/api/time-entries/timer/").data["id"], response.data["id"]
+        )
+        response = self.api.post(
+            "/api/time-entries/timer/switch/", {"task": other.id}, format="json"
+        )
+        self.assertEqual(response.data["started"]["task"], other.id)
+        response = self.api.post("/api/time-entries/timer/stop/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(response.data["end_time"])
+        self.assertIsNone(self.api.get("/api/time-entries/timer/").data)
+
+    def test_timer_stop_without_timer_rejected(self):
+        """Should answer 400 when no timer is running."""
+        response = self.api.post("/api/time-entries/timer/stop/")
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,47 @@
+from datetime import date, datetime
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from client.models import Client
+from project.models import Project
+from task.assignment import assign_tasks
+from task.scheduling import WorkCalendar
+
+
+class AssignTasksCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        client = Client.objects.create()
+        cls.project = client.projects.create(status=Project.ProjectStatus.BOOKED)
+        User = get_user_model()
+        cls.user1 = User.objects.create(username="user1", daily_capacity_hours=8)
+        cls.user2 = User.objects.create(username="user2", daily_capacity_hours=8)
+        cls.calendar = WorkCalendar(date(2026, 1, 5), hours_per_day=8, day_start_hour=9)
+        cls.now = timezone.make_aware(datetime(2026, 1, 5, 9))
+        return super().setUpTestData()
+
+    def test_assigns_around_manual_work(self):
+        """Should give auto-assigned work to the user without manual bookings."""
+        self.project.tasks.create(
+            hours_estimate=8, auto_assign=False, assigned_to=self.user1
+        )
+        task = self.project.tasks.create(hours_estimate=8, auto_assign=True)
+
+        assign_tasks(calendar=self.calendar, now=self.now)
+
+        task.refresh_from_db()
+        self.assertEqual(task.assigned_to, self.user2)
+
+    def test_skips_unscheduled_projects(self):
+        """Should leave tasks in projects that are not booked or started alone."""
+        project = Client.objects.create().projects.create(
+            status=Project.ProjectStatus.COMPLETED
+        )
+        task = project.tasks.create(hours_estimate=8, auto_assign=True)
+
+        assign_tasks(calendar=self.calendar, now=self.now)
+
+        task.refresh_from_db()
+        self.assertIsNone(task.assigned_to)
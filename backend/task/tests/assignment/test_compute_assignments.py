@@ -0,0 +1,73 @@
+import time
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from task.assignment import AssignmentTask, compute_assignments
+
+
+def task(task_id, hours, start_day=0, priority=0, due_day=0, assigned_to_id=None):
+    return AssignmentTask(task_id, hours, start_day, priority, due_day, assigned_to_id)
+
+
+class ComputeAssignmentsCases(SimpleTestCase):
+    def test_spreads_work_across_users(self):
+        """Should give the second task to the idle user."""
+        result = compute_assignments([task(1, 8), task(2, 8)], {10: 8, 20: 8})
+        self.assertEqual(set(result.assignments.values()), {10, 20})
+        self.assertEqual(result.finish_days, {1: 0, 2: 0})
+
+    def test_never_over_allocates(self):
+        """Should push work to later days instead of exceeding capacity."""
+        result = compute_assignments([task(1, 6), task(2, 6)], {10: 8})
+        self.assertEqual(result.finish_days, {1: 0, 2: 1})
+
+    def test_priority_order(self):
+        """Should plan higher-priority projects first."""
+        result = compute_assignments(
+            [task(1, 8, priority=0), task(2, 8, priority=5)], {10: 8}
+        )
+        self.assertEqual(result.finish_days, {2: 0, 1: 1})
+
+    def test_due_date_order(self):
+        """Should plan earlier due dates first within a priority."""
+        result = compute_assignments(
+            [task(1, 8, due_day=20), task(2, 8, due_day=10)], {10: 8}
+        )
+        self.assertEqual(result.finish_days, {2: 0, 1: 1})
+
+    def test_keeps_current_assignee_on_tie(self):
+        """Should not reshuffle a task when its assignee is as good as anyone."""
+        result = compute_assignments([task(1, 4, assigned_to_id=20)], {10: 8, 20: 8})
+        self.assertEqual(result.assignments, {1: 20})
+
+    def test_booked_hours(self):
+        """Should respect hours already booked by manual assignments."""
+        booked = np.zeros((1, 10))
+        booked[0, 0] = 8
+        result = compute_assignments(
+            [task(1, 4)], {10: 8}, booked=booked, horizon_days=10
+        )
+        self.assertEqual(result.finish_days, {1: 1})
+
+    def test_does_not_fit(self):
+        """Should report tasks that cannot finish within the horizon."""
+        result = compute_assignments([task(1, 100)], {10: 8}, horizon_days=5)
+        self.assertEqual(result.unassigned, [1])
+
+    def test_large_portfolio(self):
+        """Should plan 50 users x 20k tasks in a few seconds."""
+        rng = np.random.default_rng(3)
+        tasks = [
+            task(
+                i,
+                float(rng.integers(1, 16)),
+                start_day=int(rng.integers(0, 120)),
+                priority=int(rng.integers(0, 3)),
+            )
+            for i in range(20_000)
+        ]
+        started = time.perf_counter()
+        result = compute_assignments(tasks, {user: 8 for user in range(50)})
+        self.assertLess(time.perf_counter() - started, 10)
+        self.assertEqual(len(result.assignments) + len(result.unassigned), 20_000)
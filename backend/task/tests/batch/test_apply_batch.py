@@ -0,0 +1,205 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from client.models import Client
+from task.batch import BatchError, apply_batch
+from task.models import Task
+
+
+@override_settings(SCHEDULING_QUEUE_BACKEND="inline")
+class ApplyBatchCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        client = Client.objects.create(name="Client")
+        cls.project = client.projects.create(name="Project")
+        cls.other_project = client.projects.create(name="Other")
+        cls.root = cls.project.tasks.create(name="Root")
+        cls.leaf = cls.project.tasks.create(
+            name="Leaf", parent=cls.root, hours_estimate=2
+        )
+        return super().setUpTestData()
+
+    def test_creates_tree_with_refs(self):
+        """Should create nested tasks whose parents are other rows of the batch."""
+        result = apply_batch(
+            [
+                {"op": "create", "ref": "a", "project": self.project.id,
+                 "parent": self.root.id, "name": "A"},
+                {"op": "create", "ref": "b", "project": self.project.id,
+                 "parent": "a", "name": "B", "hours_estimate": 3},
+                {"op": "link", "task": "b", "prerequisite": self.leaf.id},
+            ]
+        )
+        a = Task.objects.get(pk=result.created["a"])
+        b = Task.objects.get(pk=result.created["b"])
+        self.assertEqual(b.parent_id, a.id)
+        self.assertEqual(b.path, f"{self.root.id}/{a.id}/{b.id}/")
+        self.assertEqual(
+            list(b.prerequisites.values_list("id", flat=True)), [self.leaf.id]
+        )
+        self.assertEqual(result.linked, 1)
+        self.root.refresh_from_db()
+        self.assertEqual(self.root.child_count, 2)
+        self.assertEqual(self.root.dependent_hours, 5)
+
+    def test_moves_and_updates_refresh_maintained_columns(self):
+        """Should re-parent, update estimates and rebuild paths and rollups."""
+        result = apply_batch(
+            [
+                {"op": "create", "ref": "group", "project": self.project.id,
+                 "name": "Group"},
+                {"op": "move", "task": self.leaf.id, "parent": "group"},
+                {"op": "update", "task": self.leaf.id, "hours_estimate": 4,
+                 "name": "Renamed"},
+            ]
+        )
+        group = Task.objects.get(pk=result.created["group"])
+        leaf = Task.objects.get(pk=self.leaf.id)
+        self.assertEqual(result.updated, [self.leaf.id])
+        self.assertEqual(leaf.name, "Renamed")
+        self.assertEqual(leaf.path, f"{group.id}/{leaf.id}/")
+        self.assertEqual(group.child_count, 1)
+        self.assertEqual(group.dependent_hours, 4)
+        self.root.refresh_from_db()
+        self.assertEqual((self.root.child_count, self.root.dependent_hours), (0, 0))
+
+    def test_unlinks_prerequisites(self):
+        """Should remove the named prerequisite links."""
+        other = self.project.tasks.create(name="Other", parent=self.root)
+        other.prerequisites.add(self.leaf)
+        result = apply_batch(
+            [{"op": "unlink", "task": other.id, "prerequisite": self.leaf.id}]
+        )
+        self.assertEqual(result.unlinked, 1)
+        self.assertFalse(other.prerequisites.exists())
+
+    def test_rejects_parent_cycle_and_writes_nothing(self):
+        """Should reject a move under the task's own subtree and roll back."""
+        with self.assertRaises(BatchError) as raised:
+            apply_batch(
+                [
+                    {"op": "create", "ref": "a", "project": self.project.id,
+                     "name": "A"},
+                    {"op": "move", "task": self.root.id, "parent": self.leaf.id},
+                ]
+            )
+        self.assertEqual(list(raised.exception.operation_errors), [1])
+        self.assertFalse(Task.objects.filter(name="A").exists())
+        self.assertIsNone(Task.objects.get(pk=self.root.id).parent_id)
+
+    def test_rejects_prerequisite_cycle(self):
+        """Should reject links that close a prerequisite cycle within the batch."""
+        with self.assertRaises(BatchError) as raised:
+            apply_batch(
+                [
+                    {"op": "create", "ref": "a", "project": self.project.id,
+                     "name": "A"},
+                    {"op": "link", "task": "a", "prerequisite": self.leaf.id},
+                    {"op": "link", "task": self.leaf.id, "prerequisite": "a"},
+                ]
+            )
+        self.assertEqual(sorted(raised.exception.operation_errors), [1, 2])
+        self.assertFalse(Task.objects.filter(name="A").exists())
+
+    def test_rejects_estimate_on_parent(self):
+        """Should reject moving a task under a task that has an estimate."""
+        with self.assertRaises(BatchError) as raised:
+            apply_batch([{"op": "move", "task": self.root.id, "parent": None},
+                         {"op": "create", "project": self.project.id,
+                          "parent": self.leaf.id, "name": "Child"}])
+        self.assertEqual(list(raised.exception.operation_errors), [1])
+
+    def test_reverses_prerequisite(self):
+        """Should see an unlink when a later link in the batch checks for cycles."""
+        other = self.project.tasks.create(name="Other", parent=self.root)
+        other.prerequisites.add(self.leaf)
+        result = apply_batch(
+            [
+                {"op": "unlink", "task": other.id, "prerequisite": self.leaf.id},
+                {"op": "link", "task": self.leaf.id, "prerequisite": other.id},
+            ]
+        )
+        self.assertEqual((result.unlinked, result.linked), (1, 1))
+        self.assertFalse(other.prerequisites.exists())
+        self.assertQuerySetEqual(self.leaf.prerequisites.all(), [other])
+
+    def test_clears_estimate_before_adding_child(self):
+        """Should let a task become a parent once an earlier update clears it."""
+        result = apply_batch(
+            [
+                {"op": "update", "task": self.leaf.id, "hours_estimate": 0},
+                {"op": "create", "ref": "a", "project": self.project.id,
+                 "parent": self.leaf.id, "hours_estimate": 1},
+            ]
+        )
+        self.leaf.refresh_from_db()
+        self.assertEqual(self.leaf.child_count, 1)
+        self.assertEqual(self.leaf.dependent_hours, 1)
+        self.assertEqual(result.updated, [self.leaf.id])
+
+    def test_reports_constraint_violations_by_operation(self):
+        """Should report rows breaking check constraints at their operation."""
+        with self.assertRaises(BatchError) as raised:
+            apply_batch(
+                [
+                    {"op": "update", "task": self.leaf.id, "name": "Renamed"},
+                    {"op": "update", "task": self.leaf.id, "hours_estimate": -1},
+                    {"op": "create", "project": self.project.id,
+                     "hours_estimate": 4, "hours_pessimistic": 2},
+                ]
+            )
+        self.assertEqual(sorted(raised.exception.operation_errors), [1, 2])
+        self.assertEqual(Task.objects.get(pk=self.leaf.id).name, "Leaf")
+
+    def test_reports_malformed_operations(self):
+        """Should report unknown ops, keys and refs before touching the database."""
+        with self.assertNumQueries(0), self.assertRaises(BatchError) as raised:
+            apply_batch(
+                [
+                    {"op": "delete", "task": 1},
+                    {"op": "update", "task": 1, "path": "1/"},
+                    {"op": "move", "task": "missing", "parent": None},
+                ]
+            )
+        self.assertEqual(sorted(raised.exception.operation_errors), [0, 1, 2])
+
+    def test_reports_malformed_ids_and_refs(self):
+        """Should reject ids and refs of the wrong type before querying."""
+        with self.assertNumQueries(0), self.assertRaises(BatchError) as raised:
+            apply_batch(
+                [
+                    {"op": "create", "ref": [], "project": self.project.id},
+                    {"op": "create", "ref": "a", "project": "x"},
+                    {"op": "update", "task": True, "name": "Renamed"},
+                    {"op": "update", "task": self.leaf.id, "assigned_to": "x"},
+                    {"op": "update", "task": self.leaf.id, "assigned_to": {}},
+                    {"op": "link", "task": self.leaf.id, "prerequisite": 1.5},
+                ]
+            )
+        self.assertEqual(
+            sorted(raised.exception.operation_errors), [0, 1, 2, 3, 4, 5]
+        )
+
+    def test_query_count_independent_of_batch_size(self):
+        """Should apply a batch with the same number of queries at any size."""
+
+        def operations(count):
+            ops = [{"op": "create", "ref": "group", "project": self.project.id,
+                    "name": "Group"}]
+            for i in range(count):
+                ops.append({"op": "create", "ref": f"t{i}", "project": self.project.id,
+                            "parent": "group", "name": f"T{i}", "hours_estimate": 1})
+                if i:
+                    ops.append({"op": "link", "task": f"t{i}",
+                                "prerequisite": f"t{i - 1}"})
+            ops.append({"op": "move", "task": self.leaf.id, "parent": "group"})
+            ops.append({"op": "update", "task": self.leaf.id, "status": "COMPLETED"})
+            return ops
+
+        counts = []
+        for count in (5, 25):
+            with CaptureQueriesContext(connection) as queries:
+                apply_batch(operations(count))
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
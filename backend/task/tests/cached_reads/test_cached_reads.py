@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+
+from common.cache import get_cache
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from client.models import Client
+from task.assignment import assign_tasks
+from task.batch import apply_batch
+from task.cached_reads import project_rollup, project_tree, user_tasks
+from task.models import Task, TimeEntry
+from task.timers import start_timer, stop_timer
+
+START = timezone.make_aware(datetime(2026, 1, 5, 9))
+
+
+class CachedReadCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create(username="consultant")
+        cls.project = Client.objects.create().projects.create()
+        cls.parent = cls.project.tasks.create(name="Phase")
+        cls.leaf = cls.project.tasks.create(
+            parent=cls.parent, hours_estimate=4, assigned_to=cls.user
+        )
+        return super().setUpTestData()
+
+    def setUp(self):
+        get_cache().clear()
+
+    def test_tree_served_from_cache(self):
+        """Should read a project's tree once until one of its tasks changes."""
+        project_tree(self.project.pk)
+        with self.assertNumQueries(0):
+            roots, children = project_tree(self.project.pk)
+        self.assertEqual([row[0] for row in roots], [self.parent.pk])
+        self.leaf.name = "Renamed"
+        self.leaf.save()
+        _, children = project_tree(self.project.pk)
+        self.assertEqual(children[self.parent.pk][0][2], "Renamed")
+
+    def test_rollup_sees_logged_time(self):
+        """Should recompute a project's rollup after time is logged on it."""
+        self.assertEqual(project_rollup(self.project.pk)["actual_hours"], 0)
+        start_timer(self.user, self.leaf.pk, at=START)
+        with self.captureOnCommitCallbacks(execute=True):
+            stop_timer(self.user, at=START + timedelta(hours=1))
+        self.assertEqual(project_rollup(self.project.pk)["actual_hours"], 1)
+        TimeEntry.objects.all().delete()
+        self.assertEqual(project_rollup(self.project.pk)["actual_hours"], 0)
+
+    def test_user_tasks(self):
+        """Should list a user's open tasks and follow new assignments."""
+        self.assertEqual(
+            [task["id"] for task in user_tasks(self.user.pk)], [self.leaf.pk]
+        )
+        with self.assertNumQueries(0):
+            user_tasks(self.user.pk)
+        other = Client.objects.create().projects.create()
+        task = other.tasks.create(hours_estimate=1)
+        task.assigned_to = self.user
+        task.save()
+        self.assertEqual(
+            {task["id"] for task in user_tasks(self.user.pk)}, {self.leaf.pk, task.pk}
+        )
+        Task.objects.filter(pk=self.leaf.pk).delete()
+        self.assertEqual([task["id"] for task in user_tasks(self.user.pk)], [task.pk])
+
+    def test_user_tasks_follow_reopened_task(self):
+        """Should list a task of another project once it is reopened."""
+        other = Client.objects.create().projects.create()
+        task = other.tasks.create(
+            hours_estimate=1, assigned_to=self.user, status=Task.TaskStatus.COMPLETED
+        )
+        self.assertEqual(
+            [row["id"] for row in user_tasks(self.user.pk)], [self.leaf.pk]
+        )
+        task.status = Task.TaskStatus.IN_PROCESS
+        task.save()
+        self.assertIn(task.pk, [row["id"] for row in user_tasks(self.user.pk)])
+        task.status = Task.TaskStatus.COMPLETED
+        task.save()
+        self.assertNotIn(task.pk, [row["id"] for row in user_tasks(self.user.pk)])
+        apply_batch([{"op": "update", "task": task.pk, "status": "NOT_STARTED"}])
+        self.assertIn(task.pk, [row["id"] for row in user_tasks(self.user.pk)])
+
+    def test_user_tasks_follow_auto_assignment(self):
+        """Should see tasks the auto-assigner hands to the user."""
+        self.project.status = self.project.ProjectStatus.STARTED
+        self.project.save()
+        task = self.project.tasks.create(
+            parent=self.parent, hours_estimate=1, schedule_datetime=START
+        )
+        self.assertEqual(len(user_tasks(self.user.pk)), 1)
+        assign_tasks(now=START)
+        self.assertIn(task.pk, [row["id"] for row in user_tasks(self.user.pk)])
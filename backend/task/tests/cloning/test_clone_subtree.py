@@ -0,0 +1,123 @@
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+
+from client.models import Client
+from project.models import ProjectType
+from task.cloning import clone_subtree, instantiate_template
+from task.models import Task
+
+
+def build_tree(project, phases, leaves):
+    """A root with ``phases`` phases of ``leaves`` chained leaves each."""
+    root = project.tasks.create(name="Root")
+    previous = None
+    for i in range(phases):
+        phase = project.tasks.create(name=f"Phase {i}", parent=root, buffer_after=1)
+        for j in range(leaves):
+            leaf = project.tasks.create(
+                name=f"Leaf {i}.{j}", parent=phase, hours_estimate=j + 1
+            )
+            if previous is not None:
+                leaf.prerequisites.add(previous)
+            previous = leaf
+    return root
+
+
+class CloneSubtreeCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        client = Client.objects.create()
+        cls.source = client.projects.create(name="Source")
+        cls.target = client.projects.create(name="Target")
+        cls.root = build_tree(cls.source, 2, 3)
+        return super().setUpTestData()
+
+    def assertNoDrift(self, project):
+        tasks = Task.objects.filter(project=project)
+        self.assertEqual(
+            (
+                tasks.rebuild_paths(),
+                tasks.rebuild_child_counts(),
+                tasks.rebuild_rollups(),
+            ),
+            (0, 0, 0),
+        )
+
+    def test_copies_tree(self):
+        """Should copy names, estimates, buffers, parents and prerequisites."""
+        result = clone_subtree(self.root, self.target)
+
+        def shape(project):
+            tasks = Task.objects.filter(project=project)
+            by_id = {task.pk: task for task in tasks}
+            return sorted(
+                (
+                    task.name,
+                    task.hours_estimate,
+                    task.buffer_after,
+                    by_id[task.parent_id].name if task.parent_id else None,
+                    sorted(p.name for p in task.prerequisites.all()),
+                )
+                for task in tasks
+            )
+
+        self.assertEqual(shape(self.target), shape(self.source))
+        self.assertEqual(len(result.created), 9)
+        self.assertEqual(result.edges, 5)
+        self.assertEqual(Task.objects.get(pk=result.roots[0]).dependent_hours, 12)
+        self.assertNoDrift(self.target)
+
+    def test_query_count_independent_of_size(self):
+        """Should copy a tree with a fixed number of queries."""
+        small = build_tree(self.source, 1, 2)
+        # Small enough for one INSERT under SQLite's parameter limit.
+        large = build_tree(self.source, 4, 10)
+        # Read rows, read edges, insert tasks, link parents, insert edges,
+        # drop the report snapshot, plus the savepoint and its release.
+        for root in (small, large):
+            with self.assertNumQueries(8):
+                clone_subtree(root, self.target)
+
+    def test_clone_under_parent(self):
+        """Should hang the copy under a parent and roll its hours up."""
+        parent = self.target.tasks.create(name="Existing")
+        result = clone_subtree(self.root, self.target, parent=parent)
+        parent.refresh_from_db()
+        self.assertEqual(parent.child_count, 1)
+        self.assertEqual(parent.dependent_hours, 12)
+        self.assertEqual(Task.objects.get(pk=result.roots[0]).parent_id, parent.pk)
+        self.assertNoDrift(self.target)
+
+    def test_rejects_invalid_parent(self):
+        """Should refuse a leaf with an estimate or a task of another project."""
+        leaf = self.target.tasks.create(hours_estimate=2)
+        with self.assertRaises(ValidationError):
+            clone_subtree(self.root, self.target, parent=leaf)
+        with self.assertRaises(ValidationError):
+            clone_subtree(self.root, self.target, parent=self.root)
+        self.assertEqual(Task.objects.filter(project=self.target).count(), 1)
+
+
+class InstantiateTemplateCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        client = Client.objects.create()
+        template = client.projects.create(name="Audit template")
+        build_tree(template, 2, 2)
+        cls.audit = ProjectType.objects.create(name="Audit", template=template)
+        cls.project = client.projects.create(name="Audit 2026", type=cls.audit)
+        return super().setUpTestData()
+
+    def test_copies_template_tree(self):
+        """Should copy every task of the type's template project."""
+        result = instantiate_template(self.project)
+        self.assertEqual(len(result.roots), 1)
+        self.assertEqual(self.project.tasks.count(), 7)
+        self.assertEqual(self.project.tasks.get(parent=None).dependent_hours, 6)
+
+    def test_requires_template(self):
+        """Should refuse a project whose type has no template."""
+        self.audit.template = None
+        self.audit.save()
+        with self.assertRaises(ValidationError):
+            instantiate_template(self.project)
@@ -0,0 +1,33 @@
+from django.test import SimpleTestCase
+
+from task.graph import find_cycle
+
+
+class FindCycleCases(SimpleTestCase):
+    def test_no_edges(self):
+        """Should return None."""
+        self.assertIsNone(find_cycle([], [1]))
+
+    def test_diamond(self):
+        """Should return None."""
+        edges = [(4, 2), (4, 3), (2, 1), (3, 1)]
+        self.assertIsNone(find_cycle(edges, [4]))
+
+    def test_self_reference(self):
+        """Should return the single-node cycle."""
+        self.assertEqual(find_cycle([(1, 1)], [1]), [1, 1])
+
+    def test_cycle_reachable_from_start(self):
+        """Should return the cycle even if the start node is not part of it."""
+        edges = [(1, 2), (2, 3), (3, 2)]
+        self.assertEqual(find_cycle(edges, [1]), [2, 3, 2])
+
+    def test_cycle_not_reachable_from_start(self):
+        """Should return None."""
+        edges = [(1, 2), (3, 4), (4, 3)]
+        self.assertIsNone(find_cycle(edges, [1]))
+
+    def test_deep_chain(self):
+        """Should not hit the recursion limit."""
+        edges = [(i, i + 1) for i in range(100_000)]
+        self.assertIsNone(find_cycle(edges, [0]))
@@ -0,0 +1,60 @@
+import numpy as np
+from django.test import SimpleTestCase
+
+from task.graph import TaskGraph
+
+
+class TaskGraphCases(SimpleTestCase):
+    def setUp(self):
+        # 10 -> (20 -> 40, 30); 50 has a parent outside the graph.
+        self.graph = TaskGraph(
+            [40, 10, 30, 20, 50],
+            [20, None, 10, 10, 99],
+            edges=[(30, 20), (40, 30), (40, 99)],
+            hours=[4.0, 0.0, 2.0, 1.0, 8.0],
+        )
+
+    def ids(self, positions):
+        return sorted(self.graph.ids[positions].tolist())
+
+    def test_orders_columns_by_id(self):
+        """Should sort tasks by id and reorder columns to match."""
+        self.assertEqual(self.graph.ids.tolist(), [10, 20, 30, 40, 50])
+        self.assertEqual(self.graph.hours.tolist(), [0.0, 1.0, 2.0, 4.0, 8.0])
+        self.assertEqual(self.graph.parent.tolist(), [-1, 0, 0, 1, -1])
+
+    def test_adjacency(self):
+        """Should keep children, prerequisites and dependents as CSR rows."""
+        graph = self.graph
+        self.assertEqual(self.ids(graph.children_of(0)), [20, 30])
+        self.assertEqual(self.ids(graph.prerequisites_of(3)), [30])
+        self.assertEqual(self.ids(graph.dependents_of(1)), [30])
+        self.assertEqual(len(graph.prerequisite_targets), 2)
+
+    def test_subtree_sums(self):
+        """Should total values over every subtree."""
+        totals = self.graph.subtree_sums(self.graph.hours)
+        self.assertEqual(totals.tolist(), [7.0, 5.0, 2.0, 4.0, 8.0])
+
+    def test_parent_cycle_keeps_own_value(self):
+        """Should leave tasks caught in a parent cycle with their own value."""
+        graph = TaskGraph([1, 2, 3], [None, 3, 2])
+        totals = graph.subtree_sums(np.array([[1.0], [2.0], [4.0]]))
+        self.assertEqual(totals.tolist(), [[1.0], [2.0], [4.0]])
+
+    def test_find_cycle(self):
+        """Should return a prerequisite cycle, or None for a DAG."""
+        self.assertIsNone(self.graph.find_cycle())
+        graph = TaskGraph(
+            [1, 2, 3, 4], [None] * 4, edges=[(4, 1), (1, 2), (2, 3), (3, 1)]
+        )
+        cycle = graph.find_cycle()
+        self.assertEqual(cycle[0], cycle[-1])
+        self.assertEqual(set(cycle), {1, 2, 3})
+
+    def test_empty(self):
+        """Should handle a graph without tasks."""
+        graph = TaskGraph([], [])
+        self.assertEqual(len(graph), 0)
+        self.assertIsNone(graph.find_cycle())
+        self.assertEqual(graph.index_of([1]).tolist(), [-1])
@@ -0,0 +1,73 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from task.benchmarks import BENCHMARKS, tree_parents
+from task.models import Task, TimeEntry
+
+
+class TreeParentsCases(SimpleTestCase):
+    def test_wide_tree(self):
+        """Should give every task `branching` children in index order."""
+        self.assertEqual(tree_parents(7, "wide", branching=3), [None, 0, 0, 0, 1, 1, 1])
+
+    def test_deep_tree_respects_max_depth(self):
+        """Should restart spines at the root once they reach max_depth."""
+        parents = tree_parents(2000, "deep", branching=2, max_depth=10)
+        depth = [0]
+        for parent in parents[1:]:
+            depth.append(depth[parent] + 1)
+        self.assertEqual(max(depth), 10)
+
+
+class BenchmarkCommandCases(TestCase):
+    def test_seeds_consistent_workload(self):
+        """Should seed rows whose maintained columns need no repair."""
+        out = StringIO()
+        call_command(
+            "seed_benchmark_data",
+            clients=2,
+            projects_per_client=2,
+            tasks_per_project=40,
+            shape="deep",
+            branching=3,
+            users=5,
+            entries_per_leaf=2,
+            stdout=out,
+        )
+        self.assertEqual(Task.objects.count(), 160)
+        self.assertTrue(TimeEntry.objects.exists())
+        self.assertTrue(Task.prerequisites.through.objects.exists())
+        tasks = Task.objects.all()
+        self.assertEqual(
+            (
+                tasks.rebuild_child_counts(),
+                tasks.rebuild_paths(),
+                tasks.rebuild_rollups(),
+            ),
+            (0, 0, 0),
+        )
+
+    def test_runs_benchmarks_as_json(self):
+        """Should time every benchmark and print comparable JSON."""
+        call_command(
+            "seed_benchmark_data",
+            clients=1,
+            projects_per_client=2,
+            tasks_per_project=30,
+            users=3,
+            stdout=StringIO(),
+        )
+        out = StringIO()
+        call_command("run_benchmarks", repeat=1, label="test", stdout=out)
+        results = json.loads(out.getvalue())
+        self.assertEqual(results["label"], "test")
+        self.assertEqual(results["workload"]["tasks"], 60)
+        self.assertEqual(set(results["results"]), set(BENCHMARKS))
+        for result in results["results"].values():
+            self.assertEqual(result["runs"], 1)
+            self.assertLessEqual(result["min"], result["max"])
+            self.assertGreater(result["peak_bytes"], 0)
+        self.assertEqual(Task.objects.count(), 60)
@@ -0,0 +1,31 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from client.models import Client
+from task.models import Task
+
+
+class RepairTaskHierarchyCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        client = Client.objects.create()
+        cls.project = client.projects.create()
+        return super().setUpTestData()
+
+    def test_repairs_drift(self):
+        """Should reset child_count and path to match the parent links."""
+        parent = self.project.tasks.create()
+        child = self.project.tasks.create(parent=parent)
+        Task.objects.filter(pk=parent.pk).update(child_count=5)
+        Task.objects.filter(pk=child.pk).update(path="")
+
+        out = StringIO()
+        call_command("repair_task_hierarchy", stdout=out)
+
+        parent.refresh_from_db()
+        child.refresh_from_db()
+        self.assertEqual(parent.child_count, 1)
+        self.assertEqual(child.path, f"{parent.id}/{child.id}/")
+        self.assertIn("child_count on 1 task(s), path on 1 task(s)", out.getvalue())
@@ -0,0 +1,157 @@
+from datetime import date, datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from client.models import Client
+from task.models import DailyTime, TimeEntry
+from task.rollups import seconds_by_day
+
+START = timezone.make_aware(datetime(2026, 1, 5, 22))
+
+
+def totals(task=None):
+    rows = DailyTime.objects.order_by("day", "user_id", "task_id")
+    if task is not None:
+        rows = rows.filter(task=task)
+    return [
+        (row.user_id, row.task_id, row.day, row.seconds)
+        for row in rows
+        if row.seconds
+    ]
+
+
+class SecondsByDayCases(TestCase):
+    def test_split_at_midnight(self):
+        """Should split an entry at local midnight into whole seconds per day."""
+        self.assertEqual(
+            seconds_by_day(START, START + timedelta(hours=3, microseconds=500)),
+            {date(2026, 1, 5): 7200, date(2026, 1, 6): 3600},
+        )
+
+    @override_settings(TIME_ZONE="America/Toronto")
+    def test_local_days(self):
+        """Should bucket by days of the current time zone."""
+        with timezone.override("America/Toronto"):
+            self.assertEqual(
+                seconds_by_day(START, START + timedelta(hours=3)),
+                {date(2026, 1, 5): 3 * 3600},
+            )
+
+    def test_open_entry(self):
+        """Should count nothing for a running timer."""
+        self.assertEqual(seconds_by_day(START, None), {})
+
+
+class DailyTimeInStepCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create(username="consultant")
+        project = Client.objects.create().projects.create()
+        parent = project.tasks.create()
+        cls.task = project.tasks.create(parent=parent)
+        cls.other = project.tasks.create(parent=parent)
+        return super().setUpTestData()
+
+    def entry(self, task=None, hours=1, start=START):
+        return TimeEntry.objects.create(
+            task=task or self.task,
+            user=self.user,
+            start_time=start,
+            end_time=start + timedelta(hours=hours),
+        )
+
+    def test_save_adds_seconds(self):
+        """Should add a new entry's seconds to each day it covers."""
+        self.entry(hours=3)
+        self.assertEqual(
+            totals(),
+            [
+                (self.user.pk, self.task.pk, date(2026, 1, 5), 7200),
+                (self.user.pk, self.task.pk, date(2026, 1, 6), 3600),
+            ],
+        )
+
+    def test_update_moves_seconds(self):
+        """Should move an edited entry's seconds to its new task and days."""
+        entry = self.entry()
+        entry.task = self.other
+        entry.end_time = START + timedelta(minutes=30)
+        entry.save()
+        self.assertEqual(totals(self.task), [])
+        self.assertEqual(
+            totals(self.other), [(self.user.pk, self.other.pk, date(2026, 1, 5), 1800)]
+        )
+
+    def test_update_of_deferred_entry(self):
+        """Should read the saved span back when the entry was loaded deferred."""
+        self.entry()
+        entry = TimeEntry.objects.only("pk").get()
+        entry.end_time = START + timedelta(hours=2)
+        entry.save()
+        self.assertEqual(
+            totals(),
+            [
+                (self.user.pk, self.task.pk, date(2026, 1, 5), 7200),
+            ],
+        )
+
+    def test_delete_subtracts_seconds(self):
+        """Should remove a deleted entry's seconds, one by one or in bulk."""
+        first = self.entry()
+        self.entry(start=START - timedelta(hours=2))
+        first.delete()
+        self.assertEqual(
+            totals(), [(self.user.pk, self.task.pk, date(2026, 1, 5), 3600)]
+        )
+        TimeEntry.objects.all().delete()
+        self.assertEqual(totals(), [])
+
+    def test_bulk_create_adds_seconds(self):
+        """Should add the seconds of entries created in bulk."""
+        TimeEntry.objects.bulk_create_validated(
+            [
+                TimeEntry(
+                    task=self.task,
+                    user=self.user,
+                    start_time=START - timedelta(hours=i + 1),
+                    end_time=START - timedelta(hours=i),
+                )
+                for i in range(3)
+            ]
+        )
+        self.assertEqual(
+            totals(), [(self.user.pk, self.task.pk, date(2026, 1, 5), 3 * 3600)]
+        )
+
+    def test_rebuild(self):
+        """Should recompute drifted totals from the entries."""
+        self.entry(hours=3)
+        DailyTime.objects.update(seconds=1)
+        DailyTime.objects.create(task=self.other, day=date(2026, 1, 1), seconds=9)
+        self.assertEqual(DailyTime.objects.rebuild(), (2, 1))
+        self.assertEqual(
+            totals(),
+            [
+                (self.user.pk, self.task.pk, date(2026, 1, 5), 7200),
+                (self.user.pk, self.task.pk, date(2026, 1, 6), 3600),
+            ],
+        )
+
+    def test_user_delete_merges_into_rows_without_user(self):
+        """Should fold a deleted user's totals into the shared no-user rows."""
+        other_user = get_user_model().objects.create(username="other")
+        self.entry()
+        TimeEntry.objects.create(
+            task=self.task,
+            user=other_user,
+            start_time=START,
+            end_time=START + timedelta(minutes=30),
+        )
+        other_user.delete()
+        self.user.delete()
+        merged = [(None, self.task.pk, date(2026, 1, 5), 5400)]
+        self.assertEqual(totals(), merged)
+        DailyTime.objects.rebuild()
+        self.assertEqual(totals(), merged)
@@ -0,0 +1,129 @@
+from datetime import date, datetime, timedelta, timezone
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, skipUnlessDBFeature
+
+from client.models import Client
+from project.models import Project
+from task.models import Task, TimeEntry
+
+START = datetime(2025, 1, 6, 9, tzinfo=timezone.utc)
+
+
+@skipUnlessDBFeature("supports_partial_indexes")
+class QueryPlanCases(TestCase):
+    """
+    Seeds a dataset shaped like production (mostly completed work spread over
+    many projects and users) and checks with EXPLAIN that the dashboard and
+    scheduler queries are served by the indexes declared on the models.
+    """
+
+    PROJECTS = 40
+    TASKS_PER_PROJECT = 250
+    USERS = 50
+
+    @classmethod
+    def setUpTestData(cls):
+        users = get_user_model().objects.bulk_create(
+            get_user_model()(username=f"user{i}") for i in range(cls.USERS)
+        )
+        client = Client.objects.create(name="Client")
+        projects = Project.objects.bulk_create(
+            Project(client=client, name=f"Project {i}") for i in range(cls.PROJECTS)
+        )
+        tasks = []
+        for p, project in enumerate(projects):
+            for i in range(cls.TASKS_PER_PROJECT):
+                n = p * cls.TASKS_PER_PROJECT + i
+                tasks.append(
+                    Task(
+                        project=project,
+                        name=f"Task {n}",
+                        status=(
+                            Task.TaskStatus.NOT_STARTED
+                            if n % 20 == 0
+                            else Task.TaskStatus.COMPLETED
+                        ),
+                        assigned_to=users[n % cls.USERS],
+                        auto_assign=n % 40 == 0,
+                        schedule_datetime=START + timedelta(hours=n),
+                        due_date=date(2025, 1, 1) + timedelta(days=n % 365)
+                        if n % 10 == 0
+                        else None,
+                    )
+                )
+        tasks = Task.objects.bulk_create(tasks, batch_size=2000)
+        TimeEntry.objects.bulk_create(
+            (
+                TimeEntry(
+                    task=task,
+                    user=users[(task.pk + day) % cls.USERS],
+                    start_time=START + timedelta(days=day),
+                    end_time=START + timedelta(days=day, hours=2),
+                )
+                for task in tasks[::5]
+                for day in range(5)
+            ),
+            batch_size=2000,
+        )
+        cls.project, cls.user, cls.task = projects[7], users[3], tasks[123]
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        return super().setUpTestData()
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, f"{index_name} not used:\n{plan}")
+
+    def test_open_tasks_by_project(self):
+        """Should read a project's open tasks from the partial open-task index."""
+        self.assertUsesIndex(
+            Task.objects.filter(project=self.project).exclude(
+                status=Task.TaskStatus.COMPLETED
+            ),
+            "task_open_project_idx",
+        )
+
+    def test_open_auto_assignable_leaves(self):
+        """Should find auto-assignable open leaves through their partial index."""
+        self.assertUsesIndex(
+            Task.objects.filter(
+                project=self.project, auto_assign=True, child_count=0
+            ).exclude(status=Task.TaskStatus.COMPLETED),
+            "task_open_auto_leaf_idx",
+        )
+
+    def test_assigned_tasks_in_schedule_order(self):
+        """Should list a user's tasks in schedule order straight off the index."""
+        self.assertUsesIndex(
+            Task.objects.filter(assigned_to=self.user).order_by("schedule_datetime"),
+            "task_assignee_schedule_idx",
+        )
+
+    def test_overdue_tasks(self):
+        """Should find open overdue tasks through the partial due date index."""
+        self.assertUsesIndex(
+            Task.objects.filter(due_date__lt=date(2025, 1, 15)).exclude(
+                status=Task.TaskStatus.COMPLETED
+            ),
+            "task_open_due_date_idx",
+        )
+
+    def test_user_time_entries_by_date(self):
+        """Should read a user's week of time entries by (user, start_time)."""
+        self.assertUsesIndex(
+            TimeEntry.objects.filter(
+                user=self.user,
+                start_time__gte=START,
+                start_time__lt=START + timedelta(days=7),
+            ),
+            "time_entry_user_start_idx",
+        )
+
+    def test_task_time_entries_by_date(self):
+        """Should read a task's time entries in order by (task, start_time)."""
+        self.assertUsesIndex(
+            TimeEntry.objects.filter(task=self.task).order_by("start_time"),
+            "time_entry_task_start_idx",
+        )
@@ -0,0 +1,68 @@
+from django.test import TestCase
+
+from client.models import Client
+from task.models import Task
+
+
+class UpdateParentChildCountsCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        client = Client.objects.create()
+        cls.project = client.projects.create()
+        return super().setUpTestData()
+
+    def assertChildCount(self, task, expected):
+        task.refresh_from_db()
+        self.assertEqual(task.child_count, expected)
+
+    def test_create_child(self):
+        """Should increment the parent's count in the database and in memory."""
+        parent = self.project.tasks.create()
+        self.project.tasks.create(parent=parent)
+        self.assertEqual(parent.child_count, 1)
+        self.assertTrue(parent.is_parent)
+        self.assertChildCount(parent, 1)
+
+    def test_reparent(self):
+        """Should move the count from the old parent to the new one."""
+        parent1 = self.project.tasks.create()
+        parent2 = self.project.tasks.create()
+        child = self.project.tasks.create(parent=parent1)
+        child.parent = parent2
+        child.save()
+        self.assertChildCount(parent1, 0)
+        self.assertChildCount(parent2, 1)
+
+    def test_stale_instance_does_not_clobber(self):
+        """Should not write back child_count or path from an old instance."""
+        parent = self.project.tasks.create()
+        stale = Task.objects.get(pk=parent.pk)
+        child = self.project.tasks.create(parent=parent)
+        stale.name = "Renamed"
+        stale.save()
+        self.assertChildCount(parent, 1)
+        child.refresh_from_db()
+        self.assertTrue(child.path.startswith(parent.path))
+
+    def test_delete_child(self):
+        """Should decrement the parent's count."""
+        parent = self.project.tasks.create()
+        child = self.project.tasks.create(parent=parent)
+        self.project.tasks.create(parent=parent)
+        child.delete()
+        self.assertChildCount(parent, 1)
+
+    def test_queryset_delete(self):
+        """Should decrement surviving parents once per deleted child."""
+        parent = self.project.tasks.create()
+        child1 = self.project.tasks.create(parent=parent)
+        self.project.tasks.create(parent=child1)
+        self.project.tasks.create(parent=parent)
+        Task.objects.descendants(parent).delete()
+        self.assertChildCount(parent, 0)
+
+    def test_leaf_check_without_query(self):
+        """Should answer is_leaf from the column."""
+        task = self.project.tasks.create()
+        with self.assertNumQueries(0):
+            self.assertTrue(task.is_leaf)
@@ -0,0 +1,56 @@
+from django.test import TestCase
+
+from client.models import Client
+from task.models import Task
+
+
+class UpdatePathCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        client = Client.objects.create()
+        cls.project = client.projects.create()
+        return super().setUpTestData()
+
+    def test_root_task(self):
+        """Should store the task's own id as its path."""
+        task1 = self.project.tasks.create()
+        self.assertEqual(task1.path, f"{task1.id}/")
+
+    def test_child_task(self):
+        """Should prefix the parent's path."""
+        task1 = self.project.tasks.create()
+        task2 = self.project.tasks.create(parent=task1)
+        task2.refresh_from_db()
+        self.assertEqual(task2.path, f"{task1.id}/{task2.id}/")
+
+    def test_reparent_rewrites_descendants(self):
+        """Should rewrite the path of every task in the moved subtree."""
+        task1 = self.project.tasks.create()
+        task2 = self.project.tasks.create()
+        task3 = self.project.tasks.create(parent=task2)
+        task4 = self.project.tasks.create(parent=task3)
+        task2.parent = task1
+        task2.save()
+        task4.refresh_from_db()
+        self.assertEqual(task4.path, f"{task1.id}/{task2.id}/{task3.id}/{task4.id}/")
+
+    def test_move_to_root(self):
+        """Should drop the old ancestors from the subtree's paths."""
+        task1 = self.project.tasks.create()
+        task2 = self.project.tasks.create(parent=task1)
+        task3 = self.project.tasks.create(parent=task2)
+        task2.parent = None
+        task2.save()
+        task3.refresh_from_db()
+        self.assertEqual(task3.path, f"{task2.id}/{task3.id}/")
+
+    def test_sibling_with_shared_prefix(self):
+        """Should not rewrite tasks whose id merely starts with the moved id."""
+        task1 = self.project.tasks.create()
+        task2 = self.project.tasks.create()
+        other = Task.objects.create(project=self.project, skip_validation=True)
+        Task.objects.filter(pk=other.pk).update(path=f"{task2.id}0/")
+        task2.parent = task1
+        task2.save()
+        other.refresh_from_db()
+        self.assertEqual(other.path, f"{task2.id}0/")
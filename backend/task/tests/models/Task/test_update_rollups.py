@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from client.models import Client
+from task.models import Task, TimeEntry
+
+START = timezone.make_aware(datetime(2026, 1, 5, 9))
+
+
+class UpdateRollupsCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        client = Client.objects.create()
+        cls.project = client.projects.create()
+        cls.root = cls.project.tasks.create()
+        cls.branch = cls.project.tasks.create(parent=cls.root)
+        cls.leaf = cls.project.tasks.create(parent=cls.branch, hours_estimate=5)
+        return super().setUpTestData()
+
+    def rollup(self, task):
+        task.refresh_from_db()
+        return (task.dependent_hours, task.actual_hours, task.remaining_hours)
+
+    def assert_consistent(self):
+        """The incremental totals should match a full rebuild."""
+        self.assertEqual(Task.objects.filter(project=self.project).rebuild_rollups(), 0)
+
+    def log(self, task, hours):
+        return task.time_entries.create(
+            start_time=START, end_time=START + timedelta(hours=hours)
+        )
+
+    def test_new_leaf(self):
+        """Should add a new task's estimate to its ancestors."""
+        self.project.tasks.create(parent=self.branch, hours_estimate=3)
+        self.assertEqual(self.rollup(self.root), (8, 0, 8))
+        self.assert_consistent()
+
+    def test_estimate_change(self):
+        """Should add the difference in estimate to every ancestor."""
+        self.leaf.hours_estimate = 7
+        self.leaf.save()
+        self.assertEqual(self.rollup(self.root), (7, 0, 7))
+        self.assert_consistent()
+
+    def test_completed(self):
+        """Should drop a completed task's remaining hours."""
+        self.leaf.status = Task.TaskStatus.COMPLETED
+        self.leaf.save()
+        self.assertEqual(self.rollup(self.branch), (5, 0, 0))
+        self.assert_consistent()
+
+    def test_time_entries(self):
+        """Should roll logged hours up as they are added, changed and deleted."""
+        entry = self.log(self.leaf, 2)
+        self.assertEqual(self.rollup(self.root), (5, 2, 3))
+
+        entry.end_time = START + timedelta(hours=6)
+        entry.save()
+        self.assertEqual(self.rollup(self.root), (5, 6, 0))
+        self.assert_consistent()
+
+        entry.delete()
+        self.assertEqual(self.rollup(self.root), (5, 0, 5))
+        self.assert_consistent()
+
+    def test_time_entry_queryset_delete(self):
+        """Should roll out the hours of bulk-deleted entries."""
+        self.log(self.leaf, 1)
+        self.log(self.leaf, 2)
+        TimeEntry.objects.filter(task=self.leaf).delete()
+        self.assertEqual(self.rollup(self.root), (5, 0, 5))
+
+    def test_move(self):
+        """Should move the subtree total from the old ancestors to the new ones."""
+        self.log(self.leaf, 1)
+        other = self.project.tasks.create()
+        self.branch.parent = other
+        self.branch.save()
+        self.assertEqual(self.rollup(self.root), (0, 0, 0))
+        self.assertEqual(self.rollup(other), (5, 1, 4))
+        self.assert_consistent()
+
+    def test_delete(self):
+        """Should subtract a deleted subtree from the surviving ancestors."""
+        self.log(self.leaf, 1)
+        self.branch.delete()
+        self.assertEqual(self.rollup(self.root), (0, 0, 0))
+
+    def test_queryset_delete(self):
+        """Should subtract each deleted subtree once."""
+        self.project.tasks.create(parent=self.root, hours_estimate=2)
+        Task.objects.filter(pk__in=[self.branch.pk, self.leaf.pk]).delete()
+        self.assertEqual(self.rollup(self.root), (2, 0, 2))
+        self.assert_consistent()
+
+    def test_stale_instance_does_not_clobber(self):
+        """Should not write back stale rollup columns from an old instance."""
+        stale = Task.objects.get(pk=self.root.pk)
+        self.project.tasks.create(parent=self.root, hours_estimate=2)
+        stale.name = "Renamed"
+        stale.save()
+        self.assertEqual(self.rollup(self.root), (7, 0, 7))
+        self.assertEqual(self.root.child_count, 2)
@@ -68,3 +68,21 @@ class ValidateNoParentCyclesCases(TestCase):
 
         with self.assertRaises(ValidationError):
             task3._validate_no_parent_cycles()
+
+    def test_reparent_under_descendant(self):
+        """Should raise ValidationError for an unsaved move below a descendant."""
+        task1 = self.project.tasks.create()
+        task2 = self.project.tasks.create(parent=task1)
+        task3 = self.project.tasks.create(parent=task2)
+        task1.parent = task3
+        with self.assertRaises(ValidationError):
+            task1._validate_no_parent_cycles()
+
+    def test_deep_chain_single_query(self):
+        """Should validate a deeply nested task with one query."""
+        parent = None
+        for _ in range(30):
+            parent = self.project.tasks.create(parent=parent)
+        task = self.project.tasks.create(parent=parent)
+        with self.assertNumQueries(1):
+            task._validate_no_parent_cycles()
@@ -5,6 +5,14 @@ from project.models import Project
 from task.models import Task
 
 
+def add_prerequisites_unchecked(task, *prerequisites):
+    """Insert prerequisite edges directly, bypassing the m2m_changed cycle check."""
+    Task.prerequisites.through.objects.bulk_create(
+        Task.prerequisites.through(from_task=task, to_task=prerequisite)
+        for prerequisite in prerequisites
+    )
+
+
 class ValidateNoPrerequisiteCyclesCases(TestCase):
     @classmethod
     def setUpTestData(cls):
@@ -27,7 +35,7 @@ class ValidateNoPrerequisiteCyclesCases(TestCase):
     def test_self_reference(self):
         """Should raise ValidationError."""
         task1 = self.project.tasks.create()
-        task1.prerequisites.add(task1)
+        add_prerequisites_unchecked(task1, task1)
         with self.assertRaises(ValidationError):
             task1._validate_no_prerequisite_cycles()
 
@@ -36,7 +44,7 @@ class ValidateNoPrerequisiteCyclesCases(TestCase):
         task1 = self.project.tasks.create()
         task2 = self.project.tasks.create()
         task1.prerequisites.add(task2)
-        task2.prerequisites.add(task1)
+        add_prerequisites_unchecked(task2, task1)
 
         with self.assertRaises(ValidationError):
             task1._validate_no_prerequisite_cycles()
@@ -51,7 +59,7 @@ class ValidateNoPrerequisiteCyclesCases(TestCase):
         task3 = self.project.tasks.create()
         task1.prerequisites.add(task3)
         task2.prerequisites.add(task1)
-        task3.prerequisites.add(task2)
+        add_prerequisites_unchecked(task3, task2)
 
         with self.assertRaises(ValidationError):
             task1._validate_no_prerequisite_cycles()
@@ -108,7 +116,7 @@ class ValidateNoPrerequisiteCyclesCases(TestCase):
         task7.prerequisites.add(task3, task6)
 
         # Add cycle to path 1
-        task1.prerequisites.add(task2)
+        add_prerequisites_unchecked(task1, task2)
 
         with self.assertRaises(ValidationError):
             task7._validate_no_prerequisite_cycles()
@@ -128,3 +136,15 @@ class ValidateNoPrerequisiteCyclesCases(TestCase):
         task2._validate_no_prerequisite_cycles()
         task3._validate_no_prerequisite_cycles()
         task4._validate_no_prerequisite_cycles()
+
+    def test_long_chain_single_query(self):
+        """Should not raise ValidationError or hit the recursion limit."""
+        tasks = Task.objects.bulk_create(
+            Task(project=self.project) for _ in range(2000)
+        )
+        Task.prerequisites.through.objects.bulk_create(
+            Task.prerequisites.through(from_task=task, to_task=prerequisite)
+            for task, prerequisite in zip(tasks[1:], tasks)
+        )
+        with self.assertNumQueries(1):
+            tasks[-1]._validate_no_prerequisite_cycles()
@@ -0,0 +1,109 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from client.models import Client
+from task.models import Task
+
+
+class BulkCreateValidatedCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        client = Client.objects.create()
+        cls.project = client.projects.create()
+        return super().setUpTestData()
+
+    def test_nested_batch(self):
+        """Should insert parents before children and maintain path/child_count."""
+        existing = self.project.tasks.create()
+        root = Task(project=self.project, parent=existing)
+        child1 = Task(project=self.project, parent=root, hours_estimate=2)
+        child2 = Task(project=self.project, parent=root, hours_estimate=3)
+        result = Task.objects.bulk_create_validated([child1, root, child2])
+
+        self.assertEqual(result.errors, {})
+        self.assertEqual(len(result.created), 3)
+        existing.refresh_from_db()
+        root.refresh_from_db()
+        child1.refresh_from_db()
+        self.assertEqual(existing.child_count, 1)
+        self.assertEqual(root.child_count, 2)
+        self.assertEqual(child1.path, f"{existing.id}/{root.id}/{child1.id}/")
+
+    def test_estimate_on_batch_parent(self):
+        """Should reject the parent row and its children."""
+        root = Task(project=self.project, hours_estimate=1)
+        child = Task(project=self.project, parent=root)
+        result = Task.objects.bulk_create_validated([root, child])
+        self.assertEqual(set(result.errors), {0, 1})
+        self.assertFalse(Task.objects.exists())
+
+    def test_parent_cycle_in_batch(self):
+        """Should reject every row in the cycle."""
+        task1 = Task(project=self.project)
+        task2 = Task(project=self.project, parent=task1)
+        task1.parent = task2
+        other = Task(project=self.project)
+        result = Task.objects.bulk_create_validated([task1, task2, other])
+        self.assertEqual(set(result.errors), {0, 1})
+        self.assertEqual(result.created, [other])
+
+    def test_invalid_field(self):
+        """Should report field errors per row."""
+        result = Task.objects.bulk_create_validated(
+            [Task(project=self.project, status="BOGUS"), Task(project=self.project)]
+        )
+        self.assertEqual(set(result.errors), {0})
+        self.assertEqual(len(result.created), 1)
+
+    def test_prerequisites(self):
+        """Should link prerequisite pairs between new and existing tasks."""
+        existing = self.project.tasks.create()
+        task1 = Task(project=self.project)
+        task2 = Task(project=self.project)
+        result = Task.objects.bulk_create_validated(
+            [task1, task2], prerequisites=[(task2, task1), (task1, existing)]
+        )
+        self.assertEqual(result.errors, {})
+        self.assertQuerySetEqual(task2.prerequisites.all(), [task1])
+        self.assertQuerySetEqual(task1.prerequisites.all(), [existing])
+
+    def test_prerequisite_cycle_with_stored_graph(self):
+        """Should reject rows whose pairs close a cycle through existing edges."""
+        existing1 = self.project.tasks.create()
+        existing2 = self.project.tasks.create()
+        existing2.prerequisites.add(existing1)
+        task = Task(project=self.project)
+        result = Task.objects.bulk_create_validated(
+            [task], prerequisites=[(task, existing2), (existing1, task)]
+        )
+        self.assertEqual(set(result.errors), {0})
+        self.assertFalse(existing1.prerequisites.exists())
+
+    def test_query_count_independent_of_batch_size(self):
+        """Should not issue more queries for a larger batch."""
+        parent = self.project.tasks.create()
+        counts = []
+        for size in (5, 40):
+            tasks = [Task(project=self.project, parent=parent) for _ in range(size)]
+            with CaptureQueriesContext(connection) as queries:
+                Task.objects.bulk_create_validated(tasks)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_check_constraints(self):
+        """Should report rows that break the model's check constraints."""
+        result = Task.objects.bulk_create_validated(
+            [
+                Task(project=self.project, hours_estimate=-1),
+                Task(project=self.project, hours_estimate=4, hours_optimistic=5),
+                Task(project=self.project, hours_estimate=4, hours_pessimistic=3),
+                Task(project=self.project, hours_estimate=4, hours_optimistic=2),
+            ]
+        )
+        self.assertEqual(set(result.errors), {0, 1, 2})
+        self.assertEqual(
+            result.errors[1].messages,
+            ["Optimistic hours must be between 0 and the estimate."],
+        )
+        self.assertEqual(len(result.created), 1)
@@ -0,0 +1,43 @@
+from django.test import TestCase
+
+from client.models import Client
+from task.models import Task
+
+
+class AncestorsCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        client = Client.objects.create()
+        cls.project = client.projects.create()
+        return super().setUpTestData()
+
+    def test_root_task(self):
+        """Should return an empty chain."""
+        task1 = self.project.tasks.create()
+        self.assertEqual(Task.objects.ancestors(task1.id), [])
+
+    def test_nested_task(self):
+        """Should return ancestors ordered from parent to root."""
+        task1 = self.project.tasks.create()
+        task2 = self.project.tasks.create(parent=task1)
+        task3 = self.project.tasks.create(parent=task2)
+        self.assertEqual(Task.objects.ancestors(task3.id), [task2, task1])
+
+    def test_deep_chain_single_query(self):
+        """Should load the whole chain in one query."""
+        parent = None
+        for _ in range(30):
+            parent = self.project.tasks.create(parent=parent)
+        with self.assertNumQueries(1):
+            ancestors = Task.objects.ancestors(parent.id)
+        self.assertEqual(len(ancestors), 29)
+
+    def test_stored_cycle(self):
+        """Should terminate and report the cycle."""
+        task1 = self.project.tasks.create()
+        task2 = self.project.tasks.create(parent=task1)
+        task1.parent = task2
+        task1.save(skip_validation=True)
+        chain, has_cycle = Task.objects.parent_chain(task1.id)
+        self.assertTrue(has_cycle)
+        self.assertEqual(chain, [(task1.id, task2.id), (task2.id, task1.id)])
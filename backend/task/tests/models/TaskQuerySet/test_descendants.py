@@ -0,0 +1,60 @@
+from django.test import TestCase
+
+from client.models import Client
+from task.models import Task
+
+
+class DescendantsCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        client = Client.objects.create()
+        project = client.projects.create()
+        cls.task1 = project.tasks.create()
+        cls.task2 = project.tasks.create(parent=cls.task1)
+        cls.task3 = project.tasks.create(parent=cls.task2)
+        cls.task4 = project.tasks.create(parent=cls.task1)
+        cls.other = project.tasks.create()
+        return super().setUpTestData()
+
+    def test_descendants(self):
+        """Should return every task below the root, excluding the root."""
+        self.assertQuerySetEqual(
+            Task.objects.descendants(self.task1),
+            [self.task2, self.task3, self.task4],
+            ordered=False,
+        )
+
+    def test_subtree(self):
+        """Should include the root."""
+        self.assertQuerySetEqual(
+            Task.objects.subtree(self.task2), [self.task2, self.task3], ordered=False
+        )
+
+    def test_leaf_task(self):
+        """Should return no descendants."""
+        self.assertFalse(Task.objects.descendants(self.task3).exists())
+
+
+class RebuildPathsCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        client = Client.objects.create()
+        cls.project = client.projects.create()
+        return super().setUpTestData()
+
+    def test_repairs_bulk_created_tasks(self):
+        """Should fill in paths for tasks created without save()."""
+        root = self.project.tasks.create()
+        tasks = Task.objects.bulk_create(
+            [Task(project=self.project, parent=root) for _ in range(3)]
+        )
+        self.assertEqual(Task.objects.all().rebuild_paths(), 3)
+        for task in tasks:
+            task.refresh_from_db()
+            self.assertEqual(task.path, f"{root.id}/{task.id}/")
+
+    def test_no_drift(self):
+        """Should not update anything."""
+        root = self.project.tasks.create()
+        self.project.tasks.create(parent=root)
+        self.assertEqual(Task.objects.all().rebuild_paths(), 0)
@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from client.models import Client
+from task.models import Task
+
+START = timezone.make_aware(datetime(2026, 1, 5, 9))
+
+
+class RebuildRollupsCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        client = Client.objects.create()
+        cls.project = client.projects.create()
+        cls.root = cls.project.tasks.create()
+        cls.leaf1 = cls.project.tasks.create(parent=cls.root, hours_estimate=5)
+        cls.leaf2 = cls.project.tasks.create(parent=cls.root, hours_estimate=3)
+        cls.leaf1.time_entries.create(
+            start_time=START, end_time=START + timedelta(hours=2)
+        )
+        return super().setUpTestData()
+
+    def test_repairs_drift(self):
+        """Should recompute every node and write back only drifted rows."""
+        Task.objects.filter(pk__in=[self.root.pk, self.leaf1.pk]).update(
+            dependent_hours=0, actual_hours=0, remaining_hours=0
+        )
+        updated = Task.objects.filter(project=self.project).rebuild_rollups()
+
+        self.assertEqual(updated, 2)
+        root = Task.objects.get(pk=self.root.pk)
+        self.assertEqual(
+            (root.dependent_hours, root.actual_hours, root.remaining_hours), (8, 2, 6)
+        )
+
+    def test_query_count_independent_of_size(self):
+        """Should read a project's tree with one aggregated query."""
+        for _ in range(10):
+            self.project.tasks.create(parent=self.leaf2)
+        with self.assertNumQueries(1):
+            Task.objects.filter(project=self.project).rebuild_rollups()
@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.utils import timezone
+
+from client.models import Client
+
+START = timezone.make_aware(datetime(2026, 1, 5, 9))
+
+
+class ValidateNoOverlapCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create(username="consultant")
+        cls.task = Client.objects.create().projects.create().tasks.create()
+        cls.entry = cls.task.time_entries.create(
+            user=cls.user, start_time=START, end_time=START + timedelta(hours=2)
+        )
+        return super().setUpTestData()
+
+    def test_create_overlapping(self):
+        """Should raise ValidationError for a new entry inside another one."""
+        with self.assertRaisesMessage(ValidationError, f"time entry {self.entry.pk}"):
+            self.task.time_entries.create(
+                user=self.user, start_time=START + timedelta(hours=1)
+            )
+
+    def test_update_overlapping(self):
+        """Should raise ValidationError when an edit moves an entry onto another."""
+        later = self.task.time_entries.create(
+            user=self.user,
+            start_time=START + timedelta(hours=2),
+            end_time=START + timedelta(hours=3),
+        )
+        later.start_time = START + timedelta(hours=1)
+        with self.assertRaises(ValidationError):
+            later.save()
+
+    def test_other_user_and_own_entry(self):
+        """Should not raise for another user's time or the entry itself."""
+        self.task.time_entries.create(start_time=START, end_time=START)
+        self.entry.end_time = START + timedelta(hours=3)
+        self.entry.save()
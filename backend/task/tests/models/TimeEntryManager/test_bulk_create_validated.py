@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from client.models import Client
+from task.models import TimeEntry
+
+
+class BulkCreateValidatedCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        client = Client.objects.create()
+        project = client.projects.create()
+        cls.parent_task = project.tasks.create()
+        cls.leaf_task = project.tasks.create(parent=cls.parent_task)
+        return super().setUpTestData()
+
+    def test_leaf_and_parent_tasks(self):
+        """Should insert entries on leaf tasks and reject entries on parents."""
+        entries = [
+            TimeEntry(task=self.leaf_task),
+            TimeEntry(task=self.parent_task),
+            TimeEntry(task=self.leaf_task),
+        ]
+        result = TimeEntry.objects.bulk_create_validated(entries)
+        self.assertEqual(set(result.errors), {1})
+        self.assertEqual(TimeEntry.objects.count(), 2)
+
+    def test_ends_before_start(self):
+        """Should reject an entry that ends before it starts."""
+        start = timezone.make_aware(datetime(2026, 1, 5, 9))
+        result = TimeEntry.objects.bulk_create_validated(
+            [
+                TimeEntry(
+                    task=self.leaf_task,
+                    start_time=start,
+                    end_time=start - timedelta(hours=1),
+                )
+            ]
+        )
+        self.assertEqual(set(result.errors), {0})
+        self.assertFalse(TimeEntry.objects.exists())
+
+    def test_overlapping_entries(self):
+        """Should reject entries overlapping the user's stored or batch entries."""
+        user = get_user_model().objects.create(username="consultant")
+        start = timezone.make_aware(datetime(2026, 1, 5, 9))
+
+        def hour(n):
+            return start + timedelta(hours=n)
+
+        TimeEntry.objects.bulk_create_validated(
+            [TimeEntry(task=self.leaf_task, user=user, start_time=hour(0),
+                       end_time=hour(2))]
+        )
+        result = TimeEntry.objects.bulk_create_validated(
+            [
+                TimeEntry(task=self.leaf_task, user=user, start_time=hour(1),
+                          end_time=hour(3)),
+                TimeEntry(task=self.leaf_task, user=user, start_time=hour(3),
+                          end_time=hour(4)),
+                TimeEntry(task=self.leaf_task, user=user, start_time=hour(5),
+                          end_time=hour(6)),
+                TimeEntry(task=self.leaf_task, user=user, start_time=hour(4)),
+                TimeEntry(task=self.leaf_task, start_time=hour(1),
+                          end_time=hour(3)),
+            ]
+        )
+        self.assertEqual(set(result.errors), {0, 2, 3})
+        self.assertEqual(TimeEntry.objects.count(), 3)
+
+    def test_query_count_independent_of_batch_size(self):
+        """Should not issue more queries for a larger batch."""
+        counts = []
+        for size in (5, 100):
+            entries = [TimeEntry(task=self.leaf_task) for _ in range(size)]
+            with CaptureQueriesContext(connection) as queries:
+                TimeEntry.objects.bulk_create_validated(entries)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
@@ -0,0 +1,76 @@
+from django.test import TestCase
+
+from client.models import Client
+from task.models import RescheduleJob
+from task.queue import DatabaseQueue
+
+
+class DatabaseQueueCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        client = Client.objects.create()
+        cls.project1 = client.projects.create()
+        cls.project2 = client.projects.create()
+        return super().setUpTestData()
+
+    def setUp(self):
+        self.queue = DatabaseQueue()
+
+    def test_enqueue_coalesces(self):
+        """Should keep one pending job per project."""
+        self.queue.enqueue([self.project1.id, self.project1.id])
+        self.queue.enqueue([self.project1.id, self.project2.id])
+        self.assertEqual(RescheduleJob.objects.count(), 2)
+        self.assertEqual(self.queue.stats().depth, 2)
+
+    def test_coalesced_jobs_merge_task_ids(self):
+        """Should merge edited task ids, and reschedule whole once any job asks."""
+        self.queue.enqueue(
+            [self.project1.id, self.project2.id],
+            {self.project1.id: [10], self.project2.id: [20]},
+        )
+        self.queue.enqueue(
+            [self.project1.id, self.project2.id], {self.project1.id: [11]}
+        )
+        jobs = {job.project_id: job.task_ids for job in self.queue.claim(10)}
+        self.assertEqual(jobs, {self.project1.id: {10, 11}, self.project2.id: None})
+
+    def test_claim_marks_jobs_running(self):
+        """Should not hand the same job out twice."""
+        self.queue.enqueue([self.project1.id, self.project2.id])
+        first = self.queue.claim(1)
+        second = self.queue.claim(10)
+        self.assertEqual(len(first), 1)
+        self.assertEqual(
+            {job.project_id for job in first + second},
+            {self.project1.id, self.project2.id},
+        )
+        self.assertEqual(self.queue.claim(10), [])
+
+    def test_edit_while_running(self):
+        """Should queue a new job for a running project without claiming it yet."""
+        self.queue.enqueue([self.project1.id])
+        jobs = self.queue.claim(10)
+        self.queue.enqueue([self.project1.id])
+        self.assertEqual(self.queue.claim(10), [])
+
+        self.queue.complete(jobs)
+        self.assertEqual(
+            [job.project_id for job in self.queue.claim(10)], [self.project1.id]
+        )
+
+    def test_release(self):
+        """Should make a failed job claimable again."""
+        self.queue.enqueue([self.project1.id])
+        self.queue.release(self.queue.claim(10))
+        self.assertEqual(
+            [job.project_id for job in self.queue.claim(10)], [self.project1.id]
+        )
+
+    def test_requeue_stale(self):
+        """Should release claims older than the timeout."""
+        self.queue.enqueue([self.project1.id])
+        self.queue.claim(10)
+        self.queue.requeue_stale(older_than=-1)
+        self.assertEqual(self.queue.stats().depth, 1)
+        self.assertEqual(self.queue.stats().running, 0)
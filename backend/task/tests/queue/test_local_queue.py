@@ -0,0 +1,42 @@
+from django.test import SimpleTestCase
+
+from task.queue import LocalQueue
+
+
+class LocalQueueCases(SimpleTestCase):
+    def setUp(self):
+        self.queue = LocalQueue()
+
+    def test_enqueue_coalesces(self):
+        """Should keep one pending job per project."""
+        self.queue.enqueue([1, 1, 2])
+        self.queue.enqueue([1])
+        self.assertEqual(self.queue.stats().depth, 2)
+
+    def test_claim_oldest_first(self):
+        """Should claim projects in enqueue order."""
+        self.queue.enqueue([2])
+        self.queue.enqueue([1])
+        self.assertEqual([job.project_id for job in self.queue.claim(1)], [2])
+
+    def test_running_project_not_claimed(self):
+        """Should hold back a project's new job until its running job completes."""
+        self.queue.enqueue([1])
+        jobs = self.queue.claim(10)
+        self.queue.enqueue([1])
+        self.assertEqual(self.queue.claim(10), [])
+        self.queue.complete(jobs)
+        self.assertEqual([job.project_id for job in self.queue.claim(10)], [1])
+
+    def test_coalesced_jobs_merge_task_ids(self):
+        """Should merge edited task ids, and reschedule whole once any job asks."""
+        self.queue.enqueue([1, 2], {1: [10], 2: [20]})
+        self.queue.enqueue([1, 2], {1: [11]})
+        jobs = {job.project_id: job.task_ids for job in self.queue.claim(10)}
+        self.assertEqual(jobs, {1: {10, 11}, 2: None})
+
+    def test_release_keeps_task_ids(self):
+        """Should requeue a failed job with the task ids it was claimed with."""
+        self.queue.enqueue([1], {1: [10]})
+        self.queue.release(self.queue.claim(10))
+        self.assertEqual(self.queue.claim(10)[0].task_ids, {10})
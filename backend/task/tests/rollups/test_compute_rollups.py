@@ -0,0 +1,31 @@
+from django.test import SimpleTestCase
+
+from task.rollups import Rollup, compute_rollups, own_rollup
+
+
+class ComputeRollupsCases(SimpleTestCase):
+    def test_sums_subtrees(self):
+        """Should add every descendant's contribution to its ancestors."""
+        nodes = {
+            1: (None, own_rollup(0, 0, False)),
+            2: (1, own_rollup(0, 0, False)),
+            3: (2, own_rollup(5, 2, False)),
+            4: (2, own_rollup(3, 4, False)),
+            5: (1, own_rollup(8, 1, True)),
+        }
+        totals = compute_rollups(nodes)
+        self.assertEqual(totals[2], Rollup(8, 6, 3))
+        self.assertEqual(totals[1], Rollup(16, 7, 3))
+        self.assertEqual(totals[5], Rollup(8, 1, 0))
+
+    def test_parent_outside_nodes(self):
+        """Should treat tasks whose parent was not loaded as roots."""
+        totals = compute_rollups({2: (1, own_rollup(4, 0, False))})
+        self.assertEqual(totals, {2: Rollup(4, 0, 4)})
+
+    def test_parent_cycle(self):
+        """Should keep only the own contribution of tasks in a parent cycle."""
+        totals = compute_rollups(
+            {1: (2, own_rollup(1, 0, False)), 2: (1, own_rollup(2, 0, False))}
+        )
+        self.assertEqual(totals, {1: Rollup(1, 0, 1), 2: Rollup(2, 0, 2)})
@@ -0,0 +1,209 @@
+from datetime import date, datetime
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from client.models import Client
+from project.models import Project
+from task.models import Task
+from task.scenarios import Scenario, load_portfolio
+from task.scheduling import WorkCalendar
+
+
+class ScenarioCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        client = Client.objects.create()
+        User = get_user_model()
+        cls.user1 = User.objects.create(username="user1", daily_capacity_hours=8)
+        cls.user2 = User.objects.create(username="user2", daily_capacity_hours=8)
+        cls.booked = client.projects.create(status=Project.ProjectStatus.BOOKED)
+        cls.design = cls.booked.tasks.create(
+            hours_estimate=8, assigned_to=cls.user1, due_date=date(2026, 1, 6)
+        )
+        cls.build = cls.booked.tasks.create(
+            hours_estimate=8, assigned_to=cls.user1, due_date=date(2026, 1, 6)
+        )
+        cls.build.prerequisites.add(cls.design)
+        cls.rfp = client.projects.create(
+            status=Project.ProjectStatus.EVALUATING_RFP, priority=5
+        )
+        cls.proposal = cls.rfp.tasks.create(hours_estimate=16)
+        cls.calendar = WorkCalendar(date(2026, 1, 5), hours_per_day=8, day_start_hour=9)
+        cls.now = timezone.make_aware(datetime(2026, 1, 5, 9))
+        return super().setUpTestData()
+
+    def portfolio(self, candidates=()):
+        return load_portfolio(candidates, calendar=self.calendar, now=self.now)
+
+    def test_reads_without_writing(self):
+        """Should load with four queries and run scenarios with none."""
+        with self.assertNumQueries(4):
+            portfolio = self.portfolio([self.rfp.pk])
+        with self.assertNumQueries(0):
+            Scenario(portfolio).apply(
+                [{"op": "add_project", "project": self.rfp.pk}]
+            ).run()
+            Scenario(portfolio).apply(
+                [{"op": "remove_user", "user": self.user2.pk}]
+            ).run()
+
+    def test_unedited_scenario_has_no_changes(self):
+        """Should report no changed tasks when nothing is edited."""
+        result = Scenario(self.portfolio([self.rfp.pk])).run()
+        self.assertEqual(result.tasks, {})
+        self.assertNotIn(self.rfp.pk, result.projects)
+
+    def test_add_candidate_project(self):
+        """Should schedule a won RFP ahead of lower-priority work."""
+        result = (
+            Scenario(self.portfolio([self.rfp.pk]))
+            .apply([{"op": "add_project", "project": self.rfp.pk}])
+            .run()
+        )
+        proposal = result.tasks[self.proposal.pk]
+        self.assertEqual(
+            proposal["schedule_datetime"],
+            (None, timezone.make_aware(datetime(2026, 1, 5, 9))),
+        )
+        self.assertEqual(proposal["risk_hours"], (None, 0.0))
+        self.assertIn(proposal["assigned_to_id"][1], {self.user1.pk, self.user2.pk})
+        self.assertEqual(result.projects[self.rfp.pk]["risk_hours"], (None, 0.0))
+        # The proposal takes one user for two days; design moves to the other.
+        self.assertNotEqual(
+            result.tasks[self.design.pk]["assigned_to_id"][1],
+            proposal["assigned_to_id"][1],
+        )
+
+    def test_changed_estimate_moves_successors(self):
+        """Should push dependents later and report the new risk."""
+        result = (
+            Scenario(self.portfolio())
+            .apply([{"op": "set_estimate", "task": self.design.pk, "hours": 16}])
+            .run()
+        )
+        self.assertEqual(
+            result.tasks[self.build.pk]["schedule_datetime"],
+            (
+                timezone.make_aware(datetime(2026, 1, 6, 9)),
+                timezone.make_aware(datetime(2026, 1, 7, 9)),
+            ),
+        )
+        self.assertEqual(result.tasks[self.build.pk]["risk_hours"], (0.0, 8.0))
+        self.assertNotIn(self.design.pk, result.tasks)
+        self.assertEqual(result.projects[self.booked.pk]["risk_hours"], (0.0, 8.0))
+
+    def test_removed_user_work_is_reassigned(self):
+        """Should move a removed user's auto-assigned tasks to someone else."""
+        portfolio = self.portfolio()
+        assignees = Scenario(portfolio).outcomes()[0]
+        removed = assignees[self.design.pk].assigned_to_id
+
+        result = (
+            Scenario(portfolio).apply([{"op": "remove_user", "user": removed}]).run()
+        )
+
+        for task in (self.design, self.build):
+            self.assertNotEqual(
+                result.tasks.get(task.pk, {}).get(
+                    "assigned_to_id", (None, assignees[task.pk].assigned_to_id)
+                )[1],
+                removed,
+            )
+
+    def test_invalid_edits(self):
+        """Should reject unknown operations, arguments and projects."""
+        portfolio = self.portfolio()
+        for edit in (
+            {"op": "drop_table"},
+            {"op": "set_estimate", "task": self.design.pk},
+            {"op": "add_project", "project": self.rfp.pk},
+            {"op": "set_due_date", "task": self.design.pk, "due_date": "soon"},
+            {"op": "set_due_date", "task": self.design.pk, "due_date": 5},
+            {"op": "set_priority", "project": self.booked.pk, "priority": "high"},
+            {"op": "set_priority", "project": self.booked.pk, "priority": -1},
+            {"op": "set_priority", "project": 0, "priority": 1},
+            {"op": "set_estimate", "task": self.design.pk, "hours": -1},
+            {"op": "set_estimate", "task": self.design.pk, "hours": "nan"},
+            {"op": "set_estimate", "task": self.design.pk, "hours": [8]},
+            {"op": "set_capacity", "user": self.user1.pk, "hours": "inf"},
+        ):
+            with self.subTest(edit=edit), self.assertRaises(ValidationError):
+                Scenario(portfolio).apply([edit])
+
+    def test_coerces_arguments(self):
+        """Should accept numbers and dates given as strings."""
+        scenario = Scenario(self.portfolio()).apply(
+            [
+                {"op": "set_priority", "project": self.booked.pk, "priority": "3"},
+                {"op": "set_estimate", "task": self.design.pk, "hours": "4.5"},
+                {"op": "set_due_date", "task": self.design.pk, "due_date": None},
+            ]
+        )
+        self.assertEqual(scenario.priorities, {self.booked.pk: 3})
+        self.assertEqual(
+            scenario.task_changes[self.design.pk],
+            {"hours_estimate": 4.5, "due_date": None},
+        )
+
+    def test_does_not_change_stored_tasks(self):
+        """Should leave every task row as it was."""
+        before = list(Task.objects.order_by("pk").values())
+        Scenario(self.portfolio([self.rfp.pk])).apply(
+            [
+                {"op": "add_project", "project": self.rfp.pk},
+                {"op": "set_estimate", "task": self.design.pk, "hours": 24},
+                {"op": "remove_user", "user": self.user1.pk},
+            ]
+        ).run()
+        self.assertEqual(list(Task.objects.order_by("pk").values()), before)
+
+
+class ScenarioViewSetCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create(
+            username="manager", daily_capacity_hours=8
+        )
+        client = Client.objects.create()
+        cls.rfp = client.projects.create(status=Project.ProjectStatus.WRITING_RFP)
+        cls.task = cls.rfp.tasks.create(hours_estimate=8)
+        return super().setUpTestData()
+
+    def setUp(self):
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def test_run_scenario(self):
+        """Should respond with the tasks the scenario adds."""
+        response = self.api.post(
+            "/api/scenarios/",
+            {
+                "candidates": [self.rfp.pk],
+                "edits": [{"op": "add_project", "project": self.rfp.pk}],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        changes = response.data["tasks"][self.task.pk]
+        self.assertEqual(changes["assigned_to_id"], (None, self.user.pk))
+
+    def test_invalid_edit(self):
+        """Should respond 400 for an edit that cannot be applied."""
+        for candidates, edit in (
+            ([], {"op": "add_project", "project": self.rfp.pk}),
+            (
+                [self.rfp.pk],
+                {"op": "set_due_date", "task": self.task.pk, "due_date": 5},
+            ),
+        ):
+            response = self.api.post(
+                "/api/scenarios/",
+                {"candidates": candidates, "edits": [edit]},
+                format="json",
+            )
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("edits", response.data)
@@ -0,0 +1,93 @@
+import random
+from datetime import date, datetime, timedelta
+
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from task.scheduling import (
+    TaskRecord,
+    WorkCalendar,
+    build_task_graph,
+    compute_graph_schedule,
+    compute_schedule,
+)
+
+ORIGIN = date(2026, 1, 5)
+
+
+def portfolio(count, rng):
+    """A random forest with prerequisites between leaves, as TaskRecords."""
+    tasks = {}
+    for task_id in range(1, count + 1):
+        parent_id = None
+        if task_id > 1 and rng.random() < 0.8:
+            parent_id = rng.randrange(1, task_id)
+        if parent_id is not None:
+            tasks[parent_id] = tasks[parent_id]._replace(hours_estimate=0)
+        manual = rng.random() < 0.1
+        tasks[task_id] = TaskRecord(
+            id=task_id,
+            project_id=1 + task_id % 3,
+            parent_id=parent_id,
+            status="COMPLETED" if rng.random() < 0.1 else "NOT_STARTED",
+            hours_estimate=rng.choice([1, 2.5, 4, 8, 16]),
+            buffer_before=rng.randrange(2),
+            buffer_after=rng.randrange(2),
+            schedule_datetime=(
+                timezone.make_aware(datetime(2026, 1, 5, 9))
+                + timedelta(days=rng.randrange(20))
+                if manual
+                else None
+            ),
+            auto_schedule=not manual,
+            due_date=ORIGIN + timedelta(days=rng.randrange(30))
+            if rng.random() < 0.5
+            else None,
+            risk_hours=0,
+        )
+    parents = {task.parent_id for task in tasks.values()}
+    leaves = [task_id for task_id in tasks if task_id not in parents]
+    edges = {
+        (leaves[j], leaves[i])
+        for i in range(len(leaves))
+        for j in range(i + 1, min(i + 5, len(leaves)))
+        if rng.random() < 0.3
+    }
+    return tasks, sorted(edges)
+
+
+class ComputeGraphScheduleCases(SimpleTestCase):
+    def setUp(self):
+        self.calendar = WorkCalendar(ORIGIN, hours_per_day=8, day_start_hour=9)
+
+    def test_matches_compute_schedule(self):
+        """Should give the same times, slack and risk as before."""
+        rng = random.Random(7)
+        for count in (1, 30, 300):
+            tasks, edges = portfolio(count, rng)
+            expected = compute_schedule(tasks, edges, self.calendar, now_offset=4)
+            actual = compute_graph_schedule(
+                build_task_graph(list(tasks.values()), edges),
+                self.calendar,
+                now_offset=4,
+            )
+            for name in ("early_start", "early_finish", "slack", "risk_hours"):
+                with self.subTest(count=count, name=name):
+                    expected_values = getattr(expected, name)
+                    actual_values = getattr(actual, name)
+                    self.assertEqual(actual_values.keys(), expected_values.keys())
+                    for task_id, value in expected_values.items():
+                        self.assertAlmostEqual(actual_values[task_id], value)
+
+    def test_cycle(self):
+        """Should raise ValidationError."""
+        tasks, _ = portfolio(2, random.Random(1))
+        graph = build_task_graph(list(tasks.values()), [(1, 2), (2, 1)])
+        with self.assertRaises(ValidationError):
+            compute_graph_schedule(graph, self.calendar)
+
+    def test_empty(self):
+        """Should schedule nothing."""
+        schedule = compute_graph_schedule(build_task_graph([], []), self.calendar)
+        self.assertEqual(schedule.early_start, {})
@@ -0,0 +1,73 @@
+import random
+from datetime import date
+
+from django.test import SimpleTestCase
+
+from task.scheduling import (
+    WorkCalendar,
+    compute_incremental_schedule,
+    compute_schedule,
+)
+
+from .test_compute_schedule import record
+
+
+class ComputeIncrementalScheduleCases(SimpleTestCase):
+    def setUp(self):
+        self.calendar = WorkCalendar(date(2026, 1, 5), hours_per_day=8)
+
+    def stored(self, tasks, edges):
+        """Return tasks with schedule_datetime set from a full schedule."""
+        schedule = compute_schedule(tasks, edges, self.calendar)
+        return {
+            task_id: task._replace(schedule_datetime=schedule.start_datetime(task_id))
+            for task_id, task in tasks.items()
+        }
+
+    def test_only_downstream_cone(self):
+        """Should recompute the changed task, its dependents and ancestors only."""
+        tasks = {
+            task.id: task
+            for task in [
+                record(1),
+                record(2, parent_id=1, hours=4),
+                record(3, parent_id=1, hours=4),
+                record(4, hours=2),
+                record(5, hours=1),
+            ]
+        }
+        edges = [(3, 2), (5, 4)]
+        tasks = self.stored(tasks, edges)
+        tasks[2] = tasks[2]._replace(hours_estimate=6)
+
+        schedule = compute_incremental_schedule(tasks, edges, self.calendar, {2})
+
+        self.assertEqual(set(schedule.early_start), {1, 2, 3})
+        self.assertEqual(schedule.early_start[3], 6)
+        self.assertEqual(schedule.early_finish[1], 10)
+
+    def test_matches_full_schedule(self):
+        """Should agree with a full recompute on a random graph."""
+        rng = random.Random(7)
+        tasks = {}
+        for task_id in range(1, 201):
+            parent_id = rng.randint(1, 20) if task_id > 20 else None
+            hours = 0 if task_id <= 20 else rng.randint(1, 12)
+            tasks[task_id] = record(task_id, parent_id=parent_id, hours=hours)
+        edges = [
+            (task_id, rng.randint(21, task_id - 1))
+            for task_id in range(30, 201)
+            for _ in range(2)
+        ]
+        tasks = self.stored(tasks, edges)
+        for task_id in (25, 90, 150):
+            tasks[task_id] = tasks[task_id]._replace(hours_estimate=20)
+
+        incremental = compute_incremental_schedule(
+            tasks, edges, self.calendar, {25, 90, 150}
+        )
+        full = compute_schedule(tasks, edges, self.calendar)
+        for task_id in incremental.early_start:
+            self.assertAlmostEqual(
+                incremental.early_finish[task_id], full.early_finish[task_id]
+            )
@@ -0,0 +1,89 @@
+from datetime import date
+
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase
+
+from task.scheduling import TaskRecord, WorkCalendar, compute_schedule
+
+# A Monday, so working-day arithmetic in the assertions stays simple.
+ORIGIN = date(2026, 1, 5)
+
+
+def record(task_id, parent_id=None, hours=0, before=0, after=0, due_date=None):
+    return TaskRecord(
+        id=task_id,
+        project_id=1,
+        parent_id=parent_id,
+        status="NOT_STARTED",
+        hours_estimate=hours,
+        buffer_before=before,
+        buffer_after=after,
+        schedule_datetime=None,
+        auto_schedule=True,
+        due_date=due_date,
+        risk_hours=0,
+    )
+
+
+class ComputeScheduleCases(SimpleTestCase):
+    def setUp(self):
+        self.calendar = WorkCalendar(ORIGIN, hours_per_day=8, day_start_hour=9)
+
+    def schedule(self, records, edges=()):
+        tasks = {task.id: task for task in records}
+        return compute_schedule(tasks, list(edges), self.calendar)
+
+    def test_chain(self):
+        """Should start each task when its prerequisite finishes."""
+        schedule = self.schedule(
+            [record(1, hours=4), record(2, hours=6)], edges=[(2, 1)]
+        )
+        self.assertEqual(schedule.early_start[2], 4)
+        self.assertEqual(schedule.early_finish[2], 10)
+        self.assertEqual(schedule.critical_path, [1, 2])
+
+    def test_buffers(self):
+        """Should add buffer days between prerequisite and dependent."""
+        schedule = self.schedule(
+            [record(1, hours=8, after=1), record(2, hours=1, before=2)],
+            edges=[(2, 1)],
+        )
+        self.assertEqual(schedule.early_start[2], 8 + 3 * 8)
+
+    def test_slack(self):
+        """Should report slack on the shorter branch."""
+        schedule = self.schedule(
+            [record(1, hours=2), record(2, hours=10), record(3, hours=1)],
+            edges=[(3, 1), (3, 2)],
+        )
+        self.assertEqual(schedule.slack[1], 8)
+        self.assertEqual(schedule.slack[2], 0)
+
+    def test_parent_spans_children(self):
+        """Should start children with their parent and finish the parent last."""
+        schedule = self.schedule(
+            [
+                record(1, hours=3),
+                record(2),
+                record(3, parent_id=2, hours=2),
+                record(4, parent_id=2, hours=5),
+            ],
+            edges=[(2, 1)],
+        )
+        self.assertEqual(schedule.early_start[3], 3)
+        self.assertEqual(schedule.early_finish[2], 8)
+
+    def test_risk_hours(self):
+        """Should report hours past the end of the due date."""
+        schedule = self.schedule([record(1, hours=20, due_date=ORIGIN)])
+        self.assertEqual(schedule.risk_hours[1], 12)
+
+    def test_weekend_is_skipped(self):
+        """Should map offsets past Friday onto the following Monday."""
+        schedule = self.schedule([record(1, hours=40), record(2)], edges=[(2, 1)])
+        self.assertEqual(schedule.start_datetime(2).date(), date(2026, 1, 12))
+
+    def test_cycle(self):
+        """Should raise ValidationError."""
+        with self.assertRaises(ValidationError):
+            self.schedule([record(1), record(2)], edges=[(1, 2), (2, 1)])
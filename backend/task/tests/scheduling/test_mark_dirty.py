@@ -0,0 +1,87 @@
+from datetime import date, datetime
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from client.models import Client
+from task import queue, scheduling
+
+
+@override_settings(SCHEDULING_QUEUE_BACKEND="inline")
+class MarkDirtyCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        client = Client.objects.create()
+        cls.project = client.projects.create()
+        return super().setUpTestData()
+
+    def setUp(self):
+        scheduling._dirty_state().dirty.clear()
+
+    def test_edits_coalesce_into_one_recompute(self):
+        """Should reschedule all edited tasks with a single call."""
+        task1 = self.project.tasks.create(hours_estimate=1)
+        task2 = self.project.tasks.create(hours_estimate=1)
+        with mock.patch.object(scheduling, "reschedule_tasks") as reschedule:
+            with self.captureOnCommitCallbacks(execute=True):
+                with scheduling.coalesce_rescheduling():
+                    task1.hours_estimate = 2
+                    task1.save()
+                    task2.prerequisites.add(task1)
+                    task2.buffer_before = 1
+                    task2.save()
+        reschedule.assert_called_once_with({task1.id, task2.id})
+
+    def test_unrelated_change_is_ignored(self):
+        """Should not queue a task whose schedule inputs did not change."""
+        task1 = self.project.tasks.create()
+        scheduling._dirty_state().dirty.clear()
+        task1.description = "Updated"
+        task1.save()
+        self.assertEqual(scheduling._dirty_state().dirty, set())
+
+    def test_flush_writes_downstream_schedule(self):
+        """Should move a dependent when its prerequisite's estimate changes."""
+        calendar = scheduling.WorkCalendar(date(2026, 1, 5), hours_per_day=8)
+        now = timezone.make_aware(datetime(2026, 1, 5, 9))
+        task1 = self.project.tasks.create(hours_estimate=2)
+        task2 = self.project.tasks.create(hours_estimate=1)
+        task2.prerequisites.add(task1)
+        scheduling.schedule_projects([self.project.id], calendar=calendar, now=now)
+
+        task1.hours_estimate = 5
+        task1.save()
+        scheduling._dirty_state().dirty.clear()
+        scheduling.reschedule_tasks([task1.id], calendar=calendar, now=now)
+
+        task2.refresh_from_db()
+        self.assertEqual(task2.schedule_datetime, calendar.to_datetime(5))
+
+
+@override_settings(SCHEDULING_QUEUE_BACKEND="local")
+class MarkDirtyQueuedCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        client = Client.objects.create()
+        cls.project = client.projects.create()
+        return super().setUpTestData()
+
+    def setUp(self):
+        scheduling._dirty_state().dirty.clear()
+        queue._queues.clear()
+
+    def test_enqueues_project_instead_of_rescheduling(self):
+        """Should hand edited projects and their tasks to the worker queue once."""
+        task1 = self.project.tasks.create(hours_estimate=1)
+        task2 = self.project.tasks.create(hours_estimate=1)
+        with mock.patch.object(scheduling, "reschedule_tasks") as reschedule:
+            with self.captureOnCommitCallbacks(execute=True):
+                task1.hours_estimate = 2
+                task1.save()
+                task2.hours_estimate = 2
+                task2.save()
+        reschedule.assert_not_called()
+        self.assertEqual(list(queue.get_queue().pending), [self.project.id])
+        job = queue.get_queue().claim(1)[0]
+        self.assertEqual(job.task_ids, {task1.id, task2.id})
@@ -0,0 +1,56 @@
+from datetime import date, datetime
+
+from django.test import TestCase
+from django.utils import timezone
+
+from client.models import Client
+from task.scheduling import WorkCalendar, schedule_projects
+
+
+class ScheduleProjectsCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        client = Client.objects.create()
+        cls.project = client.projects.create()
+        return super().setUpTestData()
+
+    def test_writes_schedule(self):
+        """Should store schedule_datetime and risk_hours."""
+        parent = self.project.tasks.create()
+        task1 = self.project.tasks.create(parent=parent, hours_estimate=8)
+        task2 = self.project.tasks.create(
+            parent=parent, hours_estimate=4, due_date=date(2026, 1, 5)
+        )
+        task2.prerequisites.add(task1)
+        calendar = WorkCalendar(date(2026, 1, 5), hours_per_day=8, day_start_hour=9)
+        now = timezone.make_aware(datetime(2026, 1, 5, 9))
+
+        schedule_projects([self.project.id], calendar=calendar, now=now)
+
+        for task in (parent, task1, task2):
+            task.refresh_from_db()
+        self.assertEqual(task2.schedule_datetime, calendar.to_datetime(8))
+        self.assertEqual(task2.risk_hours, 4)
+
+    def test_leaves_dependent_hours_to_rollups(self):
+        """Should not write the maintained dependent_hours column."""
+        parent = self.project.tasks.create()
+        self.project.tasks.create(parent=parent, hours_estimate=8)
+        self.project.tasks.filter(pk=parent.pk).update(dependent_hours=3)
+
+        schedule_projects([self.project.id])
+
+        parent.refresh_from_db()
+        self.assertEqual(parent.dependent_hours, 3)
+
+    def test_query_count_independent_of_size(self):
+        """Should load and save the project with a fixed number of queries."""
+        previous = None
+        for _ in range(20):
+            task = self.project.tasks.create(hours_estimate=1)
+            if previous is not None:
+                task.prerequisites.add(previous)
+            previous = task
+        # Load tasks, load edges, write the schedule, drop the report snapshot.
+        with self.assertNumQueries(4):
+            schedule_projects([self.project.id])
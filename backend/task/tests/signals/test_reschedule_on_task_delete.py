@@ -0,0 +1,34 @@
+from django.test import TestCase
+
+from client.models import Client
+from task import scheduling
+from task.models import Task
+
+
+class RescheduleOnTaskDeleteCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        client = Client.objects.create()
+        cls.project = client.projects.create()
+        return super().setUpTestData()
+
+    def setUp(self):
+        self.parent = self.project.tasks.create()
+        self.prerequisite = self.project.tasks.create(
+            parent=self.parent, hours_estimate=4
+        )
+        self.dependent = self.project.tasks.create(hours_estimate=2)
+        self.dependent.prerequisites.add(self.prerequisite)
+        scheduling._dirty_state().dirty.clear()
+
+    def test_delete_queues_dependents_and_parent(self):
+        """Should queue the tasks whose prerequisite or child was deleted."""
+        self.prerequisite.delete()
+        self.assertEqual(
+            scheduling._dirty_state().dirty, {self.parent.id, self.dependent.id}
+        )
+
+    def test_queryset_delete_queues_dependents(self):
+        """Should queue dependents when prerequisites are deleted in bulk."""
+        Task.objects.filter(pk=self.parent.pk).delete()
+        self.assertIn(self.dependent.id, scheduling._dirty_state().dirty)
@@ -0,0 +1,46 @@
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.test import TestCase
+
+from client.models import Client
+
+
+class ValidatePrerequisitesOnChangeCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        client = Client.objects.create()
+        cls.project = client.projects.create()
+        return super().setUpTestData()
+
+    def test_add_without_cycle(self):
+        """Should add the prerequisite."""
+        task1 = self.project.tasks.create()
+        task2 = self.project.tasks.create()
+        task2.prerequisites.add(task1)
+        self.assertQuerySetEqual(task2.prerequisites.all(), [task1])
+
+    def test_add_self_reference(self):
+        """Should raise ValidationError without storing the edge."""
+        task1 = self.project.tasks.create()
+        with self.assertRaises(ValidationError), transaction.atomic():
+            task1.prerequisites.add(task1)
+        self.assertFalse(task1.prerequisites.exists())
+
+    def test_add_closing_cycle(self):
+        """Should raise ValidationError without storing the edge."""
+        task1 = self.project.tasks.create()
+        task2 = self.project.tasks.create()
+        task3 = self.project.tasks.create()
+        task2.prerequisites.add(task1)
+        task3.prerequisites.add(task2)
+        with self.assertRaises(ValidationError), transaction.atomic():
+            task1.prerequisites.add(task3)
+        self.assertFalse(task1.prerequisites.exists())
+
+    def test_reverse_add_closing_cycle(self):
+        """Should raise ValidationError when the edge is added from the other side."""
+        task1 = self.project.tasks.create()
+        task2 = self.project.tasks.create()
+        task2.prerequisites.add(task1)
+        with self.assertRaises(ValidationError), transaction.atomic():
+            task2.dependents.add(task1)
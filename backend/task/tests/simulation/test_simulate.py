@@ -0,0 +1,182 @@
+import random
+from datetime import date, datetime
+
+import numpy as np
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from client.models import Client
+from project.models import Project
+from task.benchmarks import prerequisite_pairs, tree_parents
+from task.models import TaskForecast
+from task.scheduling import TaskRecord, WorkCalendar, compute_schedule
+from task.simulation import (
+    CHUNK_TRIALS,
+    build_graph,
+    duration_ranges,
+    sample_triangular,
+    simulate,
+    simulate_chunk,
+    simulate_projects,
+)
+
+ORIGIN = date(2026, 1, 5)
+
+
+def random_project(count, seed=0):
+    """A random tree of ``count`` tasks with prerequisites between its leaves."""
+    rng = random.Random(seed)
+    parents = tree_parents(count, "wide", branching=4)
+    has_children = {parent for parent in parents if parent is not None}
+    tasks = {
+        i + 1: TaskRecord(
+            id=i + 1,
+            project_id=1,
+            parent_id=None if parent is None else parent + 1,
+            status="NOT_STARTED",
+            hours_estimate=0 if i in has_children else rng.randint(1, 16),
+            buffer_before=0,
+            buffer_after=rng.randint(0, 1),
+            schedule_datetime=None,
+            auto_schedule=True,
+            due_date=date(2026, 1, 30),
+            risk_hours=0,
+        )
+        for i, parent in enumerate(parents)
+    }
+    leaves = [task_id for task_id in tasks if task_id - 1 not in has_children]
+    return tasks, prerequisite_pairs(leaves, rng, per_task=1.0, window=10)
+
+
+class SimulateCases(SimpleTestCase):
+    def setUp(self):
+        self.calendar = WorkCalendar(ORIGIN, hours_per_day=8, day_start_hour=9)
+        self.tasks, self.edges = random_project(200)
+
+    def test_fixed_durations_match_critical_path(self):
+        """Should reproduce compute_schedule when every range is a point."""
+        ranges = {
+            task_id: (task.hours_estimate,) * 3 for task_id, task in self.tasks.items()
+        }
+        graph = build_graph(self.tasks, self.edges, ranges, self.calendar)
+        result = simulate(graph, trials=3, seed=1)
+        schedule = compute_schedule(self.tasks, self.edges, self.calendar)
+        np.testing.assert_allclose(
+            result.p90, [schedule.early_finish[task_id] for task_id in result.task_ids]
+        )
+
+    def test_rejects_trials_below_one(self):
+        """Should raise ValidationError instead of simulating no trials."""
+        ranges = {
+            task_id: (task.hours_estimate,) * 3 for task_id, task in self.tasks.items()
+        }
+        graph = build_graph(self.tasks, self.edges, ranges, self.calendar)
+        for trials in (0, -1):
+            with self.subTest(trials=trials), self.assertRaises(ValidationError):
+                simulate(graph, trials=trials)
+        with self.assertRaises(CommandError):
+            call_command("simulate_schedule", "--trials", "0")
+
+    def test_spread_moves_finish_later(self):
+        """Should put P90 after P50, and P50 after the single-point finish."""
+        graph = build_graph(
+            self.tasks, self.edges, duration_ranges(self.tasks, {}, {}), self.calendar
+        )
+        result = simulate(graph, trials=400, seed=1)
+        schedule = compute_schedule(self.tasks, self.edges, self.calendar)
+        root = result.task_ids.index(1)
+        self.assertGreater(result.p50[root], schedule.early_finish[1])
+        self.assertGreater(result.p90[root], result.p50[root])
+        self.assertTrue(np.all(result.overrun_probability >= 0))
+
+    def test_deterministic_across_processes(self):
+        """Should give the same results for a seed on one or two processes."""
+        graph = build_graph(
+            self.tasks, self.edges, duration_ranges(self.tasks, {}, {}), self.calendar
+        )
+        one = simulate(graph, trials=300, seed=7)
+        two = simulate(graph, trials=300, seed=7, processes=2)
+        np.testing.assert_array_equal(one.p90, two.p90)
+
+    def test_chunks_reduce_to_whole_run(self):
+        """Should give the statistics of all trials at once, whatever the chunks."""
+        graph = build_graph(
+            self.tasks, self.edges, duration_ranges(self.tasks, {}, {}), self.calendar
+        )
+        trials = 2 * CHUNK_TRIALS + 10
+        result = simulate(graph, trials=trials, seed=3)
+
+        seeds = np.random.SeedSequence(3).spawn(3)
+        finish = np.hstack(
+            [
+                simulate_chunk(graph, seed, size)
+                for seed, size in zip(seeds, (CHUNK_TRIALS, CHUNK_TRIALS, 10))
+            ]
+        )
+        p50, p90 = np.percentile(finish, [50, 90], axis=1)
+        np.testing.assert_array_equal(result.p50, p50)
+        np.testing.assert_array_equal(result.p90, p90)
+        np.testing.assert_array_equal(
+            result.overrun_probability,
+            (finish > graph.due[:, np.newaxis]).mean(axis=1),
+        )
+
+    def test_triangular_samples(self):
+        """Should draw within the range with the triangular mean."""
+        rng = np.random.default_rng(0)
+        low, mode, high = np.array([[2.0, 5.0], [4.0, 5.0], [9.0, 5.0]])
+        samples = sample_triangular(rng, low, mode, high, 20000)
+        self.assertTrue(np.all((samples >= low[:, None]) & (samples <= high[:, None])))
+        self.assertAlmostEqual(samples[0].mean(), 5.0, delta=0.05)
+        self.assertTrue(np.all(samples[1] == 5.0))
+
+    def test_rejects_cycle(self):
+        """Should refuse a prerequisite cycle."""
+        tasks, _ = random_project(3)
+        with self.assertRaises(ValidationError):
+            build_graph(
+                tasks, [(2, 3), (3, 2)], duration_ranges(tasks, {}, {}), self.calendar
+            )
+
+
+class SimulateProjectsCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.project = Client.objects.create().projects.create(
+            status=Project.ProjectStatus.BOOKED
+        )
+        cls.first = cls.project.tasks.create(
+            hours_estimate=8, hours_optimistic=6, hours_pessimistic=24
+        )
+        cls.second = cls.project.tasks.create(
+            hours_estimate=8, due_date=date(2026, 1, 6)
+        )
+        cls.second.prerequisites.add(cls.first)
+        return super().setUpTestData()
+
+    def test_stores_forecasts(self):
+        """Should store P50/P90 finishes and the overrun probability per task."""
+        calendar = WorkCalendar(ORIGIN, hours_per_day=8, day_start_hour=9)
+        now = timezone.make_aware(datetime(2026, 1, 5, 9))
+        # Load tasks, load edges, load ranges, upsert forecasts.
+        with self.assertNumQueries(4):
+            simulate_projects(
+                [self.project.pk], trials=500, calendar=calendar, now=now, seed=0
+            )
+        first = TaskForecast.objects.get(task=self.first)
+        second = TaskForecast.objects.get(task=self.second)
+        self.assertIsNone(first.overrun_probability)
+        self.assertLess(first.finish_p50, second.finish_p50)
+        self.assertLessEqual(second.finish_p50, second.finish_p90)
+        # Two days of work due by the end of the second day: late unless both
+        # tasks come in at or under estimate.
+        self.assertGreater(second.overrun_probability, 0.5)
+        self.assertEqual(second.trials, 500)
+
+    def test_rejects_range_outside_estimate(self):
+        """Should require optimistic <= estimate <= pessimistic."""
+        self.first.hours_optimistic = 9
+        with self.assertRaises(ValidationError):
+            self.first.full_clean()
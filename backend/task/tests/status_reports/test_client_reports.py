@@ -0,0 +1,155 @@
+import csv
+import io
+from datetime import datetime, timedelta
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from client.models import Client
+from task.models import ProjectSnapshot, Task, TimeEntry
+from task.status_reports import (
+    CSV_COLUMNS,
+    client_reports,
+    percent_complete,
+    render_csv,
+    render_pdf,
+)
+from task.timers import start_timer, stop_timer
+
+START = timezone.make_aware(datetime(2026, 1, 5, 9))
+
+
+class ClientReportCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create(username="consultant")
+        cls.client_ = Client.objects.create(name="Acme")
+        cls.project = cls.client_.projects.create(name="Website")
+        cls.other = cls.client_.projects.create(name="Intranet")
+        cls.phase = cls.project.tasks.create(name="Design")
+        cls.leaf = cls.project.tasks.create(parent=cls.phase, hours_estimate=8)
+        cls.done = cls.project.tasks.create(
+            parent=cls.phase, hours_estimate=2, status=Task.TaskStatus.COMPLETED
+        )
+        cls.other.tasks.create(name="Everything", hours_estimate=5)
+        TimeEntry.objects.create(
+            task=cls.leaf,
+            user=cls.user,
+            start_time=START,
+            end_time=START + timedelta(hours=2),
+        )
+        return super().setUpTestData()
+
+    def report(self):
+        return {
+            project["name"]: project
+            for project in client_reports([self.client_.pk])[0]["projects"]
+        }
+
+    def test_percent_complete(self):
+        """Should report the share of the estimate no longer remaining."""
+        self.assertEqual(percent_complete(10, 6), 40.0)
+        self.assertEqual(percent_complete(0, 0), 100.0)
+
+    def test_report_figures(self):
+        """Should report rollups, task counts and phases per project."""
+        website = self.report()["Website"]
+        self.assertEqual(
+            (
+                website["estimate_hours"],
+                website["actual_hours"],
+                website["remaining_hours"],
+            ),
+            (10, 2, 6),
+        )
+        self.assertEqual(website["percent_complete"], 40.0)
+        self.assertEqual((website["tasks"], website["completed_tasks"]), (2, 1))
+        self.assertEqual([phase["name"] for phase in website["phases"]], ["Design"])
+
+    def test_renders_cached_snapshots_in_one_query(self):
+        """Should read every project and snapshot with one query once cached."""
+        for i in range(10):
+            self.client_.projects.create(name=f"Extra {i}").tasks.create()
+        self.report()
+        self.assertEqual(ProjectSnapshot.objects.count(), 12)
+        with self.assertNumQueries(1):
+            self.report()
+
+    def test_task_change_invalidates_only_its_project(self):
+        """Should drop the snapshot of the edited project and keep the others."""
+        self.report()
+        self.leaf.hours_estimate = 12
+        self.leaf.save()
+        self.assertEqual(
+            list(ProjectSnapshot.objects.values_list("project", flat=True)),
+            [self.other.pk],
+        )
+        self.assertEqual(self.report()["Website"]["estimate_hours"], 14)
+
+    def test_task_move_invalidates_both_projects(self):
+        """Should drop the snapshots of the project a task left and joined."""
+        task = self.project.tasks.create(name="Loose", hours_estimate=1)
+        self.report()
+        task.project = self.other
+        task.save()
+        self.assertFalse(ProjectSnapshot.objects.exists())
+        self.assertEqual(self.report()["Website"]["estimate_hours"], 10)
+
+        self.report()
+        task = Task.objects.only("id").get(pk=task.pk)
+        task.project_id = self.project.pk
+        task.save()
+        self.assertFalse(ProjectSnapshot.objects.exists())
+
+    def test_time_entry_change_invalidates(self):
+        """Should refresh a project's snapshot after time is logged on it."""
+        self.report()
+        start_timer(self.user, self.leaf.pk, at=START + timedelta(hours=3))
+        with self.captureOnCommitCallbacks(execute=True):
+            stop_timer(self.user, at=START + timedelta(hours=4))
+        self.assertFalse(ProjectSnapshot.objects.filter(project=self.project).exists())
+        self.assertEqual(self.report()["Website"]["actual_hours"], 3)
+
+    def test_bulk_task_delete_invalidates(self):
+        """Should drop the snapshot when tasks are deleted in bulk."""
+        self.report()
+        Task.objects.filter(pk=self.done.pk).delete()
+        self.assertFalse(ProjectSnapshot.objects.filter(project=self.project).exists())
+
+    def test_csv(self):
+        """Should write a row per project and per phase."""
+        rows = list(csv.reader(io.StringIO(render_csv(client_reports([self.client_])))))
+        self.assertEqual(tuple(rows[0]), CSV_COLUMNS)
+        self.assertEqual(
+            [(row[1], row[3]) for row in rows[1:]],
+            [
+                ("Intranet", ""),
+                ("Intranet", "Everything"),
+                ("Website", ""),
+                ("Website", "Design"),
+            ],
+        )
+
+    def test_pdf(self):
+        """Should produce a PDF naming the client and its projects."""
+        content = render_pdf(client_reports([self.client_]))
+        self.assertTrue(content.startswith(b"%PDF-1.4"))
+        self.assertTrue(content.rstrip().endswith(b"%%EOF"))
+        self.assertIn(b"Status report: Acme", content)
+        self.assertIn(b"Website", content)
+
+    def test_export_command(self):
+        """Should write the reports to a file."""
+        with TemporaryDirectory() as directory:
+            output = Path(directory) / "reports.pdf"
+            call_command(
+                "export_status_reports",
+                "--format=pdf",
+                f"--output={output}",
+                stdout=io.StringIO(),
+            )
+            self.assertTrue(output.read_bytes().startswith(b"%PDF"))
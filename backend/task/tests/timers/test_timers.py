@@ -0,0 +1,166 @@
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from client.models import Client
+from task.models import TimeEntry
+from task.timers import running_timer, start_timer, stop_timer, switch_timer
+
+START = timezone.make_aware(datetime(2026, 1, 5, 9))
+
+
+def statements(queries):
+    """Queries other than transaction control."""
+    return [
+        query["sql"]
+        for query in queries
+        if "SAVEPOINT" not in query["sql"]
+        and query["sql"] not in ("BEGIN", "COMMIT")
+    ]
+
+
+class TimerCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create(username="consultant")
+        project = Client.objects.create().projects.create()
+        cls.parent = project.tasks.create()
+        cls.task = project.tasks.create(parent=cls.parent, hours_estimate=10)
+        cls.other = project.tasks.create(parent=cls.parent, hours_estimate=4)
+        return super().setUpTestData()
+
+    def test_start_is_one_statement(self):
+        """Should start a timer with a single INSERT."""
+        with CaptureQueriesContext(connection) as queries:
+            entry = start_timer(self.user, self.task.id, at=START)
+        self.assertEqual(len(statements(queries)), 1)
+        self.assertEqual(running_timer(self.user).pk, entry.pk)
+
+    def test_stop_is_one_statement(self):
+        """
+        Should stop the timer with a single UPDATE and roll its hours up the
+        tree and into the daily totals once the transaction commits.
+        """
+        start_timer(self.user, self.task.id, at=START)
+        with self.captureOnCommitCallbacks() as callbacks:
+            with CaptureQueriesContext(connection) as queries:
+                entry = stop_timer(self.user, at=START + timedelta(hours=3))
+        self.assertEqual(len(statements(queries)), 1)
+        self.assertEqual(entry.hours, 3)
+        self.assertIsNone(running_timer(self.user))
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(
+            list(self.task.daily_times.values_list("user", "day", "seconds")),
+            [(self.user.pk, START.date(), 3 * 3600)],
+        )
+        self.task.refresh_from_db()
+        self.parent.refresh_from_db()
+        self.assertEqual((self.task.actual_hours, self.task.remaining_hours), (3, 7))
+        self.assertEqual(self.parent.actual_hours, 3)
+        self.assertEqual(self.parent.remaining_hours, 11)
+
+    def test_switch(self):
+        """
+        Should stop the running timer and start the next one at the same time,
+        with the stop's UPDATE and the start's INSERT.
+        """
+        start_timer(self.user, self.task.id, at=START)
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as queries:
+                stopped, started = switch_timer(
+                    self.user, self.other.id, at=START + timedelta(hours=1)
+                )
+        self.assertEqual(len(statements(queries)), 2)
+        self.assertEqual(stopped.end_time, started.start_time)
+        self.assertEqual(running_timer(self.user).task_id, self.other.id)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.actual_hours, 1)
+
+    def test_rejects_start_inside_logged_entry(self):
+        """Should refuse a timer starting before an entry of the user ends."""
+        self.task.time_entries.create(
+            user=self.user,
+            start_time=START + timedelta(hours=2),
+            end_time=START + timedelta(hours=3),
+        )
+        with self.assertRaisesMessage(ValidationError, "would overlap"):
+            start_timer(self.user, self.other.id, at=START)
+        start_timer(self.user, self.other.id, at=START + timedelta(hours=3))
+
+    def test_rejects_second_running_timer(self):
+        """Should refuse to start a timer while another is running."""
+        start_timer(self.user, self.task.id, at=START)
+        with self.assertRaisesMessage(ValidationError, "already running"):
+            start_timer(self.user, self.other.id, at=START + timedelta(hours=1))
+
+    def test_rejects_overlap_with_logged_entry(self):
+        """Should refuse a timer starting inside an existing entry."""
+        entry = self.task.time_entries.create(
+            user=self.user, start_time=START, end_time=START + timedelta(hours=2)
+        )
+        with self.assertRaisesMessage(ValidationError, f"time entry {entry.pk}"):
+            start_timer(self.user, self.other.id, at=START + timedelta(hours=1))
+
+    def test_rejects_parent_task(self):
+        """Should refuse a timer on a parent task."""
+        with self.assertRaisesMessage(ValidationError, "leaf tasks"):
+            start_timer(self.user, self.parent.id, at=START)
+        self.assertFalse(TimeEntry.objects.exists())
+
+    def test_stop_without_timer(self):
+        """Should report that no timer is running."""
+        with self.assertRaisesMessage(ValidationError, "No timer is running."):
+            stop_timer(self.user, at=START)
+
+    def test_database_allows_one_running_timer(self):
+        """Should enforce one running timer per user in the database itself."""
+        TimeEntry.objects.bulk_create(
+            [TimeEntry(task=self.task, user=self.user, start_time=START)]
+        )
+        with self.assertRaises(IntegrityError):
+            TimeEntry.objects.bulk_create(
+                [TimeEntry(task=self.other, user=self.user, start_time=START)]
+            )
+
+
+class OverlappingCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        project = Client.objects.create().projects.create()
+        task = project.tasks.create()
+        cls.entries = TimeEntry.objects.bulk_create(
+            [
+                TimeEntry(
+                    task=task, start_time=START, end_time=START + timedelta(hours=2)
+                ),
+                TimeEntry(task=task, start_time=START + timedelta(hours=4)),
+            ]
+        )
+        return super().setUpTestData()
+
+    def overlapping(self, start, end=None):
+        return set(
+            TimeEntry.objects.overlapping(start, end).values_list("pk", flat=True)
+        )
+
+    def test_closed_range(self):
+        """Should match entries sharing any instant with the range."""
+        first, running = (entry.pk for entry in self.entries)
+
+        def hour(n):
+            return START + timedelta(hours=n)
+
+        self.assertEqual(self.overlapping(hour(1), hour(3)), {first})
+        self.assertEqual(self.overlapping(hour(2), hour(4)), set())
+        self.assertEqual(self.overlapping(hour(3), hour(9)), {running})
+
+    def test_open_range(self):
+        """Should treat a missing end as running forever."""
+        self.assertEqual(len(self.overlapping(START)), 2)
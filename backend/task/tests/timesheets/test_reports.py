@@ -0,0 +1,117 @@
+from datetime import date, datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from client.models import Client
+from task.models import TimeEntry
+from task.timesheets import (
+    billable_hours,
+    estimate_vs_actual,
+    timesheet,
+    utilization,
+)
+
+# A Monday.
+MONDAY = date(2026, 1, 5)
+
+
+def at(day, hour):
+    return timezone.make_aware(datetime.combine(day, datetime.min.time())) + timedelta(
+        hours=hour
+    )
+
+
+class ReportCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.alice = User.objects.create(username="alice", daily_capacity_hours=8)
+        cls.bob = User.objects.create(username="bob", daily_capacity_hours=4)
+        cls.billed = Client.objects.create(name="Customer").projects.create()
+        cls.house = Client.objects.create(name="Us", internal=True).projects.create()
+        billed_root = cls.billed.tasks.create()
+        cls.billed_task = cls.billed.tasks.create(parent=billed_root, hours_estimate=10)
+        cls.house_task = cls.house.tasks.create(hours_estimate=2)
+        for user, task, day, hours in (
+            (cls.alice, cls.billed_task, MONDAY, 6),
+            (cls.alice, cls.house_task, MONDAY + timedelta(days=1), 2),
+            (cls.alice, cls.billed_task, MONDAY + timedelta(days=7), 5),
+            (cls.bob, cls.billed_task, MONDAY + timedelta(days=2), 3),
+        ):
+            TimeEntry.objects.create(
+                task=task, user=user, start_time=at(day, 9), end_time=at(day, 9 + hours)
+            )
+        return super().setUpTestData()
+
+    def test_timesheet_by_user_and_week(self):
+        """Should sum hours per user and week."""
+        rows = timesheet(MONDAY, MONDAY + timedelta(days=14))
+        self.assertEqual(
+            [(row["user"], row["week"], row["hours"]) for row in rows],
+            [
+                (self.alice.pk, MONDAY, 8),
+                (self.alice.pk, MONDAY + timedelta(days=7), 5),
+                (self.bob.pk, MONDAY, 3),
+            ],
+        )
+
+    def test_timesheet_by_client(self):
+        """Should sum hours per client within the range only."""
+        rows = timesheet(MONDAY, MONDAY + timedelta(days=7), ("client",))
+        self.assertEqual(
+            {row["client"]: row["hours"] for row in rows},
+            {self.billed.client_id: 9, self.house.client_id: 2},
+        )
+
+    def test_unknown_grouping(self):
+        """Should raise ValueError for an unknown grouping."""
+        with self.assertRaises(ValueError):
+            timesheet(MONDAY, MONDAY + timedelta(days=7), ("colour",))
+
+    def test_billable_hours(self):
+        """Should split hours for internal clients from billable hours."""
+        rows = billable_hours(MONDAY, MONDAY + timedelta(days=7))
+        self.assertEqual(
+            [(row["user"], row["billable"], row["internal"]) for row in rows],
+            [(self.alice.pk, 6, 2), (self.bob.pk, 3, 0)],
+        )
+
+    def test_utilization(self):
+        """Should compare billable hours with capacity over working days."""
+        rows = utilization(MONDAY, MONDAY + timedelta(days=7))
+        by_user = {row.user_id: row for row in rows}
+        self.assertEqual(by_user[self.alice.pk].capacity_hours, 40)
+        self.assertEqual(by_user[self.alice.pk].logged_hours, 8)
+        self.assertAlmostEqual(by_user[self.alice.pk].utilization, 6 / 40)
+        self.assertEqual(by_user[self.bob.pk].capacity_hours, 20)
+        self.assertAlmostEqual(by_user[self.bob.pk].utilization, 3 / 20)
+
+    def test_report_queries_do_not_grow_with_entries(self):
+        """Should answer a report with one query however many entries exist."""
+        TimeEntry.objects.bulk_create_validated(
+            [
+                TimeEntry(
+                    task=self.billed_task,
+                    user=self.bob,
+                    start_time=at(MONDAY, 12) + timedelta(minutes=i),
+                    end_time=at(MONDAY, 12) + timedelta(minutes=i + 1),
+                )
+                for i in range(60)
+            ]
+        )
+        with self.assertNumQueries(1):
+            rows = timesheet(MONDAY, MONDAY + timedelta(days=7), ("user",))
+        self.assertEqual(rows[1]["hours"], 4)
+
+    def test_estimate_vs_actual(self):
+        """Should report estimate, actual and forecast per project."""
+        rows = {row.project_id: row for row in estimate_vs_actual()}
+        billed = rows[self.billed.pk]
+        self.assertEqual(
+            (billed.estimate_hours, billed.actual_hours, billed.remaining_hours),
+            (10, 14, 0),
+        )
+        self.assertEqual(billed.variance_hours, 4)
+        self.assertEqual(rows[self.house.pk].variance_hours, 0)
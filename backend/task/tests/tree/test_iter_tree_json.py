@@ -0,0 +1,40 @@
+import json
+
+from django.test import SimpleTestCase
+
+from task import tree
+
+
+def row(task_id, parent_id):
+    values = dict.fromkeys(tree.TREE_FIELDS[2:])
+    values.update(name=f"Task {task_id}", status="NOT_STARTED", hours_estimate=1.0)
+    return (task_id, parent_id, *values.values())
+
+
+class IterTreeJsonCases(SimpleTestCase):
+    def test_chunks_join_to_valid_json(self):
+        """Should stream a large tree in several chunks that parse as one document."""
+        root = row(1, None)
+        chain = [row(i, i - 1) for i in range(2, 300)]
+        leaves = [row(i, 1) for i in range(1000, 3000)]
+        children = {1: [chain[0]] + leaves}
+        for item in chain[1:]:
+            children[item[1]] = [item]
+
+        chunks = list(tree.iter_tree_json(7, [root], children))
+
+        self.assertGreater(len(chunks), 1)
+        document = json.loads("".join(chunks))
+        self.assertEqual(document["project"], 7)
+        self.assertEqual(len(document["tasks"][0]["children"]), 2001)
+        node, depth = document["tasks"][0], 0
+        while node["children"]:
+            node, depth = node["children"][0], depth + 1
+        self.assertEqual(depth, 298)
+
+    def test_empty(self):
+        """Should produce an empty task list for an empty project."""
+        self.assertEqual(
+            json.loads("".join(tree.iter_tree_json(1, [], {}))),
+            {"project": 1, "tasks": []},
+        )
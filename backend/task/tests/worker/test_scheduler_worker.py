@@ -0,0 +1,58 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from client.models import Client
+from task import worker
+from task.queue import LocalQueue
+from task.worker import SchedulerWorker
+
+
+class SchedulerWorkerCases(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        client = Client.objects.create()
+        cls.project = client.projects.create()
+        return super().setUpTestData()
+
+    def test_drains_queue(self):
+        """Should schedule every queued project and report latency."""
+        task = self.project.tasks.create(hours_estimate=4)
+        queue = LocalQueue()
+        queue.enqueue([self.project.id])
+
+        stats = SchedulerWorker(queue=queue).run(once=True)
+
+        task.refresh_from_db()
+        self.assertIsNotNone(task.schedule_datetime)
+        self.assertEqual(stats.processed, 1)
+        self.assertGreaterEqual(stats.latency_max, 0)
+        self.assertEqual(queue.stats().depth, 0)
+        self.assertEqual(queue.stats().running, 0)
+
+    def test_reschedules_edited_tasks_incrementally(self):
+        """Should reschedule only downstream of a job's edited tasks."""
+        task = self.project.tasks.create(hours_estimate=4)
+        queue = LocalQueue()
+        queue.enqueue([self.project.id], {self.project.id: [task.id]})
+
+        with mock.patch.object(worker, "schedule_projects") as schedule_projects:
+            stats = SchedulerWorker(queue=queue).run(once=True)
+
+        schedule_projects.assert_not_called()
+        task.refresh_from_db()
+        self.assertIsNotNone(task.schedule_datetime)
+        self.assertEqual(stats.tasks_scheduled, 1)
+
+    def test_failed_job_is_released(self):
+        """Should put a failing project back on the queue and stop in once mode."""
+        queue = LocalQueue()
+        queue.enqueue([self.project.id])
+        with mock.patch.object(
+            worker, "schedule_projects", side_effect=RuntimeError("boom")
+        ):
+            with self.assertLogs("task.worker", "ERROR"):
+                stats = SchedulerWorker(queue=queue).run(once=True)
+
+        self.assertEqual(stats.failed, 1)
+        self.assertEqual(queue.stats().depth, 1)
@@ -0,0 +1,204 @@
+"""
+Start, stop and switch time-tracking timers.
+
+A running timer is a ``TimeEntry`` with a ``start_time`` and no ``end_time``;
+the ``time_entry_one_running_timer`` constraint allows one per user. The timer
+actions skip ``TimeEntry.save()``'s ``full_clean()`` and check everything in
+the statement that writes, so a successful action costs at most two statements:
+
+* start: one ``INSERT ... SELECT`` that only inserts against an existing leaf
+  task when the timer would not overlap another of the user's entries.
+* stop: one ``UPDATE ... RETURNING`` that also reads what the rollups need.
+* switch: a stop followed by a start.
+
+The stopped entry's hours reach the task rollups, the project's report
+snapshot and the daily totals through the same ``roll_up_logged_hours`` and
+``DailyTime.add_seconds`` writes as every other time entry change, run in
+their own transaction once the timer's transaction commits. Should that
+transaction fail, ``rebuild_rollups`` and ``DailyTime.objects.rebuild``
+restore the derived columns from the entries.
+
+Only a failed action spends further queries, to explain why it failed.
+"""
+from datetime import timezone as dt_timezone
+from functools import partial
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from task.models import DailyTime, Task, TimeEntry
+from task.models.managers import spread_by_day
+from task.rollups import hours_between
+
+
+def running_timer(user):
+    """Return the user's running timer or ``None``, with one query."""
+    return (
+        TimeEntry.objects.filter(
+            user=user, start_time__isnull=False, end_time__isnull=True
+        )
+        .order_by()
+        .first()
+    )
+
+
+def start_timer(user, task_id, at=None):
+    """
+    Start a timer for ``user`` on the leaf task ``task_id`` at ``at`` (default:
+    now). Raises ValidationError if the task is missing or a parent, if a timer
+    is already running or if the user has an entry ending after ``at``.
+    """
+    at = at or timezone.now()
+    try:
+        with transaction.atomic():
+            return _start(user.pk, task_id, at)
+    except IntegrityError as error:
+        # Lost a race with a concurrent start for the same user.
+        raise ValidationError("A timer is already running.") from error
+
+
+def stop_timer(user, at=None):
+    """
+    Stop the user's running timer at ``at`` (default: now) and, once the
+    transaction commits, roll its hours up the task tree and into the daily
+    totals. Returns the stopped entry.
+    """
+    at = at or timezone.now()
+    with transaction.atomic():
+        return _stop(user.pk, at)
+
+
+def switch_timer(user, task_id, at=None):
+    """
+    Stop the running timer and start one on ``task_id`` at the same instant, in
+    one transaction. Returns ``(stopped, started)``.
+    """
+    at = at or timezone.now()
+    try:
+        with transaction.atomic():
+            stopped = _stop(user.pk, at)
+            return stopped, _start(user.pk, task_id, at)
+    except IntegrityError as error:
+        raise ValidationError("A timer is already running.") from error
+
+
+def _tables():
+    quote = connection.ops.quote_name
+    return quote(TimeEntry._meta.db_table), quote(Task._meta.db_table)
+
+
+def _start(user_id, task_id, at):
+    entries, tasks = _tables()
+    at_param = connection.ops.adapt_datetimefield_value(at)
+    # A timer from ``at`` onwards overlaps every entry that has not ended by
+    # then, which includes a running timer.
+    conflicts, conflict_params = (
+        TimeEntry.objects.filter(user_id=user_id)
+        .overlapping(at)
+        .order_by()
+        .values("pk")
+        .query.sql_with_params()
+    )
+    sql = f"""
+        INSERT INTO {entries} (task_id, user_id, start_time, end_time)
+        SELECT t.id, %s, %s, NULL FROM {tasks} t
+        WHERE t.id = %s AND t.child_count = 0 AND NOT EXISTS ({conflicts})
+        RETURNING id
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [user_id, at_param, task_id, *conflict_params])
+        row = cursor.fetchone()
+    if row is None:
+        _explain_failed_start(user_id, task_id, at)
+    return TimeEntry(
+        id=row[0], task_id=task_id, user_id=user_id, start_time=at, end_time=None
+    )
+
+
+def _explain_failed_start(user_id, task_id, at):
+    child_count = (
+        Task.objects.filter(pk=task_id).values_list("child_count", flat=True).first()
+    )
+    if child_count is None:
+        raise ValidationError("Task does not exist.")
+    if child_count > 0:
+        raise ValidationError("Time entries can only be applied to leaf tasks.")
+    conflict = (
+        TimeEntry.objects.filter(user_id=user_id)
+        .overlapping(at)
+        .order_by("start_time")
+        .values_list("pk", "end_time")
+        .first()
+    )
+    if conflict is None or conflict[1] is None:
+        raise ValidationError("A timer is already running.")
+    raise ValidationError(f"The timer would overlap time entry {conflict[0]}.")
+
+
+def _stop(user_id, at):
+    entries, tasks = _tables()
+    at_param = connection.ops.adapt_datetimefield_value(at)
+    task_columns = (
+        "project_id",
+        "path",
+        "hours_estimate",
+        "status",
+        "actual_hours",
+        "child_count",
+    )
+    lookups = ", ".join(
+        f"(SELECT t.{column} FROM {tasks} t WHERE t.id = {entries}.task_id)"
+        for column in task_columns
+    )
+    sql = f"""
+        UPDATE {entries} SET end_time = %s
+        WHERE user_id = %s AND start_time IS NOT NULL AND end_time IS NULL
+        AND start_time <= %s
+        RETURNING id, task_id, start_time, {lookups}
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [at_param, user_id, at_param])
+        row = cursor.fetchone()
+    if row is None:
+        if running_timer(user_id) is None:
+            raise ValidationError("No timer is running.")
+        raise ValidationError("A timer cannot stop before it started.")
+
+    entry_id, task_id, start, project_id, path, estimate, status, actual, children = (
+        row
+    )
+    entry = TimeEntry(
+        id=entry_id,
+        task_id=task_id,
+        user_id=user_id,
+        start_time=_to_datetime(start),
+        end_time=at,
+    )
+    hours = {task_id: hours_between(entry.start_time, at)}
+    rows = None
+    if children == 0:
+        # A leaf's actual hours are its own logged hours: no query needed.
+        rows = [(task_id, project_id, path, estimate, status, actual + hours[task_id])]
+    daily = {}
+    spread_by_day(daily, entry._span())
+    transaction.on_commit(partial(_roll_up_stopped, hours, rows, daily))
+    return entry
+
+
+def _roll_up_stopped(hours, rows, daily):
+    """Roll a stopped timer's hours into the tasks and the daily totals."""
+    with transaction.atomic():
+        Task.objects.roll_up_logged_hours(hours, rows)
+        DailyTime.objects.add_seconds(daily)
+
+
+def _to_datetime(value):
+    """Datetimes from raw SQL: SQLite returns text, naive in UTC."""
+    if isinstance(value, str):
+        value = parse_datetime(value)
+    if settings.USE_TZ and timezone.is_naive(value):
+        value = timezone.make_aware(value, dt_timezone.utc)
+    return value
@@ -0,0 +1,165 @@
+"""
+Timesheet, utilization and billing reports.
+
+Reports read ``DailyTime``, the seconds each user logged on each task per local
+day, rather than the raw time entries: a query over a date range touches one
+row per user, task and day worked whatever the number of entries behind it,
+and groups and sums it in the database. Estimate-versus-actual reads the
+rolled-up hours already maintained on each project's root tasks.
+"""
+from collections import namedtuple
+
+from django.contrib.auth import get_user_model
+from django.db.models import Case, F, Q, Sum, When
+from django.db.models.functions import TruncMonth, TruncWeek
+
+from task.models import DailyTime, Task
+from task.scheduling import WorkCalendar
+
+# group_by name -> expression on DailyTime it groups on; None for its own fields.
+GROUPINGS = {
+    "user": None,
+    "task": None,
+    "day": None,
+    "project": F("task__project_id"),
+    "client": F("task__project__client_id"),
+    "week": TruncWeek("day"),
+    "month": TruncMonth("day"),
+}
+
+Utilization = namedtuple(
+    "Utilization",
+    ["user_id", "capacity_hours", "logged_hours", "billable_hours", "utilization"],
+)
+
+EstimateVsActual = namedtuple(
+    "EstimateVsActual",
+    [
+        "project_id",
+        "estimate_hours",
+        "actual_hours",
+        "remaining_hours",
+        "forecast_hours",
+        "variance_hours",
+    ],
+)
+
+
+def daily_time(start, end, users=None, projects=None):
+    """``DailyTime`` rows for days in ``[start, end)``, optionally filtered."""
+    rows = DailyTime.objects.filter(day__gte=start, day__lt=end)
+    if users is not None:
+        rows = rows.filter(user__in=users)
+    if projects is not None:
+        rows = rows.filter(task__project__in=projects)
+    return rows.order_by()
+
+
+def _grouped(rows, group_by):
+    unknown = set(group_by) - GROUPINGS.keys()
+    if unknown:
+        raise ValueError(f"Unknown groupings: {', '.join(sorted(unknown))}")
+    return rows.values(
+        *(name for name in group_by if GROUPINGS[name] is None),
+        **{name: GROUPINGS[name] for name in group_by if GROUPINGS[name] is not None},
+    ).order_by(*group_by)
+
+
+def timesheet(start, end, group_by=("user", "week"), users=None, projects=None):
+    """
+    Hours logged in ``[start, end)`` summed per combination of the
+    ``group_by`` names from ``GROUPINGS``. Returns a list of dicts holding
+    those names and ``hours``, ordered by them.
+    """
+    rows = _grouped(daily_time(start, end, users, projects), group_by).annotate(
+        seconds=Sum("seconds")
+    )
+    return [
+        {**{name: row[name] for name in group_by}, "hours": row["seconds"] / 3600}
+        for row in rows
+        if row["seconds"]
+    ]
+
+
+def billable_hours(start, end, group_by=("user",), users=None, projects=None):
+    """
+    Hours logged in ``[start, end)`` split into ``billable`` and ``internal``
+    (work for a ``Client.internal`` client) per ``group_by`` combination.
+    """
+    internal = Q(task__project__client__internal=True)
+    rows = _grouped(daily_time(start, end, users, projects), group_by).annotate(
+        billable=Sum(Case(When(~internal, then="seconds"), default=0)),
+        internal=Sum(Case(When(internal, then="seconds"), default=0)),
+    )
+    return [
+        {
+            **{name: row[name] for name in group_by},
+            "billable": row["billable"] / 3600,
+            "internal": row["internal"] / 3600,
+        }
+        for row in rows
+    ]
+
+
+def utilization(start, end, users=None):
+    """
+    ``Utilization`` of every active user (or of ``users``) over ``[start,
+    end)``: logged and billable hours against ``daily_capacity_hours`` on each
+    working day. ``utilization`` is billable over capacity, ``None`` for users
+    without capacity.
+    """
+    User = get_user_model()
+    people = User.objects.filter(is_active=True)
+    if users is not None:
+        people = User.objects.filter(pk__in=users)
+    capacities = dict(people.values_list("pk", "daily_capacity_hours"))
+    totals = {
+        row["user"]: row
+        for row in billable_hours(start, end, ("user",), users=list(capacities))
+    }
+    workdays = max(WorkCalendar._workdays_between(start, end), 0)
+    report = []
+    for user_id, per_day in sorted(capacities.items()):
+        row = totals.get(user_id, {"billable": 0.0, "internal": 0.0})
+        capacity = per_day * workdays
+        report.append(
+            Utilization(
+                user_id=user_id,
+                capacity_hours=capacity,
+                logged_hours=row["billable"] + row["internal"],
+                billable_hours=row["billable"],
+                utilization=row["billable"] / capacity if capacity > 0 else None,
+            )
+        )
+    return report
+
+
+def estimate_vs_actual(projects=None):
+    """
+    ``EstimateVsActual`` per project from its root tasks' rollups: the
+    estimate, hours logged, hours still estimated to go, their sum as the
+    forecast and the forecast's overrun of the estimate.
+    """
+    roots = Task.objects.filter(parent__isnull=True)
+    if projects is not None:
+        roots = roots.filter(project__in=projects)
+    rows = (
+        roots.values("project_id")
+        .annotate(
+            estimate=Sum("dependent_hours"),
+            actual=Sum("actual_hours"),
+            remaining=Sum("remaining_hours"),
+        )
+        .order_by("project_id")
+    )
+    return [
+        EstimateVsActual(
+            project_id=row["project_id"],
+            estimate_hours=row["estimate"],
+            actual_hours=row["actual"],
+            remaining_hours=row["remaining"],
+            forecast_hours=row["actual"] + row["remaining"],
+            variance_hours=row["actual"] + row["remaining"] - row["estimate"],
+        )
+        for row in rows
+    ]
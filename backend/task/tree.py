@@ -0,0 +1,119 @@
+"""
+Nested task trees for whole projects.
+
+A project's tasks are read with one query, grouped by ``parent_id`` in a single
+pass and written out depth first as JSON. The encoder is a generator that
+yields the document in chunks, so the serialized tree is never held in memory
+at once and can be handed straight to a ``StreamingHttpResponse``.
+"""
+import json
+from collections import defaultdict
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from task.models import Task
+
+TREE_FIELDS = (
+    "id",
+    "parent_id",
+    "name",
+    "status",
+    "hours_estimate",
+    "dependent_hours",
+    "actual_hours",
+    "remaining_hours",
+    "schedule_datetime",
+    "due_date",
+    "risk_hours",
+    "assigned_to_id",
+    "child_count",
+)
+
+# Flush the output buffer once it holds roughly this many characters.
+CHUNK_SIZE = 64 * 1024
+
+
+def load_tree(project_id, root_id=None):
+    """
+    Return ``(roots, children)`` for a project, or for the subtree under
+    ``root_id``: the top-level rows and a ``{parent_id: [row, ...]}`` map, where
+    each row is a tuple of ``TREE_FIELDS``. Children are ordered by id.
+
+    One query for the project; a subtree adds a primary key lookup for the root's
+    materialized path so the tasks can be read with an indexed prefix scan.
+    """
+    tasks = Task.objects.filter(project_id=project_id)
+    if root_id is not None:
+        path = tasks.filter(pk=root_id).values_list("path", flat=True).first()
+        if path is None:
+            raise Task.DoesNotExist(
+                f"Task {root_id} does not exist in project {project_id}."
+            )
+        tasks = tasks.filter(path__startswith=path)
+
+    ids, children = set(), defaultdict(list)
+    for row in tasks.order_by("id").values_list(*TREE_FIELDS).iterator(2000):
+        ids.add(row[0])
+        children[row[1]].append(row)
+
+    if root_id is not None:
+        roots = [
+            row for rows in children.values() for row in rows if row[0] == root_id
+        ]
+    else:
+        roots = sorted(
+            row
+            for parent_id, rows in children.items()
+            if parent_id not in ids
+            for row in rows
+        )
+    return roots, children
+
+
+def iter_tree_json(project_id, roots, children, max_depth=None):
+    """
+    Yield the JSON document ``{"project": id, "tasks": [...]}`` for a tree from
+    ``load_tree`` in chunks, every task carrying its nested ``children``. Tasks
+    more than ``max_depth`` levels below the top are left out; ``child_count``
+    still tells the client that a truncated task has children.
+    """
+    encoder = DjangoJSONEncoder(separators=(",", ":"))
+    names = [json.dumps(field.removesuffix("_id")) for field in TREE_FIELDS[2:]]
+
+    def node_head(row):
+        fields = "".join(
+            f",{name}:{encoder.encode(value)}" for name, value in zip(names, row[2:])
+        )
+        parent = encoder.encode(row[1])
+        return f'{{"id":{row[0]},"parent":{parent}{fields},"children":['
+
+    buffer = [f'{{"project":{json.dumps(project_id)},"tasks":[']
+    size = len(buffer[0])
+    # Each frame walks one list of siblings: [rows, depth, wrote_a_sibling].
+    # Closing a frame closes its parent's "children" list and object, or, for
+    # the top-level frame, the "tasks" list and the document: "]}" either way.
+    stack = [[iter(roots), 0, False]]
+    seen = set()
+    while stack:
+        frame = stack[-1]
+        row = next(frame[0], None)
+        if row is not None and row[0] in seen:
+            continue  # Only reachable through a parent cycle.
+        if row is None:
+            stack.pop()
+            part = "]}"
+        else:
+            part = ("," if frame[2] else "") + node_head(row)
+            frame[2] = True
+            seen.add(row[0])
+            depth = frame[1]
+            kids = children.get(row[0], ())
+            if max_depth is not None and depth >= max_depth:
+                kids = ()
+            stack.append([iter(kids), depth + 1, False])
+        buffer.append(part)
+        size += len(part)
+        if size >= CHUNK_SIZE:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    yield "".join(buffer)
@@ -1,3 +1,293 @@
-from django.shortcuts import render
+from django.core.exceptions import ValidationError
+from django.db.models import Prefetch
+from rest_framework import serializers, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError as DRFValidationError
+from rest_framework.response import Response
 
-# Create your views here.
+from project.models import Project
+from task import timesheets
+from task.batch import BatchError, apply_batch
+from task.cached_reads import user_tasks
+from task.cloning import clone_subtree
+from task.models import Task, TimeEntry
+from task.scenarios import run_scenario
+from task.serializers import TaskSerializer, TimeEntrySerializer, TimerSerializer
+from task.timers import running_timer, start_timer, stop_timer, switch_timer
+
+
+class TaskViewSet(viewsets.ModelViewSet):
+    """
+    Tasks with everything the serializer reads joined or prefetched up front, so
+    a page costs the same three queries whatever its size.
+    """
+    queryset = Task.objects.select_related(
+        "project__client", "assigned_to", "parent"
+    ).prefetch_related(
+        Prefetch("prerequisites", queryset=Task.objects.only("id")),
+        Prefetch("children", queryset=Task.objects.only("id", "parent_id")),
+    )
+    serializer_class = TaskSerializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = TaskFilterParamsSerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = params.validated_data
+        if filters.get("project"):
+            queryset = queryset.filter(project_id=filters["project"])
+        if filters.get("parent"):
+            queryset = queryset.filter(parent_id=filters["parent"])
+        if filters.get("assigned_to"):
+            queryset = queryset.filter(assigned_to_id=filters["assigned_to"])
+        return queryset
+
+    @action(detail=False)
+    def assigned(self, request):
+        """Open tasks assigned to ``?user=<id>`` (default: the requesting user)."""
+        user = request.query_params.get("user") or request.user.pk
+        try:
+            user = int(user)
+        except ValueError as error:
+            raise DRFValidationError({"user": "Expected a user id."}) from error
+        return Response(user_tasks(user))
+
+    @action(detail=False, methods=["post"])
+    def batch(self, request):
+        """
+        Apply ``{"operations": [...]}`` in one transaction; see ``task.batch``
+        for the operations. Responds 400 with the errors keyed by operation
+        index, having written nothing, if any operation is invalid.
+        """
+        params = BatchParamsSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        try:
+            result = apply_batch(params.validated_data["operations"])
+        except BatchError as error:
+            return Response(
+                {"operations": error.operation_errors},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(result._asdict())
+
+    @action(detail=True, methods=["post"])
+    def clone(self, request, pk=None):
+        """
+        Copy the task and its subtree, with their prerequisites, into
+        ``{"project": id}``, under ``"parent"`` if given; see ``task.cloning``.
+        """
+        params = CloneParamsSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        task = self.get_object()
+        try:
+            result = clone_subtree(
+                task,
+                params.validated_data["project"],
+                parent=params.validated_data.get("parent"),
+            )
+        except ValidationError as error:
+            raise DRFValidationError({"non_field_errors": error.messages}) from error
+        return Response(result._asdict(), status=status.HTTP_201_CREATED)
+
+
+class TaskFilterParamsSerializer(serializers.Serializer):
+    project = serializers.IntegerField(required=False)
+    parent = serializers.IntegerField(required=False)
+    assigned_to = serializers.IntegerField(required=False)
+
+
+class BatchParamsSerializer(serializers.Serializer):
+    operations = serializers.ListField(
+        child=serializers.DictField(), allow_empty=False, max_length=5000
+    )
+
+
+class CloneParamsSerializer(serializers.Serializer):
+    project = serializers.PrimaryKeyRelatedField(queryset=Project.objects.all())
+    parent = serializers.IntegerField(required=False, allow_null=True)
+
+
+class ScenarioViewSet(viewsets.ViewSet):
+    """What-if rescheduling of the portfolio, computed without writing."""
+
+    def create(self, request):
+        """
+        Apply ``{"edits": [...]}`` to the booked and started projects plus
+        ``"candidates"`` (e.g. open RFPs) and respond with the changed tasks and
+        per-project summaries as ``[before, after]`` pairs; see
+        ``task.scenarios``.
+        """
+        params = ScenarioParamsSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        try:
+            result = run_scenario(
+                params.validated_data["edits"],
+                candidate_ids=params.validated_data["candidates"],
+            )
+        except ValidationError as error:
+            raise DRFValidationError({"edits": error.messages}) from error
+        return Response(result._asdict())
+
+
+class ScenarioParamsSerializer(serializers.Serializer):
+    candidates = serializers.ListField(
+        child=serializers.IntegerField(), required=False, default=list
+    )
+    edits = serializers.ListField(
+        child=serializers.DictField(), required=False, default=list, max_length=1000
+    )
+
+
+class TimeEntryViewSet(viewsets.ModelViewSet):
+    queryset = TimeEntry.objects.select_related("task", "user")
+    serializer_class = TimeEntrySerializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = TimeEntryFilterParamsSerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        filters = params.validated_data
+        if filters.get("task"):
+            queryset = queryset.filter(task_id=filters["task"])
+        if filters.get("user"):
+            queryset = queryset.filter(user_id=filters["user"])
+        return queryset
+
+    @action(detail=False, methods=["get"])
+    def timer(self, request):
+        """The requesting user's running timer, or ``null``."""
+        entry = running_timer(request.user)
+        return Response(TimerSerializer(entry).data if entry else None)
+
+    @action(detail=False, methods=["post"], url_path="timer/start")
+    def timer_start(self, request):
+        """Start a timer on ``{"task": id}`` for the requesting user."""
+        params = TimerParamsSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        entry = self._timer_action(
+            start_timer, request.user, params.validated_data["task"]
+        )
+        return Response(TimerSerializer(entry).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=["post"], url_path="timer/stop")
+    def timer_stop(self, request):
+        """Stop the requesting user's running timer."""
+        entry = self._timer_action(stop_timer, request.user)
+        return Response(TimerSerializer(entry).data)
+
+    @action(detail=False, methods=["post"], url_path="timer/switch")
+    def timer_switch(self, request):
+        """Stop the running timer and start one on ``{"task": id}``."""
+        params = TimerParamsSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        stopped, started = self._timer_action(
+            switch_timer, request.user, params.validated_data["task"]
+        )
+        return Response(
+            {
+                "stopped": TimerSerializer(stopped).data,
+                "started": TimerSerializer(started).data,
+            }
+        )
+
+    @staticmethod
+    def _timer_action(function, *args):
+        try:
+            return function(*args)
+        except ValidationError as error:
+            raise DRFValidationError({"non_field_errors": error.messages}) from error
+
+
+class TimeEntryFilterParamsSerializer(serializers.Serializer):
+    task = serializers.IntegerField(required=False)
+    user = serializers.IntegerField(required=False)
+
+
+class TimerParamsSerializer(serializers.Serializer):
+    task = serializers.IntegerField()
+
+
+class ReportViewSet(viewsets.ViewSet):
+    """Timesheet, utilization and billing reports over ``DailyTime``."""
+
+    @action(detail=False)
+    def timesheet(self, request):
+        """Hours per ``group_by`` combination, e.g. ``?group_by=user,week``."""
+        params = self._params(request)
+        return Response(
+            timesheets.timesheet(
+                params["start"],
+                params["end"],
+                params["group_by"] or ("user", "week"),
+                params["users"],
+                params["projects"],
+            )
+        )
+
+    @action(detail=False)
+    def billable(self, request):
+        """Billable and internal hours per ``group_by`` combination."""
+        params = self._params(request)
+        return Response(
+            timesheets.billable_hours(
+                params["start"],
+                params["end"],
+                params["group_by"] or ("user",),
+                params["users"],
+                params["projects"],
+            )
+        )
+
+    @action(detail=False)
+    def utilization(self, request):
+        """Logged and billable hours against capacity per user."""
+        params = self._params(request)
+        rows = timesheets.utilization(params["start"], params["end"], params["users"])
+        return Response([row._asdict() for row in rows])
+
+    @action(detail=False, url_path="estimate-vs-actual")
+    def estimate_vs_actual(self, request):
+        """Estimated, logged and remaining hours per project."""
+        projects = ReportParamsSerializer.id_list(request, "projects")
+        rows = timesheets.estimate_vs_actual(projects)
+        return Response([row._asdict() for row in rows])
+
+    @staticmethod
+    def _params(request):
+        params = ReportParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = dict(params.validated_data)
+        for name in ("users", "projects"):
+            data[name] = ReportParamsSerializer.id_list(request, name)
+        return data
+
+
+class ReportParamsSerializer(serializers.Serializer):
+    start = serializers.DateField()
+    end = serializers.DateField()
+    group_by = serializers.CharField(required=False, default="")
+
+    def validate_group_by(self, value):
+        names = tuple(name for name in value.split(",") if name)
+        unknown = set(names) - timesheets.GROUPINGS.keys()
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unknown groupings: {', '.join(sorted(unknown))}"
+            )
+        return names
+
+    def validate(self, attrs):
+        if attrs["end"] <= attrs["start"]:
+            raise serializers.ValidationError("end must be after start.")
+        return attrs
+
+    @staticmethod
+    def id_list(request, name):
+        """Comma-separated ids in ``?name=``, or ``None`` when absent."""
+        value = request.query_params.get(name)
+        if not value:
+            return None
+        try:
+            return [int(part) for part in value.split(",") if part]
+        except ValueError as error:
+            raise DRFValidationError({name: "Expected comma-separated ids."}) from error
@@ -0,0 +1,190 @@
+"""
+Background consumer for project reschedule jobs.
+
+``SchedulerWorker`` claims batches of jobs from a ``task.queue`` backend,
+splits the claimed projects into chunks and schedules the chunks across a
+process pool. Jobs that carry edited task ids are rescheduled incrementally
+downstream of those tasks; the rest reschedule their whole project.
+Scheduling cost therefore never lands on a web request; edits only enqueue
+their project (see ``task.scheduling.flush_dirty``).
+"""
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.db import connections
+
+from task.queue import get_queue
+from task.scheduling import reschedule_tasks, schedule_projects
+
+logger = logging.getLogger(__name__)
+
+
+def _init_process():
+    """Make spawned pool processes ready to use the ORM."""
+    django.setup()
+
+
+def reschedule_jobs(jobs):
+    """
+    Reschedule the projects of ``jobs``: the downstream cone of their edited
+    tasks, or the whole project for jobs without task ids. Returns the number
+    of tasks scheduled.
+    """
+    whole = [job.project_id for job in jobs if job.task_ids is None]
+    task_ids = set().union(*(job.task_ids for job in jobs if job.task_ids))
+    scheduled = 0
+    if whole:
+        scheduled += len(schedule_projects(whole).early_start)
+    if task_ids:
+        scheduled += len(reschedule_tasks(task_ids).early_start)
+    return scheduled
+
+
+def _schedule_chunk(jobs):
+    """Schedule one chunk of jobs in a pool process."""
+    try:
+        return reschedule_jobs(jobs)
+    finally:
+        connections.close_all()
+
+
+class WorkerStats:
+    """Running totals reported by the worker after every batch."""
+
+    def __init__(self):
+        self.processed = 0
+        self.failed = 0
+        self.tasks_scheduled = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    def record(self, jobs, finished_at, tasks_scheduled=0, failed=False):
+        if failed:
+            self.failed += len(jobs)
+            return
+        self.processed += len(jobs)
+        self.tasks_scheduled += tasks_scheduled
+        for job in jobs:
+            latency = finished_at - job.enqueued_at
+            self.latency_total += latency
+            self.latency_max = max(self.latency_max, latency)
+
+    @property
+    def latency_mean(self):
+        return self.latency_total / self.processed if self.processed else 0.0
+
+    def as_dict(self):
+        return {
+            "processed": self.processed,
+            "failed": self.failed,
+            "tasks_scheduled": self.tasks_scheduled,
+            "latency_mean_seconds": round(self.latency_mean, 3),
+            "latency_max_seconds": round(self.latency_max, 3),
+        }
+
+
+class SchedulerWorker:
+    """
+    Claim jobs from ``queue`` and reschedule their projects.
+
+    With ``processes`` greater than one the claimed projects are split into
+    ``chunk_size`` groups and scheduled in parallel; otherwise they are
+    scheduled in this process, which is what tests and the ``local`` queue use.
+    """
+
+    def __init__(
+        self,
+        queue=None,
+        processes=1,
+        batch_size=100,
+        chunk_size=10,
+        poll_interval=1.0,
+        stale_after=600,
+    ):
+        self.queue = queue or get_queue()
+        self.processes = processes
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.stats = WorkerStats()
+        self._pool = None
+
+    def run(self, once=False):
+        """Process batches until stopped, or until the queue is empty if ``once``."""
+        self.queue.requeue_stale(self.stale_after)
+        try:
+            while True:
+                # A batch where every job failed also backs off, so a project
+                # that keeps failing cannot spin the worker.
+                if not self.run_batch():
+                    if once:
+                        return self.stats
+                    time.sleep(self.poll_interval)
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+
+    def run_batch(self):
+        """Claim and process one batch. Returns the number of jobs completed."""
+        jobs = self.queue.claim(self.batch_size)
+        if not jobs:
+            return 0
+        processed = self.stats.processed
+        chunks = [
+            jobs[start:start + self.chunk_size]
+            for start in range(0, len(jobs), self.chunk_size)
+        ]
+        if self.processes > 1:
+            self._run_in_pool(chunks)
+        else:
+            for chunk in chunks:
+                self._run_chunk(chunk)
+        depth = self.queue.stats()
+        logger.info(
+            "Rescheduled %d project(s); queue depth %d, oldest %.1fs; %s",
+            len(jobs),
+            depth.depth,
+            depth.oldest_age_seconds,
+            self.stats.as_dict(),
+        )
+        return self.stats.processed - processed
+
+    def _run_chunk(self, chunk):
+        try:
+            scheduled = reschedule_jobs(chunk)
+        except Exception:
+            logger.exception("Rescheduling failed for %s", chunk)
+            self._finish(chunk, failed=True)
+        else:
+            self._finish(chunk, tasks_scheduled=scheduled)
+
+    def _run_in_pool(self, chunks):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.processes, initializer=_init_process
+            )
+        # Forked processes must not share this process's database sockets.
+        connections.close_all()
+        futures = {
+            self._pool.submit(_schedule_chunk, chunk): chunk
+            for chunk in chunks
+        }
+        for future in as_completed(futures):
+            chunk = futures[future]
+            try:
+                scheduled = future.result()
+            except Exception:
+                logger.exception("Rescheduling failed for %s", chunk)
+                self._finish(chunk, failed=True)
+            else:
+                self._finish(chunk, tasks_scheduled=scheduled)
+
+    def _finish(self, chunk, tasks_scheduled=0, failed=False):
+        if failed:
+            self.queue.release(chunk)
+        else:
+            self.queue.complete(chunk)
+        self.stats.record(chunk, time.time(), tasks_scheduled, failed=failed)
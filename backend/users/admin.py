@@ -1,3 +1,13 @@
 from django.contrib import admin
+from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 
-# Register your models here.
+from users.models import User
+
+
+@admin.register(User)
+class UserAdmin(BaseUserAdmin):
+    list_display = (*BaseUserAdmin.list_display, "initials", "daily_capacity_hours")
+    fieldsets = (
+        *BaseUserAdmin.fieldsets,
+        ("Scheduling", {"fields": ("initials", "daily_capacity_hours")}),
+    )
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 14:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='daily_capacity_hours',
+            field=models.FloatField(default=8, help_text='Hours per working day the scheduler may assign to this user'),
+        ),
+    ]
@@ -9,6 +9,10 @@ class User(AbstractUser):
         blank=True,
         help_text="3-character initials for display next to tasks"
     )
+    daily_capacity_hours = models.FloatField(
+        default=8,
+        help_text="Hours per working day the scheduler may assign to this user"
+    )
     
     class Meta:
         ordering = ['last_name', 'first_name']